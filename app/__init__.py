@@ -4,7 +4,6 @@ from __future__ import annotations
 import json
 import logging
 import os
-import re
 import time
 from datetime import datetime, timezone
 from importlib import import_module
@@ -47,6 +46,16 @@ except Exception:  # pragma: no cover
 
 from flask_migrate import Migrate
 
+from app.security.csp import NONCE_SLOT, CspTemplate
+from app.security.jinja_nonce import current_nonce
+from app.services import request_timing
+from app.services.invalidation_bus import init_invalidation_bus
+from app.services.metrics import count_socketio_clients, init_metrics
+from app.services.metrics_store import init_metrics_store
+from app.services.request_timing import init_request_timing
+from app.services.schema_registry import init_schema_registry
+from app.services.startup_profile import StartupProfile
+
 load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -184,10 +193,7 @@ def _safe_register(app: Flask, dotted: str, attr: str | Iterable[str], url_prefi
 
 # ── Security (CSP/nonce) ───────────────────────────────────────────
 
-_SCRIPT_OPEN = re.compile(r"(<script\b(?![^>]*\bnonce=)[^>]*>)", re.IGNORECASE)
-_STYLE_OPEN  = re.compile(r"(<style\b(?![^>]*\bnonce=)[^>]*>)", re.IGNORECASE)
-
-def _build_csp(nonce: str) -> str:
+def _csp_policy() -> str:
     STRIPE_JS   = "https://js.stripe.com"
     STRIPE_API  = "https://api.stripe.com"
     PAYPAL_CORE = "https://www.paypal.com"
@@ -197,6 +203,7 @@ def _build_csp(nonce: str) -> str:
     SOCKETIO_CDN = "https://cdn.socket.io"
     YT_FRAME = "https://www.youtube-nocookie.com https://www.youtube.com"
     YT_IMG   = "https://i.ytimg.com"
+    nonce = NONCE_SLOT
 
     script_src = (
         f"'self' 'nonce-{nonce}' 'strict-dynamic' "
@@ -225,57 +232,65 @@ def _build_csp(nonce: str) -> str:
     )
 
 
+# Compiled once per process: per response only the nonce is joined in
+_CSP = CspTemplate(_csp_policy())
+
+_HARDENING_HEADERS = (
+    ("Referrer-Policy", "strict-origin-when-cross-origin"),
+    ("Permissions-Policy", "camera=(), geolocation=(), microphone=(), payment=()"),
+    ("X-Frame-Options", "DENY"),
+    ("X-Content-Type-Options", "nosniff"),
+)
+_HSTS = ("Strict-Transport-Security", "max-age=31536000; includeSubDomains; preload")
+
+
 def init_security(app: Flask) -> None:
     """Nonce in Jinja context + headers (CSP/HSTS/etc)."""
 
+    # Auto-nonce inline <script>/<style> when templates compile (not per response)
+    if app.config.get("AUTO_NONCE_HTML", True):
+        from app.security.jinja_nonce import CspNonceExtension
+
+        app.jinja_env.add_extension(CspNonceExtension)
+
     @app.context_processor
     def _inject_csp_nonce():
-        if not hasattr(g, "csp_nonce"):
-            from secrets import token_urlsafe
-            g.csp_nonce = token_urlsafe(16)
-        return {"csp_nonce": g.csp_nonce}
+        # The only place (with the template global) a nonce is minted: HTML renders
+        return {"csp_nonce": current_nonce()}
 
     @app.after_request
     def _apply_security_headers(resp):
-        # request id + server timing
         rid = getattr(g, "request_id", None)
         if rid:
             resp.headers.setdefault("X-Request-ID", rid)
+
+        with request_timing.segment("csp"):
+            headers = resp.headers
+            # CSP only for HTML documents: static files, JSON and 304s skip it
+            if (
+                resp.status_code != 304
+                and resp.mimetype == "text/html"
+                and request.endpoint != "static"
+                and app.config.get("AUTO_SET_CSP", True)
+                and "Content-Security-Policy" not in headers
+            ):
+                headers["Content-Security-Policy"] = _CSP.render(g.get("csp_nonce") or "")
+
+            # Standard hardening
+            for name, value in _HARDENING_HEADERS:
+                if name not in headers:
+                    headers[name] = value
+            if request.is_secure or app.config.get("PREFERRED_URL_SCHEME") == "https":
+                headers.setdefault(*_HSTS)
+
+        # Server timing (db/render/csp/compress) + budget log; runs after Compress
         try:
-            dur_ms = (time.perf_counter() - getattr(g, "_start_ts", time.perf_counter())) * 1000.0
-            resp.headers.setdefault("Server-Timing", f"app;dur={dur_ms:.1f}")
+            start = getattr(g, "_start_ts", None)
+            resp.headers.setdefault("Server-Timing", request_timing.server_timing(start))
+            request_timing.check_budget(app, resp.status_code, start)
         except Exception:
             pass
 
-        # CSP
-        nonce = getattr(g, "csp_nonce", "")
-        if app.config.get("AUTO_SET_CSP", True) and nonce:
-            resp.headers.setdefault("Content-Security-Policy", _build_csp(nonce))
-
-        # Standard hardening
-        resp.headers.setdefault("Referrer-Policy", "strict-origin-when-cross-origin")
-        resp.headers.setdefault("Permissions-Policy", "camera=(), geolocation=(), microphone=(), payment=()")
-        resp.headers.setdefault("X-Frame-Options", "DENY")
-        resp.headers.setdefault("X-Content-Type-Options", "nosniff")
-        if request.is_secure or app.config.get("PREFERRED_URL_SCHEME") == "https":
-            resp.headers.setdefault("Strict-Transport-Security", "max-age=31536000; includeSubDomains; preload")
-
-        # Auto-nonce any inline <script>/<style> if allowed
-        if (
-            app.config.get("AUTO_NONCE_HTML", True)
-            and nonce
-            and resp.mimetype == "text/html"
-            and not resp.direct_passthrough
-        ):
-            try:
-                html = resp.get_data(as_text=True)
-                if "<script" in html or "<style" in html:
-                    html = _SCRIPT_OPEN.sub(lambda m: m.group(1)[:-1] + f' nonce="{nonce}">', html)
-                    html = _STYLE_OPEN.sub(lambda m: m.group(1)[:-1] + f' nonce="{nonce}">', html)
-                    resp.set_data(html)
-            except Exception:
-                pass
-
         return resp
 
 
@@ -337,6 +352,8 @@ def create_app(config_class: ConfigLike | None = None) -> Flask:
         static_folder=str(BASE_DIR / "app/static"),
         template_folder=str(BASE_DIR / "app/templates"),
     )
+    # Per-step init timings (`flask startup-profile`)
+    boot = app.extensions["fc_startup"] = StartupProfile()
 
     # Jinja filters & globals
     def usd(value):
@@ -418,34 +435,55 @@ def create_app(config_class: ConfigLike | None = None) -> Flask:
     if app.config.get("ENV") == "production" and Talisman:
         Talisman(app, content_security_policy=None)
 
-    # Security headers + nonce
-    init_security(app)
+    # Security headers + nonce; per-request timing segments; /metrics
+    with boot.step("metrics"):
+        init_metrics(app)
+        init_metrics_store(app)  # backend chosen lazily, on first ROI read/flush
+    with boot.step("request_timing"):
+        init_request_timing(app)
+    with boot.step("security"):
+        init_security(app)
 
     # Core extensions
     if csrf:
-        csrf.init_app(app)
-    db.init_app(app)
+        with boot.step("csrf"):
+            csrf.init_app(app)
+    with boot.step("sqlalchemy"):
+        db.init_app(app)
     if app.config.get("SQLALCHEMY_DATABASE_URI", "").startswith("sqlite"):
         try:
-            with app.app_context():
+            with boot.step("sqlite.create_all"), app.app_context():
                 db.create_all()
         except Exception:
             pass
-    Migrate(app, db, compare_type=True, render_as_batch=True)
-
-    mail.init_app(app)
+    with boot.step("migrate"):
+        Migrate(app, db, compare_type=True, render_as_batch=True)
+    with boot.step("schema_registry"):
+        init_schema_registry(app)
+    with boot.step("invalidation_bus"):
+        init_invalidation_bus(app)
+
+    with boot.step("mail"):
+        mail.init_app(app)
     if Compress:
-        Compress(app)
+        with boot.step("compress"):
+            compress = Compress(app)
+            request_timing.time_after_request(app, compress.after_request, "compress")
 
     # Socket.IO
     app.socketio = socketio
-    socketio.init_app(app, cors_allowed_origins=cors_origins if cors_origins else "*")
+    with boot.step("socketio"):
+        socketio.init_app(app, cors_allowed_origins=cors_origins if cors_origins else "*")
+        count_socketio_clients(app, socketio)  # fc_socketio_clients, without claiming handlers
 
     # Request bootstrap (rid/nonce/timing + Sentry tags)
     @app.before_request
     def _bootstrap_request():
-        from secrets import token_urlsafe
-        g.csp_nonce = getattr(g, "csp_nonce", token_urlsafe(16))
+        # g outlives the request when an app context is already pushed (tests,
+        # scripts): drop per-request state so nonces/tokens/timings never carry over.
+        # The CSP nonce is minted lazily on first template render (see jinja_nonce).
+        for key in ("csp_nonce", app.config.get("WTF_CSRF_FIELD_NAME", "csrf_token"), "_fc_timing"):
+            g.pop(key, None)
         g.request_id = request.headers.get("X-Request-ID") or uuid4().hex
         g._start_ts = time.perf_counter()
         try:
@@ -532,7 +570,40 @@ def create_app(config_class: ConfigLike | None = None) -> Flask:
         ("app.routes.sms",            "sms_bp|bp",  "/sms"),
     ]
     for dotted, attr, prefix in blueprints:
-        _safe_register(app, dotted, attr, prefix)
+        with boot.step(f"blueprint:{dotted}"):  # import + register
+            _safe_register(app, dotted, attr, prefix)
+
+    # CLI (`flask goals reconcile`)
+    try:
+        from app.cli.goals import goalscli  # type: ignore
+
+        app.cli.add_command(goalscli)
+    except Exception as e:  # pragma: no cover
+        app.logger.debug("goals CLI unavailable: %s", e)
+
+    # CLI (`flask outbox drain|stats`)
+    try:
+        from app.cli.outbox import outboxcli  # type: ignore
+
+        app.cli.add_command(outboxcli)
+    except Exception as e:  # pragma: no cover
+        app.logger.debug("outbox CLI unavailable: %s", e)
+
+    # CLI (`flask leaderboard rebuild|show`)
+    try:
+        from app.cli.leaderboard import leaderboardcli  # type: ignore
+
+        app.cli.add_command(leaderboardcli)
+    except Exception as e:  # pragma: no cover
+        app.logger.debug("leaderboard CLI unavailable: %s", e)
+
+    # CLI (`flask startup-profile`)
+    try:
+        from app.cli.startup import startup_profile_cmd  # type: ignore
+
+        app.cli.add_command(startup_profile_cmd)
+    except Exception as e:  # pragma: no cover
+        app.logger.debug("startup-profile CLI unavailable: %s", e)
 
     # Health/version
     @app.get("/healthz")
@@ -543,20 +614,11 @@ def create_app(config_class: ConfigLike | None = None) -> Flask:
     def _version():
         return {"version": os.getenv("GIT_COMMIT", "dev"), "env": app.config.get("ENV")}
 
-    # CSRF cookie
+    # CSRF cookie (only for responses that rendered a token; never cacheable ones)
     if csrf and generate_csrf:
-        @app.after_request
-        def _inject_csrf_cookie(resp):
-            try:
-                resp.set_cookie(
-                    "csrf_token",
-                    generate_csrf(),
-                    samesite="Lax",
-                    secure=(app.config.get("ENV") == "production"),
-                )
-            except Exception:
-                pass
-            return resp
+        from app.security.csrf_cookie import init_csrf_cookie
+
+        init_csrf_cookie(app)
 
     # Launch banner
     stripe_ok = bool(os.getenv("STRIPE_SECRET_KEY"))
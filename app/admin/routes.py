@@ -29,10 +29,12 @@ from flask import (
     request,
     url_for,
 )
-from sqlalchemy import desc, func
-from sqlalchemy import inspect as sa_inspect
+from sqlalchemy import desc
 
 from app.extensions import db
+from app.services.keyset import cached_count, seek
+from app.services.schema_registry import get_registry, refresh_schema
+from app.services.schema_registry import table_exists as _table_exists
 
 # ── Optional admin auth (flask_login) ────────────────────────────────────────
 try:
@@ -63,16 +65,30 @@ def _require_admin_guard() -> bool:
 
 
 # ── Models (tolerant imports; continue gracefully if missing) ────────────────
+# app.models only re-exports Example, so import each model from its module
 try:
-    from app.models import (  # type: ignore
-        CampaignGoal,
-        Example,
-        Sponsor,
-        Transaction,
-    )
+    from app.models.campaign_goal import CampaignGoal  # type: ignore
+    from app.models.example import Example  # type: ignore
+    from app.models.sponsor import Sponsor  # type: ignore
+    from app.models.transaction import Transaction  # type: ignore
 except Exception:  # pragma: no cover
     Sponsor = Transaction = CampaignGoal = Example = None  # type: ignore
 
+try:
+    from app.models.campaign_goal import LISTED_SPONSOR_STATUSES  # type: ignore
+    from app.models.sponsor import SPONSOR_STATUSES  # type: ignore
+except Exception:  # pragma: no cover
+    LISTED_SPONSOR_STATUSES = ("approved", "paid", "completed", "success")
+    SPONSOR_STATUSES = ("pending", "paid", "completed", "success", "refunded", "failed")
+
+# `?status=` values whose counts are cached (anything else would mint a cache key per value)
+_COUNTED_STATUSES = frozenset(SPONSOR_STATUSES) | frozenset(LISTED_SPONSOR_STATUSES)
+
+try:
+    from app.models.fundraising_totals import FundraisingTotals, get_totals  # type: ignore
+except Exception:  # pragma: no cover
+    FundraisingTotals = get_totals = None  # type: ignore
+
 
 # ── Blueprints ───────────────────────────────────────────────────────────────
 admin = Blueprint("admin", __name__, url_prefix="/admin")
@@ -85,18 +101,10 @@ api_bp = api
 __all__ = ["bp", "admin_bp", "api_bp", "admin", "api"]
 
 
-# ── Helpers ─────────────────────────────────────────────────────────────────
-def _table_exists(name_or_model: Any) -> bool:
-    """Safe table existence check (won’t raise in dev)."""
-    try:
-        name = getattr(name_or_model, "__tablename__", None) or str(name_or_model)
-        if not name:
-            return False
-        return bool(sa_inspect(db.engine).has_table(name))
-    except Exception:
-        return False
+ADMIN_SPONSORS_PER_PAGE = 50
 
 
+# ── Helpers ─────────────────────────────────────────────────────────────────
 def _first_attr(obj: Any, candidates: Iterable[str]) -> Any:
     """Return first present attribute from candidates, else None."""
     for c in candidates:
@@ -113,41 +121,26 @@ def _sponsor_query():
     if hasattr(Sponsor, "deleted"):
         q = q.filter(Sponsor.deleted.is_(False))
     if hasattr(Sponsor, "status"):
-        q = q.filter(Sponsor.status == "approved")
+        q = q.filter(Sponsor.status.in_(LISTED_SPONSOR_STATUSES))
     order_col = _first_attr(Sponsor, ("created_at", "id"))
     if order_col is not None:
         q = q.order_by(desc(order_col))
     return q
 
 
-def _sum_sponsor_amounts() -> float:
-    """Sum sponsor amounts safely even if schema varies."""
-    if not Sponsor or not _table_exists(getattr(Sponsor, "__tablename__", "sponsors")):
-        return 0.0
+def _fundraising_totals() -> dict:
+    """Site-wide `fundraising_totals` row (PK lookup); empty if unavailable."""
+    if not get_totals or not _table_exists(getattr(FundraisingTotals, "__tablename__", "fundraising_totals")):
+        return {}
     try:
-        if hasattr(Sponsor, "amount"):
-            q = db.session.query(func.coalesce(Sponsor.amount, 0.0))
-            if hasattr(Sponsor, "deleted"):
-                q = q.filter(Sponsor.deleted.is_(False))
-            if hasattr(Sponsor, "status"):
-                q = q.filter(Sponsor.status == "approved")
-            # SUM(amount)
-            total = db.session.query(func.coalesce(func.sum(Sponsor.amount), 0.0))
-            if hasattr(Sponsor, "deleted"):
-                total = total.filter(Sponsor.deleted.is_(False))
-            if hasattr(Sponsor, "status"):
-                total = total.filter(Sponsor.status == "approved")
-            return float(total.scalar() or 0.0)
-        # Fallback: iterate
-        items = (_sponsor_query() or db.session.query(Sponsor)).all()
-        return float(sum((getattr(s, "amount", 0) or 0) for s in items))
+        return get_totals()
     except Exception:
-        current_app.logger.exception("Failed to compute total_raised")
-        return 0.0
+        current_app.logger.exception("Failed to load fundraising totals")
+        return {}
 
 
 def _count(model_name: str, **filters) -> int:
-    """Count records if model/table exists; otherwise 0 (schema-tolerant)."""
+    """Count records if model/table exists; otherwise 0 (schema-tolerant). Tuple values match any."""
     model = globals().get(model_name, None)
     if not model or not _table_exists(getattr(model, "__tablename__", "")):
         return 0
@@ -155,7 +148,8 @@ def _count(model_name: str, **filters) -> int:
         q = db.session.query(model)
         for k, v in filters.items():
             if hasattr(model, k):
-                q = q.filter(getattr(model, k) == v)
+                col = getattr(model, k)
+                q = q.filter(col.in_(v) if isinstance(v, tuple) else col == v)
         return int(q.count())
     except Exception:
         current_app.logger.exception("Count failed for %s", model_name)
@@ -260,11 +254,14 @@ def dashboard():
             current_app.logger.exception("Failed loading recent transactions")
 
     goal = _active_goal()
+    totals = _fundraising_totals()
     stats = {
-        "total_raised": _sum_sponsor_amounts(),
-        "sponsor_count": _count("Sponsor"),
+        "total_raised": float(totals.get("raised_cents") or 0),
+        "donor_count": int(totals.get("donor_count") or 0),
+        "largest_gift": float(totals.get("largest_gift_cents") or 0),
+        "sponsor_count": int(totals["sponsor_count"]) if totals else _count("Sponsor"),
         "pending_sponsors": _count("Sponsor", status="pending") if hasattr(Sponsor or object(), "status") else 0,
-        "approved_sponsors": _count("Sponsor", status="approved") if hasattr(Sponsor or object(), "status") else 0,
+        "approved_sponsors": _count("Sponsor", status=LISTED_SPONSOR_STATUSES) if hasattr(Sponsor or object(), "status") else 0,
         "goal_amount": float(
             getattr(goal, "amount", getattr(goal, "goal_amount", 0)) or 0
         )
@@ -286,27 +283,36 @@ def dashboard():
 @admin.route("/sponsors")
 @login_required
 def sponsors_list():
+    """Newest first, keyset-paginated on (created_at, id); `?cursor=` for the next page."""
     sponsors: List[Any] = []
+    page = None
     q_text = (request.args.get("q") or "").strip()
+    status = (request.args.get("status") or "").strip()
+    cursor = request.args.get("cursor") or None
 
     if not Sponsor or not _table_exists(getattr(Sponsor, "__tablename__", "sponsors")):
-        return render_template("admin/sponsors.html", sponsors=sponsors)
+        return render_template("admin/sponsors.html", sponsors=sponsors, page=page)
 
     try:
         q = db.session.query(Sponsor)
         if hasattr(Sponsor, "deleted"):
             q = q.filter(Sponsor.deleted.is_(False))
+        if status and hasattr(Sponsor, "status"):
+            q = q.filter(Sponsor.status == status)
         if q_text and hasattr(Sponsor, "name"):
             q = q.filter(getattr(Sponsor, "name").ilike(f"%{q_text}%"))
-        order_col = _first_attr(Sponsor, ("created_at", "id"))
-        if order_col is not None:
-            q = q.order_by(desc(order_col))
-        sponsors = q.all()
+
+        # Free-text searches and unknown statuses are not counted (unbounded cache keys, full scans)
+        total = None
+        if not q_text and (not status or status in _COUNTED_STATUSES):
+            total = cached_count(f"admin.sponsors:{status}", ("sponsors",), q)
+        page = seek(q, (Sponsor.created_at, Sponsor.id), cursor, ADMIN_SPONSORS_PER_PAGE, total=total)
+        sponsors = page.items
     except Exception:
         current_app.logger.exception("Failed loading sponsors list")
         sponsors = []
 
-    return render_template("admin/sponsors.html", sponsors=sponsors)
+    return render_template("admin/sponsors.html", sponsors=sponsors, page=page)
 
 
 @admin.route("/sponsors/approve/<int:sponsor_id>", methods=["POST"])
@@ -380,7 +386,7 @@ def export_payouts():
     try:
         q = db.session.query(Sponsor)
         if hasattr(Sponsor, "status"):
-            q = q.filter(Sponsor.status == "approved")
+            q = q.filter(Sponsor.status.in_(LISTED_SPONSOR_STATUSES))
         if hasattr(Sponsor, "deleted"):
             q = q.filter(Sponsor.deleted.is_(False))
         items = q.all()
@@ -493,6 +499,26 @@ def transactions_list():
     return render_template("admin/transactions.html", transactions=txs)
 
 
+# ───────────────────────────────
+# 🗂️ SCHEMA REGISTRY
+# ───────────────────────────────
+@admin.route("/schema")
+@login_required
+def schema_status():
+    """Known tables + how many catalog inspections the registry has saved."""
+    return jsonify(get_registry().stats())
+
+
+@admin.route("/schema/refresh", methods=["POST"])
+@login_required
+def schema_refresh():
+    """Re-read table names (e.g. after a migration ran out-of-band), in every worker."""
+    reg = get_registry()
+    tables = refresh_schema()
+    current_app.logger.info("Schema registry refreshed by admin (%d tables)", len(tables))
+    return jsonify(reg.stats())
+
+
 # ───────────────────────────────
 # 🧪 EXAMPLE SOFT DELETE / RESTORE API
 # ───────────────────────────────
@@ -557,7 +583,7 @@ def api_approved_sponsors():
         try:
             q = db.session.query(Sponsor)
             if hasattr(Sponsor, "status"):
-                q = q.filter(Sponsor.status == "approved")
+                q = q.filter(Sponsor.status.in_(LISTED_SPONSOR_STATUSES))
             if hasattr(Sponsor, "deleted"):
                 q = q.filter(Sponsor.deleted.is_(False))
             items = q.all()
@@ -10,6 +10,8 @@ from flask import (
     Blueprint, render_template, g, make_response, request, url_for, abort, current_app
 )
 
+from app.security.jinja_nonce import current_nonce
+
 # ────────────────────────────────────────────────────────────────────────────────
 # Blueprint
 # ────────────────────────────────────────────────────────────────────────────────
@@ -44,10 +46,9 @@ class TeamStub:
 # Helpers
 # ────────────────────────────────────────────────────────────────────────────────
 def _get_nonce() -> str:
-    """Best-effort CSP nonce (supports g.csp_nonce or callable)."""
-    nonce = getattr(g, "csp_nonce", None)
+    """Per-request CSP nonce (minted on first use)."""
     try:
-        return nonce() if callable(nonce) else (nonce or "")
+        return current_nonce()
     except Exception:
         return ""
 
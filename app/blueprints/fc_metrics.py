@@ -3,28 +3,18 @@ from __future__ import annotations
 
 import json
 import os
+from collections import Counter
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from flask import Blueprint, current_app, jsonify, request
 
-# ──────────────────────────────────────────────────────────────────────────────
-# Optional Redis client (degrades gracefully if not installed/unavailable)
-try:
-    from redis import Redis  # type: ignore
-except Exception:  # pragma: no cover
-    Redis = None  # type: ignore
+# Optional Redis/Stripe clients are created on first use (None if unavailable)
+from app.services import metrics_store, rollups, roi_counters, uniques
+from app.services.clients import redis_client, stripe_api
 
 bp = Blueprint("fc_metrics", __name__, url_prefix="/api/metrics")
 
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-R: Optional["Redis"] = None
-if "redis" in REDIS_URL and "://" in REDIS_URL and Redis:
-    try:
-        R = Redis.from_url(REDIS_URL)  # type: ignore
-    except Exception:
-        R = None  # degrade gracefully
-
 # ──────────────────────────────────────────────────────────────────────────────
 # Time helpers
 def _now_utc() -> datetime:
@@ -36,45 +26,23 @@ def _week_key(dt: Optional[datetime] = None) -> str:
     return f"{int(year)}-W{int(week):02d}"
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Safe Redis ops
-def _h_incrby(key: str, field: str, amount: int = 1) -> None:
-    if not R:
-        return
-    try:
-        R.hincrby(key, field, amount)
-    except Exception:
-        pass
-
-def _h_incrbyfloat(key: str, field: str, amount: float = 1.0) -> None:
-    if not R:
-        return
-    try:
-        R.hincrbyfloat(key, field, float(amount))
-    except Exception:
-        pass
-
+# Safe metrics-store reads (Redis or the embedded SQLite store; see app/services/metrics_store.py)
 def _hgetall_safe(key: str) -> Dict[str, str]:
-    if not R:
+    store = metrics_store.backend()
+    if store is None:
         return {}
     try:
-        raw = R.hgetall(key)
-        out: Dict[str, str] = {}
-        for k, v in raw.items():
-            ks = k.decode() if isinstance(k, (bytes, bytearray)) else str(k)
-            vs = v.decode() if isinstance(v, (bytes, bytearray)) else str(v)
-            out[ks] = vs
-        return out
+        return store.hgetall(key)
     except Exception:
         return {}
 
 def _lrange_json(key: str, start: int, stop: int) -> list:
-    if not R:
+    store = metrics_store.backend()
+    if store is None:
         return []
     try:
-        vals = R.lrange(key, start, stop)
         out = []
-        for z in vals:
-            s = z.decode() if isinstance(z, (bytes, bytearray)) else str(z)
+        for s in store.lrange(key, start, stop):
             try:
                 out.append(json.loads(s))
             except Exception:
@@ -101,6 +69,57 @@ def _ctx_from_request(data: Dict[str, Any]) -> Dict[str, str]:
         "source": _coerce_str(data.get("source", "web")),
     }
 
+# type → (total field, per-dimension field prefix)
+_EVENT_FIELDS = {"impression": ("impressions", "imp"), "click": ("clicks", "click")}
+
+def _event_fields(kind: str, ctx: Dict[str, str]) -> List[str]:
+    """Hash fields one event increments in fc:roi:{week}."""
+    total, prefix = _EVENT_FIELDS[kind]
+    fields = [total, f"{prefix}:{ctx['key']}"]
+    for dim in ("route", "peer", "campaign"):
+        if ctx[dim]:
+            fields.append(f"{prefix}:{dim}:{ctx[dim]}")
+    return fields
+
+def _aggregate(
+    events: Iterable[Tuple[str, Dict[str, Any]]],
+    week: Optional[str] = None,
+) -> Tuple[Dict[str, int], Dict[str, float], List[Tuple[str, Dict[str, str]]]]:
+    """
+    Fold (type, body) events into per-field deltas → (counts, floats, accepted (type, ctx)).
+    With `week`, dimension values past the weekly cap are folded into "other" (uniques.bound_ctx).
+    """
+    counts: Counter = Counter()
+    floats: Dict[str, float] = {}
+    seen: List[Tuple[str, Dict[str, str]]] = []
+    for kind, data in events:
+        if kind not in _EVENT_FIELDS or not isinstance(data, dict):
+            continue
+        ctx = _ctx_from_request(data)
+        if week is not None:
+            ctx = uniques.bound_ctx(week, ctx)
+        counts.update(_event_fields(kind, ctx))
+        if kind == "impression":
+            floats["imp_last_ts"] = floats.get("imp_last_ts", 0.0) + 1.0  # keeps field hot (not a true timestamp)
+        seen.append((kind, ctx))
+    return dict(counts), floats, seen
+
+def _visitor(week: str, data: Any) -> str:
+    """Week-scoped visitor hash from the client's anonymous `vid`, else IP + User-Agent."""
+    raw = _coerce_str(data.get("vid"), 80) if isinstance(data, dict) else ""
+    if not raw:
+        raw = f"{request.remote_addr or ''}|{request.headers.get('User-Agent', '')}"
+    return uniques.visitor_hash(raw, week)
+
+def _record(events: Iterable[Tuple[str, Dict[str, Any]]], data: Any) -> Tuple[str, int]:
+    """Count events (write-behind) and their unique visitor → (week, accepted)."""
+    wk = _week_key()
+    counts, floats, seen = _aggregate(events, wk)
+    rollups.record(wk, counts, floats, events=len(seen))
+    if seen:
+        uniques.observe(wk, seen, _visitor(wk, data))
+    return wk, len(seen)
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Metrics routes
 @bp.post("/impression")
@@ -109,22 +128,8 @@ def impression():
     Body (JSON, optional): {"key":"tiers","route":"/tiers","peer":"jordan-t","campaign":"fall-24","source":"hero"}
     """
     data = request.get_json(silent=True) or {}
-    wk = _week_key()
-    rk = f"fc:roi:{wk}"
-
-    ctx = _ctx_from_request(data)
     stamp = _now_utc().isoformat(timespec="seconds")
-
-    _h_incrby(rk, "impressions", 1)
-    _h_incrby(rk, f"imp:{ctx['key']}", 1)
-    if ctx["route"]:
-        _h_incrby(rk, f"imp:route:{ctx['route']}", 1)
-    if ctx["peer"]:
-        _h_incrby(rk, f"imp:peer:{ctx['peer']}", 1)
-    if ctx["campaign"]:
-        _h_incrby(rk, f"imp:campaign:{ctx['campaign']}", 1)
-
-    _h_incrbyfloat(rk, "imp_last_ts", 1.0)  # keeps field hot (not a true timestamp)
+    wk, _ = _record([("impression", data)], data)
 
     return jsonify({"ok": True, "week": wk, "ts": stamp})
 
@@ -134,37 +139,95 @@ def click():
     Body (JSON, optional): {"key":"sponsor-cta","route":"/tiers","peer":"jordan-t","campaign":"fall-24","source":"button"}
     """
     data = request.get_json(silent=True) or {}
-    wk = _week_key()
-    rk = f"fc:roi:{wk}"
-
-    ctx = _ctx_from_request(data)
     stamp = _now_utc().isoformat(timespec="seconds")
-
-    _h_incrby(rk, "clicks", 1)
-    _h_incrby(rk, f"click:{ctx['key']}", 1)
-    if ctx["route"]:
-        _h_incrby(rk, f"click:route:{ctx['route']}", 1)
-    if ctx["peer"]:
-        _h_incrby(rk, f"click:peer:{ctx['peer']}", 1)
-    if ctx["campaign"]:
-        _h_incrby(rk, f"click:campaign:{ctx['campaign']}", 1)
+    wk, _ = _record([("click", data)], data)
 
     return jsonify({"ok": True, "week": wk, "ts": stamp})
 
+@bp.post("/events")
+def events():
+    """
+    Batched impressions/clicks for navigator.sendBeacon (any content type).
+    Body: [{"type":"impression","key":"tiers","route":"/tiers"}, {"type":"click","key":"sponsor-cta"}, ...]
+          or {"vid": "<anonymous visitor id>", "events": [...]}
+    The batch is folded into per-field deltas for the write-behind buffer
+    (weekly hash + rollup buckets, app/services/rollups.py); unknown types are dropped.
+    """
+    data = request.get_json(force=True, silent=True)
+    items = data.get("events") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return jsonify({"ok": False, "error": "Expected a JSON array of events."}), 400
+
+    limit = max(1, int(current_app.config.get("METRICS_BEACON_MAX_EVENTS", 200)))
+    batch = [(str(e.get("type", "")), e) for e in items[:limit] if isinstance(e, dict)]
+    wk, accepted = _record(batch, data)
+
+    return jsonify({
+        "ok": True,
+        "week": wk,
+        "accepted": accepted,
+        "dropped": len(items) - accepted,
+        "ts": _now_utc().isoformat(timespec="seconds"),
+    })
+
+# sendBeacon can't attach a CSRF header; the endpoint only bumps counters
+try:
+    from app.extensions import csrf  # Flask-WTF CSRFProtect instance
+    csrf.exempt(events)  # type: ignore
+except Exception:
+    pass
+
 @bp.get("/roi/weekly")
 def weekly():
     """Optional query param: week=YYYY-Www (defaults to current ISO week)."""
     week = request.args.get("week") or _week_key()
     rk = f"fc:roi:{week}"
     metrics = _hgetall_safe(rk)
+    uniq = uniques.counts(week)
     recent = _lrange_json("fc:recent_donations", 0, 24)
 
     return jsonify({
         "ok": True,
         "week": week,
         "metrics": metrics,
+        "uniques": {
+            "impressions": uniq.pop("imp", 0),
+            "clicks": uniq.pop("click", 0),
+            "by": uniq,  # "imp:route:/tiers" → approximate unique visitors
+        },
         "recent": recent,
-        "notes": {"redis": bool(R)},
+        "notes": {"redis": bool(redis_client()), "backend": metrics_store.backend_name()},
+        "ts": _now_utc().isoformat(timespec="seconds"),
+    })
+
+@bp.get("/range")
+def metrics_range():
+    """
+    Step-aligned series from the minute/hour/day rollup buckets.
+    Query: from, to   Unix seconds or ISO-8601 (default: the last 24h)
+           step       seconds or 5m / 1h / 1d (default 1h); picks the coarsest resolution that divides it
+           field      repeatable or comma-separated (default impressions,clicks)
+    """
+    try:
+        end = rollups.parse_time(request.args.get("to")) or int(_now_utc().timestamp())
+        start = rollups.parse_time(request.args.get("from"))
+        start = end - 86400 if start is None else start
+        step = rollups.parse_step(request.args.get("step") or "1h")
+        fields = [
+            _coerce_str(f.strip(), 200)
+            for raw in (request.args.getlist("field") or ["impressions,clicks"])
+            for f in raw.split(",") if f.strip()
+        ]
+        if not fields or len(fields) > 20:
+            raise ValueError("Give 1-20 fields.")
+        out = rollups.series(list(dict.fromkeys(fields)), start, end, step)
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    return jsonify({
+        "ok": True,
+        **out,
+        "notes": {"backend": metrics_store.backend_name(), "numpy": rollups.np is not None},
         "ts": _now_utc().isoformat(timespec="seconds"),
     })
 
@@ -172,32 +235,23 @@ def weekly():
 def health():
     notes = {"redis": False}
     try:
+        R = redis_client()
         if R:
             R.ping()
             notes["redis"] = True
     except Exception:
         notes["redis"] = False
+    notes["backend"] = metrics_store.backend_name()
+    notes["roi_buffer"] = roi_counters.buffer.stats()
     return jsonify({"ok": True, "notes": notes, "ts": _now_utc().isoformat(timespec="seconds")})
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Stripe PaymentIntent (guarded; handy for E2E without the full payments bp)
 # This lives under /api/metrics so you can test quickly even if the main
 # /api/payments blueprint is unavailable. Call: POST /api/metrics/stripe/intent
-try:
-    import stripe  # type: ignore
-except Exception:  # pragma: no cover
-    stripe = None  # type: ignore
-
 FAKE_PAYMENTS = os.getenv("FAKE_PAYMENTS", "").lower() in {"1", "true", "yes", "on"}
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY", "")
 
-if stripe:
-    try:
-        stripe.api_key = STRIPE_SECRET_KEY
-    except Exception:
-        # if the lib is present but key is malformed, we'll handle in the route
-        pass
-
 @bp.post("/stripe/intent")
 def metrics_stripe_intent():
     """
@@ -213,7 +267,8 @@ def metrics_stripe_intent():
     if amount <= 0:
         return jsonify({"error": "Invalid amount"}), 400
 
-    # Guard: Stripe available?
+    # Guard: Stripe available? (imported on first intent, not at boot)
+    stripe = stripe_api() if STRIPE_SECRET_KEY else None
     if not stripe or not STRIPE_SECRET_KEY:
         if FAKE_PAYMENTS:
             return jsonify({"client_secret": "pi_fake_secret_for_local_testing"}), 200
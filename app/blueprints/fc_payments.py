@@ -14,9 +14,12 @@ from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional, Tuple, Set
 
-import stripe
 from flask import Blueprint, current_app, jsonify, request
 
+from app.services import leaderboard, metrics_store, rollups
+from app.services.clients import redis_client, stripe_api
+from app.services.metrics import WEBHOOK_LATENCY
+
 # ----------------------------------------------------------------------------
 # Blueprint (mounted at /payments — matches your route listing)
 # ----------------------------------------------------------------------------
@@ -32,7 +35,6 @@ except Exception:
 # ----------------------------------------------------------------------------
 # ENV / Clients
 # ----------------------------------------------------------------------------
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY", "")  # library keeps a global
 BRAND = os.getenv("BRAND_NAME", "FundChamps")
 CURRENCY = (os.getenv("CURRENCY") or "USD").lower()
 
@@ -40,19 +42,8 @@ CURRENCY = (os.getenv("CURRENCY") or "USD").lower()
 REQUIRE_BEARER = (os.getenv("PAYMENTS_REQUIRE_BEARER", "").lower() in {"1","true","yes","on"})
 API_TOKENS: Set[str] = {t.strip() for t in (os.getenv("API_TOKENS","") or "").split(",") if t.strip()}
 
-# Redis (optional)
-try:
-    from redis import Redis  # type: ignore
-except Exception:  # pragma: no cover
-    Redis = None  # type: ignore
-
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-REDIS = None
-if "redis" in REDIS_URL and "://" in REDIS_URL and Redis:
-    try:
-        REDIS = Redis.from_url(REDIS_URL)  # type: ignore
-    except Exception:
-        REDIS = None  # degrade gracefully
+# Stripe and Redis (optional) are imported/created on first use — see
+# app.services.clients — so worker boot doesn't pay for them.
 
 # ----------------------------------------------------------------------------
 # Utilities
@@ -88,31 +79,29 @@ def _tier_for(amount: float) -> str:
     return "Community"
 
 def _roi_track(kind: str, amount: float = 0, sponsor: str = "") -> None:
-    """Lightweight ROI counters; safe when Redis is unavailable."""
-    if not REDIS:
-        return
+    """Lightweight ROI counters (write-behind, with rollup buckets); safe when no metrics store is available."""
     wk = _week_key()
+    if kind == "donation":
+        rollups.record(wk, {"donations_count": 1}, {"donations_total": float(amount or 0)})
+    elif kind in ("impression", "click"):
+        rollups.record(wk, {f"{kind}s": 1})
+    store = metrics_store.backend() if kind == "donation" else None
+    if store is None:
+        return
     try:
-        if kind == "donation":
-            REDIS.hincrby(f"fc:roi:{wk}", "donations_count", 1)
-            REDIS.hincrbyfloat(f"fc:roi:{wk}", "donations_total", float(amount or 0))
-            REDIS.lpush(
-                "fc:recent_donations",
-                json.dumps(
-                    {
-                        "name": sponsor or "Supporter",
-                        "amount": float(amount or 0),
-                        "at": _now_utc().isoformat(timespec="seconds"),
-                    }
-                ),
-            )
-            REDIS.ltrim("fc:recent_donations", 0, 49)
-        elif kind == "impression":
-            REDIS.hincrby(f"fc:roi:{wk}", "impressions", 1)
-        elif kind == "click":
-            REDIS.hincrby(f"fc:roi:{wk}", "clicks", 1)
+        store.lpush_trim(
+            "fc:recent_donations",
+            json.dumps(
+                {
+                    "name": sponsor or "Supporter",
+                    "amount": float(amount or 0),
+                    "at": _now_utc().isoformat(timespec="seconds"),
+                }
+            ),
+            keep=50,
+        )
     except Exception:
-        # Do not break payments if Redis hiccups
+        # Do not break payments if the metrics store hiccups
         pass
 
 def _get_pk() -> str:
@@ -188,6 +177,9 @@ def create_stripe_intent():
     if isinstance(guard, tuple) and not guard[1]:
         return jsonify({"error": {"message": "Missing or invalid bearer token"}}), 401
 
+    stripe = stripe_api()
+    if stripe is None:
+        return jsonify({"error": {"message": "Stripe library unavailable"}}), 503
     # ensure key is set (hot-reload safe)
     stripe.api_key = os.getenv("STRIPE_SECRET_KEY", "")
 
@@ -240,6 +232,7 @@ def create_stripe_intent():
 # STRIPE — Webhook
 # ----------------------------------------------------------------------------
 @bp.post("/stripe/webhook")
+@WEBHOOK_LATENCY.time(source="stripe")
 def stripe_webhook():
     payload = request.data
     sig = request.headers.get("Stripe-Signature", "")
@@ -247,7 +240,7 @@ def stripe_webhook():
 
     try:
         if secret:
-            event = stripe.Webhook.construct_event(payload, sig, secret)
+            event = stripe_api().Webhook.construct_event(payload, sig, secret)
         else:
             event = json.loads(payload)
     except Exception as e:
@@ -288,6 +281,14 @@ def stripe_webhook():
             "logo": "",
         }
         _roi_track("donation", amt, who or "Supporter")
+        # PI and its charge both arrive; key on the PaymentIntent so it counts once
+        team = _num(meta.get("team_id"))
+        leaderboard.record_payment(
+            str(obj.get("payment_intent") or obj.get("id") or ""),
+            who or "Supporter",
+            int(round(amt * 100)),
+            team_id=int(team) if team else None,
+        )
         _emit("donation", pay)
         if amt >= 250.0:
             _emit("sponsor", pay)
@@ -299,8 +300,9 @@ def stripe_webhook():
 # ----------------------------------------------------------------------------
 @bp.get("/health")
 def health():
-    notes = {"stripe": bool(os.getenv("STRIPE_SECRET_KEY") or stripe.api_key)}
+    notes = {"stripe": bool(os.getenv("STRIPE_SECRET_KEY"))}
     try:
+        REDIS = redis_client()
         if REDIS:
             REDIS.ping()
             notes["redis"] = True
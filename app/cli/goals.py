@@ -0,0 +1,40 @@
+# app/cli/goals.py
+import click
+from flask.cli import AppGroup
+
+from app.models.campaign_goal import CampaignGoal
+from app.models.fundraising_totals import reconcile_totals
+
+goalscli = AppGroup("goals")
+
+
+@goalscli.command("reconcile")
+@click.option("--team-id", type=int, default=None, help="Only check this team's goal.")
+@click.option("--fix", is_flag=True, help="Overwrite drifting values with the recompute.")
+def reconcile(team_id, fix):
+    """Full recompute of totals and active goals; report (and optionally fix) drift."""
+    # Read model first: goal totals are derived from it
+    rows = reconcile_totals(fix=fix)
+    if team_id is not None:
+        rows = [r for r in rows if r["team_id"] == team_id]
+    for row in rows:
+        what = "missing" if row["missing"] else ", ".join(
+            f"{k} {stored}→{expected}" for k, (stored, expected) in row["fields"].items()
+        )
+        click.echo(f"⚠️  totals team={row['team_id']}: {what}")
+
+    drift = CampaignGoal.reconcile(team_id=team_id, fix=fix)
+    for row in drift:
+        click.echo(
+            f"⚠️  goal={row['goal_id']} team={row['team_id']} "
+            f"stored={row['stored_cents']} expected={row['expected_cents']} "
+            f"drift={row['drift_cents']:+d}"
+        )
+
+    found = len(rows) + len(drift)
+    if not found:
+        click.echo("✅ Totals and goals match a full recompute.")
+        return
+    click.echo(f"{'Fixed' if fix else 'Found'} {found} drifting row(s).")
+    if not fix:
+        raise SystemExit(1)
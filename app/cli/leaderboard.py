@@ -0,0 +1,31 @@
+# app/cli/leaderboard.py
+import click
+from flask.cli import AppGroup
+
+from app.services import leaderboard
+
+leaderboardcli = AppGroup("leaderboard")
+
+
+@leaderboardcli.command("rebuild")
+@click.option("--board", type=click.Choice(leaderboard.BOARDS), default=None, help="Only this board.")
+def rebuild_cmd(board):
+    """Rebuild the leaderboard index from the database."""
+    counts = leaderboard.rebuild(board)
+    backend = leaderboard.backend().name
+    for name, n in counts.items():
+        click.echo(f"🏆 {name}: {n} members ({backend})")
+
+
+@leaderboardcli.command("show")
+@click.option("--board", type=click.Choice(leaderboard.BOARDS), default="sponsors", show_default=True)
+@click.option("--team-id", type=int, default=None)
+@click.option("--top", type=int, default=10, show_default=True)
+def show_cmd(board, team_id, top):
+    """Print the current top-N from the index."""
+    rows = leaderboard.top(board, top, team_id=team_id)
+    if not rows:
+        click.echo("Leaderboard empty.")
+        return
+    for i, row in enumerate(rows, 1):
+        click.echo(f"{i:>3}. {row['name']:<40} {row['amount']:>12,.0f}")
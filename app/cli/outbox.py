@@ -0,0 +1,36 @@
+# app/cli/outbox.py
+import click
+from flask.cli import AppGroup
+
+from app.services.mail_outbox import drain, queue_depth, stats
+
+outboxcli = AppGroup("outbox")
+
+
+@outboxcli.command("drain")
+@click.option("--batch-size", type=int, default=None, help="Messages per SMTP session.")
+@click.option("--max-batches", type=int, default=None, help="Stop after this many batches.")
+def drain_cmd(batch_size, max_batches):
+    """Send every due outbox message now (one SMTP connection per batch)."""
+    result = drain(batch_size=batch_size, max_batches=max_batches)
+    click.echo(
+        f"✉️  sent={result['sent']} retried={result['retried']} "
+        f"failed={result['failed']} batches={result['batches']}"
+    )
+    s = stats.as_dict()
+    if s["sent"]:
+        click.echo(
+            f"   {s['emails_per_connection']} emails/connection, "
+            f"{s['send_rate_per_sec']}/s, avg latency {s['avg_latency_seconds']}s"
+        )
+
+
+@outboxcli.command("stats")
+def stats_cmd():
+    """Queue depth per status."""
+    depth = queue_depth()
+    if not depth:
+        click.echo("Outbox empty (or not migrated yet).")
+        return
+    for status, n in sorted(depth.items()):
+        click.echo(f"{status:>8}: {n}")
@@ -0,0 +1,31 @@
+# app/cli/startup.py
+import json
+
+import click
+
+from app.services.startup_profile import profile_startup, top_imports
+
+
+@click.command("startup-profile")
+@click.option("--config", "config_name", default=None, help="Config to build with (defaults to FLASK_CONFIG).")
+@click.option("--top", type=int, default=20, show_default=True, help="Modules to list.")
+@click.option("--prefix", default="", help="Only modules under this package (e.g. app).")
+@click.option("--as-json", is_flag=True, help="Emit the raw profile as JSON.")
+def startup_profile_cmd(config_name, top, prefix, as_json):
+    """Cold-start cost of create_app: per-step init time and per-module import time."""
+    result = profile_startup(config_name)
+    if as_json:
+        click.echo(json.dumps(result, indent=2))
+        return
+    if result.get("error"):
+        click.echo(f"❌ create_app failed in child process: {result['error'][0]}")
+        return
+
+    click.echo(f"⏱️  create_app (incl. imports): {result['total_ms']:.1f} ms")
+    click.echo("\nInit steps")
+    for name, ms in sorted(result["steps"], key=lambda s: s[1], reverse=True):
+        click.echo(f"  {ms:9.1f} ms  {name}")
+
+    click.echo(f"\nImports (cumulative, top {top}{' under ' + prefix if prefix else ''})")
+    for row in top_imports(result["imports"], prefix=prefix, limit=top):
+        click.echo(f"  {row['cumulative_ms']:9.1f} ms  {row['module']}  (self {row['self_ms']:.1f})")
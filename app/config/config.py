@@ -66,6 +66,87 @@ class BaseConfig:
     STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY") or os.getenv("STRIPE_API_KEY")
     STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
 
+    # Read-model caching (seconds a snapshot may serve before a forced rebuild)
+    SNAPSHOT_CACHE_TTL = float(os.getenv("SNAPSHOT_CACHE_TTL", "30"))
+
+    # Schema registry: re-inspect on a table miss at most this often (seconds; 0 = only on refresh)
+    SCHEMA_MISS_TTL = float(os.getenv("SCHEMA_MISS_TTL", "30"))
+
+    # Cross-worker invalidation: auto (redis if REDIS_URL is set, else UNIX sockets) | redis | socket | off
+    INVALIDATION_BUS = os.getenv("INVALIDATION_BUS", "auto")
+    INVALIDATION_BUS_DIR = os.getenv("FC_BUS_DIR", "/tmp/fc-bus")
+
+    # Leaderboard index: auto (Redis zsets if REDIS_URL is set, else in-process) | redis | memory
+    LEADERBOARD_BACKEND = os.getenv("LEADERBOARD_BACKEND", "auto")
+
+    # Serialize hot API resources via precompiled projections + orjson (off → restx marshal)
+    API_FAST_JSON = os.getenv("API_FAST_JSON", "1").lower() in ("1", "true", "yes")
+    # Mixed into version ETags; unset → gunicorn master's FC_BOOT_ID (new per deploy/reload)
+    API_ETAG_SALT = os.getenv("API_ETAG_SALT", "")
+
+    # Bearer auth: optional local JWKS (kid → key, reloaded on change) and the verified-JWT LRU
+    JWT_JWKS_FILE = os.getenv("JWT_JWKS_FILE", "")
+    JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "1024"))
+    JWT_CACHE_TTL = float(os.getenv("JWT_CACHE_TTL", "300"))  # for tokens without `exp`
+
+    # /api/donors?since=…&wait=N long-poll: max hold (s) and parked requests per worker
+    # (0 = auto: the budget shared with /stats/stream, threads // 4 on gthread)
+    DONORS_LONGPOLL_MAX = int(os.getenv("DONORS_LONGPOLL_MAX", "25"))
+    DONORS_LONGPOLL_SLOTS = int(os.getenv("DONORS_LONGPOLL_SLOTS", "0"))
+
+    # Live totals stream (/stats/stream)
+    SSE_POLL_SECONDS = float(os.getenv("SSE_POLL_SECONDS", "5"))
+    SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+    SSE_MAX_SECONDS = float(os.getenv("SSE_MAX_SECONDS", "300"))
+    # Parked requests (streams + long-polls) per process: 0 = auto (threads // 4 on gthread,
+    # SSE_ASYNC_MAX_CLIENTS on eventlet/gevent)
+    SSE_MAX_CLIENTS = int(os.getenv("SSE_MAX_CLIENTS", "0"))
+    SSE_ASYNC_MAX_CLIENTS = int(os.getenv("SSE_ASYNC_MAX_CLIENTS", "500"))
+
+    # Email outbox (durable queue drained in batches over one SMTP session)
+    MAIL_OUTBOX_WORKER = os.getenv("MAIL_OUTBOX_WORKER", "1").lower() in ("1", "true", "yes")
+    MAIL_OUTBOX_BATCH = int(os.getenv("MAIL_OUTBOX_BATCH", "100"))
+    MAIL_OUTBOX_POLL_SECONDS = float(os.getenv("MAIL_OUTBOX_POLL_SECONDS", "5"))
+    MAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("MAIL_OUTBOX_MAX_ATTEMPTS", "6"))
+    MAIL_OUTBOX_BACKOFF_BASE = float(os.getenv("MAIL_OUTBOX_BACKOFF_BASE", "30"))
+    MAIL_OUTBOX_BACKOFF_MAX = float(os.getenv("MAIL_OUTBOX_BACKOFF_MAX", "3600"))
+    MAIL_OUTBOX_LEASE_SECONDS = float(os.getenv("MAIL_OUTBOX_LEASE_SECONDS", "300"))
+
+    # Request budgets (Server-Timing always on; over-budget requests are logged)
+    REQUEST_QUERY_BUDGET = int(os.getenv("REQUEST_QUERY_BUDGET", "25"))
+    REQUEST_LATENCY_BUDGET_MS = float(os.getenv("REQUEST_LATENCY_BUDGET_MS", "500"))
+
+    # Prometheus exposition at /metrics (workers share FC_METRICS_DIR; see gunicorn.conf.py)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() in ("1", "true", "yes")
+    # Scrapers send METRICS_TOKEN as a bearer token; without one, only direct loopback
+    # requests (not via nginx) get through. METRICS_PUBLIC=1 opens it to everyone.
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    METRICS_PUBLIC = _as_bool(os.getenv("METRICS_PUBLIC"))
+    METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "2"))
+    # Analytics beacon (POST …/metrics/events): events accepted per batch; the rest are dropped
+    METRICS_BEACON_MAX_EVENTS = int(os.getenv("METRICS_BEACON_MAX_EVENTS", "200"))
+    # ROI counters (fc:roi:{week}) are buffered per worker and flushed by a daemon thread
+    ROI_WRITE_BEHIND = os.getenv("ROI_WRITE_BEHIND", "1").lower() in ("1", "true", "yes")
+    ROI_FLUSH_MS = int(os.getenv("ROI_FLUSH_MS", "1000"))
+    ROI_FLUSH_EVENTS = int(os.getenv("ROI_FLUSH_EVENTS", "500"))  # flush early once this many are pending
+    ROI_BUFFER_MAX_FIELDS = int(os.getenv("ROI_BUFFER_MAX_FIELDS", "20000"))
+    # Unique visitors per week/dimension (HyperLogLog in Redis, or in-process without it)
+    ROI_UNIQUES = os.getenv("ROI_UNIQUES", "1").lower() in ("1", "true", "yes")
+    ROI_UNIQUES_TTL_DAYS = float(os.getenv("ROI_UNIQUES_TTL_DAYS", "120"))
+    ROI_UNIQUES_MAX_LOCAL = int(os.getenv("ROI_UNIQUES_MAX_LOCAL", "256"))  # ≤12 KB each (sparse while small)
+    # Distinct values per dimension (key/route/peer/campaign/source) per week; the rest count as "other"
+    ROI_MAX_DIMENSION_VALUES = int(os.getenv("ROI_MAX_DIMENSION_VALUES", "200"))
+    # ROI rollup buckets (fc:roi:1m|1h|1d:{epoch}) and the weekly hash: retention per resolution
+    ROI_RETENTION_MINUTE_HOURS = float(os.getenv("ROI_RETENTION_MINUTE_HOURS", "48"))
+    ROI_RETENTION_HOUR_DAYS = float(os.getenv("ROI_RETENTION_HOUR_DAYS", "35"))
+    ROI_RETENTION_DAY_DAYS = float(os.getenv("ROI_RETENTION_DAY_DAYS", "400"))
+    ROI_RETENTION_WEEK_DAYS = float(os.getenv("ROI_RETENTION_WEEK_DAYS", "400"))
+    ROI_RANGE_MAX_BUCKETS = int(os.getenv("ROI_RANGE_MAX_BUCKETS", "5000"))  # buckets read per /range query
+    # ROI metrics store: auto (Redis if REDIS_URL is set, else SQLite) | redis | sqlite | none
+    METRICS_BACKEND = os.getenv("METRICS_BACKEND", "auto").lower()
+    METRICS_SQLITE_PATH = os.getenv("METRICS_SQLITE_PATH", "")  # "" → app/data/metrics.db (WAL)
+    METRICS_COMPACT_SECONDS = float(os.getenv("METRICS_COMPACT_SECONDS", "300"))  # expiry sweep + WAL checkpoint
+
     # Realtime
     SOCKETIO_ASYNC_MODE = (
         os.getenv("SOCKETIO_ASYNC_MODE")
@@ -7,7 +7,7 @@ App extensions and utilities (singletons + helpers)
 - Core Flask extensions: db, migrate, mail, socketio, csrf, cors, login_manager, babel
 - Background task utilities with clean shutdown
 - Safe DB helpers (commit + retry decorator)
-- Email helper with optional Jinja templates, attachments, retries, async send
+- Email helper with cached Jinja templates, delivered via the durable outbox
 - Lightweight pub/sub (Blinker) + safe socket emit
 """
 
@@ -19,6 +19,7 @@ from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from email import encoders
 from email.mime.base import MIMEBase
+from functools import lru_cache
 from typing import Any, Callable, Iterable, Optional
 
 from flask_mail import Mail, Message
@@ -152,7 +153,9 @@ def _render_template(env: Optional["JinjaEnv"], tpl: str, **ctx) -> str:
     return env.get_template(tpl).render(**ctx)
 
 
+@lru_cache(maxsize=8)
 def get_mail_env(templates_dir: str = "app/templates/emails") -> Optional["JinjaEnv"]:
+    """One Environment per templates dir: compiled templates stay cached across sends."""
     if not JinjaEnv or not FSLoader:
         return None
     loader = FSLoader(templates_dir)
@@ -172,56 +175,36 @@ def send_email_async(
     max_retries: int = 2,
     retry_backoff: float = 0.5,
 ) -> Future:
-    """Render (optionally) and send an email in the background with retries."""
+    """
+    Render (optionally) and hand the email to the outbox. The returned future
+    is already resolved with the outbox id; delivery, batching and retries
+    (MAIL_OUTBOX_MAX_ATTEMPTS with exponential backoff) happen in the drain
+    worker. `max_retries`/`retry_backoff` are kept for call compatibility.
+    """
+    from app.services.mail_outbox import enqueue  # local: outbox imports this module
+
     ctx = context or {}
     env = get_mail_env()
-
-    def _job():
-        from flask import current_app
-
-        with app.app_context():
-            try:
-                html = (
-                    _render_template(env, html_template, **ctx)
-                    if html_template
-                    else None
-                )
-                body = (
-                    _render_template(env, text_template, **ctx)
-                    if text_template
-                    else None
-                )
-                msg = Message(
-                    subject=subject,
-                    recipients=recipients,
-                    sender=sender or app.config.get("DEFAULT_MAIL_SENDER"),
-                    html=html,
+    done: Future = Future()
+    with app.app_context():
+        try:
+            html = _render_template(env, html_template, **ctx) if html_template else None
+            body = _render_template(env, text_template, **ctx) if text_template else None
+            done.set_result(
+                enqueue(
+                    subject,
+                    list(recipients),
                     body=body,
+                    html=html,
+                    sender=sender or app.config.get("DEFAULT_MAIL_SENDER"),
+                    attachments=attachments,
+                    commit=True,  # this app context's own session: nothing else rides on it
                 )
-                _attach(msg, attachments)
-                attempts = 0
-                while True:
-                    try:
-                        mail.send(msg)
-                        return True
-                    except Exception as e:
-                        attempts += 1
-                        if attempts > max_retries:
-                            raise
-                        (current_app.logger if current_app else log).warning(
-                            "Mail send failed (attempt %s/%s): %s",
-                            attempts,
-                            max_retries,
-                            e,
-                        )
-                        time.sleep(retry_backoff * attempts)
-            except Exception as e:
-                (current_app.logger if current_app else log).error(
-                    "Email send permanently failed: %s", e, exc_info=True
-                )
-                return False
-
-    return run_bg(_job)
+            )
+        except Exception as e:
+            app.logger.error("Email enqueue failed: %s", e, exc_info=True)
+            done.set_result(None)
+    return done
 
 
 # ─────────────────────────────────────────────────────────────
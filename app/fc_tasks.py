@@ -1,9 +1,11 @@
 import datetime
 import json
 import os
+import threading
 
 import pytz
 from celery import Celery
+from celery.utils.log import get_task_logger
 from redis import Redis
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
@@ -17,6 +19,23 @@ celery = Celery(
     timezone=os.getenv("TIMEZONE", "America/Chicago"),
 )
 R = Redis.from_url(REDIS_URL)
+log = get_task_logger(__name__)
+
+_app = None
+_app_pid = None
+_app_lock = threading.Lock()
+
+
+def _flask_app():
+    """The Flask app, built once per worker process (not per task run)."""
+    global _app, _app_pid
+    if _app is None or _app_pid != os.getpid():  # prefork children rebuild after fork
+        with _app_lock:
+            if _app is None or _app_pid != os.getpid():
+                from app import create_app
+
+                _app, _app_pid = create_app(), os.getpid()
+    return _app
 
 
 def _week_key(dt=None):
@@ -30,10 +49,13 @@ def send_weekly_roi():
     wk = _week_key()
     h = {k.decode(): v.decode() for k, v in R.hgetall(f"fc:roi:{wk}").items()}
     recent = [json.loads(x) for x in R.lrange("fc:recent_donations", 0, 24)]
+    # HyperLogLog unique visitors (app/services/uniques.py), refreshes/bots collapsed
+    uv_imp = R.pfcount(f"fc:uv:{wk}:imp")
+    uv_click = R.pfcount(f"fc:uv:{wk}:click")
     lines = [
         f"FundChamps Weekly ROI ({wk})",
-        f"Impressions: {h.get('impressions','0')}",
-        f"Clicks:      {h.get('clicks','0')}",
+        f"Impressions: {h.get('impressions','0')} ({uv_imp} unique visitors)",
+        f"Clicks:      {h.get('clicks','0')} ({uv_click} unique visitors)",
         f"Donations:   {h.get('donations_count','0')} • $ {h.get('donations_total','0')}",
     ]
     lines.append("\nRecent donations:")
@@ -67,3 +89,38 @@ celery.conf.beat_schedule = {
         "schedule": crontab(minute=0, hour=8, day_of_week="mon"),
     }
 }
+
+
+@celery.task
+def reconcile_goal_totals():
+    """Nightly safety net for incremental totals/goal accounting: fix and report drift."""
+    from app.models.campaign_goal import CampaignGoal
+    from app.models.fundraising_totals import reconcile_totals
+
+    with _flask_app().app_context():
+        totals = reconcile_totals(fix=True)
+        drift = CampaignGoal.reconcile(fix=True)
+    for row in totals + drift:
+        log.warning("goal drift fixed: %s", row)
+    return {"drifting_totals": len(totals), "drifting_goals": len(drift)}
+
+
+celery.conf.beat_schedule["nightly-goal-reconcile"] = {
+    "task": "fc_tasks.reconcile_goal_totals",
+    "schedule": crontab(minute=15, hour=3),
+}
+
+
+@celery.task
+def drain_email_outbox():
+    """Safety net for the in-process outbox worker: send whatever is due."""
+    from app.services.mail_outbox import drain
+
+    with _flask_app().app_context():
+        return drain()
+
+
+celery.conf.beat_schedule["email-outbox-drain"] = {
+    "task": "fc_tasks.drain_email_outbox",
+    "schedule": 60.0,
+}
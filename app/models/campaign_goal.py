@@ -8,13 +8,30 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from sqlalchemy import (Boolean, ForeignKey, Integer, String, event, func,
-                        select)
-from sqlalchemy.orm import Mapped, mapped_column, object_session, relationship
+                        inspect, select, update)
+from sqlalchemy.orm import (Mapped, Session, mapped_column, object_session,
+                            relationship)
+from sqlalchemy.orm.base import NO_VALUE
 
 from app.extensions import db
+from app.services.data_version import mark_changed
+from app.services.schema_registry import table_exists
+
+# Statuses that count toward a goal. Shared by the per-write deltas and the
+# full recompute so the two can never disagree.
+VALID_DONATION_STATUSES: Tuple[str, ...] = ("paid", "succeeded", "completed", "success")
+VALID_SPONSOR_STATUSES: Tuple[str, ...] = ("paid", "completed", "success")
+# Sponsors shown on public lists/exports: the funded ones, plus "approved", which
+# Sponsor.normalize() rewrites and so only survives on rows written outside the ORM
+LISTED_SPONSOR_STATUSES: Tuple[str, ...] = ("approved",) + VALID_SPONSOR_STATUSES
+
+# session.info key: teams whose active goal total was moved by raw SQL this flush
+_SESSION_KEY = "fc_goal_teams"
+# session.info key: previous funding-row values captured in before_flush
+_BEFORE_KEY = "fc_goal_before"
 
 
 class CampaignGoal(db.Model):
@@ -117,64 +134,88 @@ class CampaignGoal(db.Model):
 
     def update_progress_from_donations(self, commit: bool = True) -> None:
         """
-        Sum eligible incoming funds for this team (in cents). Supports both
-        Donation and Sponsor models if present; ignores soft-deleted rows.
+        Full recompute: sum eligible incoming funds for this team (in cents)
+        across Donations and Sponsors, ignoring soft-deleted rows. Writes keep
+        `total` current incrementally (see `sync_from_totals`); this is the slow,
+        authoritative path used by reconciliation.
         """
         sess = object_session(self) or db.session
+        self.total = expected_total_cents(sess, self.team_id)
+        if commit:
+            sess.commit()
 
-        total_cents = 0
-
-        # ---- Donations -------------------------------------------------------
-        try:
-            from .donation import Donation  # type: ignore
-
-            deleted_col = getattr(Donation, "deleted", None)
-            deleted_at_col = getattr(Donation, "deleted_at", None)
-
-            # Adjust status list to match your domain
-            valid_donation_statuses = ("paid", "succeeded", "completed", "success")
+    @classmethod
+    def sync_from_totals(cls, connection, team_id: Optional[int]) -> None:
+        """
+        Set the team's active goal total from its `fundraising_totals` row
+        (a primary-key subquery, safe on the flush connection). Only one goal
+        per team is active; if several are, they share the team-wide total.
+        """
+        if not team_id:
+            return
+        from .fundraising_totals import FundraisingTotals
+
+        t, ft = cls.__table__, FundraisingTotals.__table__
+        raised = select(ft.c.raised_cents).where(ft.c.team_id == team_id).scalar_subquery()
+        connection.execute(
+            update(t)
+            .where(t.c.team_id == team_id, t.c.active.is_(True))
+            .values(total=func.coalesce(raised, t.c.total))
+        )
 
-            stmt = select(func.coalesce(func.sum(Donation.amount), 0)).where(
-                Donation.team_id == self.team_id,
-                Donation.status.in_(valid_donation_statuses),
+    @classmethod
+    def recompute_for_team(cls, connection, team_id: Optional[int]) -> None:
+        """Pre-migration fallback (no read model yet): one correlated UPDATE."""
+        if not team_id:
+            return
+        t = cls.__table__
+        expected = 0
+        for model, key, statuses in funding_sources():
+            expected = expected + (
+                select(func.coalesce(func.sum(getattr(model, key)), 0))
+                .where(*eligible_criteria(model, statuses, team_id))
+                .scalar_subquery()
             )
-            if deleted_col is not None:
-                stmt = stmt.where(deleted_col.is_(False))
-            elif deleted_at_col is not None:
-                stmt = stmt.where(deleted_at_col.is_(None))
-
-            total_cents += int(sess.execute(stmt).scalar_one() or 0)
-        except Exception:
-            # Donation model may not exist in some deployments
-            pass
-
-        # ---- Sponsors --------------------------------------------------------
-        try:
-            from .sponsor import Sponsor  # type: ignore
-
-            deleted_col = getattr(Sponsor, "deleted", None)
-            deleted_at_col = getattr(Sponsor, "deleted_at", None)
-
-            valid_sponsor_statuses = ("paid", "completed", "success")
+        connection.execute(
+            update(t)
+            .where(t.c.team_id == team_id, t.c.active.is_(True))
+            .values(total=expected)
+        )
 
-            stmt = select(func.coalesce(func.sum(Sponsor.amount), 0)).where(
-                Sponsor.team_id == self.team_id,
-                Sponsor.status.in_(valid_sponsor_statuses),
+    @classmethod
+    def reconcile(
+        cls, team_id: Optional[int] = None, fix: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Compare every active goal's stored total with a full recompute.
+        Returns one row per drifting goal; with `fix=True` the stored totals
+        are corrected and committed.
+        """
+        sess = db.session
+        stmt = select(cls).where(cls.active.is_(True)).order_by(cls.id)
+        if team_id is not None:
+            stmt = stmt.where(cls.team_id == team_id)
+
+        drift: List[Dict[str, Any]] = []
+        for goal in sess.execute(stmt).scalars():
+            expected = expected_total_cents(sess, goal.team_id)
+            stored = int(goal.total or 0)
+            if stored == expected:
+                continue
+            drift.append(
+                {
+                    "goal_id": goal.id,
+                    "team_id": goal.team_id,
+                    "stored_cents": stored,
+                    "expected_cents": expected,
+                    "drift_cents": stored - expected,
+                }
             )
-            if deleted_col is not None:
-                stmt = stmt.where(deleted_col.is_(False))
-            elif deleted_at_col is not None:
-                stmt = stmt.where(deleted_at_col.is_(None))
-
-            total_cents += int(sess.execute(stmt).scalar_one() or 0)
-        except Exception:
-            # Sponsor model may not exist in some deployments
-            pass
-
-        self.total = max(0, int(total_cents))
-
-        if commit:
+            if fix:
+                goal.total = expected
+        if fix and drift:
             sess.commit()
+        return drift
 
     # ── Helpers / Queries ───────────────────────────────────────
     @classmethod
@@ -263,3 +304,268 @@ def _cg_before_insert(mapper, connection, target: CampaignGoal):
 def _cg_before_update(mapper, connection, target: CampaignGoal):
     target.goal_amount = max(0, int(target.goal_amount or 0))
     target.total = max(0, int(target.total or 0))
+
+
+@event.listens_for(CampaignGoal, "after_insert")
+@event.listens_for(CampaignGoal, "after_update")
+@event.listens_for(CampaignGoal, "after_delete")
+def _cg_after_change(mapper, connection, target: CampaignGoal):
+    mark_changed(object_session(target), CampaignGoal.__tablename__, target.team_id)
+    if table_exists("fundraising_totals", connection):
+        from .fundraising_totals import refresh_goal
+
+        refresh_goal(connection, target.team_id)
+
+
+@event.listens_for(CampaignGoal, "after_insert")
+def _cg_after_insert(mapper, connection, target: CampaignGoal):
+    # A new active goal starts from the team's current raised total
+    if target.active and table_exists("fundraising_totals", connection):
+        CampaignGoal.sync_from_totals(connection, target.team_id)
+        _remember_team(target, target.team_id)
+
+
+# ── Eligibility rules (shared by deltas and full recompute) ────
+def funding_sources() -> List[Tuple[Any, str, Optional[Tuple[str, ...]]]]:
+    """(model, amount attribute, valid statuses or None) for each funding table."""
+    sources: List[Tuple[Any, str, Optional[Tuple[str, ...]]]] = []
+    try:
+        from .donation import Donation  # type: ignore
+
+        # Donations are only recorded once paid; they have no status column
+        statuses = VALID_DONATION_STATUSES if hasattr(Donation, "status") else None
+        sources.append((Donation, "amount_cents", statuses))
+    except Exception:
+        # Donation model may not exist in some deployments
+        pass
+    try:
+        from .sponsor import Sponsor  # type: ignore
+
+        sources.append((Sponsor, "amount", VALID_SPONSOR_STATUSES))
+    except Exception:
+        # Sponsor model may not exist in some deployments
+        pass
+    return sources
+
+
+def eligible_criteria(
+    model: Any, statuses: Optional[Tuple[str, ...]], team_id: Optional[int]
+) -> List[Any]:
+    """WHERE clauses for rows that count; `team_id=None` means every team."""
+    crit: List[Any] = []
+    if team_id is not None:
+        crit.append(model.team_id == team_id)
+    if statuses is not None:
+        crit.append(model.status.in_(statuses))
+    deleted_col = getattr(model, "deleted", None)
+    deleted_at_col = getattr(model, "deleted_at", None)
+    if deleted_col is not None:
+        crit.append(deleted_col.is_(False))
+    elif deleted_at_col is not None:
+        crit.append(deleted_at_col.is_(None))
+    return crit
+
+
+def expected_total_cents(sess: Any, team_id: Optional[int]) -> int:
+    """Authoritative team total in cents (full scan of Donations + Sponsors)."""
+    if not team_id:
+        return 0
+    total = 0
+    for model, key, statuses in funding_sources():
+        stmt = select(func.coalesce(func.sum(getattr(model, key)), 0)).where(
+            *eligible_criteria(model, statuses, team_id)
+        )
+        total += int(sess.execute(stmt).scalar_one() or 0)
+    return max(0, total)
+
+
+def eligible_cents(
+    amount: Any, status: Any, deleted: Any, statuses: Optional[Iterable[str]]
+) -> Optional[int]:
+    """What a single row contributes to its team's goal, or None if it doesn't count."""
+    if deleted:
+        return None
+    if statuses is not None and status not in statuses:
+        return None
+    return max(0, int(amount or 0))
+
+
+# ── Per-write delta accounting (called from Donation/Sponsor hooks) ──
+_UNKNOWN = object()
+
+
+def _row_values(connection, target: Any, keys: Tuple[str, ...]) -> Dict[str, Any]:
+    """Current (post-write) values; reads the row by PK only if something is unloaded."""
+    state = inspect(target)
+    values = {k: state.attrs[k].loaded_value for k in keys}
+    if any(v is NO_VALUE for v in values.values()):
+        t = target.__table__
+        row = connection.execute(
+            select(*(t.c[k] for k in keys)).where(t.c.id == target.id)
+        ).mappings().first()
+        if row is None:
+            return {k: _UNKNOWN for k in keys}
+        values = dict(row)
+    return values
+
+
+def _previous_values(
+    target: Any, keys: Tuple[str, ...], current: Dict[str, Any], load: bool = False
+) -> Dict[str, Any]:
+    """
+    Pre-flush values from attribute history; `_UNKNOWN` if never loaded.
+    With `load=True` (before_flush only) unchanged, expired values are loaded.
+    """
+    state = inspect(target)
+    prev: Dict[str, Any] = {}
+    for k in keys:
+        hist = state.attrs[k].history
+        if hist.deleted:
+            prev[k] = hist.deleted[0]
+        elif hist.added:
+            prev[k] = _UNKNOWN  # overwritten without the old value being loaded
+        elif hist.unchanged:
+            prev[k] = hist.unchanged[0]
+        elif load:
+            prev[k] = getattr(target, k)
+        else:
+            prev[k] = current.get(k, _UNKNOWN)
+    return prev
+
+
+def _tracked_keys(amount_key: str, statuses: Optional[Tuple[str, ...]]) -> Tuple[str, ...]:
+    return ("team_id", amount_key, "deleted") + (("status",) if statuses is not None else ())
+
+
+def track_goal_history(model: Any, keys: Iterable[str]) -> None:
+    """
+    Make SQLAlchemy load the previous value when a tracked column is set on
+    an expired instance, so deltas (and team moves) see what they replace.
+    """
+
+    def _keep(target, value, oldvalue, initiator):
+        return value
+
+    for key in keys:
+        event.listen(getattr(model, key), "set", _keep, active_history=True, retval=True)
+
+
+def _remember_team(target: Any, team_id: Optional[int]) -> None:
+    sess = object_session(target)
+    if sess is not None and team_id:
+        sess.info.setdefault(_SESSION_KEY, set()).add(team_id)
+
+
+def sync_goal_after_write(
+    connection,
+    target: Any,
+    op: str,
+    amount_key: str,
+    statuses: Optional[Tuple[str, ...]],
+) -> None:
+    """
+    Apply one row's change to the `fundraising_totals` read model (site-wide
+    and team rows) as before/after deltas, then copy the team total onto its
+    active goal (op is "insert", "update" or "delete"). A team move debits
+    the old team and credits the new one. When a previous value was never
+    loaded, the affected rows are rebuilt instead.
+
+    Previous values come from `_capture_goal_state` (before_flush); attribute
+    history is the fallback for objects it did not see.
+    """
+    from .fundraising_totals import ALL_TEAMS, FundraisingTotals, apply_change, rebuild
+
+    table = target.__table__.name
+    keys = _tracked_keys(amount_key, statuses)
+    sess = object_session(target)
+    captured = (sess.info.get(_BEFORE_KEY) or {}).pop(inspect(target), None) if sess else None
+
+    def contribution(v: Dict[str, Any]) -> Optional[int]:
+        return eligible_cents(v.get(amount_key), v.get("status"), v.get("deleted"), statuses)
+
+    if op == "delete":
+        after: Dict[str, Any] = {k: None for k in keys}
+        before = captured or _previous_values(target, keys, {})
+    else:
+        after = _row_values(connection, target, keys)
+        before = (
+            {k: None for k in keys}
+            if op == "insert"
+            else captured or _previous_values(target, keys, after)
+        )
+
+    old_team = before.get("team_id")
+    new_team = after.get("team_id")
+
+    if not table_exists(FundraisingTotals, connection):
+        # Read model not migrated yet: keep goals right the slow way
+        for team in {old_team, new_team}:
+            if team and team is not _UNKNOWN:
+                CampaignGoal.recompute_for_team(connection, team)
+                _remember_team(target, team)
+        mark_changed(object_session(target), CampaignGoal.__tablename__)
+        return
+
+    if any(v is _UNKNOWN for v in before.values()) or any(v is _UNKNOWN for v in after.values()):
+        teams = [t for t in (old_team, new_team) if t is not _UNKNOWN and t]
+        for scope in {ALL_TEAMS, *teams}:
+            rebuild(connection, scope)
+        moved = teams
+    else:
+        old_cents = contribution(before) if op != "insert" else None
+        new_cents = contribution(after) if op != "delete" else None
+        moved = apply_change(connection, table, old_team, new_team, old_cents, new_cents)
+
+    for team in set(moved):
+        CampaignGoal.sync_from_totals(connection, team)
+        _remember_team(target, team)
+    if moved:
+        mark_changed(object_session(target), CampaignGoal.__tablename__)
+
+
+@event.listens_for(Session, "before_flush")
+def _capture_goal_state(session: Session, flush_context, instances) -> None:
+    """
+    Before any row is written: remember each funding row's previous values
+    (loading expired ones) and make sure the totals rows its deltas will
+    touch exist. Batched INSERT/UPDATEs run before the per-row mapper hooks,
+    so neither is safe to do from inside them.
+    """
+    from .fundraising_totals import ALL_TEAMS, FundraisingTotals, ensure_rows
+
+    sources = {m: (key, st) for m, key, st in funding_sources()}
+    captured: Dict[Any, Dict[str, Any]] = {}
+    session.info[_BEFORE_KEY] = captured
+    touched = [o for o in (*session.new, *session.dirty, *session.deleted) if type(o) in sources]
+    if not touched:
+        return
+
+    scopes = {ALL_TEAMS}
+    with session.no_autoflush:
+        for obj in touched:
+            scopes.add(getattr(obj, "team_id", None))
+            if obj in session.new:
+                continue
+            prev = _previous_values(obj, _tracked_keys(*sources[type(obj)]), {}, load=True)
+            captured[inspect(obj)] = prev
+            scopes.add(prev.get("team_id"))
+
+    connection = session.connection()
+    if table_exists(FundraisingTotals, connection):
+        ensure_rows(connection, {s for s in scopes if s is not None and s is not _UNKNOWN})
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_moved_goal_totals(session: Session, flush_context) -> None:
+    """Raw UPDATEs bypass the identity map; expire `total` on loaded goals."""
+    session.info.pop(_BEFORE_KEY, None)
+    teams = session.info.pop(_SESSION_KEY, None)
+    if not teams:
+        return
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, CampaignGoal) and obj.team_id in teams:
+            session.expire(obj, ["total"])
+
+
+# Register the read model with the metadata wherever goals are mapped
+from . import fundraising_totals  # noqa: E402,F401
@@ -1,7 +1,7 @@
 # -----------------------------------------------------------------------------
 # Donation Model — Prestige Tier
 # Cents-based, tier auto-derivation, optional team/goal links,
-# and CampaignGoal sync on insert/update/delete.
+# and incremental CampaignGoal sync on insert/update/delete.
 # -----------------------------------------------------------------------------
 
 from __future__ import annotations
@@ -12,7 +12,11 @@ from urllib.parse import urlparse
 from sqlalchemy import CheckConstraint, Index, event
 
 from app.extensions import db
+from app.services import leaderboard
+from app.services.data_version import mark_changed
 
+from .campaign_goal import (_UNKNOWN, VALID_DONATION_STATUSES, _row_values,
+                            sync_goal_after_write, track_goal_history)
 from .mixins import SoftDeleteMixin, TimestampMixin
 
 DONATION_TIERS = ("Platinum", "Gold", "Silver", "Bronze", "Supporter")
@@ -200,25 +204,43 @@ def _donation_before_save(mapper, connection, target: Donation) -> None:
     target.logo_path = Donation._sanitize_logo_url(target.logo_path)
 
 
+def _donation_after_change(connection, target: Donation, op: str) -> None:
+    """Apply this donation's delta to the team's active CampaignGoal."""
+    mark_changed(db.session.object_session(target), Donation.__tablename__, target.team_id)
+    _track_leaderboard(connection, target, op)
+    statuses = VALID_DONATION_STATUSES if hasattr(Donation, "status") else None
+    sync_goal_after_write(connection, target, op, "amount_cents", statuses)
+
+
+def _track_leaderboard(connection, target: Donation, op: str) -> None:
+    """New donations credit the donor's total; edits/deletes rebuild the board lazily."""
+    sess = db.session.object_session(target)
+    if op != "insert":
+        leaderboard.queue(sess, "dirty", "donors")
+        return
+    row = _row_values(connection, target, ("name", "amount_cents", "deleted", "team_id"))
+    if any(v is _UNKNOWN for v in row.values()):
+        leaderboard.queue(sess, "dirty", "donors")
+    elif not row["deleted"] and row["amount_cents"]:
+        name = (row["name"] or "").strip() or "Anonymous"
+        member = leaderboard.donor_member(name)
+        leaderboard.queue(sess, "incr", "donors", row["team_id"], member, int(row["amount_cents"]), name)
+
+
 @event.listens_for(Donation, "after_insert")
+def _donation_after_insert(mapper, connection, target: Donation) -> None:
+    _donation_after_change(connection, target, "insert")
+
+
 @event.listens_for(Donation, "after_update")
+def _donation_after_update(mapper, connection, target: Donation) -> None:
+    _donation_after_change(connection, target, "update")
+
+
 @event.listens_for(Donation, "after_delete")
-def _donation_after_change(mapper, connection, target: Donation) -> None:
-    """Sync active CampaignGoal totals after any donation change."""
-    if not target.team_id:
-        return
-    from .campaign_goal import CampaignGoal  # local import to avoid cycles
+def _donation_after_delete(mapper, connection, target: Donation) -> None:
+    _donation_after_change(connection, target, "delete")
 
-    session = db.session.object_session(target)
-    if not session:
-        return
-    active_goal = (
-        session.query(CampaignGoal)
-        .filter_by(team_id=target.team_id, active=True)
-        .order_by(CampaignGoal.created_at.desc())
-        .first()
-    )
-    if active_goal:
-        # Recompute from Sponsors/Donations (your CampaignGoal method sums Sponsors;
-        # extend it (optionally) to include Donations as well, or add a parallel method).
-        active_goal.update_progress_from_donations(commit=False)
+
+# Deltas need the previous team/amount/deleted even on expired instances
+track_goal_history(Donation, ("team_id", "amount_cents", "deleted"))
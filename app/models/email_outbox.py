@@ -0,0 +1,84 @@
+# -----------------------------------------------------------------------------
+# EmailOutbox Model
+# Durable queue of outbound emails. Rows are written in the request's
+# transaction and drained in batches by app/services/mail_outbox.py.
+# -----------------------------------------------------------------------------
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import DateTime, Index, Integer, String, Text, event
+from sqlalchemy.orm import Mapped, mapped_column, object_session
+
+from app.extensions import db
+from app.services.data_version import mark_changed
+
+OUTBOX_STATUSES = ("pending", "sending", "sent", "failed")
+
+
+class EmailOutbox(db.Model):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # drain query: due rows in (status, next_attempt_at) order
+        Index("ix_email_outbox_due", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    # ---- Message ----
+    subject: Mapped[str] = mapped_column(String(255), nullable=False)
+    recipients_json: Mapped[str] = mapped_column(Text, nullable=False, doc="JSON list of addresses")
+    sender: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    body: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    html: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    attachments_json: Mapped[Optional[str]] = mapped_column(
+        Text, nullable=True, doc="JSON list of {filename, mimetype, b64}"
+    )
+
+    # ---- Delivery state ----
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow
+    )
+    claim_token: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    @property
+    def recipients(self) -> List[str]:
+        try:
+            return list(json.loads(self.recipients_json or "[]"))
+        except Exception:
+            return []
+
+    @recipients.setter
+    def recipients(self, value: List[str]) -> None:
+        self.recipients_json = json.dumps(list(value or []))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "subject": self.subject,
+            "recipients": self.recipients,
+            "status": self.status,
+            "attempts": self.attempts,
+            "next_attempt_at": self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None,
+        }
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<EmailOutbox {self.id} {self.status} to={self.recipients}>"
+
+
+@event.listens_for(EmailOutbox, "after_insert")
+def _outbox_after_insert(mapper, connection, target: EmailOutbox) -> None:
+    # Commit of a new message wakes the drain worker (see mail_outbox)
+    mark_changed(object_session(target), EmailOutbox.__tablename__)
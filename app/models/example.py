@@ -1,6 +1,11 @@
 
 from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
 from app.extensions import db
+from app.services.data_version import mark_changed
 
 class Example(db.Model):
     __tablename__ = 'example'
@@ -23,3 +28,11 @@ class Example(db.Model):
 
     def __repr__(self):
         return f"<Example id={self.id} name={self.name!r} deleted={self.deleted}>"
+
+
+# Impact buckets are served from this table; keep API ETags/snapshots honest
+@event.listens_for(Example, "after_insert")
+@event.listens_for(Example, "after_update")
+@event.listens_for(Example, "after_delete")
+def _example_after_change(mapper, connection, target):
+    mark_changed(object_session(target), Example.__tablename__)
@@ -0,0 +1,306 @@
+# -----------------------------------------------------------------------------
+# FundraisingTotals Read Model
+# One row per team (plus team_id=0 for "all teams") holding raised cents,
+# eligible donor/sponsor counts, largest gift and the active goal. Kept
+# current inside the write transaction by the Donation/Sponsor/CampaignGoal
+# hooks; stats surfaces read it with a single primary-key lookup.
+# -----------------------------------------------------------------------------
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import DateTime, Integer, case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.extensions import db
+
+ALL_TEAMS = 0  # site-wide row: every eligible gift, including team-less ones
+
+# Which counter a funding table feeds
+_COUNT_COLUMNS = {"donations": "donor_count", "sponsors": "sponsor_count"}
+
+
+class FundraisingTotals(db.Model):
+    __tablename__ = "fundraising_totals"
+
+    # No FK: row 0 is the site-wide aggregate, not a team
+    team_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+
+    # ── Active goal (refreshed by CampaignGoal hooks) ───────────
+    campaign_goal_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    goal_cents: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # ── Money / counts (eligible rows only) ─────────────────────
+    raised_cents: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    donor_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sponsor_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    largest_gift_cents: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow
+    )
+
+    @property
+    def percent_raised(self) -> float:
+        g = int(self.goal_cents or 0)
+        return round((int(self.raised_cents or 0) / g) * 100.0, 1) if g > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "team_id": self.team_id,
+            "campaign_goal_id": self.campaign_goal_id,
+            "goal_cents": int(self.goal_cents or 0),
+            "raised_cents": int(self.raised_cents or 0),
+            "donor_count": int(self.donor_count or 0),
+            "sponsor_count": int(self.sponsor_count or 0),
+            "largest_gift_cents": int(self.largest_gift_cents or 0),
+            "percent_raised": self.percent_raised,
+            "updated_at": self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else None,
+        }
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return (
+            f"<FundraisingTotals team={self.team_id} raised={self.raised_cents} "
+            f"goal={self.goal_cents} donors={self.donor_count} sponsors={self.sponsor_count}>"
+        )
+
+
+# ── Full computation (rebuilds, reads before the first write, reconcile) ──
+def _active_goal_row(executor: Any, team_id: int) -> Optional[Any]:
+    from .campaign_goal import CampaignGoal
+
+    t = CampaignGoal.__table__
+    stmt = select(t.c.id, t.c.goal_amount).where(t.c.active.is_(True))
+    if team_id != ALL_TEAMS:
+        stmt = stmt.where(t.c.team_id == team_id)
+    return executor.execute(stmt.order_by(t.c.created_at.desc()).limit(1)).first()
+
+
+def compute_totals(executor: Any, team_id: int = ALL_TEAMS) -> Dict[str, Any]:
+    """Scan Donations/Sponsors for `team_id` (a Session or Connection works)."""
+    from .campaign_goal import eligible_criteria, funding_sources
+
+    values: Dict[str, Any] = {
+        "team_id": team_id,
+        "raised_cents": 0,
+        "donor_count": 0,
+        "sponsor_count": 0,
+        "largest_gift_cents": 0,
+    }
+    for model, key, statuses in funding_sources():
+        amount = getattr(model, key)
+        crit = eligible_criteria(model, statuses, None if team_id == ALL_TEAMS else team_id)
+        total, count, largest = executor.execute(
+            select(
+                func.coalesce(func.sum(amount), 0),
+                func.count(),
+                func.coalesce(func.max(amount), 0),
+            ).where(*crit)
+        ).one()
+        values["raised_cents"] += int(total or 0)
+        values[_COUNT_COLUMNS.get(model.__tablename__, "donor_count")] += int(count or 0)
+        values["largest_gift_cents"] = max(values["largest_gift_cents"], int(largest or 0))
+
+    goal = _active_goal_row(executor, team_id)
+    values["campaign_goal_id"] = goal.id if goal else None
+    values["goal_cents"] = int(goal.goal_amount or 0) if goal else 0
+    values["updated_at"] = datetime.utcnow()
+    return values
+
+
+def _insert_missing(connection: Any, values: Dict[str, Any]) -> bool:
+    """
+    INSERT … ON CONFLICT DO NOTHING. False when a concurrent first write
+    created the row in the meantime (the caller then UPDATEs it instead).
+    """
+    t = FundraisingTotals.__table__
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(t).values(**values).on_conflict_do_nothing(index_elements=[t.c.team_id])
+        return bool(connection.execute(stmt).rowcount)
+    try:
+        with connection.begin_nested():
+            connection.execute(insert(t).values(**values))
+        return True
+    except IntegrityError:
+        return False
+
+
+def rebuild(connection: Any, team_id: int) -> None:
+    """Replace one row with a full recompute (on the caller's connection)."""
+    t = FundraisingTotals.__table__
+    values = compute_totals(connection, team_id)
+    res = connection.execute(update(t).where(t.c.team_id == team_id).values(**values))
+    if not res.rowcount and not _insert_missing(connection, values):
+        connection.execute(update(t).where(t.c.team_id == team_id).values(**values))
+
+
+def ensure_rows(connection: Any, team_ids: Any) -> None:
+    """Materialize missing rows (before_flush, ahead of this flush's writes)."""
+    wanted = set(team_ids)
+    if not wanted:
+        return
+    t = FundraisingTotals.__table__
+    have = set(connection.execute(select(t.c.team_id).where(t.c.team_id.in_(wanted))).scalars())
+    for team_id in wanted - have:
+        # A concurrent first write may win the race; its row already lacks our
+        # change, which the delta UPDATE that follows adds either way
+        _insert_missing(connection, compute_totals(connection, team_id))
+
+
+# ── Incremental maintenance (called from flush hooks) ─────────
+def _largest_expr(connection: Any, team_id: int):
+    from .campaign_goal import eligible_criteria, funding_sources
+
+    parts = [
+        select(func.coalesce(func.max(getattr(m, key)), 0))
+        .where(*eligible_criteria(m, st, None if team_id == ALL_TEAMS else team_id))
+        .scalar_subquery()
+        for m, key, st in funding_sources()
+    ]
+    if not parts:
+        return 0
+    if len(parts) == 1:
+        return parts[0]
+    # Scalar max of several values: SQLite spells GREATEST as multi-arg MAX
+    fn = func.max if connection.dialect.name == "sqlite" else func.greatest
+    return fn(*parts)
+
+
+def _apply(connection: Any, team_id: int, table: str, old: Optional[int], new: Optional[int]) -> None:
+    """Move one row from `old` to `new` contribution (None = not counted)."""
+    t = FundraisingTotals.__table__
+    raised = t.c.raised_cents + ((new or 0) - (old or 0))
+    values: Dict[str, Any] = {
+        "raised_cents": case((raised < 0, 0), else_=raised),
+        "updated_at": datetime.utcnow(),
+    }
+    count_delta = (new is not None) - (old is not None)
+    if count_delta:
+        col = t.c[_COUNT_COLUMNS.get(table, "donor_count")]
+        moved = col + count_delta
+        values[col.name] = case((moved < 0, 0), else_=moved)
+    largest = t.c.largest_gift_cents
+    if old is not None and (new is None or new < old):
+        # The removed amount may have been the maximum: re-derive only then
+        values["largest_gift_cents"] = case(
+            (largest <= old, _largest_expr(connection, team_id)), else_=largest
+        )
+    elif new is not None:
+        values["largest_gift_cents"] = case((largest < new, new), else_=largest)
+
+    stmt = update(t).where(t.c.team_id == team_id)
+    if connection.execute(stmt.values(**values)).rowcount:
+        return
+    # Scope not seen by ensure_rows (e.g. team set via relationship): the
+    # recompute already includes this write — unless another writer created
+    # the row first, in which case apply the delta to theirs
+    if not _insert_missing(connection, compute_totals(connection, team_id)):
+        connection.execute(stmt.values(**values))
+
+
+def apply_change(
+    connection: Any,
+    table: str,
+    old_team: Optional[int],
+    new_team: Optional[int],
+    old: Optional[int],
+    new: Optional[int],
+) -> List[int]:
+    """
+    Apply one row's before/after contribution to the site-wide row and the
+    team row(s). Returns the team ids whose totals moved.
+    """
+    if old == new and old_team == new_team:
+        return []
+    _apply(connection, ALL_TEAMS, table, old, new)
+    moved: List[int] = []
+    if old_team == new_team:
+        if old_team:
+            _apply(connection, old_team, table, old, new)
+            moved.append(old_team)
+    else:
+        if old_team:
+            _apply(connection, old_team, table, old, None)
+            moved.append(old_team)
+        if new_team:
+            _apply(connection, new_team, table, None, new)
+            moved.append(new_team)
+    return moved
+
+
+def refresh_goal(connection: Any, team_id: Optional[int]) -> None:
+    """Copy the current active goal into the team row and the site-wide row."""
+    t = FundraisingTotals.__table__
+    for scope in {ALL_TEAMS, team_id or ALL_TEAMS}:
+        goal = _active_goal_row(connection, scope)
+        connection.execute(
+            update(t)
+            .where(t.c.team_id == scope)
+            .values(
+                campaign_goal_id=goal.id if goal else None,
+                goal_cents=int(goal.goal_amount or 0) if goal else 0,
+                updated_at=datetime.utcnow(),
+            )
+        )
+
+
+# ── Reads ──────────────────────────────────────────────────────
+def get_totals(team_id: int = ALL_TEAMS) -> Dict[str, Any]:
+    """
+    Primary-key read of the materialized row. Before the first write (or a
+    `flask goals reconcile --fix`) there is no row; compute without storing.
+    """
+    row = db.session.get(FundraisingTotals, team_id)
+    if row is not None:
+        return row.as_dict()
+    values = compute_totals(db.session, team_id)
+    return FundraisingTotals(**values).as_dict()
+
+
+def reconcile_totals(fix: bool = False) -> List[Dict[str, Any]]:
+    """Compare stored rows with a full recompute; optionally rewrite them."""
+    from .campaign_goal import CampaignGoal
+
+    sess = db.session
+    scopes = {ALL_TEAMS}
+    scopes.update(sess.execute(select(FundraisingTotals.team_id)).scalars())
+    scopes.update(
+        sess.execute(select(CampaignGoal.team_id).where(CampaignGoal.active.is_(True))).scalars()
+    )
+    fields = ("raised_cents", "donor_count", "sponsor_count", "largest_gift_cents", "goal_cents")
+
+    drift: List[Dict[str, Any]] = []
+    for scope in sorted(scopes):
+        expected = compute_totals(sess, scope)
+        row = sess.get(FundraisingTotals, scope)
+        stored = {f: (getattr(row, f) if row is not None else None) for f in fields}
+        diff = {f: (stored[f], expected[f]) for f in fields if stored[f] != expected[f]}
+        if not diff:
+            continue
+        drift.append({"team_id": scope, "missing": row is None, "fields": diff})
+        if fix:
+            rebuild(sess.connection(), scope)
+    if fix and drift:
+        sess.commit()
+    return drift
+
+
+__all__ = [
+    "ALL_TEAMS",
+    "FundraisingTotals",
+    "apply_change",
+    "compute_totals",
+    "ensure_rows",
+    "get_totals",
+    "rebuild",
+    "reconcile_totals",
+    "refresh_goal",
+]
@@ -0,0 +1,40 @@
+# -----------------------------------------------------------------------------
+# LeaderboardCredit Model
+# One row per webhook payment credited to the donors leaderboard. Webhook
+# payments never become Donation rows, so this is what a board rebuild
+# (app/services/leaderboard.py) reads to keep them; the primary key on the
+# payment id is also the "count once" guard across workers.
+# -----------------------------------------------------------------------------
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.extensions import db
+
+
+class LeaderboardCredit(db.Model):
+    __tablename__ = "leaderboard_credits"
+
+    # Stripe PaymentIntent (or charge) id
+    payment_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    amount_cents: Mapped[int] = mapped_column(Integer, nullable=False)
+    team_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "payment_id": self.payment_id,
+            "name": self.name,
+            "amount_cents": int(self.amount_cents or 0),
+            "team_id": self.team_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<LeaderboardCredit {self.payment_id} {self.name} {self.amount_cents}>"
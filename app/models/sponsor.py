@@ -5,7 +5,7 @@ Features
 - Stripe/PayPal–friendly cents-based amounts (integer, non-negative)
 - Tier classification (Platinum, Gold, Silver, Bronze, Supporter)
 - Soft deletes + timestamps (via your mixins)
-- Automatic CampaignGoal sync on insert/update
+- Incremental CampaignGoal sync on insert/update/delete
 - SQLAlchemy 2.0 typing (Mapped / mapped_column)
 """
 
@@ -15,11 +15,15 @@ from datetime import datetime
 from typing import Any, Dict, Final, Optional
 
 from sqlalchemy import (CheckConstraint, ForeignKey, Index, Integer, String,
-                        Text, event, select)
+                        Text, event)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.extensions import db
+from app.services import leaderboard
+from app.services.data_version import mark_changed
 
+from .campaign_goal import (_UNKNOWN, VALID_SPONSOR_STATUSES, _row_values,
+                            sync_goal_after_write, track_goal_history)
 from .mixins import SoftDeleteMixin, TimestampMixin
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -202,38 +206,47 @@ def _sponsor_before_save(mapper, connection, target: Sponsor) -> None:  # noqa:
     target.auto_assign_tier()
 
 
-@event.listens_for(Sponsor, "after_insert")
-@event.listens_for(Sponsor, "after_update")
-def _sponsor_after_save(mapper, connection, target: Sponsor) -> None:
+def _sync_goal(connection, target: Sponsor, op: str) -> None:
     """
-    Update the active CampaignGoal snapshot for this sponsor’s team.
-    We fetch via the current session to avoid nested/implicit transactions.
+    Apply this sponsor's amount/status/deleted change to the team's active
+    CampaignGoal as a delta (no rescans on the write path).
     """
-    if not target.team_id:
-        return
+    mark_changed(db.session.object_session(target), Sponsor.__tablename__, target.team_id)
+    _track_leaderboard(connection, target, op)
+    sync_goal_after_write(connection, target, op, "amount", VALID_SPONSOR_STATUSES)
 
-    # Pull the active goal and refresh its totals without committing here.
-    try:
-        from .campaign_goal import CampaignGoal  # local import avoids cycles
-    except Exception:
-        return
 
+def _track_leaderboard(connection, target: Sponsor, op: str) -> None:
+    """Queue this sponsor's leaderboard entry (absolute score; applied after commit)."""
     sess = db.session.object_session(target)
-    if not sess:
+    member = leaderboard.sponsor_member(target.id)
+    if op == "delete":
+        leaderboard.queue(sess, "remove", "sponsors", None, member)
         return
+    row = _row_values(connection, target, ("name", "amount", "status", "deleted", "team_id"))
+    if any(v is _UNKNOWN for v in row.values()):
+        leaderboard.queue(sess, "dirty", "sponsors")
+    elif row["status"] in leaderboard.SPONSOR_STATUSES and not row["deleted"]:
+        name = row["name"] or "Sponsor"
+        leaderboard.queue(sess, "set", "sponsors", row["team_id"], member, int(row["amount"] or 0), name)
+    else:
+        leaderboard.queue(sess, "remove", "sponsors", None, member)
+
+
+@event.listens_for(Sponsor, "after_insert")
+def _sponsor_after_insert(mapper, connection, target: Sponsor) -> None:
+    _sync_goal(connection, target, "insert")
+
+
+@event.listens_for(Sponsor, "after_update")
+def _sponsor_after_update(mapper, connection, target: Sponsor) -> None:
+    _sync_goal(connection, target, "update")
+
+
+@event.listens_for(Sponsor, "after_delete")
+def _sponsor_after_delete(mapper, connection, target: Sponsor) -> None:
+    _sync_goal(connection, target, "delete")
+
 
-    active_goal = sess.execute(
-        select(CampaignGoal)
-        .where(CampaignGoal.team_id == target.team_id, CampaignGoal.active.is_(True))
-        .order_by(CampaignGoal.created_at.desc())
-        .limit(1)
-    ).scalar_one_or_none()
-
-    if active_goal:
-        # This method should read current sponsor totals from DB and NOT call commit().
-        # We purposely pass commit=False to keep this in the outer transaction.
-        try:
-            active_goal.update_progress_from_donations(commit=False)
-        except Exception:
-            # Never let a sync hiccup break the write path.
-            pass
+# Deltas need the previous team/amount/status/deleted even on expired instances
+track_goal_history(Sponsor, ("team_id", "amount", "status", "deleted"))
@@ -18,12 +18,6 @@ from typing import Iterable, Optional
 
 from flask import Blueprint, Flask
 
-# ─── Optional CLI Group ──────────────────────────────────────────────────────
-try:
-    from app.cli import starforge  # type: ignore
-except Exception:  # pragma: no cover
-    starforge = None  # type: ignore
-
 log = logging.getLogger(__name__)
 
 
@@ -151,7 +145,12 @@ def register_blueprints(app: Flask) -> None:
     # Cache disabled aliases on the app (used by _safe_register)
     app._fc_disabled_bps = _parse_disabled_env(os.getenv("DISABLE_BPS"))
 
-    # CLI group
+    # CLI group (imported here, not at module import: app.cli pulls in Faker
+    # and every model, and `app.routes` is imported on every worker boot)
+    try:
+        from app.cli import starforge  # type: ignore
+    except Exception:  # pragma: no cover
+        starforge = None  # type: ignore
     if starforge:
         try:
             app.cli.add_command(starforge)
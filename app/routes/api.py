@@ -4,7 +4,8 @@ from __future__ import annotations
 FundChamps API Blueprint (Stripe-only, production-hardened)
 ────────────────────────────────────────────────────────────
 • RESTX docs at /api/docs (Bearer auth supported)
-• Health + fundraiser stats + donors feed (+ impact buckets)
+• Health + fundraiser stats + donors feed (cursor deltas, long-poll) (+ impact buckets)
+• /api/boot: the page-load resources in one request under one ETag
 • Stripe config/readiness (public-safe)
 • Tolerates missing tables/models in dev/offline
 • Stronger cache/ETag handling + JSON helpers
@@ -12,19 +13,28 @@ FundChamps API Blueprint (Stripe-only, production-hardened)
 """
 
 import os
+import time
 from dataclasses import dataclass
 from functools import wraps
 from hashlib import sha1
 from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import uuid4
 
 from flask import Blueprint, current_app, jsonify, make_response, request
 from flask_restx import Api, Resource, fields
 from sqlalchemy import desc, func
-from sqlalchemy import inspect as sa_inspect
 
 from werkzeug.exceptions import BadRequest, Unauthorized
 
 from app.extensions import db
+from app.services import data_version
+from app.services import leaderboard as lb_index
+from app.services.bearer_auth import verify_bearer_token
+from app.services.fastjson import json_response, marshal_fast
+from app.services.keyset import decode_cursor, encode_cursor
+from app.services.longpoll import budget as parked_budget, donors_waiter
+from app.services.snapshot_cache import snapshots
+from app.services.schema_registry import table_exists as _table_exists
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Optional models (fail gracefully)
@@ -47,6 +57,11 @@ try:
 except Exception:  # pragma: no cover
     Sponsor = None  # type: ignore
 
+try:
+    from app.models.fundraising_totals import FundraisingTotals, get_totals  # type: ignore
+except Exception:  # pragma: no cover
+    FundraisingTotals = get_totals = None  # type: ignore
+
 # Generic “example/impact bucket” table (optional)
 try:
     from app.models.example import Example  # type: ignore
@@ -109,18 +124,6 @@ def _stripe_public() -> str:
 # ─────────────────────────────────────────────────────────────────────────────
 # Small DB utilities (schema tolerant)
 # ─────────────────────────────────────────────────────────────────────────────
-def _table_exists(model: Any) -> bool:
-    try:
-        if not db or not db.engine:
-            return False
-        name = getattr(model, "__tablename__", None)
-        if not name:
-            return False
-        return bool(sa_inspect(db.engine).has_table(name))
-    except Exception:
-        return False
-
-
 def _first_attr(obj: Any, candidates: tuple[str, ...]) -> Any:
     """Return the first present attribute from candidates, else None."""
     for c in candidates:
@@ -132,21 +135,6 @@ def _first_attr(obj: Any, candidates: tuple[str, ...]) -> Any:
 # ─────────────────────────────────────────────────────────────────────────────
 # Auth: Bearer (API key or JWT)
 # ─────────────────────────────────────────────────────────────────────────────
-try:
-    import jwt  # PyJWT
-except Exception:  # pragma: no cover
-    jwt = None  # type: ignore
-
-
-def _api_tokens() -> Set[str]:
-    return {t.strip() for t in str(_cfg("API_TOKENS", "") or "").split(",") if t.strip()}
-
-
-def _normalize_pem(s: str) -> str:
-    # Allow keys provided via env with `\n`
-    return s.replace("\\n", "\n") if "BEGIN" in s and "\\n" in s else s
-
-
 def _bearer_token() -> Optional[str]:
     h = request.headers.get("Authorization", "")
     if h.lower().startswith("bearer "):
@@ -154,34 +142,9 @@ def _bearer_token() -> Optional[str]:
     return None
 
 
-def _token_scopes_from_claims(claims: Dict[str, Any]) -> Set[str]:
-    if isinstance(claims.get("scope"), str):
-        return set(claims["scope"].split())
-    if isinstance(claims.get("scopes"), (list, tuple)):
-        return set(map(str, claims["scopes"]))
-    if isinstance(claims.get("permissions"), (list, tuple)):
-        return set(map(str, claims["permissions"]))
-    return set()
-
-
 def _verify_bearer_token(tok: str) -> Tuple[str, Set[str]]:
-    # 1) raw API token
-    if tok in _api_tokens():
-        return f"apikey:{tok[-4:]}", {"*"}
-    # 2) JWT
-    jwt_secret = str(_cfg("JWT_SECRET", "") or "")
-    jwt_pub = str(_cfg("JWT_PUBLIC_KEY", "") or "")
-    jwt_alg = str(_cfg("JWT_ALG", "HS256") or "HS256")
-    api_aud = _cfg("API_AUDIENCE") or None
-    api_iss = _cfg("API_ISSUER") or None
-    if jwt and (jwt_secret or jwt_pub):
-        key = jwt_secret or _normalize_pem(jwt_pub)
-        options = {"verify_aud": bool(api_aud), "verify_iss": bool(api_iss)}
-        claims = jwt.decode(
-            tok, key=key, algorithms=[jwt_alg], audience=api_aud, issuer=api_iss, options=options
-        )
-        return str(claims.get("sub", "jwt")), _token_scopes_from_claims(claims)
-    raise Unauthorized("Invalid or unsupported bearer token.")
+    """API token (digest match) or JWT (cached until `exp`) — see app/services/bearer_auth.py."""
+    return verify_bearer_token(tok)
 
 
 def require_bearer(optional: bool = True, scopes: Optional[List[str]] = None):
@@ -215,20 +178,92 @@ def _etag(s: str) -> str:
     return sha1(s.encode("utf-8")).hexdigest()[:12]
 
 
+def _not_modified(etag: str) -> bool:
+    # Weak comparison (RFC 9110): proxies that compress may hand back W/"…"
+    return request.method in ("GET", "HEAD") and request.if_none_match.contains_weak(etag)
+
+
 def _json(data: Dict[str, Any], status: int = 200, etag: Optional[str] = None, max_age: int = 15):
-    resp = make_response(jsonify(data), status)
-    if request.method == "GET":
+    # Decide on 304 first so a matched request never pays for encoding
+    if etag and _not_modified(etag):
+        resp = make_response("", 304)
+    else:
+        resp = json_response(data, status)
+    if request.method in ("GET", "HEAD"):
         if etag:
-            # Short-circuit 304 when If-None-Match matches our etag
-            inm = request.headers.get("If-None-Match")
-            if inm and etag in inm:
-                resp = make_response("", 304)
             resp.set_etag(etag)
         resp.headers.setdefault("Cache-Control", f"public, max-age={max_age}")
         resp.headers.setdefault("X-Content-Type-Options", "nosniff")
     return resp
 
 
+# ── Version ETags (checked before any SQL) ─────────────────────────
+_PROCESS_SALT = uuid4().hex[:12]
+
+
+def _etag_salt() -> str:
+    """Same for every worker of one gunicorn master (FC_BOOT_ID), new on deploy/reload."""
+    return str(_cfg("API_ETAG_SALT", "") or os.getenv("FC_BOOT_ID") or _PROCESS_SALT)
+
+
+def versioned(*tables: str, max_age: int = 15):
+    """
+    Resource class decorator: the ETag is derived from the data versions of
+    `tables` plus path and query string, and `If-None-Match` is answered
+    with 304 in `before_request`, before the resource touches the database.
+    """
+
+    def decorator(cls):
+        cls.etag_tables = tuple(tables)
+        cls.etag_max_age = max_age
+        return cls
+
+    return decorator
+
+
+def _etag_epoch() -> int:
+    """Coarse time bucket (SNAPSHOT_CACHE_TTL long): a tag outlives a lost invalidation by at most one bucket."""
+    ttl = float(_cfg("SNAPSHOT_CACHE_TTL", 30) or 0)
+    return int(time.time() // ttl) if ttl > 0 else 0
+
+
+def _version_etag(tables: Tuple[str, ...]) -> str:
+    versions = ".".join(str(data_version.version(t)) for t in tables)
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+    return _etag(f"{request.path}?{query}|{versions}|{_etag_epoch()}|{_etag_salt()}")
+
+
+def _resource_etag(cls: Any) -> str:
+    """ETag fixed at request start (before the queries, so a racing write only costs a refetch)."""
+    etag = getattr(request, "fc_etag", None)
+    if etag is None:
+        etag = request.fc_etag = _version_etag(cls.etag_tables)  # type: ignore[attr-defined]
+    return etag
+
+
+@api_bp.before_request
+def _short_circuit_not_modified():
+    if request.method not in ("GET", "HEAD") or request.args.get("wait", "0") not in ("", "0"):
+        return None  # long-polls wait for the *next* change instead
+    view = current_app.view_functions.get(request.endpoint or "")
+    cls = getattr(view, "view_class", None)
+    if getattr(cls, "etag_tables", None) is None:
+        return None
+    etag = _resource_etag(cls)
+    if not _not_modified(etag):
+        return None
+    resp = make_response("", 304)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = f"public, max-age={cls.etag_max_age}"
+    resp.headers["X-Content-Type-Options"] = "nosniff"
+    return resp
+
+
+def _longpoll_slots() -> int:
+    """Parked-request limit for long-polls (shared with /stats/stream; see app/services/longpoll.py)."""
+    return parked_budget(current_app.config, int(_cfg("DONORS_LONGPOLL_SLOTS", 0) or 0))
+
+
 def _safe_int(name: str, default: int, minimum: int = 1, maximum: int = 100) -> int:
     raw = request.args.get(name, default)
     try:
@@ -259,6 +294,7 @@ leaderboard_model = api.model(
 donor_model = api.model(
     "Donor",
     {
+        "id": fields.Integer(required=False, example=42),
         "name": fields.String(required=True, example="Anonymous"),
         "amount": fields.Float(required=True, example=50.0),
         "created_at": fields.String(required=False, example="2025-08-15T21:30:00Z"),
@@ -345,118 +381,136 @@ def _active_goal_amount() -> float:
     return 10000.0
 
 
-def _sum_sponsor_approved() -> float:
-    if not Sponsor or not _table_exists(Sponsor):
-        return 0.0
+def _fundraising_totals() -> Dict[str, Any]:
+    """Site-wide row of the `fundraising_totals` read model (PK lookup)."""
+    if not get_totals or not _table_exists(FundraisingTotals):
+        return {}
     try:
-        q = db.session.query(func.coalesce(func.sum(getattr(Sponsor, "amount")), 0.0))
+        return get_totals()
+    except Exception:
+        current_app.logger.exception("Totals lookup failed")
+        return {}
+
+
+def _raised_and_goal() -> Tuple[float, float]:
+    """(raised, goal) — computed once per request and shared by every section that needs it."""
+    cached = getattr(request, "fc_raised_goal", None)
+    if cached is None:
+        totals = _fundraising_totals()
+        raised = float(totals.get("raised_cents") or 0)
+        goal = float(totals["goal_cents"]) if totals.get("campaign_goal_id") else _active_goal_amount()
+        cached = request.fc_raised_goal = (raised, goal)  # type: ignore[attr-defined]
+    return cached
+
+
+def _feed_source() -> Tuple[Any, str]:
+    """(model, cursor prefix) backing the donors feed: Donations, else approved Sponsors."""
+    if Donation and _table_exists(Donation):
+        return Donation, "d"
+    if Sponsor and _table_exists(Sponsor):
+        return Sponsor, "s"
+    return None, ""
+
+
+def _feed_query(model: Any):
+    q = db.session.query(model)
+    if model is Sponsor:
         if hasattr(Sponsor, "deleted"):
             q = q.filter(Sponsor.deleted.is_(False))
         if hasattr(Sponsor, "status"):
-            q = q.filter(Sponsor.status == "approved")
-        total = q.scalar() or 0.0
-        return float(total)
-    except Exception:
-        return 0.0
+            q = q.filter(Sponsor.status.in_(lb_index.SPONSOR_STATUSES))
+    return q
 
 
-def _sum_donations() -> float:
-    if not Donation or not _table_exists(Donation):
-        return 0.0
+def _feed_item(obj: Any) -> Dict[str, Any]:
+    if Sponsor and isinstance(obj, Sponsor):
+        name = getattr(obj, "name", "Sponsor") or "Sponsor"
+        amt_val = getattr(obj, "amount", 0.0)
+    else:
+        name = _first_attr(obj, ("display_name", "donor_name", "name")) or "Anonymous"
+        amt_val = _first_attr(obj, ("amount_dollars", "amount", "total", "value"))
     try:
-        total = db.session.query(func.coalesce(func.sum(getattr(Donation, "amount")), 0.0)).scalar() or 0.0
-        return float(total)
+        amount = float(amt_val or 0.0)
     except Exception:
-        return 0.0
+        amount = 0.0
+    created = _first_attr(obj, ("created_at", "created", "timestamp")) or ""
+    return {"id": getattr(obj, "id", None), "name": name, "amount": amount, "created_at": str(created)}
 
 
 def _recent_donations(limit: int) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
+    model, _ = _feed_source()
+    if model is None:
+        return []
+    try:
+        q = _feed_query(model)
+        order_col = _first_attr(model, ("created_at", "created", "timestamp", "id"))
+        if order_col is not None:
+            q = q.order_by(desc(order_col))
+        return [_feed_item(row) for row in q.limit(limit).all()]
+    except Exception:
+        current_app.logger.exception("Recent donations query failed")
+        return []
 
-    # Prefer Donations table
-    if Donation and _table_exists(Donation):
-        try:
-            q = db.session.query(Donation)
-            order_col = _first_attr(Donation, ("created_at", "created", "timestamp", "id"))
-            if order_col is not None:
-                q = q.order_by(desc(order_col))
-            for d in q.limit(limit).all():
-                name = _first_attr(d, ("display_name", "donor_name", "name")) or "Anonymous"
-                # amount
-                amt_val = _first_attr(d, ("amount", "total", "value"))
-                try:
-                    amount = float(amt_val or 0.0)
-                except Exception:
-                    amount = 0.0
-                # created_at
-                created = _first_attr(d, ("created_at", "created", "timestamp")) or ""
-                out.append({"name": name, "amount": amount, "created_at": str(created)})
-            return out
-        except Exception:
-            current_app.logger.exception("Recent donations query failed")
 
-    # Fallback to Sponsors
-    if Sponsor and _table_exists(Sponsor):
+def _feed_head(model: Any, prefix: str) -> int:
+    """Highest id in the feed, cached until its table's data_version moves."""
+    table = model.__tablename__
+    snap = snapshots.get(
+        f"donors-feed-head:{prefix}",
+        (table,),
+        lambda: {"head": int(_feed_query(model).with_entities(func.max(model.id)).scalar() or 0)},
+    )
+    return int(snap.data["head"])
+
+
+def _donations_after(model: Any, prefix: str, after_id: int, limit: int) -> Tuple[List[Dict[str, Any]], int, bool]:
+    """
+    Rows with id > after_id, oldest first in the query (so a burst pages
+    through without gaps), returned newest first like the full feed.
+    Returns (items, last id, more).
+    """
+    if after_id >= _feed_head(model, prefix):
+        return [], after_id, False  # nothing new: no row query, no serialization
+    rows = _feed_query(model).filter(model.id > after_id).order_by(model.id.asc()).limit(limit + 1).all()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    last = int(rows[-1].id) if rows else after_id
+    return [_feed_item(r) for r in reversed(rows)], last, more
+
+
+def _parse_cursor(prefix: str) -> Optional[int]:
+    """`after_id=<int>` or `since=<cursor>` (from X-Feed-Cursor); None for a full read."""
+    raw_id = request.args.get("after_id")
+    if raw_id not in (None, ""):
         try:
-            q = db.session.query(Sponsor)
-            if hasattr(Sponsor, "deleted"):
-                q = q.filter(Sponsor.deleted.is_(False))
-            if hasattr(Sponsor, "status"):
-                q = q.filter(Sponsor.status == "approved")
-            order_col = _first_attr(Sponsor, ("created_at", "id"))
-            if order_col is not None:
-                q = q.order_by(desc(order_col))
-            for s in q.limit(limit).all():
-                out.append(
-                    {
-                        "name": getattr(s, "name", "Sponsor") or "Sponsor",
-                        "amount": float(getattr(s, "amount", 0.0) or 0.0),
-                        "created_at": str(getattr(s, "created_at", "") or ""),
-                    }
-                )
-        except Exception:
-            pass
-    return out
+            return max(0, int(raw_id))
+        except (TypeError, ValueError):
+            raise BadRequest("Invalid integer for 'after_id'")
+    # Malformed cursors, or ones minted for the other source, read as a full refresh
+    values = decode_cursor(request.args.get("since"), 2)
+    if values is None or values[0] != prefix or not isinstance(values[1], int):
+        return None
+    return max(0, values[1])
 
 
 def _leaderboard(top_n: int) -> List[Dict[str, Any]]:
-    # Prefer Sponsors for “top givers”
-    if Sponsor and _table_exists(Sponsor):
-        try:
-            q = db.session.query(Sponsor)
-            if hasattr(Sponsor, "deleted"):
-                q = q.filter(Sponsor.deleted.is_(False))
-            if hasattr(Sponsor, "status"):
-                q = q.filter(Sponsor.status == "approved")
-            amt_col = getattr(Sponsor, "amount", None)
-            if amt_col is not None:
-                q = q.order_by(desc(amt_col))
-            items = q.limit(top_n).all()
-            return [{"name": getattr(s, "name", "Sponsor") or "Sponsor", "amount": float(getattr(s, "amount", 0.0) or 0.0)} for s in items]
-        except Exception:
-            pass
-
-    # Donation aggregation fallback
-    if Donation and _table_exists(Donation):
-        try:
-            name_col = _first_attr(Donation, ("display_name", "donor_name", "name"))
-            amt_col = getattr(Donation, "amount", None)
-            if name_col is not None and amt_col is not None:
-                rows = (
-                    db.session.query(
-                        name_col.label("name"),
-                        func.coalesce(func.sum(amt_col), 0.0).label("amount"),
-                    )
-                    .group_by(name_col)
-                    .order_by(desc("amount"))
-                    .limit(top_n)
-                    .all()
-                )
-                return [{"name": r.name or "Anonymous", "amount": float(r.amount or 0.0)} for r in rows]
-        except Exception:
-            pass
-
-    return []
+    # Index first (Redis zset / in-process board; no SQL once built). Sponsors
+    # and donors (incl. webhook credits) are merged by display name so every
+    # gift can place and nobody is listed twice; the SQL fallback reads the
+    # same rows the index is rebuilt from, so both paths agree.
+    has_donors = bool(Donation and _table_exists(Donation)) or _table_exists("leaderboard_credits")
+    boards = (["sponsors"] if Sponsor and _table_exists(Sponsor) else []) + (["donors"] if has_donors else [])
+    if not boards:
+        return []
+    try:
+        return lb_index.top_givers(boards, top_n)
+    except Exception:
+        current_app.logger.warning("🏆 leaderboard index unavailable; using SQL", exc_info=True)
+    try:
+        return lb_index.sql_top_givers(boards, top_n)
+    except Exception:
+        current_app.logger.warning("🏆 leaderboard SQL fallback failed", exc_info=True)
+        return []
 
 
 def _impact_buckets() -> List[Dict[str, Any]]:
@@ -527,52 +581,129 @@ class Status(Resource):
         return {"status": "ok", "message": "API live", "version": "1.0.0", "docs": "/api/docs"}
 
 
+def _stats_payload(top: int) -> Dict[str, Any]:
+    raised, goal = _raised_and_goal()
+    percent = (raised / goal * 100.0) if goal else 0.0
+    return {"raised": float(raised), "goal": float(goal), "percent": round(percent, 2), "leaderboard": _leaderboard(top)}
+
+
+# Stats read the totals read model (written alongside these) + the leaderboard index
+STATS_TABLES: Tuple[str, ...] = data_version.FUNDRAISING_TABLES + (lb_index.VERSION_KEY,)
+DONOR_TABLES: Tuple[str, ...] = ("donations", "sponsors")
+IMPACT_TABLES: Tuple[str, ...] = ("example",)
+
+
 @api.route("/stats")
+@versioned(*STATS_TABLES, max_age=10)
 class StatsResource(Resource):
     @api.doc(description="Get current fundraiser totals and leaderboard", params={"top": "Top-N for leaderboard (1-50)"}, tags=["Stats"])
-    @api.marshal_with(stats_model)
+    @marshal_fast(api, stats_model)
     @require_bearer(optional=True)
     def get(self):
         try:
-            top = _safe_int("top", default=10, minimum=1, maximum=50)
-            raised = _sum_donations() + _sum_sponsor_approved()
-            goal = _active_goal_amount()
-            percent = (raised / goal * 100.0) if goal else 0.0
-            lb = _leaderboard(top)
-
-            etag = _etag(f"{int(raised)}-{int(goal)}-{len(lb)}")
-            return (
-                {"raised": float(raised), "goal": float(goal), "percent": round(percent, 2), "leaderboard": lb},
-                200,
-                {"Cache-Control": "public, max-age=10", "ETag": etag, "X-Content-Type-Options": "nosniff"},
-            )
+            etag = _resource_etag(StatsResource)
+            data = _stats_payload(_safe_int("top", default=10, minimum=1, maximum=50))
+            return (data, 200, {"Cache-Control": "public, max-age=10", "ETag": f'"{etag}"', "X-Content-Type-Options": "nosniff"})
         except BadRequest as e:
             api.abort(400, str(e))
         except Exception:
             current_app.logger.error("📊 Error fetching stats", exc_info=True)
             api.abort(500, "Database error")
 
+@api.route("/leaderboard/rank")
+@versioned(*STATS_TABLES, max_age=10)
+class LeaderboardRank(Resource):
+    @api.doc(
+        description="One giver's leaderboard position (\"you're #14\")",
+        params={"sponsor_id": "Sponsor id", "name": "Donor name (donations board)", "team_id": "Rank within a team"},
+        tags=["Stats"],
+    )
+    @require_bearer(optional=True)
+    def get(self):
+        sponsor_id = request.args.get("sponsor_id", type=int)
+        name = (request.args.get("name") or "").strip()
+        team_id = request.args.get("team_id", type=int)
+        if not sponsor_id and not name:
+            api.abort(400, "Pass sponsor_id or name")
+        board, member = (
+            ("sponsors", lb_index.sponsor_member(sponsor_id)) if sponsor_id else ("donors", lb_index.donor_member(name))
+        )
+        try:
+            found = lb_index.rank(board, member, team_id=team_id)
+        except Exception:
+            current_app.logger.error("🏆 leaderboard rank error", exc_info=True)
+            api.abort(500, "Leaderboard unavailable")
+        if found is None:
+            api.abort(404, "Not on the leaderboard")
+        headers = {"Cache-Control": "public, max-age=10", "ETag": f'"{_resource_etag(LeaderboardRank)}"', "X-Content-Type-Options": "nosniff"}
+        return ({"board": board, **found}, 200, headers)
+
+
 # app/routes/api.py
 @api_bp.get("/totals")
 def totals():
     return jsonify({"total": 12340, "goal": current_app.config.get("GOAL_USD", 50000)})
 
+def _donors_page(limit: int) -> Tuple[List[Dict[str, Any]], str]:
+    """Latest donors plus the cursor a client passes back as `since`."""
+    _, prefix = _feed_source()
+    donors = _recent_donations(limit)
+    head = max((d["id"] or 0 for d in donors), default=0)
+    return donors, encode_cursor([prefix, head])
+
+
 @api.route("/donors")
+@versioned(*DONOR_TABLES, max_age=15)
 class DonorsResource(Resource):
     @api.doc(
-        description="Recent donors (for ticker / wall)",
-        params={"limit": "Max items (1-100, default 12)"},
+        description=(
+            "Recent donors (for ticker / wall). Pass the X-Feed-Cursor response header back as "
+            "`since` (or the last item id as `after_id`) to receive only newer entries; add "
+            "`wait` to hold the request until one arrives."
+        ),
+        params={
+            "limit": "Max items (1-100, default 12)",
+            "since": "Cursor from a previous X-Feed-Cursor header",
+            "after_id": "Only entries with a larger id",
+            "wait": "Long-poll seconds when nothing is new (0-25, default 0)",
+        },
         tags=["Stats"],
     )
-    @api.marshal_list_with(donor_model)
+    @marshal_fast(api, donor_model, as_list=True)
     @require_bearer(optional=True)
     def get(self):
         try:
             limit = _safe_int("limit", default=12, minimum=1, maximum=100)
-            donors = _recent_donations(limit)
-            first_ts = donors[0]["created_at"] if donors else "0"
-            etag = _etag(f"d-{len(donors)}-{first_ts}")
-            return (donors, 200, {"Cache-Control": "public, max-age=15", "ETag": etag, "X-Content-Type-Options": "nosniff"})
+            model, prefix = _feed_source()
+            after_id = _parse_cursor(prefix) if model is not None else None
+            if after_id is None:
+                etag = _resource_etag(DonorsResource)
+                donors, cursor = _donors_page(limit)
+                headers = {
+                    "Cache-Control": "public, max-age=15",
+                    "ETag": f'"{etag}"',
+                    "X-Feed-Cursor": cursor,
+                    "X-Content-Type-Options": "nosniff",
+                }
+                return (donors, 200, headers)
+
+            wait = _safe_int("wait", default=0, minimum=0, maximum=int(_cfg("DONORS_LONGPOLL_MAX", 25)))
+            seen = donors_waiter.version()
+            etag = _resource_etag(DonorsResource)
+            donors, last, more = _donations_after(model, prefix, after_id, limit)
+            if not donors and wait:
+                db.session.close()  # don't hold a pooled connection while parked
+                if donors_waiter.wait(seen, wait, _longpoll_slots()):
+                    etag = _version_etag(DONOR_TABLES)
+                    donors, last, more = _donations_after(model, prefix, after_id, limit)
+            headers = {
+                "Cache-Control": "no-store" if wait else "public, max-age=15",
+                "ETag": f'"{etag}"',
+                "X-Feed-Cursor": encode_cursor([prefix, last]),
+                "X-Feed-More": "1" if more else "0",
+                "X-Content-Type-Options": "nosniff",
+            }
+            return (donors, 200, headers)
         except BadRequest as e:
             api.abort(400, str(e))
         except Exception:
@@ -581,14 +712,15 @@ class DonorsResource(Resource):
 
 
 @api.route("/impact")
+@versioned(*IMPACT_TABLES, max_age=60)
 class ImpactResource(Resource):
     @api.doc(description="Impact buckets (DB-first, static fallback)", tags=["Stats"])
-    @api.marshal_list_with(bucket_model)
+    @marshal_fast(api, bucket_model, as_list=True)
     @require_bearer(optional=True)
     def get(self):
+        etag = _resource_etag(ImpactResource)
         data = _impact_buckets()
-        etag = _etag(f"impact-{len(data)}-{data[0]['slug'] if data else '0'}")
-        return (data, 200, {"Cache-Control": "public, max-age=60", "ETag": etag, "X-Content-Type-Options": "nosniff"})
+        return (data, 200, {"Cache-Control": "public, max-age=60", "ETag": f'"{etag}"', "X-Content-Type-Options": "nosniff"})
 
 
 @api.route("/payments/config")
@@ -607,6 +739,76 @@ class PaymentsReadiness(Resource):
         return {"stripe_ready": bool(_stripe_secret()), "stripe_public_key": _stripe_public() or ""}
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Page boot: several resources in one round trip
+# ─────────────────────────────────────────────────────────────────────────────
+def _site_stats() -> Dict[str, Any]:
+    from app.routes.main import stats_payload  # the `/stats` body, same snapshot
+
+    return stats_payload()
+
+
+BOOT_SECTIONS: Tuple[str, ...] = ("stats", "donors", "impact", "payments", "site_stats")
+
+
+def _boot_section(name: str, top: int, limit: int) -> Any:
+    if name == "stats":
+        return _stats_payload(top)
+    if name == "donors":
+        donors, cursor = _donors_page(limit)
+        return {"items": donors, "cursor": cursor}
+    if name == "impact":
+        return _impact_buckets()
+    if name == "payments":
+        return {"stripe_public_key": _stripe_public() or ""}
+    return _site_stats()
+
+
+@api.route("/boot")
+@versioned(*STATS_TABLES, *IMPACT_TABLES, max_age=10)
+class BootResource(Resource):
+    @api.doc(
+        description=(
+            "Everything the front end fetches on page load, in one request: /api/stats, "
+            "/api/donors, /api/impact, /api/payments/config and /stats, under one ETag. "
+            "A section that fails is null and listed in `errors`."
+        ),
+        params={
+            "include": f"Comma-separated subset of: {', '.join(BOOT_SECTIONS)} (default all)",
+            "top": "Top-N for the stats leaderboard (1-50, default 10)",
+            "limit": "Donors to include (1-100, default 12)",
+        },
+        tags=["Stats"],
+    )
+    @require_bearer(optional=True)
+    def get(self):
+        etag = _resource_etag(BootResource)
+        try:
+            top = _safe_int("top", default=10, minimum=1, maximum=50)
+            limit = _safe_int("limit", default=12, minimum=1, maximum=100)
+        except BadRequest as e:
+            api.abort(400, str(e))
+        wanted = [p.strip() for p in (request.args.get("include") or "").split(",") if p.strip()]
+        unknown = sorted(set(wanted) - set(BOOT_SECTIONS))
+        if unknown:
+            api.abort(400, f"Unknown section(s): {', '.join(unknown)}")
+
+        out: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for name in wanted or BOOT_SECTIONS:
+            try:
+                out[name] = _boot_section(name, top, limit)
+            except Exception:
+                current_app.logger.error("🚀 boot section %s failed", name, exc_info=True)
+                out[name], errors[name] = None, "unavailable"
+        if errors:
+            out["errors"] = errors
+        resp = _json(out, etag=None if errors else etag, max_age=10)
+        if errors:
+            resp.headers["Cache-Control"] = "no-store"  # the next load retries the failed sections
+        return resp
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Error Handlers (opt-in from app factory)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -13,10 +13,7 @@ from flask import current_app, jsonify, make_response, request
 from sqlalchemy import desc, func
 from werkzeug.exceptions import BadRequest, Unauthorized
 
-try:
-    import jwt  # PyJWT
-except ImportError:  # pragma: no cover
-    jwt = None  # type: ignore
+from app.services.bearer_auth import verify_bearer_token
 
 log = logging.getLogger(__name__)
 
@@ -25,64 +22,19 @@ log = logging.getLogger(__name__)
 # =============================================================================
 
 
-def _api_tokens() -> Set[str]:
-    """Return static API tokens from config (CSV)."""
-    raw = str(_cfg("API_TOKENS", "") or "")
-    return {t.strip() for t in raw.split(",") if t.strip()}
-
-
-def _normalize_pem(s: str) -> str:
-    """Normalize PEM strings that may contain escaped newlines."""
-    return s.replace("\\n", "\n") if "BEGIN" in s and "\\n" in s else s
-
-
 def _bearer_token() -> Optional[str]:
     """Extract bearer token from request headers."""
     h = request.headers.get("Authorization", "")
     return h.split(" ", 1)[1].strip() if h.lower().startswith("bearer ") else None
 
 
-def _token_scopes_from_claims(claims: Dict[str, Any]) -> Set[str]:
-    """Extract scopes from common JWT claim fields."""
-    if isinstance(claims.get("scope"), str):
-        return set(claims["scope"].split())
-    if isinstance(claims.get("scopes"), (list, tuple)):
-        return set(map(str, claims["scopes"]))
-    if isinstance(claims.get("permissions"), (list, tuple)):
-        return set(map(str, claims["permissions"]))
-    return set()
-
-
 def _verify_bearer_token(tok: str) -> Tuple[str, Set[str]]:
     """
     Verify bearer token as either:
     1. Static API token (full scope).
-    2. JWT (validated if configured).
+    2. JWT (validated if configured; verified tokens cached until `exp`).
     """
-    # Static API token
-    if tok in _api_tokens():
-        return f"apikey:{tok[-4:]}", {"*"}  # tweak: restrict if needed
-
-    # JWT path
-    jwt_secret = str(_cfg("JWT_SECRET", "") or "")
-    jwt_pub = str(_cfg("JWT_PUBLIC_KEY", "") or "")
-    jwt_alg = str(_cfg("JWT_ALG", "HS256") or "HS256")
-    api_aud = _cfg("API_AUDIENCE") or None
-    api_iss = _cfg("API_ISSUER") or None
-
-    if jwt and (jwt_secret or jwt_pub):
-        key = jwt_secret or _normalize_pem(jwt_pub)
-        claims = jwt.decode(
-            tok,
-            key=key,
-            algorithms=[jwt_alg],
-            audience=api_aud,
-            issuer=api_iss,
-            options={"verify_aud": bool(api_aud), "verify_iss": bool(api_iss)},
-        )
-        return str(claims.get("sub", "jwt")), _token_scopes_from_claims(claims)
-
-    raise Unauthorized("Invalid or unsupported bearer token.")
+    return verify_bearer_token(tok)
 
 
 def require_bearer(optional: bool = True, scopes: Optional[List[str]] = None):
@@ -8,6 +8,7 @@ Refactor highlights:
 - Schema-tolerant ORM reads (no dev/offline crashes if tables aren’t present)
 - Unified goal/raised aggregation; Python fallback when needed
 - Conditional ETag handling (304) for / and /stats to cut bandwidth
+- Versioned snapshot cache: 304s and repeat renders skip the database
 - Safer env lookups; Stripe publishable key aliases supported
 - Structured logging + consistent error paths
 - Stronger typing + small utilities (safe_url, cache headers, JSON helpers)
@@ -16,8 +17,6 @@ Refactor highlights:
 import os
 from dataclasses import dataclass
 from decimal import Decimal
-from hashlib import sha1
-from threading import Thread
 from typing import Any, Dict, List, Optional, Tuple
 
 from flask import (
@@ -34,22 +33,33 @@ from flask import (
     g,
 )
 from flask_mail import Message
-from sqlalchemy import desc, func
-from sqlalchemy import inspect as sa_inspect
+from sqlalchemy import desc
 
-from app.extensions import db, mail
+from app.extensions import db
+from app.services.data_version import FUNDRAISING_TABLES
+from app.services.keyset import KeysetPage, cached_count, seek
+from app.services.mail_outbox import enqueue_message
+from app.services.schema_registry import table_exists as _table_exists
+from app.services.snapshot_cache import Snapshot, snapshots
+from app.services.stats_stream import broadcaster, capacity as sse_capacity
 
 # ── Models (tolerant import – log & continue in dev) ───────────────
 try:
-    from app.models.campaign_goal import CampaignGoal  # type: ignore
+    from app.models.campaign_goal import LISTED_SPONSOR_STATUSES, CampaignGoal  # type: ignore
 except Exception:  # pragma: no cover
     CampaignGoal = None  # type: ignore
+    LISTED_SPONSOR_STATUSES = ("approved", "paid", "completed", "success")
 
 try:
     from app.models.sponsor import Sponsor  # type: ignore
 except Exception:  # pragma: no cover
     Sponsor = None  # type: ignore
 
+try:
+    from app.models.fundraising_totals import FundraisingTotals, get_totals  # type: ignore
+except Exception:  # pragma: no cover
+    FundraisingTotals = get_totals = None  # type: ignore
+
 # ── Config & helpers (tolerant fallbacks) ──────────────────────────
 try:
     from app.config.team_config import TEAM_CONFIG  # type: ignore
@@ -94,6 +104,14 @@ DEFAULT_FUNDRAISING_GOAL = 10_000
 SPONSORS_PER_PAGE = 20
 PERSONAS_DEFAULT = ["Sponsor", "Parent", "Coach"]
 
+HOME_FAQS = [
+    {"q": "Is my gift tax-deductible?", "a": "Yes. We’ll email a receipt right away."},
+    {"q": "Can I sponsor anonymously?", "a": "Absolutely—toggle anonymous at checkout."},
+    {"q": "Corporate matching?", "a": "Yes. We’ll include the info HR portals need."},
+    {"q": "Refunds/cancellations?", "a": "Email team@connectatxelite.org and we’ll help."},
+    {"q": "Where does it go?", "a": "Gym time, travel, uniforms, tutoring—updated live."},
+]
+
 
 # ── Typed structs ──────────────────────────────────────────────────
 @dataclass(frozen=True)
@@ -120,17 +138,13 @@ def _nocache_html(resp):
     return resp
 
 
-def _ctx_etag(seed_dict: Dict[str, Any]) -> str:
-    """Generate a short ETag hash from a dict of primitives."""
-    seed = "|".join(
-        [
-            str(int(seed_dict.get("raised", 0))),
-            str(int(seed_dict.get("goal", 0) or 0)),
-            str(int(seed_dict.get("percent", 0))),
-            str(len(seed_dict.get("sponsors_sorted", []))),
-        ]
-    )
-    return sha1(seed.encode("utf-8")).hexdigest()[:12]
+def _not_modified(etag: str) -> bool:
+    """True when the client's If-None-Match already holds `etag`."""
+    return bool(request.if_none_match) and etag in request.if_none_match
+
+
+def _snapshot_ttl() -> float:
+    return float(current_app.config.get("SNAPSHOT_CACHE_TTL", 30))
 
 
 def _env_publishable_key() -> str:
@@ -138,18 +152,14 @@ def _env_publishable_key() -> str:
     return os.getenv("STRIPE_PUBLISHABLE_KEY") or os.getenv("STRIPE_PUBLIC_KEY") or ""
 
 
-def _send_async_email(msg: Message) -> None:
-    """Send email in a background thread within app context."""
-    with current_app.app_context():
-        try:
-            mail.send(msg)
-            current_app.logger.info("✉️ Email sent", extra={"recipients": msg.recipients})
-        except Exception:
-            current_app.logger.exception("✉️ Email send failed", extra={"recipients": getattr(msg, "recipients", None)})
-
-
 def _queue_email(msg: Message) -> None:
-    Thread(target=_send_async_email, args=(msg,), daemon=True).start()
+    """Hand the message to the email outbox (batched SMTP, retried with backoff)."""
+    try:
+        enqueue_message(msg)
+        db.session.commit()  # callers have committed their own work already
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("✉️ Email enqueue failed", extra={"recipients": getattr(msg, "recipients", None)})
 
 
 def _create_thank_you_msg(name: str, email: str) -> Message:
@@ -167,18 +177,9 @@ def _create_thank_you_msg(name: str, email: str) -> Message:
     )
 
 
-def _table_exists(model_or_name: Any) -> bool:
-    """Robust table existence check to avoid 'no such table' crashes in dev."""
-    try:
-        name = getattr(model_or_name, "__tablename__", None) or str(model_or_name)
-        return bool(sa_inspect(db.engine).has_table(name))
-    except Exception:
-        return False
-
-
 # ── DB helpers (schema tolerant) ───────────────────────────────────
 def _sponsor_query():
-    """Build a base query for approved, non-deleted sponsors (schema tolerant)."""
+    """Build a base query for listed (funded or approved), non-deleted sponsors (schema tolerant)."""
     if not Sponsor:
         return None
     if not _table_exists(getattr(Sponsor, "__tablename__", "sponsors")):
@@ -188,11 +189,11 @@ def _sponsor_query():
     if hasattr(Sponsor, "deleted"):
         q = q.filter(Sponsor.deleted_at.is_(None))
     if hasattr(Sponsor, "status"):
-        q = q.filter(Sponsor.status == "approved")
+        q = q.filter(Sponsor.status.in_(LISTED_SPONSOR_STATUSES))
 
     order_col = getattr(Sponsor, "amount", None) or getattr(Sponsor, "id", None)
     if order_col is not None:
-        q = q.order_by(desc(order_col))
+        q = q.order_by(desc(order_col), desc(Sponsor.id))
     return q
 
 
@@ -245,34 +246,69 @@ def _active_goal_amount() -> float:
 
 
 def _get_fundraising_stats() -> FundraisingStats:
-    """Compute raised, goal, and percent with DB + config fallback."""
+    """Raised/goal/percent from the `fundraising_totals` read model (PK lookup)."""
     raised = 0.0
+    goal = 0.0
     try:
-        if Sponsor and _table_exists(getattr(Sponsor, "__tablename__", "sponsors")):
-            if hasattr(Sponsor, "amount"):
-                q = db.session.query(func.coalesce(func.sum(Sponsor.amount), 0.0))
-                if hasattr(Sponsor, "deleted"):
-                    q = q.filter(Sponsor.deleted_at.is_(None))
-                if hasattr(Sponsor, "status"):
-                    q = q.filter(Sponsor.status == "approved")
-                raised = float(q.scalar() or 0.0)
-            else:
-                sponsors = (_sponsor_query() or db.session.query(Sponsor)).all()
-                raised = float(sum((getattr(s, "amount", 0) or 0) for s in sponsors))
+        if get_totals and _table_exists(getattr(FundraisingTotals, "__tablename__", "fundraising_totals")):
+            totals = get_totals()
+            raised = float(totals["raised_cents"])
+            if totals.get("campaign_goal_id"):
+                goal = float(totals["goal_cents"])
     except Exception:
         current_app.logger.exception("💾 Failed fetching total raised")
         raised = 0.0
 
-    goal = _active_goal_amount() or 0.0
+    goal = goal or _active_goal_amount() or 0.0
     percent = (raised / goal * 100.0) if goal else 0.0
     return FundraisingStats(raised=raised, goal=goal or None, percent_raised=percent)
 
 
+# ── Snapshots (cached per fundraising data version) ────────────────
+def _sponsor_view(s: Any) -> Dict[str, Any]:
+    """
+    Detached, JSON-safe sponsor view with the keys the sponsor partials read
+    (`amount` in the same units as the column / `sponsors_total`, plus
+    `tier`, `logo`, `url`); missing attributes become None.
+    """
+    tier = getattr(s, "tier", None) or getattr(s, "computed_tier", None)
+    return {
+        "id": getattr(s, "id", None),
+        "name": getattr(s, "name", None),
+        "amount": getattr(s, "amount", 0) or 0,
+        "tier": tier,
+        "logo": getattr(s, "logo", None) or getattr(s, "logo_url", None),
+        "url": getattr(s, "url", None) or getattr(s, "website", None),
+        "status": getattr(s, "status", None),
+        "team_id": getattr(s, "team_id", None),
+    }
+
+
+def _build_fundraising_snapshot() -> Dict[str, Any]:
+    sponsors, sponsors_total, _ = _get_sponsors()
+    stats = _get_fundraising_stats()
+    return {
+        "raised": stats.raised,
+        "goal": stats.goal,
+        "percent": stats.percent_raised,
+        "sponsors_total": sponsors_total,
+        "sponsors_sorted": [_sponsor_view(s) for s in sponsors],
+    }
+
+
+def _fundraising_snapshot() -> Snapshot:
+    """Sponsors + totals + goal; rebuilt only after a fundraising write."""
+    return snapshots.get(
+        "main.fundraising", FUNDRAISING_TABLES, _build_fundraising_snapshot, ttl=_snapshot_ttl()
+    )
+
+
 # ── Context builder ────────────────────────────────────────────────
-def _home_context() -> Dict[str, Any]:
+def _home_context(snap: Optional[Snapshot] = None) -> Dict[str, Any]:
     """Full homepage context with live DB data + UI sections."""
-    sponsors_sorted, sponsors_total, top_sponsor = _get_sponsors()
-    stats = _get_fundraising_stats()
+    data = (snap or _fundraising_snapshot()).data
+    sponsors_sorted = data["sponsors_sorted"]
+    top_sponsor = sponsors_sorted[0] if sponsors_sorted else None
     impact = _generate_impact_stats(TEAM_CONFIG)
 
     # URLs for partials (avoid inline url_for in Jinja)
@@ -286,11 +322,11 @@ def _home_context() -> Dict[str, Any]:
         about=_generate_about_section(TEAM_CONFIG),
         challenge=_generate_challenge_section(TEAM_CONFIG, impact),
         mission=_generate_mission_section(TEAM_CONFIG, impact),
-        stats=_prepare_stats(TEAM_CONFIG, stats.raised, stats.goal, stats.percent_raised),
-        raised=stats.raised,
-        goal=stats.goal,
-        percent=stats.percent_raised,
-        sponsors_total=sponsors_total,
+        stats=_prepare_stats(TEAM_CONFIG, data["raised"], data["goal"], data["percent"]),
+        raised=data["raised"],
+        goal=data["goal"],
+        percent=data["percent"],
+        sponsors_total=data["sponsors_total"],
         sponsors_sorted=sponsors_sorted,
         sponsor=top_sponsor,
         features={"digital_hub_enabled": True},
@@ -316,31 +352,18 @@ def _home_context() -> Dict[str, Any]:
 def home():
     """Homepage with live stats and sponsor highlights."""
     try:
-        faqs = [
-            {"q": "Is my gift tax-deductible?", "a": "Yes. We’ll email a receipt right away."},
-            {"q": "Can I sponsor anonymously?", "a": "Absolutely—toggle anonymous at checkout."},
-            {"q": "Corporate matching?", "a": "Yes. We’ll include the info HR portals need."},
-            {"q": "Refunds/cancellations?", "a": "Email team@connectatxelite.org and we’ll help."},
-            {"q": "Where does it go?", "a": "Gym time, travel, uniforms, tutoring—updated live."},
-        ]
-
-        context = _home_context()
-        context["faqs"] = faqs
-
-        # Build ETag and honor If-None-Match (conditional GET)
-        etag = _ctx_etag(
-            {
-                "raised": context.get("raised", 0),
-                "goal": context.get("goal", 0),
-                "percent": context.get("percent", 0),
-                "sponsors_sorted": context.get("sponsors_sorted", []),
-            }
-        )
-        if request.if_none_match and etag in request.if_none_match:
+        # Honor If-None-Match before building any context: a cached snapshot
+        # answers revalidations without touching the database.
+        snap = _fundraising_snapshot()
+        etag = snap.etag
+        if _not_modified(etag):
             resp = make_response("", 304)
             resp.set_etag(etag)
             return resp
 
+        context = _home_context(snap)
+        context["faqs"] = HOME_FAQS
+
         resp = make_response(render_template("index.html", **context))
         resp.set_etag(etag)
         _nocache_html(resp)
@@ -396,21 +419,31 @@ def become_sponsor():
 
 
 # ── Static Pages ───────────────────────────────────────────────────
+def _build_about_context() -> Dict[str, Any]:
+    return dict(
+        team=TEAM_CONFIG,
+        about=_generate_about_section(TEAM_CONFIG),
+        mission=_generate_mission_section(TEAM_CONFIG, _generate_impact_stats(TEAM_CONFIG)),
+        faqs=[
+            {"q": "What’s our mission?", "a": "To shape leaders, scholars, and athletes in our community."},
+            {"q": "How are funds used?", "a": "Gym time, travel, uniforms, tutoring — always updated live."},
+        ],
+    )
+
+
 @bp.get("/about")
 def about():
     """About & Mission page."""
     try:
-        context: Dict[str, Any] = dict(
-            team=TEAM_CONFIG,
-            about=_generate_about_section(TEAM_CONFIG),
-            mission=_generate_mission_section(TEAM_CONFIG, _generate_impact_stats(TEAM_CONFIG)),
-            faqs=[
-                {"q": "What’s our mission?", "a": "To shape leaders, scholars, and athletes in our community."},
-                {"q": "How are funds used?", "a": "Gym time, travel, uniforms, tutoring — always updated live."},
-            ],
-        )
-        resp = make_response(render_template("about.html", **context))
-        resp.set_etag(sha1(str(context).encode("utf-8")).hexdigest()[:12])
+        # Static content: built once per process, no data-version tables.
+        snap = snapshots.get("main.about", (), _build_about_context, ttl=0)
+        if _not_modified(snap.etag):
+            resp = make_response("", 304)
+            resp.set_etag(snap.etag)
+            return resp
+
+        resp = make_response(render_template("about.html", **snap.data))
+        resp.set_etag(snap.etag)
         _nocache_html(resp)
         return resp
     except Exception:
@@ -425,28 +458,29 @@ def stripe_smoke():
 
 @bp.get("/sponsors")
 def sponsor_list():
-    """Paginated list of approved sponsors."""
-    page = request.args.get("page", 1, type=int)
-    sponsors: List[Any] = []
-    pagination = None
+    """Approved sponsors, keyset-paginated on (amount, id) with a cached total."""
+    cursor = request.args.get("cursor") or None
+    before = request.args.get("before") or None
+    page: Optional[KeysetPage] = None
 
     q = _sponsor_query()
-    if q is None:
-        return render_template("sponsor_list.html", sponsors=sponsors, pagination=pagination)
-
-    try:
-        # Flask-SQLAlchemy v3+ has Query.paginate; fallback to manual pagination
+    if q is not None:
         try:
-            pagination = q.paginate(page=page, per_page=SPONSORS_PER_PAGE, error_out=False)  # type: ignore[attr-defined]
-            sponsors = list(pagination.items)  # type: ignore[assignment]
+            # _sponsor_query() pre-orders by amount; seek() supplies (amount, id)
+            q = q.order_by(None)
+            total = cached_count("main.sponsors", ("sponsors",), q, ttl=_snapshot_ttl())
+            page = seek(q, (Sponsor.amount, Sponsor.id), cursor, SPONSORS_PER_PAGE, total=total, before=before)
         except Exception:
-            sponsors = q.limit(SPONSORS_PER_PAGE).offset((page - 1) * SPONSORS_PER_PAGE).all()
-            pagination = None
-    except Exception:
-        current_app.logger.exception("📋 Error fetching sponsors list")
-        sponsors, pagination = [], None
-
-    return render_template("sponsor_list.html", sponsors=sponsors, pagination=pagination)
+            current_app.logger.exception("📋 Error fetching sponsors list")
+
+    return render_template(
+        "sponsors.html",
+        sponsors=page.items if page else [],
+        page=page,
+        next_cursor=page.next_cursor if page else None,
+        prev_cursor=page.prev_cursor if page else None,
+        total=page.total if page else 0,
+    )
 
 
 @bp.get("/calendar")
@@ -576,37 +610,33 @@ def embed_about():
 
 
 # ── Lightweight stats API used by AI Concierge + front-end widgets ─
+def stats_payload(snap: Optional[Snapshot] = None) -> Dict[str, Any]:
+    """Body of `/stats` (also embedded in `/api/boot`)."""
+    data = (snap or _fundraising_snapshot()).data
+    return {
+        "team": TEAM_CONFIG.get("team_name", "Our Team"),
+        "raised": int(data["raised"]),
+        "goal": int(data["goal"] or 0),
+        "percent": round(data["percent"], 1),
+        "sponsors_total": int(data["sponsors_total"]),
+        "sponsors_count": len(data["sponsors_sorted"]),
+    }
+
+
 @bp.get("/stats")
 def stats_json():
     """JSON snapshot of fundraising stats for client widgets/AI context."""
     try:
-        s = _get_fundraising_stats()
-        sponsors_sorted, sponsors_total, _ = _get_sponsors()
-        payload = {
-            "team": TEAM_CONFIG.get("team_name", "Our Team"),
-            "raised": int(s.raised),
-            "goal": int(s.goal or 0),
-            "percent": round(s.percent_raised, 1),
-            "sponsors_total": int(sponsors_total),
-            "sponsors_count": len(sponsors_sorted),
-        }
-
-        etag = _ctx_etag(
-            {
-                "raised": payload["raised"],
-                "goal": payload["goal"],
-                "percent": payload["percent"],
-                "sponsors_sorted": sponsors_sorted,
-            }
-        )
-        if request.if_none_match and etag in request.if_none_match:
+        snap = _fundraising_snapshot()
+        etag = snap.etag
+        if _not_modified(etag):
             resp = make_response("", 304)
             resp.set_etag(etag)
             resp.cache_control.public = True
             resp.cache_control.max_age = 30
             return resp
 
-        resp = make_response(jsonify(payload))
+        resp = make_response(jsonify(stats_payload(snap)))
         resp.set_etag(etag)
         resp.cache_control.public = True
         resp.cache_control.max_age = 30  # short caching for widgets
@@ -625,3 +655,42 @@ def stats_json():
         resp.cache_control.no_store = True
         return resp
 
+
+def _stream_payload() -> Dict[str, Any]:
+    """Totals for the live stream (read-model PK lookup; no sponsor list)."""
+    stats = _get_fundraising_stats()
+    return {
+        "raised": int(stats.raised),
+        "goal": int(stats.goal or 0),
+        "percent": round(stats.percent_raised, 1),
+    }
+
+
+@bp.get("/stats/stream")
+def stats_stream():
+    """
+    Server-Sent Events: `{raised, goal, percent, seq}` pushed only when the
+    totals change, heartbeats in between, `Last-Event-ID` aware.
+    """
+    cfg = current_app.config
+    if not broadcaster.acquire(sse_capacity(cfg)):
+        resp = make_response("stream capacity reached; poll /stats", 503)
+        resp.headers["Retry-After"] = "30"
+        return resp
+
+    broadcaster.start(
+        current_app._get_current_object(),  # type: ignore[attr-defined]
+        _stream_payload,
+        poll=float(cfg.get("SSE_POLL_SECONDS", 5)),
+    )
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+    body = broadcaster.stream(
+        last_id,
+        heartbeat=float(cfg.get("SSE_HEARTBEAT_SECONDS", 15)),
+        max_seconds=float(cfg.get("SSE_MAX_SECONDS", 300)),
+    )
+    resp = current_app.response_class(body, mimetype="text/event-stream")
+    resp.call_on_close(broadcaster.release)  # also when the client leaves before the first byte
+    resp.headers["Cache-Control"] = "no-cache, no-transform"
+    resp.headers["X-Accel-Buffering"] = "no"  # nginx: flush each event
+    return resp
@@ -22,6 +22,9 @@ from typing import Deque, Dict, Optional, Tuple
 from flask import Blueprint, Response, abort, current_app, jsonify, request
 
 from app.extensions import db
+from app.services.clients import openai_client
+from app.services.metrics import EXTERNAL_LATENCY, WEBHOOK_LATENCY
+from app.services.schema_registry import table_exists as _db_table_exists
 
 # Optional CSRF exemption (Twilio posts are third-party)
 try:
@@ -95,26 +98,6 @@ RATE_LIMIT_MAX_MSGS = int(os.getenv("SMS_RATE_MAX", "6"))
 _rate_window: Dict[str, Deque[float]] = defaultdict(deque)
 
 
-# ─────────────────────────────────────────────────────────────
-# 🤖 OpenAI Client (new or legacy)
-# ─────────────────────────────────────────────────────────────
-_OPENAI_CLIENT = None
-_OPENAI_LEGACY = False
-try:
-    from openai import OpenAI  # type: ignore
-
-    _OPENAI_CLIENT = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-except Exception:
-    try:
-        import openai  # type: ignore
-
-        openai.api_key = os.getenv("OPENAI_API_KEY")
-        _OPENAI_LEGACY = True
-        _OPENAI_CLIENT = openai
-    except Exception:
-        _OPENAI_CLIENT = None
-
-
 # ─────────────────────────────────────────────────────────────
 # 🧩 Utility Functions
 # ─────────────────────────────────────────────────────────────
@@ -197,31 +180,22 @@ def _twiml(msg: str) -> Response:
     return Response(xml, mimetype="application/xml")
 
 
-def _db_table_exists(model) -> bool:
-    """Lightweight introspection to avoid dev/offline crashes."""
-    try:
-        from sqlalchemy import inspect as sa_inspect
-
-        name = getattr(model, "__tablename__", None)
-        return bool(name and sa_inspect(db.engine).has_table(name))
-    except Exception:
-        return False
-
-
 # ─────────────────────────────────────────────────────────────
 # 💬 AI Chat with OpenAI
 # ─────────────────────────────────────────────────────────────
 def _openai_chat(user_text: str) -> Tuple[str, Optional[str]]:
     if not SMS_AI_ENABLED:
         return (f"Thanks for your message! Learn more at {SITE_URL}.", "ai_disabled")
-    if _OPENAI_CLIENT is None:
+    client, legacy = openai_client()  # new or legacy SDK; built on first AI reply
+    if client is None:
         return (f"Sorry, our AI is busy. You can sponsor or donate at {SITE_URL}.", "openai_unavailable")
 
     last_err: Optional[str] = None
     for attempt in range(1, OPENAI_MAX_RETRIES + 2):
+        t0 = time.perf_counter()
         try:
-            if _OPENAI_LEGACY:
-                resp = _OPENAI_CLIENT.ChatCompletion.create(  # type: ignore[attr-defined]
+            if legacy:
+                resp = client.ChatCompletion.create(  # type: ignore[attr-defined]
                     model=OPENAI_MODEL,
                     messages=[
                         {"role": "system", "content": SYSTEM_PROMPT},
@@ -233,7 +207,7 @@ def _openai_chat(user_text: str) -> Tuple[str, Optional[str]]:
                 )
                 text = (resp.choices[0].message.content or "").strip()
             else:
-                resp = _OPENAI_CLIENT.chat.completions.create(  # type: ignore[attr-defined]
+                resp = client.chat.completions.create(  # type: ignore[attr-defined]
                     model=OPENAI_MODEL,
                     messages=[
                         {"role": "system", "content": SYSTEM_PROMPT},
@@ -245,9 +219,11 @@ def _openai_chat(user_text: str) -> Tuple[str, Optional[str]]:
                 )
                 text = (resp.choices[0].message.content or "").strip()
 
+            EXTERNAL_LATENCY.observe(time.perf_counter() - t0, service="openai", outcome="ok")
             trimmed = _trim(text, MAX_OUTBOUND_LEN)
             return (trimmed, None if trimmed else "empty_openai_response")
         except Exception as e:
+            EXTERNAL_LATENCY.observe(time.perf_counter() - t0, service="openai", outcome="error")
             last_err = str(e)
             current_app.logger.warning(
                 "OpenAI attempt %s failed: %s", attempt, last_err, exc_info=(attempt == OPENAI_MAX_RETRIES + 1)
@@ -318,11 +294,12 @@ def _handle_keywords(text: str) -> Optional[str]:
 # ─────────────────────────────────────────────────────────────
 @sms_bp.route("/health", methods=["GET"])
 def health() -> Response:
+    client, _ = openai_client()
     payload = {
         "status": "ok",
         "ai_enabled": SMS_AI_ENABLED,
-        "openai": bool(_OPENAI_CLIENT),
-        "model": OPENAI_MODEL if _OPENAI_CLIENT else None,
+        "openai": bool(client),
+        "model": OPENAI_MODEL if client else None,
         "twilio_sig_required": REQUIRE_TWILIO_SIGNATURE and bool(TWILIO_AUTH_TOKEN),
         "rate_limit": {"window_secs": RATE_LIMIT_WINDOW_SECS, "max_msgs": RATE_LIMIT_MAX_MSGS},
     }
@@ -333,6 +310,7 @@ def health() -> Response:
 # 📬 SMS Webhook (POST)
 # ─────────────────────────────────────────────────────────────
 @sms_bp.route("/webhook", methods=["POST"])
+@WEBHOOK_LATENCY.time(source="twilio")
 def sms_webhook() -> Response:
     # Signature guard (aborts 403 if invalid)
     try:
@@ -3,10 +3,13 @@ from __future__ import annotations
 
 import os
 import secrets
-from typing import Iterable
-from flask import g, current_app
+from functools import lru_cache
+from typing import Iterable, Tuple
+from flask import current_app
 from markupsafe import Markup
 
+from app.security.jinja_nonce import current_nonce
+
 # Toggle report-only via env: CSP_REPORT_ONLY=1
 REPORT_ONLY = (os.getenv("CSP_REPORT_ONLY", "0").lower() in {"1", "true", "yes"})
 
@@ -15,8 +18,8 @@ def new_nonce() -> str:
     return secrets.token_urlsafe(16)
 
 def nonce() -> str:
-    # Access the per-request nonce; set in before_request
-    return getattr(g, "csp_nonce", "")
+    # Per-request nonce, generated on first use (never for static/JSON responses)
+    return current_nonce()
 
 def nonce_attr() -> Markup:
     # Handy for templates: <script {{ nonce_attr() }}>
@@ -26,12 +29,40 @@ def nonce_attr() -> Markup:
 def _join(*vals: Iterable[str]) -> str:
     return " ".join(v for v in vals if v)
 
+
+# Placeholder compiled into policies where the per-request nonce goes
+NONCE_SLOT = "\x00nonce\x00"
+
+
+class CspTemplate:
+    """
+    A policy compiled once into the literal chunks around its nonce slot(s);
+    rendering is a single str.join. `without_nonce` drops the nonce sources
+    for HTML that was not rendered through Jinja (no nonce was issued).
+    """
+
+    __slots__ = ("parts", "without_nonce")
+
+    def __init__(self, policy: str) -> None:
+        self.parts: Tuple[str, ...] = tuple(policy.split(NONCE_SLOT))
+        self.without_nonce = policy.replace(f" 'nonce-{NONCE_SLOT}'", "")
+
+    def render(self, nonce_value: str) -> str:
+        return nonce_value.join(self.parts) if nonce_value else self.without_nonce
+
 def build_csp() -> str:
     """
     Strict but practical CSP for your stack (Stripe, GA/GTM optional, Socket.IO).
-    Adjust domains as needed; we keep it minimal and safe.
+    Compiled once per (PRIMARY_ORIGIN, GA_ID); each call only fills the nonce.
     """
-    n = nonce()
+    cfg = current_app.config
+    template = _compiled_policy(cfg.get("PRIMARY_ORIGIN", "http://127.0.0.1:5000"), bool(cfg.get("GA_ID")))
+    return template.render(nonce())
+
+
+@lru_cache(maxsize=8)
+def _compiled_policy(primary_origin: str, ga_enabled: bool) -> CspTemplate:
+    n = NONCE_SLOT
 
     # External services you actually use
     stripe_js   = "https://js.stripe.com"
@@ -51,7 +82,6 @@ def build_csp() -> str:
     fonts_bin = "https://fonts.gstatic.com"
 
     # Socket.IO / websockets
-    primary_origin = current_app.config.get("PRIMARY_ORIGIN", "http://127.0.0.1:5000")
     # Allow ws/wss back to ourselves (and same host/port)
     ws_self = primary_origin.replace("http", "ws", 1)
 
@@ -63,7 +93,7 @@ def build_csp() -> str:
         f"'nonce-{n}'",
         stripe_js, cdn1, cdn2,
     ]
-    if current_app.config.get("GA_ID"):
+    if ga_enabled:
         script_src += [gtm, ga, dbl]
 
     # Styles: your app uses external CSS (e.g., fonts) + Tailwind. Prefer nonced <style> blocks.
@@ -77,7 +107,7 @@ def build_csp() -> str:
         ws_self,         # websocket (dev)
         "wss://*",       # if you deploy behind TLS and need wss (Socket.IO, Stripe, etc.)
     ]
-    if current_app.config.get("GA_ID"):
+    if ga_enabled:
         connect_src += [gtm, ga]
 
     img_src = ["'self'", "data:", "blob:"]
@@ -106,10 +136,10 @@ def build_csp() -> str:
         # ("upgrade-insecure-requests", ""),
         # ("block-all-mixed-content", ""),
     ]
-    return "; ".join(
+    return CspTemplate("; ".join(
         f"{name} {value}".rstrip() if value else name
         for name, value in directives
-    )
+    ))
 
 def apply_csp_headers(response):
     # Attach either CSP or Report-Only header
@@ -0,0 +1,83 @@
+# app/security/csrf_cookie.py
+from __future__ import annotations
+
+"""
+CSRF cookie policy.
+
+The `csrf_token` cookie (read by fetch() callers) is only attached when the
+response actually used a token — i.e. a template called `csrf_token()` /
+`form.hidden_tag()`, which leaves the signed token in `g` — and:
+
+- never on cacheable responses: 304s, static files, or anything marked
+  `Cache-Control: public` / `s-maxage` (a Set-Cookie makes shared caches
+  skip or, worse, replay it);
+- not again while the browser's cookie is still a valid token for this
+  session with at least half its lifetime left.
+
+Static assets, JSON API responses and Socket.IO traffic therefore skip the
+HMAC, the session write and the Set-Cookie header entirely.
+"""
+
+import hmac
+from typing import Any
+
+from flask import Flask, current_app, g, request, session
+
+try:
+    from itsdangerous import BadData, URLSafeTimedSerializer  # type: ignore
+except Exception:  # pragma: no cover
+    URLSafeTimedSerializer = None  # type: ignore
+    BadData = Exception  # type: ignore
+
+COOKIE_NAME = "csrf_token"
+
+
+def _field_name() -> str:
+    return current_app.config.get("WTF_CSRF_FIELD_NAME", "csrf_token")
+
+
+def is_cacheable(resp: Any) -> bool:
+    if resp.status_code == 304 or request.endpoint == "static":
+        return True
+    cc = resp.cache_control
+    return bool(cc.public or cc.s_maxage)
+
+
+def cookie_still_valid() -> bool:
+    """The request's cookie matches this session's token and is not near expiry."""
+    raw_cookie = request.cookies.get(COOKIE_NAME)
+    raw_session = session.get(_field_name())
+    if not raw_cookie or not raw_session or URLSafeTimedSerializer is None:
+        return False
+    cfg = current_app.config
+    secret = cfg.get("WTF_CSRF_SECRET_KEY") or current_app.secret_key
+    limit = cfg.get("WTF_CSRF_TIME_LIMIT", 3600)
+    try:
+        data = URLSafeTimedSerializer(secret, salt="wtf-csrf-token").loads(
+            raw_cookie, max_age=(limit / 2) if limit else None
+        )
+    except BadData:
+        return False
+    return hmac.compare_digest(str(data), str(raw_session))
+
+
+def init_csrf_cookie(app: Flask) -> None:
+    @app.after_request
+    def _inject_csrf_cookie(resp):
+        token = g.get(_field_name())  # set only if this request rendered a token
+        if not token or is_cacheable(resp):
+            return resp
+        try:
+            if not cookie_still_valid():
+                resp.set_cookie(
+                    COOKIE_NAME,
+                    token,
+                    samesite="Lax",
+                    secure=(app.config.get("ENV") == "production"),
+                )
+        except Exception:
+            pass
+        return resp
+
+
+__all__ = ["init_csrf_cookie", "is_cacheable", "cookie_still_valid", "COOKIE_NAME"]
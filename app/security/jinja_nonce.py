@@ -0,0 +1,99 @@
+# app/security/jinja_nonce.py
+from __future__ import annotations
+
+"""
+Compile-time CSP nonces for inline <script>/<style>.
+
+`CspNonceExtension.preprocess` runs once per template load (before Jinja
+compiles it) and rewrites every `<script`/`<style` opening tag that has no
+`nonce=` into `<script nonce="{{ _fc_csp_nonce() }}"`. The compiled template
+then emits the per-request nonce like any other expression, so responses
+are never decoded, regex-scanned and re-encoded after rendering, and
+streamed templates keep working.
+
+The nonce is a global function rather than the `csp_nonce` context
+variable so macros imported without context get it too. Text inside Jinja
+tags/comments and `{% raw %}` blocks is left alone.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from flask import g, has_request_context
+from jinja2.ext import Extension
+
+NONCE_GLOBAL = "_fc_csp_nonce"
+
+_TAG_OPEN = re.compile(r"<(script|style)(?=[\s>/])", re.IGNORECASE)
+_JINJA = re.compile(
+    r"\{%-?\s*raw\s*-?%\}.*?\{%-?\s*endraw\s*-?%\}|\{\{.*?\}\}|\{%.*?%\}|\{#.*?#\}",
+    re.DOTALL,
+)
+# Attribute run up to the tag's closing ">", stepping over {{ }}/{% %} (which may contain ">")
+_TAG_BODY = re.compile(r"(?:\{\{.*?\}\}|\{%.*?%\}|\{#.*?#\}|[^>])*", re.DOTALL)
+_HAS_NONCE = re.compile(r"\bnonce\s*=", re.IGNORECASE)
+_JINJA_PART = re.compile(r"\{\{.*?\}\}|\{%.*?%\}|\{#.*?#\}", re.DOTALL)
+
+
+def current_nonce() -> str:
+    """Per-request nonce (created on first use); empty outside a request."""
+    if not has_request_context():
+        return ""
+    nonce = getattr(g, "csp_nonce", None)
+    if not nonce:
+        from secrets import token_urlsafe
+
+        nonce = g.csp_nonce = token_urlsafe(16)
+    return nonce
+
+
+def _jinja_spans(source: str) -> List[Tuple[int, int]]:
+    return [m.span() for m in _JINJA.finditer(source)]
+
+
+def _inside(pos: int, spans: List[Tuple[int, int]]) -> bool:
+    return any(start <= pos < end for start, end in spans)
+
+
+def _has_nonce(tag_body: str) -> bool:
+    """A literal `nonce=` or a Jinja expression that emits one (`{{ nonce_attr() }}`)."""
+    for part in _JINJA_PART.findall(tag_body):
+        if "nonce" in part.lower():
+            return True
+    return bool(_HAS_NONCE.search(_JINJA_PART.sub("", tag_body)))
+
+
+def add_nonce_placeholders(source: str) -> str:
+    """Insert the nonce expression into un-nonced <script>/<style> tags."""
+    if "<script" not in source.lower() and "<style" not in source.lower():
+        return source
+    spans = _jinja_spans(source)
+    out: List[str] = []
+    last = 0
+    for m in _TAG_OPEN.finditer(source):
+        if _inside(m.start(), spans):
+            continue
+        body = _TAG_BODY.match(source, m.end())
+        if body and _has_nonce(body.group(0)):
+            continue
+        out.append(source[last : m.end()])
+        out.append(' nonce="{{ %s() }}"' % NONCE_GLOBAL)
+        last = m.end()
+    if not out:
+        return source
+    out.append(source[last:])
+    return "".join(out)
+
+
+class CspNonceExtension(Extension):
+    """Jinja extension: nonce placeholders added at compile time, filled at render."""
+
+    def __init__(self, environment) -> None:
+        super().__init__(environment)
+        environment.globals.setdefault(NONCE_GLOBAL, current_nonce)
+
+    def preprocess(self, source: str, name: Optional[str], filename: Optional[str] = None) -> str:
+        return add_nonce_placeholders(source)
+
+
+__all__ = ["CspNonceExtension", "add_nonce_placeholders", "current_nonce", "NONCE_GLOBAL"]
@@ -1,2 +1,14 @@
+# app/services/__init__.py
+# Resolved lazily so importing any app.services.* module doesn't pull in
+# Stripe/requests via PaymentService.
 
-from .payments import PaymentService
+
+def __getattr__(name):
+    if name == "PaymentService":
+        from .payments import PaymentService
+
+        return PaymentService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["PaymentService"]
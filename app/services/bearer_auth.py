@@ -0,0 +1,271 @@
+# app/services/bearer_auth.py
+from __future__ import annotations
+
+"""
+Bearer verification (static API tokens or JWT) with cached keys and a
+verified-token LRU.
+
+Every authenticated API call used to rebuild the `API_TOKENS` set, re-read
+and re-normalize the PEM key and run a full `jwt.decode` — an RSA signature
+check per request for a partner reusing one long-lived token. Now:
+
+- a `Keyring` is built once per auth configuration: SHA-256 digests of the
+  static tokens, the parsed HMAC/PEM key and, optionally, keys from a local
+  JWKS file (`JWT_JWKS_FILE`, re-read when its mtime changes) looked up by
+  the token's `kid`. Rotating a key is a config/JWKS change; the next
+  request builds a new keyring and drops every cached verification;
+- verified JWTs are remembered in a bounded LRU keyed by the token's
+  digest until their `exp` (tokens without `exp` for `JWT_CACHE_TTL`
+  seconds), so a repeat presentation costs one hash and a dict lookup.
+
+Failures are never cached.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from flask import current_app, has_app_context
+from werkzeug.exceptions import Unauthorized
+
+Principal = Tuple[str, Set[str]]  # (subject, scopes)
+
+log = logging.getLogger(__name__)
+
+
+def _cfg(name: str, default: Any = None) -> Any:
+    v = current_app.config.get(name) if has_app_context() else None
+    return v if v is not None else os.getenv(name, default)
+
+
+def _jwt():
+    """PyJWT (pulls in `cryptography`) — imported on the first JWT, not at boot."""
+    try:
+        import jwt  # PyJWT
+    except Exception:  # pragma: no cover
+        return None
+    return jwt
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def normalize_pem(s: str) -> str:
+    # Allow keys provided via env with `\n`
+    return s.replace("\\n", "\n") if "BEGIN" in s and "\\n" in s else s
+
+
+def scopes_from_claims(claims: Dict[str, Any]) -> Set[str]:
+    if isinstance(claims.get("scope"), str):
+        return set(claims["scope"].split())
+    if isinstance(claims.get("scopes"), (list, tuple)):
+        return set(map(str, claims["scopes"]))
+    if isinstance(claims.get("permissions"), (list, tuple)):
+        return set(map(str, claims["permissions"]))
+    return set()
+
+
+# ── Keyring ────────────────────────────────────────────────────────
+
+class Keyring:
+    """Everything derived from the auth config, parsed once."""
+
+    def __init__(self, settings: Tuple[Any, ...]) -> None:
+        tokens, secret, public, alg, jwks_path, jwks_mtime, self.audience, self.issuer = settings
+        self.settings = settings
+        self.algorithm = alg
+        self.token_digests: FrozenSet[bytes] = frozenset(
+            _digest(t.strip()) for t in tokens.split(",") if t.strip()
+        )
+        self.default_key: Any = None
+        self.jwks: Dict[str, Tuple[Any, str]] = {}  # kid → (key object, algorithm)
+        jwt = _jwt() if (secret or public or jwks_path) else None
+        if jwt is None:
+            return
+        if secret:
+            self.default_key = secret
+        elif public:
+            self.default_key = self._prepare(jwt, alg, normalize_pem(public))
+        if jwks_path and jwks_mtime is not None:
+            try:
+                self._load_jwks(jwt, jwks_path)
+            except Exception:
+                log.warning("JWKS file %s unreadable; using configured keys only", jwks_path, exc_info=True)
+
+    @staticmethod
+    def _prepare(jwt: Any, alg: str, material: str) -> Any:
+        # Parse PEM into a key object once (RSA/EC parsing is the expensive part)
+        algo = jwt.algorithms.get_default_algorithms().get(alg)
+        return algo.prepare_key(material) if algo is not None else material
+
+    def _load_jwks(self, jwt: Any, path: str) -> None:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        for raw in data.get("keys", []) if isinstance(data, dict) else []:
+            try:
+                jwk = jwt.PyJWK.from_dict(raw)
+            except Exception:
+                continue  # unsupported key type; others still usable
+            kid = str(raw.get("kid") or "")
+            self.jwks[kid] = (jwk.key, raw.get("alg") or self.algorithm)
+
+    @property
+    def accepts_jwt(self) -> bool:
+        return self.default_key is not None or bool(self.jwks)
+
+    def key_for(self, kid: Optional[str]) -> List[Tuple[Any, str]]:
+        """Candidate (key, alg) pairs: the JWKS entry for `kid`, else every configured key."""
+        if kid is not None and kid in self.jwks:
+            return [self.jwks[kid]]
+        keys = [(self.default_key, self.algorithm)] if self.default_key is not None else []
+        if kid is None:
+            keys += list(self.jwks.values())
+        return keys
+
+
+def _settings() -> Tuple[Any, ...]:
+    jwks_path = str(_cfg("JWT_JWKS_FILE", "") or "")
+    try:
+        mtime = os.stat(jwks_path).st_mtime_ns if jwks_path else None
+    except OSError:
+        mtime = None
+    return (
+        str(_cfg("API_TOKENS", "") or ""),
+        str(_cfg("JWT_SECRET", "") or ""),
+        str(_cfg("JWT_PUBLIC_KEY", "") or ""),
+        str(_cfg("JWT_ALG", "HS256") or "HS256"),
+        jwks_path,
+        mtime,
+        _cfg("API_AUDIENCE") or None,
+        _cfg("API_ISSUER") or None,
+    )
+
+
+# ── Verifier ───────────────────────────────────────────────────────
+
+class BearerVerifier:
+    """Per-process keyring + verified-token LRU (thread-safe)."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._keyring: Optional[Keyring] = None
+        self._cache: "OrderedDict[bytes, Tuple[float, Principal]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+
+    def keyring(self) -> Keyring:
+        settings = _settings()
+        ring = self._keyring
+        if ring is None or ring.settings != settings:
+            ring = Keyring(settings)
+            self.max_entries = int(_cfg("JWT_CACHE_SIZE", self.max_entries))
+            self.ttl = float(_cfg("JWT_CACHE_TTL", self.ttl))
+            with self._lock:
+                self._keyring = ring
+                self._cache.clear()  # rotated/removed keys must not keep old verifications alive
+                self.rebuilds += 1
+        return ring
+
+    def _remember(self, digest: bytes, expires_at: float, principal: Principal) -> None:
+        with self._lock:
+            self._cache[digest] = (expires_at, principal)
+            self._cache.move_to_end(digest)
+            while len(self._cache) > max(1, self.max_entries):
+                self._cache.popitem(last=False)
+
+    def _recall(self, digest: bytes) -> Optional[Principal]:
+        with self._lock:
+            entry = self._cache.get(digest)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at <= time.time():
+                del self._cache[digest]
+                return None
+            self._cache.move_to_end(digest)
+            return principal
+
+    def verify(self, token: str) -> Principal:
+        ring = self.keyring()
+        digest = _digest(token)
+        if digest in ring.token_digests:
+            return f"apikey:{token[-4:]}", {"*"}
+
+        cached = self._recall(digest)
+        if cached is not None:
+            self.hits += 1
+            return cached[0], set(cached[1])
+
+        if not ring.accepts_jwt:
+            raise Unauthorized("Invalid or unsupported bearer token.")
+        self.misses += 1
+        claims = self._decode(ring, token)
+        principal = (str(claims.get("sub", "jwt")), scopes_from_claims(claims))
+        now = time.time()
+        exp = claims.get("exp")
+        expires_at = float(exp) if isinstance(exp, (int, float)) else now + self.ttl
+        if expires_at > now:
+            self._remember(digest, expires_at, (principal[0], frozenset(principal[1])))
+        return principal
+
+    @staticmethod
+    def _decode(ring: Keyring, token: str) -> Dict[str, Any]:
+        jwt = _jwt()
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except Exception:
+            raise Unauthorized("Invalid bearer token.")
+        options = {"verify_aud": bool(ring.audience), "verify_iss": bool(ring.issuer)}
+        last_error: Optional[Exception] = None
+        for key, alg in ring.key_for(kid):
+            try:
+                return jwt.decode(
+                    token, key=key, algorithms=[alg], audience=ring.audience, issuer=ring.issuer, options=options
+                )
+            except jwt.InvalidSignatureError as exc:
+                last_error = exc  # try the next key (rotation overlap)
+            except jwt.PyJWTError as exc:
+                raise Unauthorized(f"Invalid bearer token: {exc}")
+        raise Unauthorized(f"Invalid bearer token: {last_error or 'no matching key'}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._keyring = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached": len(self._cache),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "keyring_rebuilds": self.rebuilds,
+        }
+
+
+verifier = BearerVerifier()
+
+
+def verify_bearer_token(token: str) -> Principal:
+    """(subject, scopes) for a static API token or a valid JWT; raises Unauthorized."""
+    return verifier.verify(token)
+
+
+__all__ = [
+    "BearerVerifier",
+    "Keyring",
+    "Principal",
+    "normalize_pem",
+    "scopes_from_claims",
+    "verifier",
+    "verify_bearer_token",
+]
@@ -0,0 +1,127 @@
+# app/services/clients.py
+from __future__ import annotations
+
+"""
+Lazy, process-wide third-party clients (Redis, Stripe, OpenAI).
+
+Importing these libraries and building their clients used to happen at
+module import, so every gunicorn worker paid for them during boot whether
+or not a request ever needed them. Callers now ask here on first use:
+
+    r = redis_client()          # Redis | None
+    r = redis_if_available()    # ... only if REDIS_URL is set and reachable
+    if redis_configured(): ...  # REDIS_URL set (backend choices that must not
+                                # depend on whether Redis answered at boot)
+    stripe = stripe_api()       # the `stripe` module with api_key set | None
+    client, legacy = openai_client()
+
+Each is built once per process and cached — including a `None` result when
+the library or its configuration is missing, so callers keep their
+"degrade gracefully" branches. `reset()` drops the cache (tests, key
+rotation).
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_lock = threading.RLock()  # factories may build other clients (redis_if_available → redis_client)
+_cache: Dict[str, Any] = {}
+
+
+def _once(name: str, factory: Callable[[], Any]) -> Any:
+    try:
+        return _cache[name]
+    except KeyError:
+        pass
+    with _lock:
+        if name not in _cache:
+            try:
+                _cache[name] = factory()
+            except Exception:
+                _cache[name] = None  # missing lib / bad config → degrade
+        return _cache[name]
+
+
+def reset(name: Optional[str] = None) -> None:
+    with _lock:
+        if name is None:
+            _cache.clear()
+        else:
+            _cache.pop(name, None)
+
+
+# ── Redis ──────────────────────────────────────────────────────────
+
+def redis_url() -> str:
+    return os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+def _build_redis() -> Any:
+    url = redis_url()
+    if "redis" not in url or "://" not in url:
+        return None
+    from redis import Redis  # type: ignore
+
+    # No socket is opened until the first command; a dead host fails fast
+    return Redis.from_url(url, socket_connect_timeout=2)
+
+
+def redis_client() -> Optional[Any]:
+    return _once("redis", _build_redis)
+
+
+def _build_redis_checked() -> Any:
+    if not os.getenv("REDIS_URL"):
+        return None
+    client = redis_client()
+    return client if client is not None and client.ping() else None
+
+
+def redis_configured() -> bool:
+    """REDIS_URL is set. Unlike `redis_if_available()`, every worker gets the same answer."""
+    return bool(os.getenv("REDIS_URL"))
+
+
+def redis_if_available() -> Optional[Any]:
+    """Redis only when REDIS_URL is set *and* answers PING (checked once per process)."""
+    return _once("redis_checked", _build_redis_checked)
+
+
+# ── Stripe ─────────────────────────────────────────────────────────
+
+def _build_stripe() -> Any:
+    import stripe  # type: ignore
+
+    stripe.api_key = os.getenv("STRIPE_SECRET_KEY", "")  # library keeps a global
+    return stripe
+
+
+def stripe_api() -> Optional[Any]:
+    return _once("stripe", _build_stripe)
+
+
+# ── OpenAI ─────────────────────────────────────────────────────────
+
+def _build_openai() -> Tuple[Any, bool]:
+    try:
+        from openai import OpenAI  # type: ignore
+
+        return OpenAI(api_key=os.getenv("OPENAI_API_KEY")), False
+    except Exception:
+        pass
+    try:
+        import openai  # type: ignore
+
+        openai.api_key = os.getenv("OPENAI_API_KEY")
+        return openai, True
+    except Exception:
+        return None, False
+
+
+def openai_client() -> Tuple[Any, bool]:
+    """(client, legacy) — `legacy` is True for the pre-1.0 module-level API."""
+    return _once("openai", _build_openai) or (None, False)
+
+
+__all__ = ["redis_client", "redis_configured", "redis_if_available", "redis_url", "stripe_api", "openai_client", "reset"]
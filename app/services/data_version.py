@@ -0,0 +1,178 @@
+# app/services/data_version.py
+from __future__ import annotations
+
+"""
+Process-wide data versions for read-model caching.
+
+Model hooks (after_insert/after_update/after_delete) call `mark_changed()`
+with their table name; the touched tables are remembered on the session and
+their version is bumped once the surrounding transaction commits. Readers
+compare `version(...)` against what they cached to decide whether a snapshot
+is still valid — a plain dict lookup, no SQL.
+
+Versions are hybrid clock stamps (microseconds since the epoch, bumped by
+one when the clock hasn't moved). Local commits are also handed to
+`on_commit` hooks as `(table, team_id)` keys — the invalidation bus
+(app/services/invalidation_bus.py) publishes them with their stamp and the
+other workers `observe()` it, so once a change has propagated every worker
+reports the same version for the table. That makes versions usable in
+ETags shared across workers (see app/routes/api.py).
+
+Tables this process hasn't seen change report the boot stamp the gunicorn
+master exports (FC_BOOT_STAMP, new on every start/reload, see
+gunicorn.conf.py), so idle workers agree on their tags too. Outside
+gunicorn it is the process start time. A worker restarted after a commit
+it never heard about reports the pre-commit version until the next change
+reaches it; the ETag time bucket in app/routes/api.py bounds that.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Tables whose writes change fundraising totals / leaderboards
+FUNDRAISING_TABLES: tuple[str, ...] = ("sponsors", "donations", "campaign_goals")
+
+_SESSION_KEY = "fc_changed_tables"
+_SESSION_KEYS = "fc_changed_keys"
+
+ChangeKey = Tuple[str, Optional[int]]  # (table, team_id or None for "any team")
+
+log = logging.getLogger(__name__)
+
+
+
+def _boot_stamp() -> int:
+    """The master's FC_BOOT_STAMP (shared by its workers), else this process's start time."""
+    try:
+        return int(os.environ["FC_BOOT_STAMP"])
+    except (KeyError, ValueError):
+        return time.time_ns() // 1000
+
+
+_lock = threading.Lock()
+_BOOT = _boot_stamp()  # the version of tables untouched since boot
+_seq = _BOOT
+_table_seq: Dict[str, int] = {}
+_listeners: List[Callable[[Iterable[str]], None]] = []
+_commit_hooks: List[Callable[[Set[ChangeKey], int], None]] = []
+
+
+def subscribe(fn: Callable[[Iterable[str]], None]) -> None:
+    """Call `fn(tables)` after every bump (keep it cheap: it runs on the committing thread)."""
+    if fn not in _listeners:
+        _listeners.append(fn)
+
+
+def on_commit(fn: Callable[[Set[ChangeKey], int], None]) -> None:
+    """
+    Call `fn(keys, seq)` after this process commits changes. Unlike
+    `subscribe`, bumps applied on behalf of other workers don't fire it.
+    """
+    if fn not in _commit_hooks:
+        _commit_hooks.append(fn)
+
+
+def _announce(keys: Set[ChangeKey], seq: int) -> None:
+    for fn in list(_commit_hooks):
+        try:
+            fn(keys, seq)
+        except Exception:
+            log.debug("data_version commit hook failed", exc_info=True)
+
+
+def _notify(tables: Iterable[str]) -> None:
+    for fn in list(_listeners):
+        try:
+            fn(tables)
+        except Exception:
+            log.debug("data_version listener failed", exc_info=True)
+
+
+def bump(*tables: str) -> int:
+    """Advance the version of the given tables; returns the new global sequence."""
+    global _seq
+    with _lock:
+        _seq = max(_seq + 1, time.time_ns() // 1000)
+        for t in tables:
+            _table_seq[t] = _seq
+        seq = _seq
+    _notify(tables)
+    return seq
+
+
+def observe(tables: Iterable[str], stamp: int) -> None:
+    """
+    Apply another worker's commit: the table's version becomes the newer of
+    ours and its stamp, so workers that saw the same commits end on the
+    same version whatever order they arrived in. An older stamp leaves the
+    version alone — our newer commit was stamped after it landed, so what
+    we cached under that version already includes it.
+    """
+    global _seq
+    tables = tuple(tables)
+    with _lock:
+        for t in tables:
+            _table_seq[t] = max(_table_seq.get(t, _BOOT), stamp)
+            _seq = max(_seq, _table_seq[t])
+    _notify(tables)
+
+
+def version(*tables: str) -> int:
+    """Latest change sequence across `tables` (process start if unchanged since; 0 for table-less data)."""
+    return max((_table_seq.get(t, _BOOT) for t in tables), default=0)
+
+
+def mark_changed(session: Optional[Session], table: str, team_id: Optional[int] = None) -> None:
+    """
+    Record that `table` (optionally one team's rows) was written in
+    `session`. The bump happens on commit so readers never cache uncommitted
+    state under a new version. Without a session (raw connection writes) we
+    bump immediately.
+    """
+    if session is None:
+        _announce({(table, team_id)}, bump(table))
+        return
+    pending: Set[str] = session.info.setdefault(_SESSION_KEY, set())
+    pending.add(table)
+    session.info.setdefault(_SESSION_KEYS, set()).add((table, team_id))
+
+
+def _tables_from(tables: Iterable[str] | None) -> Set[str]:
+    return {t for t in (tables or ()) if t}
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session) -> None:
+    pending = _tables_from(session.info.pop(_SESSION_KEY, None))
+    keys: Set[ChangeKey] = session.info.pop(_SESSION_KEYS, None) or set()
+    if pending:
+        _announce(keys or {(t, None) for t in pending}, bump(*pending))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_on_rollback(session: Session, previous_transaction) -> None:
+    # A savepoint rollback leaves the outer transaction's marks intact
+    if getattr(previous_transaction, "nested", False):
+        return
+    session.info.pop(_SESSION_KEY, None)
+    session.info.pop(_SESSION_KEYS, None)
+
+
+@event.listens_for(Session, "after_bulk_update")
+@event.listens_for(Session, "after_bulk_delete")
+def _mark_bulk(update_context) -> None:
+    """`query.update()` / `query.delete()` skip mapper hooks; catch them here."""
+    try:
+        table = update_context.mapper.local_table.name
+    except Exception:
+        return
+    mark_changed(update_context.session, table)
+
+
+__all__ = ["FUNDRAISING_TABLES", "bump", "observe", "version", "mark_changed", "subscribe", "on_commit", "ChangeKey"]
@@ -0,0 +1,182 @@
+# app/services/fastjson.py
+from __future__ import annotations
+
+"""
+Fast JSON path for API responses.
+
+flask-restx `marshal_with` walks every field object of every item in Python
+and the result is then encoded with the stdlib `json` module. For the hot
+list endpoints we precompile each restx model once into a flat projection
+(key, getter, converter) and encode with orjson when it is installed:
+
+    @api.doc(...)
+    @marshal_fast(api, donor_model, as_list=True)
+    def get(self): ...
+
+`marshal_fast` registers exactly the same swagger metadata as
+`api.marshal_with`, so `/api/docs` is unchanged. It falls back to the restx
+path when `API_FAST_JSON` is off or the client sends a field mask
+(X-Fields). Fields the projection does not understand (dotted attributes,
+callables, formatted strings, ...) keep using their own `output()`.
+
+`scripts/bench_fastjson.py` measures per-item cost on 100-item donor lists.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import Response, current_app, has_app_context, request
+
+try:  # optional: ~5-10x faster encoding, returns bytes
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    from flask_restx import fields as _f
+    from flask_restx.utils import unpack
+except Exception:  # pragma: no cover
+    _f = None  # type: ignore
+    unpack = None  # type: ignore
+
+
+# ── Encoding ───────────────────────────────────────────────────────
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON bytes (orjson if available)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def json_response(data: Any, status: int = 200, headers: Optional[Dict[str, Any]] = None) -> Response:
+    """A ready `Response` around pre-encoded bytes (no provider, no re-encode)."""
+    return Response(dumps(data), status=status, headers=headers, mimetype="application/json")
+
+
+# ── Projections ────────────────────────────────────────────────────
+
+Projection = Callable[[Any], Dict[str, Any]]
+
+
+def _converter(field: Any) -> Optional[Callable[[Any], Any]]:
+    """Direct `format()` equivalent for the plain scalar field types."""
+    kind = type(field)
+    if kind is _f.String:
+        return str
+    if kind is _f.Float:
+        return float
+    if kind is _f.Integer:
+        return int
+    if kind is _f.Boolean:
+        return bool
+    if kind is _f.Raw:
+        return lambda v: v
+    return None
+
+
+def _plain_key(field: Any, name: str) -> Optional[str]:
+    attr = field.attribute
+    key = name if attr is None else attr
+    if not isinstance(key, str) or "." in key or getattr(field, "mask", None):
+        return None
+    return key
+
+
+def _get(obj: Any, key: str) -> Any:
+    if isinstance(obj, dict):
+        return obj.get(key)
+    return getattr(obj, key, None)
+
+
+def _compile_field(name: str, field: Any) -> Callable[[Any], Any]:
+    if isinstance(field, type):
+        field = field()
+    key = _plain_key(field, name)
+    convert = _converter(field)
+
+    if key is not None and convert is not None:
+        default = field.default
+
+        def scalar(obj: Any) -> Any:
+            value = _get(obj, key)
+            if value is None:
+                dflt = default() if callable(default) else default
+                return convert(dflt) if dflt else dflt
+            return convert(value)
+
+        return scalar
+
+    container = getattr(field, "container", None)
+    if key is not None and type(field) is _f.List and type(container) is _f.Nested and not container.allow_null:
+        inner = compile_projection(container.nested)
+
+        def nested_list(obj: Any) -> Any:
+            value = _get(obj, key)
+            if value is None:
+                return field.default
+            if isinstance(value, dict):  # restx wraps a lone dict as one item
+                return [inner(value)]
+            return [inner(v) for v in value]
+
+        return nested_list
+
+    return lambda obj: field.output(name, obj)  # anything unusual: restx semantics
+
+
+def compile_projection(model: Any) -> Projection:
+    """Turn a restx model into `item -> dict` (same keys/values `marshal` would produce)."""
+    plan: List[Tuple[str, Callable[[Any], Any]]] = [(name, _compile_field(name, fld)) for name, fld in model.items()]
+
+    def project(obj: Any) -> Dict[str, Any]:
+        return {name: get(obj) for name, get in plan}
+
+    return project
+
+
+# ── Resource decorator ─────────────────────────────────────────────
+
+def enabled() -> bool:
+    if not has_app_context():
+        return False
+    return bool(current_app.config.get("API_FAST_JSON", True))
+
+
+def marshal_fast(api: Any, model: Any, as_list: bool = False, **kwargs: Any) -> Callable:
+    """Drop-in for `api.marshal_with(model, as_list=...)` that serializes via the projection."""
+    slow_decorator = api.marshal_with(model, as_list=as_list, **kwargs)
+    project = compile_projection(model)
+
+    def wrapper(func: Callable) -> Callable:
+        slow = slow_decorator(func)  # also stamps func.__apidoc__ (swagger unchanged)
+
+        @wraps(func)
+        def fast(*args: Any, **kw: Any) -> Any:
+            if not enabled() or request.headers.get(current_app.config.get("RESTX_MASK_HEADER", "X-Fields")):
+                return slow(*args, **kw)
+            resp = func(*args, **kw)
+            if isinstance(resp, Response):
+                return resp
+            data, code, headers = unpack(resp)
+            body = [project(item) for item in data] if as_list else project(data)
+            return json_response(body, code, headers)
+
+        return fast
+
+    return wrapper
+
+
+__all__ = ["dumps", "json_response", "compile_projection", "marshal_fast", "enabled"]
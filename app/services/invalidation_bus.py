@@ -0,0 +1,285 @@
+# app/services/invalidation_bus.py
+from __future__ import annotations
+
+"""
+Cross-worker cache invalidation bus.
+
+data_version only knows about commits made in *this* process, so a donation
+handled by worker A leaves workers B and C serving cached totals until
+their TTL runs out. The bus closes that gap:
+
+- every local commit (data_version.on_commit) publishes one message with
+  its `(entity, team_id)` keys and the committing worker's version;
+- a listener thread in each worker receives other workers' messages and
+  calls `data_version.observe(entities, version)` for them. Snapshot
+  caches see the new version and rebuild, and data_version listeners (the
+  SSE broadcaster, ...) fire as if the write happened locally;
+- `on_invalidate(fn)` handlers get `(entity, team_id, version)` for local
+  and remote changes alike, for caches keyed by team.
+
+Transports:
+- "redis"  — pub/sub on `fc:invalidate` (works across hosts). `auto` uses
+  it whenever REDIS_URL is set, reachable or not: the listener reconnects
+  with backoff, so a worker that boots during a Redis blip still joins
+  its peers instead of listening on a socket nobody publishes to;
+- "socket" — one UNIX datagram socket per worker in a shared directory
+  (FC_BUS_DIR, see gunicorn.conf.py). Same host only, no dependencies;
+  `auto` without REDIS_URL.
+
+Delivery is best effort. A lost message leaves snapshot caches stale until
+their SNAPSHOT_CACHE_TTL runs out, and version ETags until their time
+bucket (same length, see app/routes/api.py) rolls over.
+"""
+
+import json
+import logging
+import os
+import secrets
+import socket
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from app.services import data_version
+from app.services.clients import redis_client, redis_configured
+
+log = logging.getLogger(__name__)
+
+CHANNEL = "fc:invalidate"
+DEFAULT_DIR = "/tmp/fc-bus"
+
+Handler = Callable[[str, Optional[int], int], None]
+
+
+# ── Transports ─────────────────────────────────────────────────────
+
+class _RedisTransport:
+    name = "redis"
+
+    def __init__(self, client: Any, channel: str = CHANNEL) -> None:
+        self.client = client
+        self.channel = channel
+
+    def publish(self, payload: bytes) -> None:
+        self.client.publish(self.channel, payload)
+
+    def listen(self, deliver: Callable[[bytes], None], stop: threading.Event) -> None:
+        backoff = 1.0
+        while not stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                backoff = 1.0
+                while not stop.is_set():
+                    msg = pubsub.get_message(timeout=1.0)
+                    if msg and msg.get("type") == "message":
+                        deliver(msg["data"])
+            except Exception as e:
+                log.warning("invalidation bus: redis listener error (%s); retrying in %.0fs", e, backoff)
+                stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    if pubsub is not None:
+                        pubsub.close()
+                except Exception:
+                    pass
+
+    def close(self) -> None:
+        pass
+
+
+class _SocketTransport:
+    name = "socket"
+
+    def __init__(self, directory: str, ident: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f"{ident}.sock")
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        self._in = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._in.bind(self.path)
+        self._in.settimeout(1.0)
+        self._out = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._out.setblocking(False)  # a wedged peer must not stall a commit
+
+    def _peers(self) -> Iterable[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return ()
+        return [os.path.join(self.directory, n) for n in names if n.endswith(".sock")]
+
+    def publish(self, payload: bytes) -> None:
+        for peer in self._peers():
+            if peer == self.path:
+                continue
+            try:
+                self._out.sendto(payload, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.unlink(peer)  # worker is gone; its socket file is stale
+                except OSError:
+                    pass
+            except OSError:
+                pass  # peer queue full: it converges via TTL
+
+    def listen(self, deliver: Callable[[bytes], None], stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                data = self._in.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                if stop.is_set():
+                    return
+                stop.wait(1.0)
+                continue
+            deliver(data)
+
+    def close(self) -> None:
+        for s in (self._in, self._out):
+            try:
+                s.close()
+            except OSError:
+                pass
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+# ── Bus ────────────────────────────────────────────────────────────
+
+class InvalidationBus:
+    """One per process; `start()` picks a transport and runs the listener."""
+
+    def __init__(self) -> None:
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(3)}"
+        self.transport: Optional[Any] = None
+        self._handlers: List[Handler] = []
+        self._remote_handlers: List[Handler] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    # handlers
+    def on_invalidate(self, fn: Handler, remote_only: bool = False) -> Handler:
+        """Register `fn(entity, team_id, version)`; `remote_only` skips this worker's commits."""
+        handlers = self._remote_handlers if remote_only else self._handlers
+        if fn not in handlers:
+            handlers.append(fn)
+        return fn
+
+    def _dispatch(self, keys: Iterable[Any], version: int, remote: bool = False) -> None:
+        handlers = self._handlers + self._remote_handlers if remote else self._handlers
+        for entity, team_id in keys:
+            for fn in list(handlers):
+                try:
+                    fn(entity, team_id, version)
+                except Exception:
+                    log.debug("invalidation handler failed", exc_info=True)
+
+    # outbound
+    def _on_local_commit(self, keys: Set[data_version.ChangeKey], seq: int) -> None:
+        self._dispatch(keys, seq)
+        transport = self.transport
+        if transport is None:
+            return
+        payload = json.dumps(
+            {"o": self.origin, "v": seq, "k": [[e, t] for e, t in keys if e]},
+            separators=(",", ":"),
+        ).encode("utf-8")
+        try:
+            transport.publish(payload)
+            self.published += 1
+        except Exception as e:
+            self.errors += 1
+            log.debug("invalidation publish failed: %s", e)
+
+    # inbound
+    def deliver(self, payload: Any) -> None:
+        try:
+            msg = json.loads(payload)
+            if msg.get("o") == self.origin:
+                return  # redis echoes our own publishes back
+            keys = [(str(e), t if t is None else int(t)) for e, t in msg.get("k") or ()]
+            version = int(msg.get("v") or 0)
+        except Exception:
+            self.errors += 1
+            return
+        self.received += 1
+        tables = {e for e, _ in keys}
+        if tables:
+            data_version.observe(tables, version)  # does not re-publish (no on_commit)
+        self._dispatch(keys, version, remote=True)
+
+    # lifecycle
+    def _pick_transport(self, mode: str, directory: str) -> Optional[Any]:
+        """From configuration only (never from a PING), so all workers pick the same one."""
+        if mode == "auto":
+            mode = "redis" if redis_configured() else "socket"
+        if mode == "redis":
+            client = redis_client()  # connects lazily; listen() retries until Redis answers
+            if client is None:
+                log.warning("invalidation bus: redis client unavailable (library or REDIS_URL)")
+            return _RedisTransport(client) if client is not None else None
+        return _SocketTransport(directory, f"{os.getpid()}-{self.origin.rsplit(':', 1)[-1]}")
+
+    def start(self, mode: str = "auto", directory: str = DEFAULT_DIR) -> None:
+        mode = (mode or "auto").lower()
+        if mode in ("off", "0", "false", "none") or self._thread is not None:
+            return
+        data_version.on_commit(self._on_local_commit)
+
+        def _run() -> None:
+            try:
+                self.transport = self._pick_transport(mode, directory)
+            except Exception:
+                log.warning("invalidation bus disabled", exc_info=True)
+                return
+            if self.transport is None:
+                log.warning("invalidation bus: no transport for mode=%s", mode)
+                return
+            log.info("🔁 invalidation bus via %s", self.transport.name)
+            self.transport.listen(self.deliver, self._stop)
+
+        self._thread = threading.Thread(target=_run, name="fc-invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=3)
+        if self.transport is not None:
+            self.transport.close()
+        self.transport = None
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "transport": getattr(self.transport, "name", None),
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors,
+            "listening": bool(self._thread and self._thread.is_alive()),
+        }
+
+
+bus = InvalidationBus()
+on_invalidate = bus.on_invalidate
+
+
+def init_invalidation_bus(app: Any) -> None:
+    bus.start(
+        mode=str(app.config.get("INVALIDATION_BUS", "auto")),
+        directory=str(app.config.get("INVALIDATION_BUS_DIR") or DEFAULT_DIR),
+    )
+
+
+__all__ = ["InvalidationBus", "bus", "on_invalidate", "init_invalidation_bus", "CHANNEL"]
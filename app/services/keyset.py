@@ -0,0 +1,138 @@
+# app/services/keyset.py
+from __future__ import annotations
+
+"""
+Keyset ("seek") pagination.
+
+Pages are addressed by an opaque cursor holding the sort key of the last row
+shown, e.g. `(amount, id)`. The next page is `WHERE (amount, id) < cursor
+ORDER BY amount DESC, id DESC LIMIT n`, which walks the index from the cursor
+instead of counting past OFFSET rows, so page 5,000 costs the same as page 1.
+Going back is the mirror image: `before=` a page's `prev_cursor` reads
+`WHERE (amount, id) > cursor ORDER BY amount, id LIMIT n` and flips the rows.
+Totals come from a cached COUNT (see `cached_count`) rather than per request.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+
+from app.services.snapshot_cache import snapshots
+
+
+@dataclass(frozen=True)
+class KeysetPage:
+    items: List[Any]
+    next_cursor: Optional[str]
+    total: Optional[int] = None
+    prev_cursor: Optional[str] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+
+# ── Cursor encoding ─────────────────────────────────────────────
+def _jsonable(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return {"dt": v.isoformat()}
+    return v
+
+
+def _from_jsonable(v: Any) -> Any:
+    if isinstance(v, dict) and "dt" in v:
+        return datetime.fromisoformat(v["dt"])
+    return v
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_jsonable(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], width: int) -> Optional[Tuple[Any, ...]]:
+    """Parse a cursor; malformed or foreign cursors read as "first page"."""
+    if not cursor:
+        return None
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + pad).decode("utf-8"))
+        if not isinstance(values, list) or len(values) != width:
+            return None
+        return tuple(_from_jsonable(v) for v in values)
+    except Exception:
+        return None
+
+
+# ── Query helpers ───────────────────────────────────────────────
+def _after(cols: Sequence[Any], values: Sequence[Any], reverse: bool = False):
+    """Row-value `(c1, c2, ...) < (v1, v2, ...)` (`>` when reverse) spelled portably."""
+    clauses = []
+    for i, col in enumerate(cols):
+        eq = [cols[j] == values[j] for j in range(i)]
+        clauses.append(and_(*eq, col > values[i] if reverse else col < values[i]))
+    return or_(*clauses)
+
+
+def seek(
+    query: Any,
+    cols: Sequence[Any],
+    cursor: Optional[str],
+    limit: int,
+    key: Optional[Callable[[Any], Sequence[Any]]] = None,
+    total: Optional[int] = None,
+    before: Optional[str] = None,
+) -> KeysetPage:
+    """
+    Descending keyset page over `cols` (last column must be unique, e.g. id).
+    `key(row)` extracts the cursor values; defaults to the column attributes.
+    Pass a page's `prev_cursor` as `before` (instead of `cursor`) to go back.
+    """
+    back = decode_cursor(before, len(cols))
+    values = back if back is not None else decode_cursor(cursor, len(cols))
+    if values is not None:
+        query = query.filter(_after(cols, values, reverse=back is not None))
+    order = (c.asc() for c in cols) if back is not None else (c.desc() for c in cols)
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    items = rows[:limit]
+    more = len(rows) > limit
+    if back is not None:
+        items.reverse()
+
+    def _cursor(row: Any) -> str:
+        return encode_cursor(list(key(row) if key else [getattr(row, c.key) for c in cols]))
+
+    if not items:
+        return KeysetPage(items=items, next_cursor=None, total=total)
+    # Forward: more rows follow; backward: we came from the rows that follow
+    has_next = more if back is None else True
+    has_prev = values is not None if back is None else more
+    return KeysetPage(
+        items=items,
+        next_cursor=_cursor(items[-1]) if has_next else None,
+        total=total,
+        prev_cursor=_cursor(items[0]) if has_prev else None,
+    )
+
+
+def cached_count(name: str, tables: Iterable[str], query: Any, ttl: Optional[float] = None) -> int:
+    """
+    COUNT(*) cached in the snapshot cache: recomputed only after a write to
+    `tables` (or when the TTL lapses), not on every page view.
+    """
+    snap = snapshots.get(
+        f"count:{name}", tuple(tables), lambda: {"count": int(query.order_by(None).count())}, ttl=ttl
+    )
+    return int(snap.data["count"])
+
+
+__all__ = ["KeysetPage", "encode_cursor", "decode_cursor", "seek", "cached_count"]
@@ -0,0 +1,614 @@
+# app/services/leaderboard.py
+from __future__ import annotations
+
+"""
+Leaderboard index: top-N and "you're #14" without touching SQL.
+
+Two boards, each kept per scope ("all" plus one per team):
+
+- "sponsors" — one member per approved, non-deleted Sponsor
+  (`sponsor:<id>`, score = amount). Sponsor hooks write absolute values,
+  so replaying an update is harmless.
+- "donors"   — donations summed per donor name (`donor:<name>`), credited
+  incrementally by Donation inserts and by the Stripe webhook. Webhook
+  payments are stored in `leaderboard_credits` (one row per payment id,
+  which is also the count-once guard), so rebuilds keep them.
+
+Backends: Redis sorted sets whenever REDIS_URL is set. Every worker
+shares them, and top-N is a ZREVRANGE, O(log n + N). The choice never
+depends on whether Redis answered at boot, so workers can't split between
+boards. While Redis is down, reads fail over to SQL in the callers, and
+boards whose writes failed are remembered and marked dirty once Redis is
+back. Without REDIS_URL an in-process board is used, and other workers'
+commits (invalidation bus) mark it dirty.
+
+Model hooks only *queue* operations on the session. They are applied after
+commit and dropped on rollback. Writes that can't be applied as an exact
+delta (a donation edited or deleted) mark the board dirty, and the next
+read rebuilds it from the database. `flask leaderboard rebuild` does the
+same on demand.
+
+Every write bumps a per-board write sequence kept in the backend (a Redis
+counter, so it covers all workers). A rebuild notes it before reading SQL
+and only installs its result if it has not moved (WATCH + MULTI/EXEC on
+Redis); otherwise the board stays dirty and the next read rebuilds again.
+"""
+
+import heapq
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.campaign_goal import LISTED_SPONSOR_STATUSES
+from app.models.leaderboard_credit import LeaderboardCredit
+from app.services.clients import redis_client, redis_configured
+from app.services.data_version import mark_changed
+from app.services.invalidation_bus import bus
+
+try:  # optional: only the Redis backend needs it
+    from redis.exceptions import WatchError  # type: ignore
+except Exception:  # pragma: no cover
+    WatchError = None  # type: ignore
+
+log = logging.getLogger(__name__)
+
+ALL = "all"
+BOARDS: Tuple[str, ...] = ("sponsors", "donors")
+SPONSOR_STATUSES: Tuple[str, ...] = LISTED_SPONSOR_STATUSES
+# data_version key for board changes that don't touch a table (webhook credits)
+VERSION_KEY = "leaderboard"
+
+_OPS_KEY = "fc_leaderboard_ops"
+_PREFIX = "fc:lb"
+_PAID_TTL = 7 * 24 * 3600
+
+Entry = Tuple[str, float]  # (member, score)
+
+
+def sponsor_member(sponsor_id: Any) -> str:
+    return f"sponsor:{int(sponsor_id)}"
+
+
+def donor_member(name: Optional[str]) -> str:
+    return f"donor:{(name or '').strip() or 'Anonymous'}"
+
+
+def _scopes(team_id: Optional[int]) -> Tuple[str, ...]:
+    return (ALL, f"team:{int(team_id)}") if team_id else (ALL,)
+
+
+def _scope(team_id: Optional[int]) -> str:
+    return f"team:{int(team_id)}" if team_id else ALL
+
+
+# ── Backends ───────────────────────────────────────────────────────
+
+class _MemoryBackend:
+    name = "memory"
+
+    def __init__(self, paid_cap: int = 10_000) -> None:
+        self._lock = threading.RLock()
+        self._boards: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._names: Dict[str, str] = {}
+        self._ready: set = set()
+        self._seq: Dict[str, int] = {}
+        self._paid: "OrderedDict[str, None]" = OrderedDict()
+        self._paid_cap = paid_cap
+
+    def ready(self, board: str) -> bool:
+        return board in self._ready
+
+    def write_seq(self, board: str) -> int:
+        return self._seq.get(board, 0)
+
+    def _wrote(self, board: str) -> None:
+        # Caller holds self._lock
+        self._seq[board] = self._seq.get(board, 0) + 1
+
+    def mark_dirty(self, board: str) -> None:
+        with self._lock:
+            self._ready.discard(board)
+            self._wrote(board)
+
+    def _all_scopes(self, board: str) -> List[str]:
+        return [s for (b, s) in self._boards if b == board]
+
+    def set(self, board: str, scopes: Iterable[str], member: str, score: float, name: str) -> None:
+        with self._lock:
+            self.remove(board, None, member)
+            for scope in scopes:
+                self._boards.setdefault((board, scope), {})[member] = float(score)
+            self._names[member] = name
+            self._wrote(board)
+
+    def remove(self, board: str, scopes: Optional[Iterable[str]], member: str) -> None:
+        with self._lock:
+            for scope in self._all_scopes(board) if scopes is None else scopes:
+                self._boards.get((board, scope), {}).pop(member, None)
+            self._wrote(board)
+
+    def incr(self, board: str, scopes: Iterable[str], member: str, delta: float, name: str) -> None:
+        with self._lock:
+            for scope in scopes:
+                entries = self._boards.setdefault((board, scope), {})
+                score = entries.get(member, 0.0) + float(delta)
+                if score > 0:
+                    entries[member] = score
+                else:
+                    entries.pop(member, None)
+            self._names[member] = name
+            self._wrote(board)
+
+    def top(self, board: str, scope: str, n: int) -> List[Entry]:
+        with self._lock:
+            items = list(self._boards.get((board, scope), {}).items())
+        # Same tie order as ZREVRANGE: score desc, then member desc
+        return heapq.nlargest(n, items, key=lambda kv: (kv[1], kv[0]))
+
+    def rank(self, board: str, scope: str, member: str) -> Optional[Tuple[int, float, int]]:
+        with self._lock:
+            entries = dict(self._boards.get((board, scope), {}))
+        if member not in entries:
+            return None
+        mine = (entries[member], member)
+        ahead = sum(1 for m, s in entries.items() if (s, m) > mine)
+        return ahead + 1, entries[member], len(entries)
+
+    def names(self, members: Iterable[str]) -> Dict[str, str]:
+        return {m: self._names.get(m, "") for m in members}
+
+    def replace(
+        self, board: str, boards: Dict[str, Dict[str, float]], names: Dict[str, str], expect: Optional[int] = None
+    ) -> bool:
+        """Install a rebuilt board; False (nothing changed) if writes moved past `expect`."""
+        with self._lock:
+            if expect is not None and self.write_seq(board) != expect:
+                return False
+            for key in [k for k in self._boards if k[0] == board]:
+                del self._boards[key]
+            for scope, entries in boards.items():
+                self._boards[(board, scope)] = dict(entries)
+            self._names.update(names)
+            self._ready.add(board)
+        return True
+
+    def first_seen(self, payment_id: str) -> bool:
+        with self._lock:
+            if payment_id in self._paid:
+                return False
+            self._paid[payment_id] = None
+            while len(self._paid) > self._paid_cap:
+                self._paid.popitem(last=False)
+            return True
+
+
+class _RedisBackend:
+    name = "redis"
+
+    def __init__(self, client: Any) -> None:
+        self.r = client
+
+    @staticmethod
+    def _key(board: str, scope: str) -> str:
+        return f"{_PREFIX}:{board}:{scope}"
+
+    @staticmethod
+    def _s(v: Any) -> str:
+        return v.decode("utf-8") if isinstance(v, bytes) else str(v)
+
+    def _all_keys(self, board: str) -> List[str]:
+        return [self._key(board, self._s(s)) for s in self.r.smembers(f"{_PREFIX}:{board}:scopes")]
+
+    @staticmethod
+    def _seq_key(board: str) -> str:
+        return f"{_PREFIX}:{board}:writes"
+
+    def ready(self, board: str) -> bool:
+        return bool(self.r.exists(f"{_PREFIX}:{board}:ready"))
+
+    def write_seq(self, board: str) -> int:
+        return int(self.r.get(self._seq_key(board)) or 0)
+
+    def mark_dirty(self, board: str) -> None:
+        pipe = self.r.pipeline()
+        pipe.delete(f"{_PREFIX}:{board}:ready")
+        pipe.incr(self._seq_key(board))
+        pipe.execute()
+
+    def set(self, board: str, scopes: Iterable[str], member: str, score: float, name: str) -> None:
+        pipe = self.r.pipeline()
+        for key in self._all_keys(board):
+            pipe.zrem(key, member)
+        for scope in scopes:
+            pipe.zadd(self._key(board, scope), {member: float(score)})
+            pipe.sadd(f"{_PREFIX}:{board}:scopes", scope)
+        pipe.hset(f"{_PREFIX}:names", member, name)
+        pipe.incr(self._seq_key(board))
+        pipe.execute()
+
+    def remove(self, board: str, scopes: Optional[Iterable[str]], member: str) -> None:
+        keys = self._all_keys(board) if scopes is None else [self._key(board, s) for s in scopes]
+        pipe = self.r.pipeline()
+        for key in keys:
+            pipe.zrem(key, member)
+        pipe.incr(self._seq_key(board))
+        pipe.execute()
+
+    def incr(self, board: str, scopes: Iterable[str], member: str, delta: float, name: str) -> None:
+        pipe = self.r.pipeline()
+        for scope in scopes:
+            key = self._key(board, scope)
+            pipe.zincrby(key, float(delta), member)
+            pipe.zremrangebyscore(key, "-inf", 0)  # fully refunded donors drop off
+            pipe.sadd(f"{_PREFIX}:{board}:scopes", scope)
+        pipe.hset(f"{_PREFIX}:names", member, name)
+        pipe.incr(self._seq_key(board))
+        pipe.execute()
+
+    def top(self, board: str, scope: str, n: int) -> List[Entry]:
+        rows = self.r.zrevrange(self._key(board, scope), 0, max(0, n - 1), withscores=True)
+        return [(self._s(m), float(s)) for m, s in rows]
+
+    def rank(self, board: str, scope: str, member: str) -> Optional[Tuple[int, float, int]]:
+        key = self._key(board, scope)
+        pipe = self.r.pipeline()
+        pipe.zrevrank(key, member)
+        pipe.zscore(key, member)
+        pipe.zcard(key)
+        pos, score, size = pipe.execute()
+        if pos is None:
+            return None
+        return int(pos) + 1, float(score or 0), int(size or 0)
+
+    def names(self, members: Iterable[str]) -> Dict[str, str]:
+        members = list(members)
+        if not members:
+            return {}
+        values = self.r.hmget(f"{_PREFIX}:names", members)
+        return {m: self._s(v) if v is not None else "" for m, v in zip(members, values)}
+
+    def replace(
+        self, board: str, boards: Dict[str, Dict[str, float]], names: Dict[str, str], expect: Optional[int] = None
+    ) -> bool:
+        """
+        One MULTI/EXEC, so readers see the old board or the new one, never
+        half. WATCHes the write sequence: if any worker wrote since `expect`
+        the transaction is dropped and False returned.
+        """
+        seq_key = self._seq_key(board)
+        with self.r.pipeline(transaction=True) as pipe:
+            try:
+                pipe.watch(seq_key)
+                if expect is not None and int(pipe.get(seq_key) or 0) != expect:
+                    pipe.unwatch()
+                    return False
+                old = [self._key(board, self._s(s)) for s in pipe.smembers(f"{_PREFIX}:{board}:scopes")]
+                pipe.multi()
+                if old:
+                    pipe.delete(*old)
+                pipe.delete(f"{_PREFIX}:{board}:scopes")
+                for scope, entries in boards.items():
+                    if entries:
+                        pipe.zadd(self._key(board, scope), entries)
+                        pipe.sadd(f"{_PREFIX}:{board}:scopes", scope)
+                if names:
+                    pipe.hset(f"{_PREFIX}:names", mapping=names)
+                pipe.set(f"{_PREFIX}:{board}:ready", 1)
+                pipe.execute()
+            except Exception as exc:
+                if WatchError is not None and isinstance(exc, WatchError):
+                    return False
+                raise
+        return True
+
+    def first_seen(self, payment_id: str) -> bool:
+        return bool(self.r.set(f"{_PREFIX}:paid:{payment_id}", 1, nx=True, ex=_PAID_TTL))
+
+
+_backend_lock = threading.Lock()
+_backend_obj: Optional[Any] = None
+_unsynced_lock = threading.Lock()
+_unsynced: Set[str] = set()  # boards whose writes failed and couldn't be marked dirty yet
+
+
+def backend() -> Any:
+    """Redis if REDIS_URL is set (or forced), else the in-process board — by configuration only."""
+    global _backend_obj
+    if _backend_obj is not None:
+        return _backend_obj
+    with _backend_lock:
+        if _backend_obj is None:
+            mode = (
+                current_app.config.get("LEADERBOARD_BACKEND", "auto")
+                if has_app_context()
+                else os.getenv("LEADERBOARD_BACKEND", "auto")
+            ).lower()
+            client = None
+            if mode == "redis" or (mode == "auto" and redis_configured()):
+                client = redis_client()  # connects lazily; no PING decides for us
+            _backend_obj = _RedisBackend(client) if client is not None else _MemoryBackend()
+        return _backend_obj
+
+
+def use_backend(obj: Any) -> None:
+    """Swap the backend (tests, `flask leaderboard rebuild --memory`)."""
+    global _backend_obj
+    with _backend_lock:
+        _backend_obj = obj
+    with _unsynced_lock:
+        _unsynced.clear()
+
+
+# ── Rebuild from the database ──────────────────────────────────────
+
+def _sponsor_rows() -> Tuple[Dict[str, Dict[str, float]], Dict[str, str]]:
+    from app.extensions import db
+    from app.models.sponsor import Sponsor
+    from app.services.schema_registry import table_exists
+
+    boards: Dict[str, Dict[str, float]] = {ALL: {}}
+    names: Dict[str, str] = {}
+    if not table_exists(Sponsor):
+        return boards, names
+    q = db.session.query(Sponsor.id, Sponsor.name, Sponsor.amount, Sponsor.team_id).filter(
+        Sponsor.status.in_(SPONSOR_STATUSES), Sponsor.deleted.is_(False)
+    )
+    for sid, name, amount, team_id in q:
+        member = sponsor_member(sid)
+        names[member] = name or "Sponsor"
+        for scope in _scopes(team_id):
+            boards.setdefault(scope, {})[member] = float(amount or 0)
+    return boards, names
+
+
+def _donor_rows() -> Tuple[Dict[str, Dict[str, float]], Dict[str, str]]:
+    from sqlalchemy import func
+
+    from app.extensions import db
+    from app.models.campaign_goal import VALID_DONATION_STATUSES, eligible_criteria
+    from app.models.donation import Donation
+    from app.services.schema_registry import table_exists
+
+    boards: Dict[str, Dict[str, float]] = {ALL: {}}
+    names: Dict[str, str] = {}
+    rows: List[Any] = []
+    if table_exists(Donation):
+        statuses = VALID_DONATION_STATUSES if hasattr(Donation, "status") else None
+        rows.extend(
+            db.session.query(Donation.name, Donation.team_id, func.coalesce(func.sum(Donation.amount_cents), 0))
+            .filter(*eligible_criteria(Donation, statuses, None))
+            .group_by(Donation.name, Donation.team_id)
+        )
+    if table_exists(LeaderboardCredit):  # webhook payments (no Donation row)
+        c = LeaderboardCredit
+        rows.extend(
+            db.session.query(c.name, c.team_id, func.coalesce(func.sum(c.amount_cents), 0)).group_by(c.name, c.team_id)
+        )
+    for name, team_id, cents in rows:
+        if not cents:
+            continue
+        member = donor_member(name)
+        names[member] = (name or "").strip() or "Anonymous"
+        for scope in _scopes(team_id):
+            entries = boards.setdefault(scope, {})
+            entries[member] = entries.get(member, 0.0) + float(cents)
+    return boards, names
+
+
+_rebuild_lock = threading.Lock()
+
+
+def rebuild(board: Optional[str] = None) -> Dict[str, int]:
+    """Rebuild one board (or both) from SQL; returns members per board in scope "all"."""
+    counts: Dict[str, int] = {}
+    with _rebuild_lock:
+        for name in [board] if board else BOARDS:
+            b = backend()
+            seen = b.write_seq(name)
+            boards, names = _sponsor_rows() if name == "sponsors" else _donor_rows()
+            if not b.replace(name, boards, names, expect=seen):
+                b.mark_dirty(name)  # a write (any worker) raced the SQL read: rebuild on next read
+            counts[name] = len(boards.get(ALL, {}))
+    return counts
+
+
+def _mark_dirty(board: str) -> None:
+    """Mark `board` dirty; if the backend is down too, remember it and retry on the next read."""
+    try:
+        backend().mark_dirty(board)
+    except Exception:
+        with _unsynced_lock:
+            _unsynced.add(board)
+        return
+    with _unsynced_lock:
+        _unsynced.discard(board)
+
+
+def _ensure_ready(board: str) -> None:
+    if board in _unsynced:
+        _mark_dirty(board)  # a write was lost while the backend was down; raises on read below if still down
+    if not backend().ready(board):
+        rebuild(board)
+
+
+# ── Reads ──────────────────────────────────────────────────────────
+
+def top(board: str, n: int, team_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """[{"name", "amount"}] — highest first; same shape as the SQL leaderboard."""
+    _ensure_ready(board)
+    entries = backend().top(board, _scope(team_id), n)
+    names = backend().names(m for m, _ in entries)
+    fallback = "Sponsor" if board == "sponsors" else "Anonymous"
+    return [{"name": names.get(m) or fallback, "amount": float(score)} for m, score in entries]
+
+
+def _merge_givers(rows: Iterable[Dict[str, Any]], n: int) -> List[Dict[str, Any]]:
+    """One row per display name (case/space-insensitive), amounts summed; top-N."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        key = " ".join(str(row["name"]).split()).casefold()
+        have = merged.get(key)
+        if have is None:
+            merged[key] = dict(row)
+        else:
+            have["amount"] += row["amount"]
+    return heapq.nlargest(n, merged.values(), key=lambda r: r["amount"])
+
+
+def top_givers(boards: Iterable[str], n: int, team_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Top-N across several boards (sponsors and donors), highest first. Someone
+    who both sponsored and donated is one row: boards are merged by display name.
+    """
+    return _merge_givers((row for board in boards for row in top(board, n, team_id)), n)
+
+
+def sql_top_givers(boards: Iterable[str], n: int, team_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """`top_givers` straight from SQL (index down): same rows, same merge, same shape."""
+    scope = _scope(team_id)
+    rows: List[Dict[str, Any]] = []
+    for board in boards:
+        entries, names = _sponsor_rows() if board == "sponsors" else _donor_rows()
+        fallback = "Sponsor" if board == "sponsors" else "Anonymous"
+        rows.extend(
+            {"name": names.get(m) or fallback, "amount": float(score)}
+            for m, score in entries.get(scope, {}).items()
+        )
+    return _merge_givers(rows, n)
+
+
+def rank(board: str, member: str, team_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """{"rank": 14, "amount": ..., "of": N} for one member, or None if not on the board."""
+    _ensure_ready(board)
+    found = backend().rank(board, _scope(team_id), member)
+    if found is None:
+        return None
+    pos, score, size = found
+    return {"rank": pos, "amount": score, "of": size}
+
+
+# ── Writes (queued per session, applied after commit) ──────────────
+
+def _apply(op: Tuple[Any, ...]) -> None:
+    kind, board = op[0], op[1]
+    b = backend()
+    if kind == "dirty" or not b.ready(board):
+        b.mark_dirty(board)  # an unbuilt board gets a full rebuild on first read
+    elif kind == "set":
+        _, _, team_id, member, score, name = op
+        b.set(board, _scopes(team_id), member, score, name)
+    elif kind == "remove":
+        b.remove(board, None, op[3])
+    elif kind == "incr":
+        _, _, team_id, member, delta, name = op
+        b.incr(board, _scopes(team_id), member, delta, name)
+
+
+def queue(session: Optional[Session], *op: Any) -> None:
+    """
+    ("set", board, team_id, member, score, name) | ("remove", board, None, member)
+    | ("incr", board, team_id, member, delta, name) | ("dirty", board).
+    Applied after `session` commits (immediately without a session).
+    """
+    if session is None:
+        try:
+            _apply(op)
+        except Exception:
+            log.warning("leaderboard update failed; marking %s dirty", op[1], exc_info=True)
+            _mark_dirty(op[1])
+        return
+    session.info.setdefault(_OPS_KEY, []).append(op)
+
+
+def _store_credit(payment_id: str, name: str, amount_cents: int, team_id: Optional[int]) -> bool:
+    """Persist a webhook credit in its own transaction; False if the payment was already credited."""
+    from app.extensions import db
+
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(
+                insert(LeaderboardCredit.__table__).values(
+                    payment_id=payment_id, name=name, amount_cents=amount_cents, team_id=team_id
+                )
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def record_payment(payment_id: str, name: Optional[str], amount_cents: int, team_id: Optional[int] = None) -> bool:
+    """Credit a webhook payment to the donors board once; False if already counted."""
+    if not payment_id or amount_cents <= 0:
+        return False
+    from app.services.schema_registry import table_exists
+
+    display = ((name or "").strip() or "Anonymous")[:100]  # as stored, so rebuilds agree
+    try:
+        if table_exists(LeaderboardCredit):
+            if not _store_credit(str(payment_id)[:64], display, int(amount_cents), team_id):
+                return False
+        elif not backend().first_seen(str(payment_id)):  # not migrated yet: lost on rebuild
+            return False
+        queue(None, "incr", "donors", team_id, donor_member(display), int(amount_cents), display)
+        mark_changed(None, VERSION_KEY, team_id)  # API ETags move; other workers' memory boards go dirty
+        return True
+    except Exception:
+        log.warning("leaderboard payment credit failed", exc_info=True)
+        return False
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_on_commit(session: Session) -> None:
+    ops = session.info.pop(_OPS_KEY, None)
+    for op in ops or ():
+        try:
+            _apply(op)
+        except Exception:
+            log.warning("leaderboard update failed (%s); marking %s dirty", op[0], op[1], exc_info=True)
+            _mark_dirty(op[1])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_on_rollback(session: Session, previous_transaction) -> None:
+    if getattr(previous_transaction, "nested", False):
+        return
+    session.info.pop(_OPS_KEY, None)
+
+
+def _on_remote_change(entity: str, team_id: Optional[int], version: int) -> None:
+    # Redis boards are shared; only a per-process board misses other workers' writes
+    b = _backend_obj
+    if isinstance(b, _MemoryBackend):
+        if entity == "sponsors":
+            b.mark_dirty("sponsors")
+        elif entity in ("donations", VERSION_KEY):
+            b.mark_dirty("donors")
+
+
+bus.on_invalidate(_on_remote_change, remote_only=True)
+
+
+__all__ = [
+    "ALL",
+    "BOARDS",
+    "SPONSOR_STATUSES",
+    "VERSION_KEY",
+    "backend",
+    "use_backend",
+    "sponsor_member",
+    "donor_member",
+    "top",
+    "top_givers",
+    "sql_top_givers",
+    "rank",
+    "rebuild",
+    "queue",
+    "record_payment",
+]
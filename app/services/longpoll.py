@@ -0,0 +1,129 @@
+# app/services/longpoll.py
+from __future__ import annotations
+
+"""
+Bounded long-poll waits on data_version.
+
+A delta feed (e.g. `/api/donors?since=…&wait=25`) that found nothing new
+parks the request here until one of its tables is bumped — by a local
+commit or, through the invalidation bus, by another worker — or the
+timeout expires. The caller then re-queries once.
+
+Each parked request holds a gthread worker thread. Long-polls and
+`/stats/stream` (app/services/stats_stream.py) share one per-process
+budget, `parked`: `budget()` is a quarter of the worker's threads
+(gunicorn.conf.py exports them), so together they never hold more than
+that and three quarters stay free for pages. Over the budget `wait()`
+returns immediately and the client simply polls again.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from app.services import data_version
+
+ASYNC_WORKERS = ("eventlet", "gevent")
+
+
+def budget(config: Any, explicit: int = 0) -> int:
+    """
+    Requests this process may park at once: `explicit` > 0 wins, async
+    workers get `SSE_ASYNC_MAX_CLIENTS` (a parked request costs a greenlet),
+    threaded ones a quarter of their threads.
+    """
+    if explicit > 0:
+        return explicit
+    if os.environ.get("FC_WORKER_CLASS", "") in ASYNC_WORKERS:
+        return int(config.get("SSE_ASYNC_MAX_CLIENTS", 500))
+    return max(1, int(os.environ.get("FC_WORKER_THREADS") or 1) // 4)
+
+
+class ParkedRequests:
+    """Count of requests parked in this process (streams + long-polls)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.held = 0
+
+    def acquire(self, limit: int) -> bool:
+        """Take a slot unless `limit` requests are already parked; pair with `release()`."""
+        with self._lock:
+            if self.held >= max(0, limit):
+                return False
+            self.held += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.held = max(0, self.held - 1)
+
+
+parked = ParkedRequests()
+
+
+class ChangeWaiter:
+    """Condition variable woken by data_version bumps of `tables`."""
+
+    def __init__(self, tables: Iterable[str], lot: Optional[ParkedRequests] = None) -> None:
+        self.tables = frozenset(tables)
+        self.lot = lot or parked
+        self._cond = threading.Condition()
+        self.waiting = 0
+        self.woken = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    def version(self) -> int:
+        return data_version.version(*self.tables)
+
+    def notify(self, tables: Iterable[str]) -> None:
+        if self.tables.intersection(tables):
+            with self._cond:
+                self._cond.notify_all()
+
+    def wait(self, seen: int, timeout: float, slots: int) -> bool:
+        """
+        Block until version() moves past `seen` (True) or `timeout` / no free
+        slot (False). `slots` is the limit on all parked requests (`lot`).
+        """
+        if timeout <= 0 or self.version() != seen:
+            return self.version() != seen
+        deadline = time.monotonic() + timeout
+        if not self.lot.acquire(slots):
+            with self._cond:
+                self.rejected += 1
+            return False
+        try:
+            with self._cond:
+                self.waiting += 1
+                try:
+                    while self.version() == seen:
+                        left = deadline - time.monotonic()
+                        if left <= 0:
+                            self.timeouts += 1
+                            return False
+                        self._cond.wait(timeout=left)
+                    self.woken += 1
+                    return True
+                finally:
+                    self.waiting -= 1
+        finally:
+            self.lot.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tables": sorted(self.tables),
+            "waiting": self.waiting,
+            "woken": self.woken,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+        }
+
+
+# Donors ticker: new donations (or approved sponsors on the fallback feed)
+donors_waiter = ChangeWaiter(("donations", "sponsors"))
+data_version.subscribe(donors_waiter.notify)
+
+__all__ = ["ASYNC_WORKERS", "ChangeWaiter", "ParkedRequests", "budget", "donors_waiter", "parked"]
@@ -0,0 +1,415 @@
+# app/services/mail_outbox.py
+from __future__ import annotations
+
+"""
+Durable, batched outbound email.
+
+Callers `enqueue()` a message: one INSERT into `email_outbox`, flushed into
+the caller's transaction and committed with it, no thread and no SMTP work
+on the request path. A per-process drain worker claims due rows
+in batches and sends each batch over a single `mail.connect()` session, so a
+burst of receipts costs one TCP/TLS handshake + login per batch instead of
+one per email (and one thread per email).
+
+Failures are rescheduled with `next_attempt_at = now + base * 2**attempts`;
+nothing sleeps, the row is simply not due yet. Rows are claimed with a
+token + lease so several gunicorn workers (or a crashed one) never double
+send: a `sending` row whose lease lapsed becomes claimable again.
+
+The worker starts lazily on the first enqueue (`MAIL_OUTBOX_WORKER`), wakes
+when this process commits an outbox row (data_version listener) and polls
+every `MAIL_OUTBOX_POLL_SECONDS` for retries and rows written elsewhere.
+`flask outbox drain` and the `drain_email_outbox` celery task drain the
+same table without a web process.
+"""
+
+import base64
+import json
+import logging
+import smtplib
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from flask import current_app
+from flask_mail import BadHeaderError, Message
+from sqlalchemy import and_, func, or_, select, update
+
+from app.extensions import db, mail, run_bg
+from app.models.email_outbox import EmailOutbox
+from app.services import data_version
+from app.services.schema_registry import table_exists
+
+log = logging.getLogger(__name__)
+
+TABLE = EmailOutbox.__tablename__
+
+# Errors that will fail the same way on every retry
+_PERMANENT = (AssertionError, BadHeaderError, smtplib.SMTPRecipientsRefused, ValueError)
+# Errors that mean the SMTP session itself is gone: stop using it for this batch
+_CONNECTION = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+def _cfg(key: str, default: Any) -> Any:
+    try:
+        return current_app.config.get(key, default)
+    except RuntimeError:  # no app context
+        return default
+
+
+# ── Counters ────────────────────────────────────────────────────
+@dataclass
+class OutboxStats:
+    enqueued: int = 0
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    batches: int = 0
+    connections: int = 0
+    send_seconds: float = 0.0     # time spent inside SMTP sessions
+    latency_seconds: float = 0.0  # enqueue → sent, summed over `sent`
+    last_batch_size: int = 0
+    last_batch_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **deltas: float) -> None:
+        with self._lock:
+            for k, v in deltas.items():
+                setattr(self, k, getattr(self, k) + v)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "batches": self.batches,
+            "connections": self.connections,
+            "emails_per_connection": round(self.sent / self.connections, 1) if self.connections else 0.0,
+            "send_rate_per_sec": round(self.sent / self.send_seconds, 1) if self.send_seconds else 0.0,
+            "avg_latency_seconds": round(self.latency_seconds / self.sent, 3) if self.sent else 0.0,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_seconds": round(self.last_batch_seconds, 4),
+        }
+
+
+stats = OutboxStats()
+
+
+# ── Enqueue ─────────────────────────────────────────────────────
+def _attachments_json(attachments: Optional[Iterable[Any]]) -> Optional[str]:
+    """EmailAttachment or flask_mail.Attachment → JSON (base64 payloads)."""
+    out = []
+    for a in attachments or ():
+        data = getattr(a, "content", None)
+        if data is None:
+            data = getattr(a, "data", b"")
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        out.append(
+            {
+                "filename": a.filename,
+                "mimetype": getattr(a, "mimetype", None) or getattr(a, "content_type", None)
+                or "application/octet-stream",
+                "b64": base64.b64encode(data or b"").decode("ascii"),
+            }
+        )
+    return json.dumps(out) if out else None
+
+
+def enqueue(
+    subject: str,
+    recipients: List[str],
+    *,
+    body: Optional[str] = None,
+    html: Optional[str] = None,
+    sender: Optional[str] = None,
+    attachments: Optional[Iterable[Any]] = None,
+    commit: bool = False,
+) -> Optional[int]:
+    """
+    Add one message to the caller's session and flush it; returns the outbox
+    id. The caller commits, so the email goes out only if its transaction
+    does (the worker is woken by that commit). `commit=True` commits the
+    session here, for callers that own a session of their own.
+
+    Before the outbox migration has run, falls back to a one-off background
+    send so dev/offline installs keep emailing.
+    """
+    if not table_exists(EmailOutbox):
+        msg = Message(subject=subject, recipients=list(recipients), body=body, html=html, sender=sender)
+        _attach_json(msg, _attachments_json(attachments))
+        _send_direct(current_app._get_current_object(), msg)  # type: ignore[attr-defined]
+        return None
+
+    row = EmailOutbox(
+        subject=subject,
+        body=body,
+        html=html,
+        sender=sender,
+        attachments_json=_attachments_json(attachments),
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+    )
+    row.recipients = list(recipients)
+    db.session.add(row)
+    if commit:
+        db.session.commit()
+    else:
+        db.session.flush()
+    stats.add(enqueued=1)
+
+    if _cfg("MAIL_OUTBOX_WORKER", True):
+        worker.start(current_app._get_current_object())  # type: ignore[attr-defined]
+    return row.id
+
+
+def enqueue_message(msg: Message, *, commit: bool = False) -> Optional[int]:
+    """Outbox a ready-built flask_mail.Message."""
+    sender = msg.sender if isinstance(msg.sender, str) else None
+    if isinstance(msg.sender, tuple):
+        sender = "{} <{}>".format(*msg.sender)
+    return enqueue(
+        msg.subject or "",
+        list(msg.recipients or []),
+        body=msg.body,
+        html=msg.html,
+        sender=sender,
+        attachments=msg.attachments,
+        commit=commit,
+    )
+
+
+def _send_direct(app: Any, msg: Message) -> None:
+    def _job() -> None:
+        with app.app_context():
+            try:
+                mail.send(msg)
+            except Exception:
+                app.logger.exception("✉️ Email send failed", extra={"recipients": msg.recipients})
+
+    run_bg(_job)
+
+
+# ── Drain ───────────────────────────────────────────────────────
+def _attach_json(msg: Message, raw: Optional[str]) -> None:
+    for a in json.loads(raw) if raw else ():
+        msg.attach(
+            filename=a.get("filename"),
+            content_type=a.get("mimetype") or "application/octet-stream",
+            data=base64.b64decode(a.get("b64") or ""),
+        )
+
+
+def _build_message(row: EmailOutbox) -> Message:
+    msg = Message(
+        subject=row.subject,
+        recipients=row.recipients,
+        body=row.body,
+        html=row.html,
+        sender=row.sender or _cfg("DEFAULT_MAIL_SENDER", None) or None,
+    )
+    _attach_json(msg, row.attachments_json)
+    return msg
+
+
+def _claim(batch_size: int, lease_seconds: float) -> List[EmailOutbox]:
+    """Mark up to `batch_size` due rows as ours; committed before any SMTP work."""
+    t = EmailOutbox.__table__
+    now = datetime.utcnow()
+    due = and_(
+        t.c.next_attempt_at <= now,
+        or_(t.c.status == "pending", t.c.status == "sending"),  # sending + lapsed lease = orphaned
+    )
+    ids = list(
+        db.session.execute(
+            select(t.c.id).where(due).order_by(t.c.next_attempt_at, t.c.id).limit(batch_size)
+        ).scalars()
+    )
+    if not ids:
+        db.session.rollback()
+        return []
+    token = uuid.uuid4().hex
+    db.session.execute(
+        update(t)
+        .where(t.c.id.in_(ids), due)  # re-check: another worker may have won some rows
+        .values(status="sending", claim_token=token, next_attempt_at=now + timedelta(seconds=lease_seconds))
+    )
+    db.session.commit()
+    return list(
+        db.session.execute(select(EmailOutbox).where(EmailOutbox.claim_token == token).order_by(EmailOutbox.id))
+        .scalars()
+    )
+
+
+def _backoff(attempts: int) -> timedelta:
+    base = float(_cfg("MAIL_OUTBOX_BACKOFF_BASE", 30))
+    cap = float(_cfg("MAIL_OUTBOX_BACKOFF_MAX", 3600))
+    return timedelta(seconds=min(cap, base * (2 ** max(0, attempts - 1))))
+
+
+def _reschedule(row: EmailOutbox, exc: BaseException, permanent: bool = False) -> None:
+    max_attempts = int(_cfg("MAIL_OUTBOX_MAX_ATTEMPTS", 6))
+    row.attempts = int(row.attempts or 0) + 1
+    row.last_error = f"{type(exc).__name__}: {exc}"[:500]
+    row.claim_token = None
+    if permanent or row.attempts >= max_attempts:
+        row.status = "failed"
+        stats.add(failed=1)
+        log.error("✉️ Outbox %s failed permanently: %s", row.id, row.last_error)
+    else:
+        row.status = "pending"
+        row.next_attempt_at = datetime.utcnow() + _backoff(row.attempts)
+        stats.add(retried=1)
+        log.warning("✉️ Outbox %s attempt %s failed: %s", row.id, row.attempts, row.last_error)
+
+
+def drain(batch_size: Optional[int] = None, max_batches: Optional[int] = None) -> Dict[str, int]:
+    """
+    Send due messages, one SMTP session per batch, until nothing is due (or
+    `max_batches`). Needs an app context. Returns counts for this call.
+    """
+    batch_size = int(batch_size or _cfg("MAIL_OUTBOX_BATCH", 100))
+    lease = float(_cfg("MAIL_OUTBOX_LEASE_SECONDS", 300))
+    result = {"sent": 0, "retried": 0, "failed": 0, "batches": 0}
+    if not table_exists(EmailOutbox):
+        return result
+
+    while max_batches is None or result["batches"] < max_batches:
+        rows = _claim(batch_size, lease)
+        if not rows:
+            break
+        before = (stats.sent, stats.retried, stats.failed)
+        _send_batch(rows)
+        result["batches"] += 1
+        result["sent"] += stats.sent - before[0]
+        result["retried"] += stats.retried - before[1]
+        result["failed"] += stats.failed - before[2]
+        if len(rows) < batch_size:
+            break
+    return result
+
+
+def _send_batch(rows: List[EmailOutbox]) -> None:
+    started = time.perf_counter()
+    sent_ids: List[int] = []
+    latency = 0.0
+    pending = list(rows)
+    try:
+        with mail.connect() as conn:
+            stats.add(connections=1)
+            while pending:
+                row = pending.pop(0)
+                try:
+                    conn.send(_build_message(row))
+                except _PERMANENT as exc:
+                    _reschedule(row, exc, permanent=True)
+                except _CONNECTION as exc:
+                    # Session is gone: this row and the rest go back on the schedule
+                    _reschedule(row, exc)
+                    for rest in pending:
+                        _reschedule(rest, exc)
+                    pending = []
+                except Exception as exc:
+                    _reschedule(row, exc)
+                else:
+                    sent_ids.append(row.id)
+                    latency += (datetime.utcnow() - row.created_at).total_seconds() if row.created_at else 0.0
+    except Exception as exc:
+        # Could not open (or cleanly close) the session: retry what wasn't sent
+        for row in pending:
+            _reschedule(row, exc)
+
+    now = datetime.utcnow()
+    if sent_ids:
+        t = EmailOutbox.__table__
+        db.session.execute(
+            update(t)
+            .where(t.c.id.in_(sent_ids))
+            .values(status="sent", sent_at=now, claim_token=None, last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+
+    elapsed = time.perf_counter() - started
+    stats.add(sent=len(sent_ids), batches=1, send_seconds=elapsed, latency_seconds=latency)
+    stats.last_batch_size = len(rows)
+    stats.last_batch_seconds = elapsed
+
+
+def queue_depth() -> Dict[str, int]:
+    """Row counts per status (for `flask outbox stats` / admin)."""
+    if not table_exists(EmailOutbox):
+        return {}
+    rows = db.session.execute(select(EmailOutbox.status, func.count()).group_by(EmailOutbox.status))
+    return {status: int(n) for status, n in rows}
+
+
+# ── Worker ──────────────────────────────────────────────────────
+class OutboxWorker:
+    """One daemon drain thread per process; sleeps on an Event between batches."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def poke(self) -> None:
+        self._wake.set()
+
+    def start(self, app: Any) -> None:
+        if self.alive:
+            return
+        with self._lock:
+            if self.alive:
+                return
+            poll = float(app.config.get("MAIL_OUTBOX_POLL_SECONDS", 5))
+
+            def _run() -> None:
+                while True:
+                    self._wake.clear()
+                    try:
+                        with app.app_context():
+                            drain()
+                    except Exception:
+                        log.warning("mail outbox: drain failed", exc_info=True)
+                    finally:
+                        try:
+                            with app.app_context():
+                                db.session.remove()
+                        except Exception:
+                            pass
+                    self._wake.wait(timeout=poll)
+
+            self._thread = threading.Thread(target=_run, name="fc-mail-outbox", daemon=True)
+            self._thread.start()
+
+
+worker = OutboxWorker()
+
+
+def _on_bump(tables: Any) -> None:
+    if TABLE in set(tables):
+        worker.poke()
+
+
+data_version.subscribe(_on_bump)
+
+__all__ = [
+    "OutboxStats",
+    "OutboxWorker",
+    "drain",
+    "enqueue",
+    "enqueue_message",
+    "queue_depth",
+    "stats",
+    "worker",
+]
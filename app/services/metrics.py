@@ -0,0 +1,444 @@
+# app/services/metrics.py
+from __future__ import annotations
+
+"""
+Prometheus text exposition (`GET /metrics`) that aggregates across workers.
+
+Each process keeps its samples in memory (a dict update under a lock per
+observation). With `FC_METRICS_DIR` set — gunicorn.conf.py sets it for the
+web workers — a daemon thread writes the process's samples to
+`<dir>/<pid>-<start>.json` every `METRICS_FLUSH_SECONDS` (atomic rename);
+the start token keeps a worker that inherits a recycled pid from
+overwriting its predecessor's file. When a worker exits, gunicorn's
+`child_exit` hook folds its counters and histograms into `exited.json`
+and removes its file. A scrape merges this process's live samples with
+every other file:
+
+- counters and histograms are summed over all files, including workers that
+  have since exited, so totals never go backwards on a worker restart;
+- gauges are summed over live workers only (a dead worker has no clients;
+  of several files sharing a pid, only the newest start counts as live).
+
+Other workers' samples are at most one flush interval old. Without a
+metrics dir the endpoint reports the scraping process only (dev server).
+
+`/metrics` fails closed: it needs `METRICS_TOKEN` as a bearer token, or a
+direct (un-proxied) request from loopback, unless `METRICS_PUBLIC` is set.
+"""
+
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from flask import Flask, Response, current_app, g, request
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_SEP = "\x1f"
+_lock = threading.Lock()
+_metrics: Dict[str, "_Metric"] = {}
+
+# Samples of this process: key = name + _SEP + json(label pairs)
+_counters: Dict[str, float] = {}
+_gauges: Dict[str, float] = {}
+_histograms: Dict[str, List[float]] = {}  # per-bucket counts..., sum, count
+
+
+def _key(name: str, labels: Dict[str, Any]) -> str:
+    return name + _SEP + json.dumps(sorted((k, str(v)) for k, v in labels.items()), separators=(",", ":"))
+
+
+def _split(key: str) -> Tuple[str, List[Tuple[str, str]]]:
+    name, _, raw = key.partition(_SEP)
+    return name, [tuple(p) for p in json.loads(raw or "[]")]  # type: ignore[misc]
+
+
+# ── Metric types ────────────────────────────────────────────────
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        _metrics[name] = self
+
+    def _k(self, labels: Dict[str, Any]) -> str:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}")
+        return _key(self.name, labels)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        k = self._k(labels)
+        with _lock:
+            _counters[k] = _counters.get(k, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Per-process value; the scrape sums live processes."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        k = self._k(labels)
+        with _lock:
+            _gauges[k] = _gauges.get(k, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        k = self._k(labels)
+        with _lock:
+            _gauges[k] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        k = self._k(labels)
+        n = len(self.buckets)
+        with _lock:
+            row = _histograms.get(k)
+            if row is None:
+                row = _histograms[k] = [0.0] * (n + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            row[n] += value
+            row[n + 1] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the block's duration in seconds (usable as a decorator)."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+
+# ── Application metrics ─────────────────────────────────────────
+HTTP_REQUESTS = Counter("fc_http_requests_total", "HTTP requests served.", ("method", "endpoint", "status"))
+HTTP_LATENCY = Histogram("fc_http_request_duration_seconds", "HTTP request latency.", ("endpoint",))
+DB_QUERIES = Counter("fc_db_queries_total", "SQL statements executed while serving requests.", ("endpoint",))
+SOCKETIO_CLIENTS = Gauge("fc_socketio_clients", "Connected Socket.IO clients.")
+EMAIL_OUTBOX = Gauge("fc_email_outbox_messages", "Email outbox rows by status.", ("status",))  # read at scrape
+WEBHOOK_LATENCY = Histogram("fc_webhook_duration_seconds", "Inbound webhook processing time.", ("source",))
+EXTERNAL_LATENCY = Histogram(
+    "fc_external_call_duration_seconds", "Outbound API call latency.", ("service", "outcome")
+)
+ROI_FLUSH_LATENCY = Histogram("fc_roi_flush_duration_seconds", "ROI counter write-behind flushes.", ("outcome",))
+ROI_DROPPED = Counter("fc_roi_dropped_deltas_total", "ROI counter deltas discarded before reaching Redis.", ("reason",))
+ROI_PENDING = Gauge("fc_roi_pending_fields", "ROI counter fields waiting for the next flush.")
+
+
+# ── Multiprocess files ──────────────────────────────────────────
+def _metrics_dir() -> Optional[str]:
+    return os.getenv("FC_METRICS_DIR") or None
+
+
+EXITED_FILE = "exited.json"  # counters/histograms of workers folded by gunicorn's child_exit
+
+_ident: Tuple[int, str] = (0, "")
+
+
+def _process_file() -> str:
+    """`<pid>-<start>.json` for this process (re-minted after a fork)."""
+    global _ident
+    pid = os.getpid()
+    if _ident[0] != pid:
+        _ident = (pid, format(time.time_ns(), "x"))
+    return f"{pid}-{_ident[1]}.json"
+
+
+def _parse_file(fn: str) -> Optional[Tuple[int, int]]:
+    """(pid, start) from a worker file name; None for anything else."""
+    pid, _, start = fn[:-5].partition("-")
+    try:
+        return int(pid), int(start, 16)
+    except ValueError:
+        return None
+
+
+def _snapshot() -> Dict[str, Any]:
+    with _lock:
+        return {
+            "pid": os.getpid(),
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "histograms": {k: list(v) for k, v in _histograms.items()},
+        }
+
+
+def flush(directory: Optional[str] = None) -> Optional[str]:
+    """Write this process's samples to `<dir>/<pid>-<start>.json`."""
+    directory = directory or _metrics_dir()
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, _process_file())
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(_snapshot(), fh, separators=(",", ":"))
+    os.replace(tmp, path)
+    return path
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def _merge(into: Dict[str, Any], snap: Dict[str, Any], live: bool) -> None:
+    for k, v in snap.get("counters", {}).items():
+        into["counters"][k] = into["counters"].get(k, 0.0) + v
+    for k, row in snap.get("histograms", {}).items():
+        have = into["histograms"].get(k)
+        into["histograms"][k] = [a + b for a, b in zip(have, row)] if have else list(row)
+    if live:
+        for k, v in snap.get("gauges", {}).items():
+            into["gauges"][k] = into["gauges"].get(k, 0.0) + v
+
+
+def collect(directory: Optional[str] = None) -> Dict[str, Any]:
+    """This process's live samples plus every other worker's last flush."""
+    merged: Dict[str, Any] = {"counters": {}, "gauges": {}, "histograms": {}}
+    _merge(merged, _snapshot(), live=True)
+    directory = directory or _metrics_dir()
+    if not directory or not os.path.isdir(directory):
+        return merged
+    def _load(fn: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(directory, fn), encoding="utf-8") as fh:
+                return json.load(fh)
+        except Exception:
+            return None  # gone (folded) or mid-write on a non-atomic filesystem: next scrape
+
+    exited = _load(EXITED_FILE) or {}
+    folded = set(exited.get("folded", ()))  # removed right after the fold; don't count twice
+    _merge(merged, exited, live=False)
+
+    mine = _process_file()
+    newest: Dict[int, int] = {}
+    workers: List[Tuple[str, int, int]] = []
+    for fn in os.listdir(directory):
+        if not fn.endswith(".json") or fn in (mine, EXITED_FILE) or fn in folded:
+            continue
+        parsed = _parse_file(fn)
+        if parsed is None:
+            continue
+        pid, start = parsed
+        newest[pid] = max(newest.get(pid, start), start)
+        workers.append((fn, pid, start))
+    for fn, pid, start in workers:
+        snap = _load(fn)
+        if snap is not None:
+            _merge(merged, snap, live=start == newest[pid] and _pid_alive(pid))
+    return merged
+
+
+class _Flusher:
+    def __init__(self) -> None:
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self, interval: float) -> None:
+        if not _metrics_dir() or (self._thread and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+
+            def _run() -> None:
+                while True:
+                    time.sleep(interval)
+                    try:
+                        flush()
+                    except Exception:
+                        log.debug("metrics flush failed", exc_info=True)
+
+            self._thread = threading.Thread(target=_run, name="fc-metrics-flush", daemon=True)
+            self._thread.start()
+
+
+flusher = _Flusher()
+
+
+# ── Exposition ──────────────────────────────────────────────────
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: Iterable[Tuple[str, str]], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(pairs) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _fmt(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def render(samples: Dict[str, Any]) -> str:
+    """Text exposition format 0.0.4 for merged samples."""
+    by_name: Dict[str, List[Tuple[List[Tuple[str, str]], Any]]] = {}
+    for table in ("counters", "gauges", "histograms"):
+        for k, v in samples[table].items():
+            name, pairs = _split(k)
+            by_name.setdefault(name, []).append((pairs, v))
+
+    lines: List[str] = []
+    for name, metric in _metrics.items():
+        rows = sorted(by_name.get(name, []), key=lambda r: r[0])
+        lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for pairs, v in rows:
+            if isinstance(metric, Histogram):
+                n = len(metric.buckets)
+                running = 0.0
+                for i, bound in enumerate(metric.buckets):
+                    running += v[i]
+                    lines.append(f"{name}_bucket{_labels(pairs, ('le', _fmt(bound)))} {_fmt(running)}")
+                lines.append(f"{name}_bucket{_labels(pairs, ('le', '+Inf'))} {_fmt(v[n + 1])}")
+                lines.append(f"{name}_sum{_labels(pairs)} {_fmt(v[n])}")
+                lines.append(f"{name}_count{_labels(pairs)} {_fmt(v[n + 1])}")
+            else:
+                lines.append(f"{name}{_labels(pairs)} {_fmt(v)}")
+    return "\n".join(lines) + "\n"
+
+
+# ── Flask wiring ────────────────────────────────────────────────
+def _scrape_gauges() -> Dict[str, float]:
+    """Gauges read from the database at scrape time (shared state: never summed)."""
+    out: Dict[str, float] = {}
+    try:
+        from app.services.mail_outbox import queue_depth
+
+        for status, n in queue_depth().items():
+            out[_key(EMAIL_OUTBOX.name, {"status": status})] = float(n)
+    except Exception:
+        log.debug("email outbox depth unavailable", exc_info=True)
+    return out
+
+
+_LOOPBACK = ("127.0.0.1", "::1")
+
+
+def _scrape_allowed() -> bool:
+    """Bearer METRICS_TOKEN, or a loopback request nginx didn't proxy, or METRICS_PUBLIC."""
+    cfg = current_app.config
+    if cfg.get("METRICS_PUBLIC"):
+        return True
+    token = cfg.get("METRICS_TOKEN")
+    if token:
+        sent = request.headers.get("Authorization", "").encode()
+        return hmac.compare_digest(sent, f"Bearer {token}".encode())
+    return request.remote_addr in _LOOPBACK and "X-Forwarded-For" not in request.headers
+
+
+def metrics_view() -> Response:
+    if not _scrape_allowed():
+        return Response("unauthorized\n", status=401, mimetype="text/plain")
+    samples = collect()
+    samples["gauges"].update(_scrape_gauges())
+    resp = Response(render(samples), mimetype="text/plain")
+    resp.headers["Content-Type"] = CONTENT_TYPE
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+
+def init_metrics(app: Flask) -> None:
+    """Request counters/latency, `/metrics`, and the flush thread."""
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    @app.after_request
+    def _record_request(resp):
+        start = getattr(g, "_start_ts", None)
+        endpoint = request.endpoint or "unmatched"
+        try:
+            HTTP_REQUESTS.inc(method=request.method, endpoint=endpoint, status=resp.status_code)
+            if start is not None:
+                HTTP_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint)
+            timing = g.get("_fc_timing")
+            if timing is not None and timing.queries:
+                DB_QUERIES.inc(timing.queries, endpoint=endpoint)
+        except Exception:
+            log.debug("request metrics failed", exc_info=True)
+        return resp
+
+    app.add_url_rule("/metrics", "metrics", metrics_view, methods=["GET"])
+
+    flusher.start(float(app.config.get("METRICS_FLUSH_SECONDS", 2)))
+
+
+def count_socketio_clients(app: Flask, socketio: Any) -> None:
+    """
+    Keep `fc_socketio_clients` by wrapping the Socket.IO server's event
+    dispatch (call after `socketio.init_app`). `@socketio.on("connect")`
+    would claim the app's one connect/disconnect handler slot; the wrapper
+    sees every connection whether or not the app registers handlers.
+    """
+    server = getattr(socketio, "server", None)
+    if not app.config.get("METRICS_ENABLED", True) or server is None:
+        return
+    if getattr(server, "_fc_counted", False):
+        return  # one server per SocketIO object; create_app may run more than once
+    trigger = server._trigger_event
+
+    def _trigger_event(event: str, namespace: str, *args: Any) -> Any:
+        result = trigger(event, namespace, *args)
+        if namespace == "/":
+            if event == "connect" and result is not False:  # False refuses the client
+                SOCKETIO_CLIENTS.inc()
+            elif event == "disconnect":
+                SOCKETIO_CLIENTS.dec()
+        return result
+
+    server._trigger_event = _trigger_event
+    server._fc_counted = True
+
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "HTTP_REQUESTS",
+    "HTTP_LATENCY",
+    "DB_QUERIES",
+    "SOCKETIO_CLIENTS",
+    "EMAIL_OUTBOX",
+    "WEBHOOK_LATENCY",
+    "EXTERNAL_LATENCY",
+    "ROI_FLUSH_LATENCY",
+    "ROI_DROPPED",
+    "ROI_PENDING",
+    "collect",
+    "count_socketio_clients",
+    "flush",
+    "init_metrics",
+    "render",
+]
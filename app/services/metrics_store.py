@@ -0,0 +1,378 @@
+# app/services/metrics_store.py
+from __future__ import annotations
+
+"""
+Pluggable storage for the ROI metrics: weekly hashes, rollup buckets,
+unique-visitor HyperLogLogs and the recent-donations list.
+
+    METRICS_BACKEND=auto    Redis when REDIS_URL is set, else the embedded store
+                   =redis   Redis only (the write-behind buffer retries while it is down)
+                   =sqlite  the embedded store, even if Redis is around
+                   =none    keep nothing
+
+`auto` decides from configuration, not from whether Redis answered a PING
+at startup: a worker that booted during a Redis blip would otherwise write
+to SQLite for its whole life while its peers wrote to Redis, splitting the
+counts. With REDIS_URL set it behaves like `redis`.
+
+Both backends speak the same small API — `write()` for a write-behind
+batch, plus `hgetall`, `hmget_many`, `smembers`, `pfcount_many`,
+`lpush_trim` and `lrange` — and keep the Redis key layout, so callers
+(fc_metrics, fc_payments, rollups, uniques) never branch on the backend.
+
+The embedded store is one SQLite file in WAL mode (`METRICS_SQLITE_PATH`,
+default app/data/metrics.db) shared by the workers on the box:
+
+    roi_counters(key, field, value, expires_at)   hashes: HINCRBY → upsert value + delta
+    roi_hll(key, registers, card, expires_at)     HyperLogLog register blobs (sparse while
+                                                  small, ≤12 KiB) + the count at last write
+    roi_sets(key, member, expires_at)             SADD (the HLL index)
+    roi_lists(key, seq, value)                    LPUSH + LTRIM (recent donations)
+
+Batches arrive pre-aggregated from the flush thread and are applied in one
+`BEGIN IMMEDIATE` transaction with executemany; WAL lets other workers read
+meanwhile and `synchronous=NORMAL` makes a commit an append to the log.
+PFADD recounts the touched HLL once per flush and stores it in `card`, so
+PFCOUNT is a column read rather than a register scan per request.
+Rollup buckets are written by the same flush as on Redis, so "compaction"
+here is retention: every `METRICS_COMPACT_SECONDS` a write also deletes
+expired rows (the TTLs Redis would enforce) and checkpoints the WAL.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from app.services.clients import redis_client
+
+log = logging.getLogger(__name__)
+
+Deltas = Dict[str, Dict[str, Any]]  # hash key → field → delta
+Members = Dict[Tuple[str, str], Set[str]]  # (pfadd|sadd, key) → members
+
+DEFAULT_SQLITE_PATH = str(Path(__file__).resolve().parents[1] / "data" / "metrics.db")
+
+
+def _text(v: Any) -> str:
+    return v.decode() if isinstance(v, (bytes, bytearray)) else str(v)
+
+
+def _fmt(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+# ── Redis ──────────────────────────────────────────────────────────
+
+class RedisBackend:
+    name = "redis"
+
+    def __init__(self, client: Any) -> None:
+        self.client = client
+
+    def write(
+        self,
+        counts: Deltas,
+        floats: Optional[Deltas] = None,
+        members: Optional[Members] = None,
+        ttls: Optional[Mapping[str, int]] = None,
+    ) -> None:
+        """One pipelined MULTI/EXEC round trip (raises on failure)."""
+        pipe = self.client.pipeline(transaction=True)
+        for key, fields in counts.items():
+            for field, amount in fields.items():
+                pipe.hincrby(key, field, int(amount))
+        for key, fields in (floats or {}).items():
+            for field, amount in fields.items():
+                pipe.hincrbyfloat(key, field, float(amount))
+        for (command, key), values in (members or {}).items():
+            getattr(pipe, command)(key, *sorted(values))
+        for key, seconds in (ttls or {}).items():
+            pipe.expire(key, int(seconds))
+        pipe.execute()
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        return {_text(k): _text(v) for k, v in self.client.hgetall(key).items()}
+
+    def hmget_many(self, keys: Sequence[str], fields: Sequence[str]) -> List[List[Any]]:
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hmget(key, list(fields))
+        return [list(row) for row in pipe.execute()]
+
+    def smembers(self, key: str) -> Set[str]:
+        return {_text(m) for m in self.client.smembers(key)}
+
+    def pfcount_many(self, keys: Sequence[str]) -> List[int]:
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.pfcount(key)
+        return [int(n) for n in pipe.execute()]
+
+    def lpush_trim(self, key: str, value: str, keep: int) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.lpush(key, value)
+        pipe.ltrim(key, 0, keep - 1)
+        pipe.execute()
+
+    def lrange(self, key: str, start: int, stop: int) -> List[str]:
+        return [_text(v) for v in self.client.lrange(key, start, stop)]
+
+
+# ── SQLite (WAL) ───────────────────────────────────────────────────
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS roi_counters (
+    key TEXT NOT NULL, field TEXT NOT NULL, value REAL NOT NULL DEFAULT 0, expires_at REAL,
+    PRIMARY KEY (key, field)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS roi_hll (
+    key TEXT PRIMARY KEY, registers BLOB NOT NULL, card INTEGER, expires_at REAL
+);
+CREATE TABLE IF NOT EXISTS roi_sets (
+    key TEXT NOT NULL, member TEXT NOT NULL, expires_at REAL, PRIMARY KEY (key, member)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS roi_lists (seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, value TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS ix_roi_counters_expiry ON roi_counters (expires_at) WHERE expires_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_roi_lists_key ON roi_lists (key, seq);
+"""
+_LIVE = "(expires_at IS NULL OR expires_at > ?)"
+
+
+class SqliteBackend:
+    name = "sqlite"
+
+    def __init__(self, path: str, compact_every: float = 300.0) -> None:
+        self.path = path
+        self.compact_every = compact_every
+        self._local = threading.local()  # one connection per thread
+        self._next_compact = 0.0
+        self.compactions = 0
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        if "card" not in {row[1] for row in conn.execute("PRAGMA table_info(roi_hll)")}:
+            conn.execute("ALTER TABLE roi_hll ADD COLUMN card INTEGER")  # files from before the count cache
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")  # take the write lock up front (no upgrade deadlocks)
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def write(
+        self,
+        counts: Deltas,
+        floats: Optional[Deltas] = None,
+        members: Optional[Members] = None,
+        ttls: Optional[Mapping[str, int]] = None,
+    ) -> None:
+        from app.services.uniques import HyperLogLog  # uniques imports us (via roi_counters)
+
+        now = time.time()
+        rows = [
+            (key, field, float(amount), now)
+            for table in (counts, floats or {})
+            for key, fields in table.items()
+            for field, amount in fields.items()
+        ]
+        with self._tx() as conn:
+            # An expired row that compaction hasn't removed yet starts over, as a Redis key would
+            conn.executemany(
+                "INSERT INTO roi_counters (key, field, value) VALUES (?1, ?2, ?3) "
+                "ON CONFLICT (key, field) DO UPDATE SET "
+                "value = CASE WHEN expires_at <= ?4 THEN excluded.value ELSE value + excluded.value END, "
+                "expires_at = CASE WHEN expires_at <= ?4 THEN NULL ELSE expires_at END",
+                rows,
+            )
+            for (command, key), values in (members or {}).items():
+                if command == "sadd":
+                    conn.executemany(
+                        "INSERT INTO roi_sets (key, member) VALUES (?1, ?2) "
+                        "ON CONFLICT (key, member) DO UPDATE SET expires_at = NULL WHERE expires_at <= ?3",
+                        [(key, v, now) for v in values],
+                    )
+                    continue
+                row = conn.execute(f"SELECT registers FROM roi_hll WHERE key = ? AND {_LIVE}", (key, now)).fetchone()
+                hll = HyperLogLog.frombytes(row[0]) if row else HyperLogLog()
+                for v in values:
+                    hll.add(v)
+                conn.execute(
+                    "INSERT INTO roi_hll (key, registers, card) VALUES (?1, ?2, ?4) "
+                    "ON CONFLICT (key) DO UPDATE SET registers = excluded.registers, card = excluded.card, "
+                    "expires_at = CASE WHEN expires_at <= ?3 THEN NULL ELSE expires_at END",
+                    (key, hll.tobytes(), now, hll.count()),
+                )
+            for table in ("roi_counters", "roi_hll", "roi_sets"):  # EXPIRE applies to the whole (live) key
+                conn.executemany(
+                    f"UPDATE {table} SET expires_at = ? WHERE key = ? AND {_LIVE}",
+                    [(now + int(s), key, now) for key, s in (ttls or {}).items()],
+                )
+        if now >= self._next_compact:
+            self.compact(now)
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Drop expired rows and checkpoint the WAL → rows deleted per table."""
+        now = time.time() if now is None else now
+        self._next_compact = now + self.compact_every
+        deleted: Dict[str, int] = {}
+        with self._tx() as conn:
+            for table in ("roi_counters", "roi_hll", "roi_sets"):
+                deleted[table] = conn.execute(
+                    f"DELETE FROM {table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+                ).rowcount
+        try:
+            self._conn().execute("PRAGMA wal_checkpoint(PASSIVE)")
+        except sqlite3.Error:
+            pass
+        self.compactions += 1
+        return deleted
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        rows = self._conn().execute(
+            f"SELECT field, value FROM roi_counters WHERE key = ? AND {_LIVE}", (key, time.time())
+        )
+        return {field: _fmt(value) for field, value in rows}
+
+    def hmget_many(self, keys: Sequence[str], fields: Sequence[str]) -> List[List[Any]]:
+        if not keys or not fields:
+            return [[None] * len(fields) for _ in keys]
+        found: Dict[Tuple[str, str], float] = {}
+        conn, now = self._conn(), time.time()
+        for i in range(0, len(keys), 400):  # stay well under SQLite's bound-parameter limit
+            chunk = keys[i:i + 400]
+            sql = (
+                f"SELECT key, field, value FROM roi_counters WHERE key IN ({','.join('?' * len(chunk))}) "
+                f"AND field IN ({','.join('?' * len(fields))}) AND {_LIVE}"
+            )
+            for key, field, value in conn.execute(sql, (*chunk, *fields, now)):
+                found[(key, field)] = value
+        return [[found.get((key, field)) for field in fields] for key in keys]
+
+    def smembers(self, key: str) -> Set[str]:
+        rows = self._conn().execute(f"SELECT member FROM roi_sets WHERE key = ? AND {_LIVE}", (key, time.time()))
+        return {m for (m,) in rows}
+
+    def pfcount_many(self, keys: Sequence[str]) -> List[int]:
+        from app.services.uniques import HyperLogLog
+
+        found: Dict[str, int] = {}
+        conn, now = self._conn(), time.time()
+        for i in range(0, len(keys), 400):
+            chunk = keys[i:i + 400]
+            sql = f"SELECT key, card, registers FROM roi_hll WHERE key IN ({','.join('?' * len(chunk))}) AND {_LIVE}"
+            for key, card, registers in conn.execute(sql, (*chunk, now)):
+                found[key] = int(card) if card is not None else HyperLogLog.frombytes(registers).count()
+        return [found.get(key, 0) for key in keys]
+
+    def lpush_trim(self, key: str, value: str, keep: int) -> None:
+        with self._tx() as conn:
+            conn.execute("INSERT INTO roi_lists (key, value) VALUES (?, ?)", (key, value))
+            conn.execute(
+                "DELETE FROM roi_lists WHERE key = ? AND seq NOT IN "
+                "(SELECT seq FROM roi_lists WHERE key = ? ORDER BY seq DESC LIMIT ?)",
+                (key, key, keep),
+            )
+
+    def lrange(self, key: str, start: int, stop: int) -> List[str]:
+        limit = -1 if stop < 0 else max(0, stop - start + 1)
+        rows = self._conn().execute(
+            "SELECT value FROM roi_lists WHERE key = ? ORDER BY seq DESC LIMIT ? OFFSET ?", (key, limit, start)
+        )
+        return [v for (v,) in rows]
+
+    def journal_mode(self) -> str:
+        return str(self._conn().execute("PRAGMA journal_mode").fetchone()[0])
+
+
+# ── Selection ──────────────────────────────────────────────────────
+
+class _Selector:
+    """Resolves METRICS_BACKEND once per process, on first use (works from the flush thread)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._app: Any = None
+        self._resolved = False
+        self._backend: Optional[Any] = None
+
+    def configure(self, app: Any) -> None:
+        with self._lock:
+            self._app, self._resolved, self._backend = app, False, None
+
+    def _setting(self, name: str, default: Any) -> Any:
+        v = self._app.config.get(name) if self._app is not None else None
+        return v if v is not None else os.getenv(name, default)
+
+    def get(self) -> Optional[Any]:
+        if self._resolved:
+            return self._backend
+        with self._lock:
+            if not self._resolved:
+                self._backend = self._build()
+                self._resolved = True
+                log.info("metrics store: %s", getattr(self._backend, "name", "none"))
+            return self._backend
+
+    def _build(self) -> Optional[Any]:
+        mode = str(self._setting("METRICS_BACKEND", "auto") or "auto").lower()
+        if mode == "none":
+            return None
+        if mode == "auto" and self._setting("REDIS_URL", ""):
+            mode = "redis"  # same choice in every worker, up or not (see module docstring)
+        if mode == "redis":
+            client = redis_client()
+            return RedisBackend(client) if client is not None else None
+        try:
+            return SqliteBackend(
+                str(self._setting("METRICS_SQLITE_PATH", "") or DEFAULT_SQLITE_PATH),
+                compact_every=float(self._setting("METRICS_COMPACT_SECONDS", 300)),
+            )
+        except Exception:
+            log.warning("metrics store: SQLite unavailable; metrics are not recorded", exc_info=True)
+            return None
+
+
+_selector = _Selector()
+
+
+def backend() -> Optional[Any]:
+    """The process's metrics backend (RedisBackend | SqliteBackend | None)."""
+    return _selector.get()
+
+
+def backend_name() -> str:
+    return getattr(backend(), "name", "none")
+
+
+def init_metrics_store(app: Any) -> None:
+    _selector.configure(app)
+
+
+__all__ = [
+    "RedisBackend",
+    "SqliteBackend",
+    "backend",
+    "backend_name",
+    "init_metrics_store",
+]
@@ -4,9 +4,10 @@ import random
 import time
 
 import requests
-import stripe
 from flask import current_app
 
+from app.services.clients import stripe_api
+
 
 class PaymentService:
     """Unified Stripe + PayPal service with demo mode toggle."""
@@ -34,7 +35,10 @@ class PaymentService:
                 "demo": True,
             }
 
-        # real call
+        # real call (stripe is imported on first use, not at worker boot)
+        stripe = stripe_api()
+        if stripe is None:
+            raise RuntimeError("Stripe library unavailable")
         stripe.api_key = current_app.config.get("STRIPE_SECRET_KEY")
         intent = stripe.PaymentIntent.create(
             amount=int(amount * 100),
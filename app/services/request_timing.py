@@ -0,0 +1,200 @@
+# app/services/request_timing.py
+from __future__ import annotations
+
+"""
+Per-request timing segments for `Server-Timing` + budget logging.
+
+Segments collected on `g` while a request runs:
+
+- db       SQLAlchemy cursor time (before/after_cursor_execute) + query count
+- render   Jinja render (before_render_template → template_rendered signals)
+- csp      security-header/nonce work in `init_security`'s after_request
+- compress flask_compress's after_request (wrapped in place)
+
+`server_timing()` formats them as
+`app;dur=12.3, db;dur=4.1;desc="6 queries", render;dur=5.0, ...`.
+`check_budget()` logs requests over `REQUEST_QUERY_BUDGET` queries or
+`REQUEST_LATENCY_BUDGET_MS` milliseconds with their request id.
+
+Segments can overlap (a lazy load inside a template counts toward both
+db and render); `app` is the wall time up to the point the header is set.
+"""
+
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from flask import Flask, before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+log = logging.getLogger(__name__)
+
+_G_KEY = "_fc_timing"
+_CONN_KEY = "_fc_query_start"
+_installed = False
+
+
+class RequestTiming:
+    """Millisecond totals per segment plus the SQL statement count."""
+
+    __slots__ = ("segments", "queries", "_render_start")
+
+    def __init__(self) -> None:
+        self.segments: Dict[str, float] = {}
+        self.queries = 0
+        self._render_start: List[float] = []
+
+    def add(self, name: str, ms: float) -> None:
+        self.segments[name] = self.segments.get(name, 0.0) + ms
+
+
+def current() -> Optional[RequestTiming]:
+    """This request's timing (created on first use); None outside a request."""
+    if not has_request_context():
+        return None
+    timing = g.get(_G_KEY)
+    if timing is None:
+        timing = RequestTiming()
+        setattr(g, _G_KEY, timing)
+    return timing
+
+
+@contextmanager
+def segment(name: str) -> Iterator[None]:
+    """`with segment("csp"): ...` adds the block's wall time to `name`."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing = current()
+        if timing is not None:
+            timing.add(name, (time.perf_counter() - t0) * 1000.0)
+
+
+# ── SQL ─────────────────────────────────────────────────────────
+def _before_cursor(conn, cursor, statement, parameters, context, executemany) -> None:
+    if has_request_context():
+        conn.info.setdefault(_CONN_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor(conn, cursor, statement, parameters, context, executemany) -> None:
+    stack = conn.info.get(_CONN_KEY)
+    if not stack:
+        return
+    ms = (time.perf_counter() - stack.pop()) * 1000.0
+    timing = current()
+    if timing is not None:
+        timing.queries += 1
+        timing.add("db", ms)
+
+
+def _on_error(exception_context) -> None:
+    conn = exception_context.connection
+    stack = conn.info.get(_CONN_KEY) if conn is not None else None
+    if stack:
+        stack.pop()
+
+
+# ── Templates ───────────────────────────────────────────────────
+def _render_started(sender, template, context, **extra) -> None:
+    timing = current()
+    if timing is not None:
+        timing._render_start.append(time.perf_counter())
+
+
+def _render_finished(sender, template, context, **extra) -> None:
+    timing = current()
+    if timing is not None and timing._render_start:
+        timing.add("render", (time.perf_counter() - timing._render_start.pop()) * 1000.0)
+
+
+# ── Header + budgets ────────────────────────────────────────────
+_ORDER = ("db", "render", "csp", "compress")
+
+
+def server_timing(start_ts: Optional[float] = None) -> str:
+    """Header value for this request (`app` first, then known segments)."""
+    timing = current()
+    parts: List[str] = []
+    if start_ts is not None:
+        parts.append(f"app;dur={(time.perf_counter() - start_ts) * 1000.0:.1f}")
+    if timing is None:
+        return ", ".join(parts)
+    names = list(_ORDER) + sorted(set(timing.segments) - set(_ORDER))
+    for name in names:
+        if name == "db":
+            parts.append(f'db;dur={timing.segments.get("db", 0.0):.1f};desc="{timing.queries} queries"')
+        elif name in timing.segments:
+            parts.append(f"{name};dur={timing.segments[name]:.1f}")
+    return ", ".join(parts)
+
+
+def check_budget(app: Flask, status: int, start_ts: Optional[float]) -> bool:
+    """Log (WARNING) a request over its query or latency budget; True if over."""
+    timing = current()
+    if timing is None or start_ts is None:
+        return False
+    total_ms = (time.perf_counter() - start_ts) * 1000.0
+    max_queries = int(app.config.get("REQUEST_QUERY_BUDGET", 0) or 0)
+    max_ms = float(app.config.get("REQUEST_LATENCY_BUDGET_MS", 0) or 0)
+    over = []
+    if max_queries and timing.queries > max_queries:
+        over.append(f"queries {timing.queries}>{max_queries}")
+    if max_ms and total_ms > max_ms:
+        over.append(f"latency {total_ms:.0f}ms>{max_ms:.0f}ms")
+    if not over:
+        return False
+    app.logger.warning(
+        "⏱️ Over budget (%s): %s %s → %s rid=%s segments=%s",
+        ", ".join(over),
+        request.method,
+        request.full_path.rstrip("?"),
+        status,
+        g.get("request_id", "-"),
+        {k: round(v, 1) for k, v in timing.segments.items()},
+    )
+    return True
+
+
+def time_after_request(app: Flask, fn: Callable[[Any], Any], name: str) -> bool:
+    """Wrap an already-registered after_request hook so it reports as `name`."""
+    funcs = app.after_request_funcs.get(None, [])
+    for i, registered in enumerate(funcs):
+        if registered == fn:
+
+            @functools.wraps(fn)
+            def _timed(resp: Any) -> Any:
+                with segment(name):
+                    return fn(resp)
+
+            funcs[i] = _timed
+            return True
+    return False
+
+
+def init_request_timing(app: Flask) -> None:
+    """Connect signal and engine listeners (engine hooks once per process)."""
+    global _installed
+    app.config.setdefault("REQUEST_QUERY_BUDGET", 25)
+    app.config.setdefault("REQUEST_LATENCY_BUDGET_MS", 500)
+    before_render_template.connect(_render_started, app)
+    template_rendered.connect(_render_finished, app)
+    if not _installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor)
+        event.listen(Engine, "after_cursor_execute", _after_cursor)
+        event.listen(Engine, "handle_error", _on_error)
+        _installed = True
+
+
+__all__ = [
+    "RequestTiming",
+    "check_budget",
+    "current",
+    "init_request_timing",
+    "segment",
+    "server_timing",
+    "time_after_request",
+]
@@ -0,0 +1,266 @@
+# app/services/roi_counters.py
+from __future__ import annotations
+
+"""
+Write-behind aggregation for the weekly ROI counters (`fc:roi:{week}`).
+
+The metrics routes used to HINCRBY Redis in the request path and swallow
+every error, so a Redis blip silently lost counts. Now each worker folds
+deltas into memory (hash → field → delta, under a lock) and a daemon
+thread hands them to the metrics store (app/services/metrics_store.py:
+one MULTI/EXEC pipeline on Redis, one transaction on SQLite) every
+`ROI_FLUSH_MS`, or sooner once `ROI_FLUSH_EVENTS` events are pending:
+
+- a failed flush merges its batch back and is retried on the next tick
+  (all-or-nothing writes, so a retry does not double-apply half a batch);
+- memory is bounded by `ROI_BUFFER_MAX_FIELDS` pending fields — deltas
+  for new fields past the cap are dropped (existing fields still
+  accumulate) and counted in `fc_roi_dropped_deltas_total`;
+- the buffer is drained at interpreter exit (atexit), best effort.
+
+Set members (PFADD for the unique-visitor HyperLogLogs, SADD for their
+index; see app/services/uniques.py) ride the same flush and count toward
+the same cap. Keys may carry a TTL (re-applied on every flush that
+touches them) — rollup buckets and HLLs expire, see app/services/rollups.py.
+
+The hash layout is unchanged, so `send_weekly_roi` reads the same keys;
+counts just land up to one flush interval later. `ROI_WRITE_BEHIND=0`
+flushes in the request instead (still one pipeline per call).
+"""
+
+import atexit
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from flask import current_app, has_app_context
+
+from app.services import metrics_store
+from app.services.metrics import ROI_DROPPED, ROI_FLUSH_LATENCY, ROI_PENDING
+from app.services.metrics_store import Deltas, Members
+
+log = logging.getLogger(__name__)
+
+SET_COMMANDS = ("pfadd", "sadd")
+
+
+def _cfg(name: str, default: Any) -> Any:
+    v = current_app.config.get(name) if has_app_context() else None
+    return default if v is None else v
+
+
+def _size(*tables: Mapping[Any, Any]) -> int:
+    return sum(len(fields) for table in tables for fields in table.values())
+
+
+# ── Buffer ─────────────────────────────────────────────────────────
+
+class WriteBehindBuffer:
+    """Per-process pending deltas plus the daemon thread that flushes them."""
+
+    def __init__(self, flush_ms: int = 1000, flush_events: int = 500, max_fields: int = 20000) -> None:
+        self.flush_ms = flush_ms
+        self.flush_events = flush_events
+        self.max_fields = max_fields
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush at a time (thread, sync mode, atexit)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._counts: Deltas = {}
+        self._floats: Deltas = {}
+        self._members: Members = {}
+        self._ttls: Dict[str, int] = {}  # key → seconds, for keys written this flush
+        self._fields = 0
+        self._events = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+
+    @property
+    def alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _merge(self, key: str, counts: Mapping[str, Any], floats: Optional[Mapping[str, Any]]) -> None:
+        # Caller holds self._lock
+        dropped = 0
+        for table, deltas in ((self._counts, counts), (self._floats, floats or {})):
+            if not deltas:
+                continue
+            pending = table.setdefault(key, {})
+            for field, amount in deltas.items():
+                if field in pending:
+                    pending[field] += amount
+                elif self._fields < self.max_fields:
+                    pending[field] = amount
+                    self._fields += 1
+                else:
+                    dropped += 1
+        self._dropped(dropped)
+
+    def _merge_members(self, command: str, key: str, values: Iterable[str]) -> None:
+        # Caller holds self._lock
+        pending = self._members.setdefault((command, key), set())
+        dropped = 0
+        for value in values:
+            if value in pending:
+                continue
+            if self._fields < self.max_fields:
+                pending.add(value)
+                self._fields += 1
+            else:
+                dropped += 1
+        if not pending:
+            del self._members[(command, key)]
+        self._dropped(dropped)
+
+    def _dropped(self, n: int) -> None:
+        if n:
+            self.dropped += n
+            ROI_DROPPED.inc(n, reason="overflow")
+
+    def add(
+        self,
+        key: str,
+        counts: Mapping[str, int],
+        floats: Optional[Mapping[str, float]] = None,
+        events: int = 1,
+        ttl: int = 0,
+    ) -> None:
+        with self._lock:
+            self._merge(key, counts, floats)
+            if ttl > 0:
+                self._ttls[key] = ttl
+            self._events += events
+            due = self._events >= self.flush_events
+        self._ensure_thread()
+        if due:
+            self._wake.set()
+
+    def add_members(self, command: str, members: Mapping[str, Iterable[str]], ttl: int = 0) -> None:
+        """Queue PFADD/SADD members per key (deduplicated until the flush)."""
+        if command not in SET_COMMANDS:
+            raise ValueError(f"unsupported set command: {command}")
+        with self._lock:
+            for key, values in members.items():
+                self._merge_members(command, key, values)
+                if ttl > 0:
+                    self._ttls[key] = ttl
+        self._ensure_thread()
+
+    def flush(self) -> bool:
+        """Write everything pending; on failure the batch goes back for the next attempt."""
+        with self._flush_lock:
+            with self._lock:
+                counts, floats, members, ttls = self._counts, self._floats, self._members, self._ttls
+                self._counts, self._floats, self._members, self._ttls = {}, {}, {}, {}
+                self._fields = self._events = 0
+            n = _size(counts, floats, members)
+            if not n:
+                ROI_PENDING.set(0)
+                return True
+
+            store = metrics_store.backend()
+            if store is None:  # METRICS_BACKEND=none / nothing usable: nothing to retry against
+                self.dropped += n
+                ROI_DROPPED.inc(n, reason="no_backend")
+                ROI_PENDING.set(0)
+                return False
+
+            t0 = time.perf_counter()
+            try:
+                store.write(counts, floats, members, ttls)
+            except Exception as exc:
+                ROI_FLUSH_LATENCY.observe(time.perf_counter() - t0, outcome="error")
+                self.failures += 1
+                log.warning("roi counters: flush of %d fields failed (%s); retrying", n, exc)
+                with self._lock:
+                    for key in set(counts) | set(floats):
+                        self._merge(key, counts.get(key, {}), floats.get(key))
+                    for (command, key), values in members.items():
+                        self._merge_members(command, key, values)
+                    for key, seconds in ttls.items():
+                        self._ttls.setdefault(key, seconds)
+                    ROI_PENDING.set(self._fields)
+                return False
+            ROI_FLUSH_LATENCY.observe(time.perf_counter() - t0, outcome="ok")
+            self.flushes += 1
+            with self._lock:
+                ROI_PENDING.set(self._fields)
+            return True
+
+    def _ensure_thread(self) -> None:
+        if self.alive or self._stop.is_set():
+            return
+        with self._start_lock:
+            if self.alive or self._stop.is_set():
+                return
+            self.flush_ms = int(_cfg("ROI_FLUSH_MS", self.flush_ms))
+            self.flush_events = int(_cfg("ROI_FLUSH_EVENTS", self.flush_events))
+            self.max_fields = int(_cfg("ROI_BUFFER_MAX_FIELDS", self.max_fields))
+
+            def _run() -> None:
+                while not self._stop.is_set():
+                    self._wake.wait(timeout=max(0.01, self.flush_ms / 1000.0))
+                    self._wake.clear()
+                    try:
+                        self.flush()
+                    except Exception:
+                        log.debug("roi counters: flush loop error", exc_info=True)
+
+            self._thread = threading.Thread(target=_run, name="fc-roi-flush", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Stop the thread and drain what is left (atexit)."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        try:
+            self.flush()
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending, events = self._fields, self._events
+        return {
+            "alive": self.alive,
+            "pending_fields": pending,
+            "pending_events": events,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "dropped": self.dropped,
+        }
+
+
+buffer = WriteBehindBuffer()
+atexit.register(buffer.close)
+
+
+def record(
+    key: str,
+    counts: Mapping[str, int],
+    floats: Optional[Mapping[str, float]] = None,
+    events: int = 1,
+    ttl: int = 0,
+    also: Optional[Mapping[str, int]] = None,
+) -> None:
+    """
+    Count `events` worth of deltas against hash `key` (buffered unless
+    ROI_WRITE_BEHIND is off). `also` maps further hashes — rollup buckets —
+    to their TTL; they receive the same deltas in the same flush.
+    """
+    if not (counts or floats):
+        return
+    for extra, extra_ttl in (also or {}).items():
+        buffer.add(extra, counts, floats, events=0, ttl=extra_ttl)
+    buffer.add(key, counts, floats, events, ttl=ttl)
+    if not _cfg("ROI_WRITE_BEHIND", True):
+        buffer.flush()
+
+
+__all__ = ["SET_COMMANDS", "WriteBehindBuffer", "buffer", "record"]
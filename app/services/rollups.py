@@ -0,0 +1,205 @@
+# app/services/rollups.py
+from __future__ import annotations
+
+"""
+Time-bucketed ROI rollups (minute / hour / day) with retention, and
+aligned range queries over them.
+
+`fc:roi:{week}` only answers "this week so far" and never expires. Every
+ROI delta recorded through `record()` now also lands in three bucket
+hashes with the same field layout, all in the same write-behind flush
+(app/services/roi_counters.py):
+
+    fc:roi:1m:{epoch}   minute buckets   ROI_RETENTION_MINUTE_HOURS (48 h)
+    fc:roi:1h:{epoch}   hour buckets     ROI_RETENTION_HOUR_DAYS    (35 d)
+    fc:roi:1d:{epoch}   UTC day buckets  ROI_RETENTION_DAY_DAYS     (400 d)
+
+`{epoch}` is the bucket start in Unix seconds. Compaction happens in the
+buffer: a flush's deltas are already summed in memory and HINCRBY-ed into
+the minute, hour and day bucket together, so there is no read-back job (and
+no double-compaction race between workers); fine buckets simply expire.
+Each TTL is re-applied by every flush that touches the key, and the weekly
+hash gets `ROI_RETENTION_WEEK_DAYS`, so no key accumulates forever.
+
+`series()` reads only the buckets covering the range at the coarsest
+resolution that divides `step` (a pipelined HMGET per bucket on Redis, one
+indexed query on the SQLite store; app/services/metrics_store.py) and sums them
+into step-aligned points — a NumPy reshape/sum when NumPy is installed,
+plain Python otherwise.
+"""
+
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from flask import current_app, has_app_context
+
+from app.services import metrics_store, roi_counters
+
+try:  # optional: vectorized aggregation for long ranges
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover
+    np = None  # type: ignore
+
+RESOLUTIONS: Dict[str, int] = {"1m": 60, "1h": 3600, "1d": 86400}
+_RETENTION = {  # name → (config key, default, seconds per unit)
+    "1m": ("ROI_RETENTION_MINUTE_HOURS", 48, 3600),
+    "1h": ("ROI_RETENTION_HOUR_DAYS", 35, 86400),
+    "1d": ("ROI_RETENTION_DAY_DAYS", 400, 86400),
+    "week": ("ROI_RETENTION_WEEK_DAYS", 400, 86400),
+}
+_STEP_RE = re.compile(r"^(\d+)\s*([smhd]?)$")
+_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def _cfg(name: str, default: Any) -> Any:
+    v = current_app.config.get(name) if has_app_context() else None
+    return default if v is None else v
+
+
+def retention(name: str) -> int:
+    """TTL in seconds for a resolution ("1m", "1h", "1d") or the weekly hash ("week"); 0 = keep."""
+    key, default, unit = _RETENTION[name]
+    return max(0, int(float(_cfg(key, default)) * unit))
+
+
+def bucket_key(resolution: str, ts: float) -> str:
+    size = RESOLUTIONS[resolution]
+    return f"fc:roi:{resolution}:{int(ts) // size * size}"
+
+
+def bucket_keys(ts: Optional[float] = None) -> Dict[str, int]:
+    """Bucket hashes (→ TTL) that a delta at `ts` lands in."""
+    ts = time.time() if ts is None else ts
+    return {bucket_key(res, ts): retention(res) for res in RESOLUTIONS}
+
+
+def record(
+    week: str,
+    counts: Mapping[str, int],
+    floats: Optional[Mapping[str, float]] = None,
+    events: int = 1,
+    ts: Optional[float] = None,
+) -> None:
+    """ROI deltas into `fc:roi:{week}` and the minute/hour/day buckets for `ts` (now)."""
+    roi_counters.record(
+        f"fc:roi:{week}", counts, floats, events, ttl=retention("week"), also=bucket_keys(ts)
+    )
+
+
+# ── Range queries ──────────────────────────────────────────────────
+
+def parse_step(raw: Any) -> int:
+    """"90", "15m", "1h", "2d" → seconds (ValueError otherwise)."""
+    m = _STEP_RE.match(str(raw).strip().lower())
+    if not m or int(m.group(1)) <= 0:
+        raise ValueError(f"Invalid step: {raw!r} (use seconds or e.g. 5m, 1h, 1d).")
+    return int(m.group(1)) * _UNITS[m.group(2)]
+
+
+def parse_time(raw: Optional[str]) -> Optional[int]:
+    """Unix seconds or ISO-8601 (naive = UTC) → Unix seconds; None/"" → None."""
+    if raw is None or not str(raw).strip():
+        return None
+    s = str(raw).strip()
+    if re.fullmatch(r"-?\d+(\.\d+)?", s):
+        return int(float(s))
+    try:
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {raw!r} (use Unix seconds or ISO-8601).")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def resolution_for(step: int) -> str:
+    """Coarsest stored resolution that divides `step`."""
+    for res in ("1d", "1h", "1m"):
+        if step % RESOLUTIONS[res] == 0:
+            return res
+    raise ValueError("step must be a whole number of minutes.")
+
+
+def _num(v: Any) -> float:
+    if v is None:
+        return 0.0
+    try:
+        return float(v.decode() if isinstance(v, (bytes, bytearray)) else v)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _fetch(store: Any, resolution: str, starts: Sequence[int], fields: Sequence[str]) -> List[List[float]]:
+    if store is None or not starts:
+        return [[0.0] * len(fields) for _ in starts]
+    rows = store.hmget_many([bucket_key(resolution, start) for start in starts], list(fields))
+    return [[_num(v) for v in row] for row in rows]
+
+
+def _fold(rows: List[List[float]], per: int, n_fields: int) -> List[List[float]]:
+    """Sum consecutive groups of `per` bucket rows → one column per field."""
+    if not rows:
+        return [[] for _ in range(n_fields)]
+    if np is not None:
+        grid = np.asarray(rows, dtype=np.float64).reshape(-1, per, n_fields).sum(axis=1)
+        return grid.T.tolist()
+    cols: List[List[float]] = [[] for _ in range(n_fields)]
+    for i in range(0, len(rows), per):
+        group = rows[i:i + per]
+        for j in range(n_fields):
+            cols[j].append(sum(row[j] for row in group))
+    return cols
+
+
+def series(
+    fields: Sequence[str],
+    start: int,
+    end: int,
+    step: int,
+    store: Any = None,
+    max_buckets: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Step-aligned sums of `fields` over [start, end): the range is widened to
+    whole steps (UTC-epoch aligned); point `t[i]` covers [t[i], t[i] + step).
+    """
+    if end <= start:
+        raise ValueError("'to' must be after 'from'.")
+    resolution = resolution_for(step)
+    size = RESOLUTIONS[resolution]
+    per = step // size
+    start = start // step * step
+    end = -(-end // step) * step
+    n_points = (end - start) // step
+    limit = int(max_buckets if max_buckets is not None else _cfg("ROI_RANGE_MAX_BUCKETS", 5000))
+    if n_points * per > limit:
+        raise ValueError(
+            f"Range needs {n_points * per} {resolution} buckets (limit {limit}); use a larger step or a shorter range."
+        )
+
+    store = metrics_store.backend() if store is None else store
+    starts = [start + i * size for i in range(n_points * per)]
+    cols = _fold(_fetch(store, resolution, starts, fields), per, len(fields))
+    return {
+        "from": start,
+        "to": end,
+        "step": step,
+        "resolution": resolution,
+        "t": [start + i * step for i in range(n_points)],
+        "series": {f: [int(v) if float(v).is_integer() else v for v in col] for f, col in zip(fields, cols)},
+    }
+
+
+__all__ = [
+    "RESOLUTIONS",
+    "bucket_key",
+    "bucket_keys",
+    "parse_step",
+    "parse_time",
+    "record",
+    "resolution_for",
+    "retention",
+    "series",
+]
@@ -0,0 +1,174 @@
+# app/services/schema_registry.py
+from __future__ import annotations
+
+"""
+Schema-presence registry.
+
+Blueprints stay tolerant of missing tables (dev/offline installs), but asking
+the live engine `has_table()` on every request costs a catalog query per call
+on Postgres. The registry snapshots the table names once per app — at
+create_app time, after `flask db upgrade`, or when an admin asks for a
+refresh — and answers `table_exists()` from memory.
+
+Every worker keeps its own snapshot, so a refresh is announced as a change
+of the pseudo-table `SCHEMA_KEY` (data_version → invalidation bus); other
+workers see its version move and re-inspect on their next lookup. Messages
+can be lost and a CLI upgrade may exit before publishing, so a miss also
+re-inspects, at most once per `SCHEMA_MISS_TTL` seconds.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, FrozenSet, Optional
+
+from flask import Flask, current_app
+from sqlalchemy import inspect as sa_inspect
+
+from app.extensions import db
+from app.services import data_version
+
+log = logging.getLogger(__name__)
+
+EXT_KEY = "schema_registry"
+SCHEMA_KEY = "__schema__"  # data_version key bumped by refresh_schema()
+
+
+class SchemaRegistry:
+    """In-memory set of table names for one engine, with usage counters."""
+
+    def __init__(self, miss_ttl: float = 30.0) -> None:
+        self._lock = threading.Lock()
+        self._tables: Optional[FrozenSet[str]] = None
+        self._seen = 0  # SCHEMA_KEY version the snapshot reflects
+        self.miss_ttl = miss_ttl
+        self.refreshed_at: Optional[float] = None
+        self.inspections = 0  # real catalog round trips
+        self.calls = 0        # has_table() questions asked
+        self.lookups = 0      # ... answered from memory without inspecting
+
+    @property
+    def loaded(self) -> bool:
+        return self._tables is not None
+
+    def refresh(self, engine: Any = None) -> FrozenSet[str]:
+        """Re-read table names from the database (one inspection; engine or connection)."""
+        engine = engine if engine is not None else db.engine
+        seen = data_version.version(SCHEMA_KEY)
+        self.inspections += 1
+        try:
+            names = frozenset(sa_inspect(engine).get_table_names())
+        except Exception as exc:
+            # Keep the last snapshot (or stay unloaded so the next lookup retries)
+            log.warning("Schema registry refresh failed: %s", exc)
+            return self._tables or frozenset()
+        with self._lock:
+            self._tables = names
+            self._seen = seen
+            self.refreshed_at = time.time()
+        return names
+
+    def _miss_expired(self) -> bool:
+        return bool(self.miss_ttl) and time.time() - (self.refreshed_at or 0.0) >= self.miss_ttl
+
+    def has_table(self, model_or_name: Any, bind: Any = None) -> bool:
+        name = getattr(model_or_name, "__tablename__", None) or (
+            model_or_name if isinstance(model_or_name, str) else None
+        )
+        if not name:
+            return False
+        self.calls += 1
+        tables = self._tables
+        if tables is None or data_version.version(SCHEMA_KEY) > self._seen:
+            tables = self.refresh(bind)
+        elif name not in tables and self._miss_expired():
+            tables = self.refresh(bind)  # e.g. migrated by another process
+        else:
+            self.lookups += 1
+        return name in tables
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tables": sorted(self._tables or ()),
+            "refreshed_at": self.refreshed_at,
+            "inspections": self.inspections,
+            "lookups": self.lookups,
+            # one inspection per call without the registry, minus the ones it did make
+            "inspections_saved": max(0, self.calls - self.inspections),
+        }
+
+
+def get_registry(app: Optional[Flask] = None) -> SchemaRegistry:
+    app = app or current_app._get_current_object()  # type: ignore[attr-defined]
+    reg = app.extensions.get(EXT_KEY)
+    if reg is None:
+        reg = app.extensions.setdefault(EXT_KEY, SchemaRegistry())
+    return reg
+
+
+def table_exists(model_or_name: Any, bind: Any = None) -> bool:
+    """
+    Cheap replacement for `sa_inspect(db.engine).has_table(...)`. Flush hooks
+    pass their connection as `bind` so a first-time load never checks out
+    (or resets) another connection mid-transaction.
+    """
+    try:
+        return get_registry().has_table(model_or_name, bind)
+    except Exception:
+        return False
+
+
+def refresh_schema(app: Optional[Flask] = None) -> FrozenSet[str]:
+    """Re-inspect here and tell the other workers to do the same (via the bus)."""
+    app = app or current_app._get_current_object()  # type: ignore[attr-defined]
+    data_version.mark_changed(None, SCHEMA_KEY)
+    with app.app_context():
+        return get_registry(app).refresh()
+
+
+def _wrap_migrate_upgrade() -> None:
+    """Refresh the registry once `flask db upgrade` has applied migrations."""
+    try:
+        from flask_migrate.cli import db as db_group  # registered via entry point
+
+        cmd = db_group.commands.get("upgrade")
+    except Exception:
+        cmd = None
+    if cmd is None or getattr(cmd.callback, "_fc_schema_refresh", False):
+        return
+    original = cmd.callback
+
+    def _upgrade_then_refresh(*args: Any, **kwargs: Any) -> Any:
+        result = original(*args, **kwargs)
+        try:
+            tables = refresh_schema(current_app._get_current_object())  # type: ignore[attr-defined]
+            log.info("Schema registry refreshed after upgrade (%d tables)", len(tables))
+        except Exception:
+            log.debug("Schema refresh after upgrade skipped", exc_info=True)
+        return result
+
+    _upgrade_then_refresh._fc_schema_refresh = True  # type: ignore[attr-defined]
+    cmd.callback = _upgrade_then_refresh
+
+
+def init_schema_registry(app: Flask) -> SchemaRegistry:
+    """Build the registry for `app` (call after db.init_app / create_all)."""
+    reg = get_registry(app)
+    reg.miss_ttl = float(app.config.get("SCHEMA_MISS_TTL", reg.miss_ttl) or 0)
+    try:
+        with app.app_context():
+            reg.refresh()
+    except Exception:
+        app.logger.warning("Schema registry: initial load deferred", exc_info=True)
+    _wrap_migrate_upgrade()
+    return reg
+
+
+__all__ = [
+    "SCHEMA_KEY",
+    "SchemaRegistry",
+    "get_registry",
+    "table_exists",
+    "refresh_schema",
+    "init_schema_registry",
+]
@@ -0,0 +1,96 @@
+# app/services/snapshot_cache.py
+from __future__ import annotations
+
+"""
+Versioned snapshot cache.
+
+A snapshot is a dict of plain values (no ORM objects) computed by a builder
+and stored under a name together with the data version it was built at and a
+content ETag. While the version is unchanged (and the entry is younger than
+its TTL) `get()` returns it without calling the builder, so conditional GETs
+and repeat renders skip the database entirely.
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from hashlib import sha1
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from app.services import data_version
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    name: str
+    version: int
+    etag: str
+    data: Dict[str, Any]
+    built_at: float = field(default_factory=time.monotonic)
+
+
+def content_etag(data: Any) -> str:
+    """Short, stable content hash (12 hex chars, like the rest of the app)."""
+    raw = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+class SnapshotCache:
+    """Thread-safe name → Snapshot map, invalidated by data_version bumps."""
+
+    def __init__(self, ttl: float = 30.0) -> None:
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Snapshot] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def peek(self, name: str, tables: Iterable[str], ttl: Optional[float] = None) -> Optional[Snapshot]:
+        """Return the cached snapshot if still current, else None (no build)."""
+        snap = self._entries.get(name)
+        if snap is None or snap.version != data_version.version(*tables):
+            return None
+        limit = self.ttl if ttl is None else float(ttl)
+        if limit > 0 and (time.monotonic() - snap.built_at) > limit:
+            return None
+        return snap
+
+    def get(
+        self,
+        name: str,
+        tables: Iterable[str],
+        builder: Callable[[], Dict[str, Any]],
+        ttl: Optional[float] = None,
+    ) -> Snapshot:
+        tables = tuple(tables)
+        snap = self.peek(name, tables, ttl)
+        if snap is not None:
+            self.hits += 1
+            return snap
+
+        # Read the version *before* building: a write racing the build leaves
+        # the entry one version behind, so the next reader rebuilds.
+        ver = data_version.version(*tables)
+        data = builder()
+        snap = Snapshot(name=name, version=ver, etag=content_etag(data), data=data)
+        with self._lock:
+            self._entries[name] = snap
+            self.misses += 1
+        return snap
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "ttl": self.ttl}
+
+
+# Process-wide instance shared by blueprints
+snapshots = SnapshotCache()
+
+__all__ = ["Snapshot", "SnapshotCache", "content_etag", "snapshots"]
@@ -0,0 +1,118 @@
+# app/services/startup_profile.py
+from __future__ import annotations
+
+"""
+Where does `create_app()` spend its time?
+
+Two sources, combined by `flask startup-profile`:
+
+- `StartupProfile` — create_app records each extension init / blueprint
+  registration as a named step (wall ms). It lives on
+  `app.extensions["fc_startup"]`.
+- `python -X importtime` — a *fresh* interpreter builds the app so module
+  import cost is measured cold, the way a gunicorn worker or an autoscaled
+  instance pays it. `parse_importtime` turns its stderr into rows.
+
+`profile_startup()` runs that child process and returns both as a dict.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+_MARK = "FC_STARTUP_PROFILE:"
+
+_CHILD = """
+import json, time
+t0 = time.perf_counter()
+from app import create_app
+app = create_app(__CONFIG__)
+prof = app.extensions.get("fc_startup")
+steps = prof.steps if prof else []
+print(__MARK__ + json.dumps({"total_ms": (time.perf_counter() - t0) * 1000, "steps": steps}))
+"""
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StartupProfile:
+    """Named wall-clock steps recorded while the app factory runs."""
+
+    def __init__(self) -> None:
+        self.steps: List[List[Any]] = []  # [name, ms] — JSON friendly
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append([name, round((time.perf_counter() - t0) * 1000, 3)])
+
+    def total_ms(self) -> float:
+        return sum(ms for _, ms in self.steps)
+
+
+# ── -X importtime ──────────────────────────────────────────────────
+
+def parse_importtime(text: str) -> List[Dict[str, Any]]:
+    """
+    Rows from `-X importtime` stderr: {"module", "self_ms", "cumulative_ms", "depth"}.
+    Non-importtime lines (logging, warnings) are ignored.
+    """
+    rows: List[Dict[str, Any]] = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cum_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # header row
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        rows.append({
+            "module": stripped,
+            "self_ms": self_us / 1000.0,
+            "cumulative_ms": cum_us / 1000.0,
+            "depth": (len(name) - len(stripped)) // 2,
+        })
+    return rows
+
+
+def top_imports(rows: List[Dict[str, Any]], *, prefix: str = "", limit: int = 25) -> List[Dict[str, Any]]:
+    """Heaviest modules by cumulative time, optionally only those under `prefix`."""
+    picked = [r for r in rows if not prefix or r["module"] == prefix or r["module"].startswith(prefix + ".")]
+    return sorted(picked, key=lambda r: r["cumulative_ms"], reverse=True)[:limit]
+
+
+# ── Child process ──────────────────────────────────────────────────
+
+def profile_startup(config: Optional[str] = None, *, timeout: float = 120.0) -> Dict[str, Any]:
+    """Build the app in a fresh interpreter; return steps, total and import rows."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (_ROOT, env.get("PYTHONPATH")) if p)
+    code = _CHILD.replace("__CONFIG__", repr(config)).replace("__MARK__", repr(_MARK))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=timeout,
+    )
+    result: Dict[str, Any] = {"returncode": proc.returncode, "total_ms": None, "steps": []}
+    for line in proc.stdout.splitlines():
+        if line.startswith(_MARK):
+            result.update(json.loads(line[len(_MARK):]))
+    result["imports"] = parse_importtime(proc.stderr)
+    if proc.returncode != 0:
+        result["error"] = proc.stderr.strip().splitlines()[-1:] or ["unknown error"]
+    return result
+
+
+__all__ = ["StartupProfile", "parse_importtime", "top_imports", "profile_startup"]
@@ -0,0 +1,185 @@
+# app/services/stats_stream.py
+from __future__ import annotations
+
+"""
+Per-process Server-Sent Events fan-out for live fundraising totals.
+
+One daemon "pump" thread per worker owns the data while anyone is
+subscribed: it rebuilds the payload when this process commits a
+fundraising write (data_version listener) or every `SSE_POLL_SECONDS`
+(picks up writes made by other workers), and only publishes when the
+payload actually changed. It stops when the last subscriber leaves and
+the next one starts it again. Each change is serialized to
+SSE bytes once; every open connection writes those same bytes.
+
+Event ids are the payload's content hash, so a client resuming with
+`Last-Event-ID` (on any worker) is only re-sent data when it differs.
+
+Each open stream holds a worker thread under gthread, so streams take a
+slot in the parked-request budget they share with long-polls
+(app/services/longpoll.py: a quarter of the worker's threads); extra
+clients get 503 + Retry-After and fall back to polling. Streams are meant to be served by the eventlet service
+(gunicorn.sse.conf.py, routed by nginx), where a client costs a greenlet
+and the cap is `SSE_ASYNC_MAX_CLIENTS`. `SSE_MAX_SECONDS` recycles
+long-lived streams.
+"""
+
+import json
+import logging
+import threading
+import time
+from hashlib import sha1
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from app.services import data_version
+from app.services.longpoll import budget, parked
+
+log = logging.getLogger(__name__)
+
+HEARTBEAT = b": hb\n\n"
+
+
+def capacity(config: Any) -> int:
+    """Parked requests (streams + long-polls) a new stream may join (`SSE_MAX_CLIENTS` > 0 overrides)."""
+    return budget(config, int(config.get("SSE_MAX_CLIENTS") or 0))
+
+
+class StatsBroadcaster:
+    """Latest encoded event + condition variable shared by all subscribers."""
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._pump: Optional[threading.Thread] = None
+        self.seq = 0
+        self.event_id: Optional[str] = None
+        self.event: Optional[bytes] = None
+        self.clients = 0
+        self.published = 0
+        self.builds = 0
+
+    # ── Publishing ──────────────────────────────────────────────
+    def publish(self, data: Dict[str, Any]) -> bool:
+        """Encode once and wake subscribers; no-op if content is unchanged."""
+        body = json.dumps(data, sort_keys=True, separators=(",", ":"))
+        event_id = sha1(body.encode("utf-8")).hexdigest()[:12]
+        with self._cond:
+            if event_id == self.event_id:
+                return False
+            self.seq += 1
+            payload = dict(data, seq=self.seq)
+            self.event = (
+                f"id: {event_id}\nevent: stats\n"
+                f"data: {json.dumps(payload, separators=(',', ':'))}\n\n"
+            ).encode("utf-8")
+            self.event_id = event_id
+            self.published += 1
+            self._cond.notify_all()
+        return True
+
+    # ── Slots ───────────────────────────────────────────────────
+    def acquire(self, limit: int) -> bool:
+        """Reserve a parked-request slot (False at `limit`); pair with `release()`."""
+        if not parked.acquire(limit):
+            return False
+        with self._cond:
+            self.clients += 1
+        return True
+
+    def release(self) -> None:
+        with self._cond:
+            self.clients = max(0, self.clients - 1)
+            last = self.clients == 0
+        parked.release()
+        if last:
+            self._wake.set()  # let the pump notice nobody is listening and stop
+
+    def poke(self) -> None:
+        """Ask the pump to rebuild now (called after local commits)."""
+        self._wake.set()
+
+    # ── Pump ────────────────────────────────────────────────────
+    def start(self, app: Any, builder: Callable[[], Dict[str, Any]], poll: float) -> None:
+        """
+        Start the pump if it isn't running (called by each subscriber after
+        `acquire`). The pump stops when the last subscriber leaves, so an
+        idle process does no periodic rebuilds.
+        """
+        with self._cond:
+            if self._pump is not None:
+                return
+
+            def _run() -> None:
+                while True:
+                    try:
+                        with app.app_context():
+                            self.builds += 1
+                            self.publish(builder())
+                    except Exception:
+                        log.warning("stats stream: payload build failed", exc_info=True)
+                    self._wake.wait(timeout=poll)
+                    self._wake.clear()
+                    with self._cond:  # same lock as acquire/start: a joining client restarts us
+                        if self.clients == 0:
+                            self._pump = None
+                            self.event = self.event_id = None  # next subscriber waits for a fresh build
+                            return
+
+            self._pump = threading.Thread(target=_run, name="fc-stats-pump", daemon=True)
+            self._pump.start()
+
+    # ── Subscribing ─────────────────────────────────────────────
+    def stream(
+        self,
+        last_event_id: Optional[str],
+        heartbeat: float,
+        max_seconds: float,
+        retry_ms: int = 3000,
+    ) -> Iterator[bytes]:
+        """
+        Generator for one connection: current state, then changes +
+        heartbeats. The caller holds the slot (`acquire`) for its lifetime.
+        """
+        yield f"retry: {int(retry_ms)}\n\n".encode("ascii")
+        seen = -1
+        deadline = time.monotonic() + max_seconds if max_seconds > 0 else None
+        while True:
+            with self._cond:
+                if self.event is not None and self.seq != seen:
+                    seen, event, event_id = self.seq, self.event, self.event_id
+                else:
+                    self._cond.wait(timeout=heartbeat)
+                    event = None
+                    if self.event is not None and self.seq != seen:
+                        seen, event, event_id = self.seq, self.event, self.event_id
+            if event is not None:
+                if event_id != last_event_id:
+                    yield event
+                last_event_id = None  # only suppress the resume duplicate once
+            else:
+                yield HEARTBEAT
+            if deadline is not None and time.monotonic() >= deadline:
+                return  # client reconnects with Last-Event-ID
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": self.clients,
+            "seq": self.seq,
+            "event_id": self.event_id,
+            "published": self.published,
+            "builds": self.builds,
+            "pump_alive": bool(self._pump and self._pump.is_alive()),
+        }
+
+
+broadcaster = StatsBroadcaster()
+
+
+def _on_bump(tables: Any) -> None:
+    if set(tables) & set(data_version.FUNDRAISING_TABLES):
+        broadcaster.poke()
+
+
+data_version.subscribe(_on_bump)
+
+__all__ = ["StatsBroadcaster", "broadcaster", "capacity", "HEARTBEAT"]
@@ -0,0 +1,296 @@
+# app/services/uniques.py
+from __future__ import annotations
+
+"""
+Approximate unique visitors per ISO week, overall and per ROI dimension.
+
+Raw impression/click counts (`fc:roi:{week}`) are inflated by refreshes
+and bots; these are HyperLogLog cardinalities of a visitor hash instead:
+
+    fc:uv:{week}:imp                    every visitor who saw an impression
+    fc:uv:{week}:imp:route:/tiers       … per key / route / peer / campaign / source
+    fc:uv:{week}:click[:dim:value]      same for clicks
+    fc:uv:{week}:index                  SET of the suffixes above (for reporting)
+
+Each HyperLogLog is at most ~12 KB (~0.81% standard error) whatever the
+traffic, and a few hundred bytes while it has seen few visitors. Members
+are PFADD/SADD-ed through the ROI write-behind buffer
+(app/services/roi_counters.py) into the metrics store — Redis, or the
+embedded SQLite store, which keeps the same sparse/dense register blobs
+(app/services/metrics_store.py). With no store at all
+(`METRICS_BACKEND=none`) each process keeps in-memory `HyperLogLog`s of
+the same shape (at most `ROI_UNIQUES_MAX_LOCAL` of them).
+
+Dimension values come from the client, so each dimension admits at most
+`ROI_MAX_DIMENSION_VALUES` distinct values per week; later newcomers are
+folded into `other` (`bound_ctx`). The same folded context feeds the raw
+counters (app/blueprints/fc_metrics.py), so neither the HLL keys nor the
+`fc:roi:{week}` hash fields grow with attacker-chosen values. The cap is
+per process, seeded from the week's index when the store has one, so
+concurrent workers can overshoot it by a few values each.
+
+The visitor hash is an HMAC of a client-supplied anonymous id (`vid`) or,
+failing that, IP + User-Agent, keyed by the app secret *and the week* — the
+raw identifier is never stored and hashes do not link across weeks.
+"""
+
+import hashlib
+import hmac
+import logging
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from flask import current_app, has_app_context
+
+from app.services import metrics_store, roi_counters
+from app.services.metrics import ROI_DROPPED
+
+log = logging.getLogger(__name__)
+
+DIMENSIONS = ("key", "route", "peer", "campaign", "source")
+OTHER = "other"
+_PREFIX = {"impression": "imp", "click": "click"}
+
+
+def _cfg(name: str, default: Any) -> Any:
+    v = current_app.config.get(name) if has_app_context() else None
+    return default if v is None else v
+
+
+# ── HyperLogLog (in-process fallback) ──────────────────────────────
+
+class HyperLogLog:
+    """
+    HLL like Redis': 2**14 six-bit registers, ~0.81% standard error. Small
+    sets stay sparse (index → rank, 3 bytes per set register); past
+    SPARSE_MAX set registers they are packed dense into 12 KiB.
+    """
+
+    P = 14
+    M = 1 << P
+    DENSE_BYTES = M * 6 // 8 + 1  # +1: last register straddles a byte
+    SPARSE_MAX = 1024  # 3 KiB sparse, a quarter of dense
+    __slots__ = ("_regs", "_sparse", "_count")
+
+    def __init__(self) -> None:
+        self._regs: Optional[bytearray] = None
+        self._sparse: Optional[Dict[int, int]] = {}
+        self._count: Optional[int] = None
+
+    def _get(self, i: int) -> int:
+        byte, off = divmod(i * 6, 8)
+        return ((self._regs[byte] | (self._regs[byte + 1] << 8)) >> off) & 63
+
+    def _set(self, i: int, rank: int) -> None:
+        byte, off = divmod(i * 6, 8)
+        word = (self._regs[byte] | (self._regs[byte + 1] << 8)) & ~(63 << off) | (rank << off)
+        self._regs[byte] = word & 0xFF
+        self._regs[byte + 1] = (word >> 8) & 0xFF
+
+    def _densify(self) -> None:
+        sparse, self._sparse = self._sparse or {}, None
+        self._regs = bytearray(self.DENSE_BYTES)
+        for i, rank in sparse.items():
+            self._set(i, rank)
+
+    def add(self, item: str) -> bool:
+        h = int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big")
+        index, rest = h >> (64 - self.P), h & ((1 << (64 - self.P)) - 1)
+        rank = (64 - self.P) - rest.bit_length() + 1
+        if self._sparse is not None:
+            if rank <= self._sparse.get(index, 0):
+                return False
+            self._sparse[index] = rank
+            if len(self._sparse) > self.SPARSE_MAX:
+                self._densify()
+        else:
+            if rank <= self._get(index):
+                return False
+            self._set(index, rank)
+        self._count = None
+        return True
+
+    def _ranks(self) -> Iterable[int]:
+        """Non-zero registers (sparse: just the set ones; dense: 4 per 3 bytes)."""
+        if self._sparse is not None:
+            return self._sparse.values()
+        regs = self._regs
+        out = []
+        for j in range(0, self.M * 6 // 8, 3):
+            w = regs[j] | (regs[j + 1] << 8) | (regs[j + 2] << 16)
+            out += (w & 63, (w >> 6) & 63, (w >> 12) & 63, w >> 18)
+        return [r for r in out if r]
+
+    def count(self) -> int:
+        if self._count is None:
+            m = self.M
+            ranks = list(self._ranks())
+            zeros = m - len(ranks)
+            estimate = (0.7213 / (1 + 1.079 / m)) * m * m / (zeros + sum(2.0 ** -r for r in ranks))
+            if estimate <= 2.5 * m and zeros:
+                estimate = m * math.log(m / zeros)  # linear counting for small sets
+            self._count = int(round(estimate))
+        return self._count
+
+    @property
+    def sparse(self) -> bool:
+        return self._sparse is not None
+
+    @property
+    def nbytes(self) -> int:
+        return 3 * len(self._sparse) if self._sparse is not None else len(self._regs)
+
+    def tobytes(self) -> bytes:
+        """Dense: the packed registers (DENSE_BYTES). Sparse: 3-byte (index << 6 | rank) entries."""
+        if self._sparse is None:
+            return bytes(self._regs)
+        return b"".join(((i << 6) | r).to_bytes(3, "big") for i, r in sorted(self._sparse.items()))
+
+    @classmethod
+    def frombytes(cls, data: bytes) -> "HyperLogLog":
+        hll = cls()
+        if len(data) == cls.DENSE_BYTES:
+            hll._sparse, hll._regs = None, bytearray(data)
+        elif len(data) % 3 == 0:  # DENSE_BYTES isn't a multiple of 3, so the sizes can't collide
+            for j in range(0, len(data), 3):
+                entry = int.from_bytes(data[j:j + 3], "big")
+                hll._sparse[entry >> 6] = entry & 63
+            if len(hll._sparse) > cls.SPARSE_MAX:
+                hll._densify()
+        return hll
+
+
+_lock = threading.Lock()
+_local: "OrderedDict[str, HyperLogLog]" = OrderedDict()
+_admitted: "OrderedDict[str, Dict[str, Set[str]]]" = OrderedDict()  # week → dim → values
+_WEEKS_KEPT = 2
+
+
+# ── Keys / hashing ─────────────────────────────────────────────────
+
+def visitor_hash(raw: str, week: str, secret: Optional[str] = None) -> str:
+    """Week-scoped keyed hash of a visitor identifier (64 bits, hex)."""
+    if secret is None:
+        secret = str(_cfg("SECRET_KEY", "") or "")
+    key = f"{secret}:uv:{week}".encode("utf-8")
+    return hmac.new(key, raw.encode("utf-8"), hashlib.sha256).hexdigest()[:16]
+
+
+def suffixes(kind: str, ctx: Dict[str, str]) -> List[str]:
+    """HLL key suffixes one event touches: "imp", "imp:route:/tiers", …"""
+    prefix = _PREFIX[kind]
+    return [prefix] + [f"{prefix}:{dim}:{ctx[dim]}" for dim in DIMENSIONS if ctx.get(dim)]
+
+
+def _key(week: str, suffix: str) -> str:
+    return f"fc:uv:{week}:{suffix}"
+
+
+def _seed(week: str) -> Dict[str, Set[str]]:
+    """Values already recorded for `week` (from the store's index) count toward the cap."""
+    seen: Dict[str, Set[str]] = {dim: set() for dim in DIMENSIONS}
+    store = metrics_store.backend()
+    if store is None:
+        return seen
+    try:
+        names = store.smembers(_key(week, "index"))
+    except Exception:
+        log.debug("uniques: index read failed", exc_info=True)
+        return seen
+    for name in names:
+        parts = str(name).split(":", 2)
+        if len(parts) == 3 and parts[1] in seen:
+            seen[parts[1]].add(parts[2])
+    return seen
+
+
+def bound_ctx(week: str, ctx: Dict[str, str]) -> Dict[str, str]:
+    """`ctx` with dimension values past this week's per-dimension cap replaced by `other`."""
+    cap = int(_cfg("ROI_MAX_DIMENSION_VALUES", 200))
+    if cap <= 0:
+        return ctx
+    with _lock:
+        admitted = _admitted.get(week)
+    if admitted is None:
+        fresh = _seed(week)  # outside the lock: may hit the store
+        with _lock:
+            admitted = _admitted.setdefault(week, fresh)
+            while len(_admitted) > _WEEKS_KEPT:
+                _admitted.popitem(last=False)
+    out = dict(ctx)
+    folded = 0
+    with _lock:
+        for dim in DIMENSIONS:
+            value = ctx.get(dim)
+            if not value or value == OTHER:
+                continue
+            values = admitted[dim]
+            if value in values:
+                continue
+            if len(values) >= cap:
+                out[dim] = OTHER
+                folded += 1
+            else:
+                values.add(value)
+    if folded:
+        ROI_DROPPED.inc(folded, reason="dimension_cap")
+    return out
+
+
+# ── Write / read ───────────────────────────────────────────────────
+
+def observe(week: str, events: Iterable[Tuple[str, Dict[str, str]]], visitor: str) -> None:
+    """Add `visitor` to every HLL the (type, ctx) events touch (values bounded by `bound_ctx`)."""
+    if not _cfg("ROI_UNIQUES", True):
+        return
+    touched = sorted({
+        s for kind, ctx in events if kind in _PREFIX for s in suffixes(kind, bound_ctx(week, ctx))
+    })
+    if not touched:
+        return
+    if metrics_store.backend() is not None:
+        ttl = int(float(_cfg("ROI_UNIQUES_TTL_DAYS", 0)) * 86400)
+        roi_counters.buffer.add_members("pfadd", {_key(week, s): (visitor,) for s in touched}, ttl=ttl)
+        roi_counters.buffer.add_members("sadd", {_key(week, "index"): touched}, ttl=ttl)
+        return
+
+    cap = int(_cfg("ROI_UNIQUES_MAX_LOCAL", 256))
+    dropped = 0
+    with _lock:
+        for s in touched:
+            key = _key(week, s)
+            hll = _local.get(key)
+            if hll is None:
+                if len(_local) >= cap:
+                    dropped += 1
+                    continue
+                hll = _local[key] = HyperLogLog()
+            hll.add(visitor)
+    if dropped:
+        ROI_DROPPED.inc(dropped, reason="hll_cap")
+
+
+def counts(week: str) -> Dict[str, int]:
+    """Suffix → approximate unique visitors for `week` ({} when nothing recorded)."""
+    store = metrics_store.backend()
+    if store is None:
+        head = _key(week, "")
+        with _lock:
+            return {k[len(head):]: hll.count() for k, hll in _local.items() if k.startswith(head)}
+    try:
+        names = sorted(store.smembers(_key(week, "index")))
+        return dict(zip(names, store.pfcount_many([_key(week, s) for s in names])))
+    except Exception:
+        log.debug("uniques: store read failed", exc_info=True)
+        return {}
+
+
+def reset_local() -> None:
+    with _lock:
+        _local.clear()
+        _admitted.clear()
+
+
+__all__ = ["DIMENSIONS", "OTHER", "HyperLogLog", "bound_ctx", "counts", "observe", "reset_local", "suffixes", "visitor_hash"]
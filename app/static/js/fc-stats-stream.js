@@ -0,0 +1,50 @@
+/*! FundChamps live totals — one SSE connection per tab instead of polling
+   - Subscribes to /stats/stream (override: <html data-stats-stream="...">)
+   - Dispatches `fc:donation:set` on document ({raised, goal, percent, seq})
+   - Fills [data-fc-stat="raised|goal|percent"] elements
+   - Falls back to polling /stats (ETag-cached) when SSE is unavailable
+*/
+(function () {
+  const D = document, W = window;
+  if (W.__fcStatsStream) return; W.__fcStatsStream = true;
+
+  const root = D.documentElement;
+  const STREAM_URL = root.dataset.statsStream || '/stats/stream';
+  const POLL_URL = root.dataset.statsUrl || '/stats';
+  const POLL_MS = 30000;
+
+  const apply = (data) => {
+    if (!data) return;
+    W.FC_STATS = data;
+    D.querySelectorAll('[data-fc-stat]').forEach((el) => {
+      const v = data[el.dataset.fcStat];
+      if (v != null) el.textContent = Number(v).toLocaleString();
+    });
+    D.dispatchEvent(new CustomEvent('fc:donation:set', { detail: data }));
+  };
+
+  const poll = async () => {
+    try {
+      const res = await fetch(POLL_URL, { headers: { Accept: 'application/json' } });
+      if (res.ok) apply(await res.json());
+    } catch {}
+    setTimeout(poll, POLL_MS);
+  };
+
+  if (!('EventSource' in W)) { poll(); return; }
+
+  let failures = 0;
+  const es = new EventSource(STREAM_URL);
+  es.addEventListener('stats', (e) => {
+    failures = 0;
+    try { apply(JSON.parse(e.data)); } catch {}
+  });
+  es.onerror = () => {
+    // The browser reconnects with Last-Event-ID by itself; give up after
+    // repeated failures (e.g. 503 at capacity) and poll instead.
+    if (++failures >= 3 || es.readyState === EventSource.CLOSED) {
+      es.close();
+      poll();
+    }
+  };
+})();
@@ -10,3 +10,7 @@ accesslog = "-"
 errorlog = "-"
 loglevel = os.getenv("LOGLEVEL", "info")
 preload_app = True
+
+# Per-worker SSE cap (threads // 4, app/services/stats_stream.py); streams go to the `sse` service
+os.environ.setdefault("FC_WORKER_CLASS", worker_class)
+os.environ.setdefault("FC_WORKER_THREADS", str(threads))
@@ -1,3 +1,9 @@
+import json
+import os
+import shutil
+import time
+import uuid
+
 bind = "0.0.0.0:8000"
 workers = 3
 worker_class = "gthread"
@@ -6,3 +12,77 @@ timeout = 60
 accesslog = "-"
 errorlog = "-"
 
+# Tells the app how many threads a worker has: /stats/stream keeps its
+# per-worker cap at threads // 4 (app/services/stats_stream.py). Streams
+# belong on the eventlet service in gunicorn.sse.conf.py (see deploy/nginx.conf).
+os.environ.setdefault("FC_WORKER_CLASS", worker_class)
+os.environ.setdefault("FC_WORKER_THREADS", str(threads))
+
+# Per-worker metric files merged by GET /metrics (app/services/metrics.py)
+os.environ.setdefault("FC_METRICS_DIR", "/tmp/fc-metrics")
+# Per-worker invalidation sockets when Redis isn't configured (app/services/invalidation_bus.py)
+os.environ.setdefault("FC_BUS_DIR", "/tmp/fc-bus")
+
+
+def _new_boot_id():
+    # Shared by every worker of this master; salts API ETags so a deploy or
+    # reload never revalidates responses built by the previous code
+    os.environ["FC_BOOT_ID"] = uuid.uuid4().hex[:12]
+    # Version of tables no worker has seen change yet (app/services/data_version.py)
+    os.environ["FC_BOOT_STAMP"] = str(time.time_ns() // 1000)
+
+
+def on_starting(server):
+    _new_boot_id()
+    # Fresh counters per master start; worker restarts keep their totals
+    shutil.rmtree(os.environ["FC_METRICS_DIR"], ignore_errors=True)
+    os.makedirs(os.environ["FC_METRICS_DIR"], exist_ok=True)
+    shutil.rmtree(os.environ["FC_BUS_DIR"], ignore_errors=True)
+
+
+def on_reload(server):
+    _new_boot_id()
+
+
+def _fold_worker_metrics(directory, pid):
+    # A dead worker's counters/histograms move into exited.json, so its file
+    # can go (and a recycled pid can't be mistaken for it). Same JSON layout
+    # as app/services/metrics.py; the master never imports the app itself.
+    # "folded" tells concurrent scrapes to skip files that still exist.
+    exited_path = os.path.join(directory, "exited.json")
+    try:
+        with open(exited_path, encoding="utf-8") as fh:
+            exited = json.load(fh)
+    except (OSError, ValueError):
+        exited = {"counters": {}, "histograms": {}}
+    mine = [fn for fn in os.listdir(directory) if fn.startswith(f"{pid}-") and fn.endswith(".json")]
+    if not mine:
+        return
+    for fn in mine:
+        try:
+            with open(os.path.join(directory, fn), encoding="utf-8") as fh:
+                snap = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        for k, v in snap.get("counters", {}).items():
+            exited["counters"][k] = exited["counters"].get(k, 0.0) + v
+        for k, row in snap.get("histograms", {}).items():
+            have = exited["histograms"].get(k)
+            exited["histograms"][k] = [a + b for a, b in zip(have, row)] if have else list(row)
+    exited["folded"] = mine
+    tmp = f"{exited_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(exited, fh, separators=(",", ":"))
+    os.replace(tmp, exited_path)
+    for fn in mine:
+        try:
+            os.remove(os.path.join(directory, fn))
+        except OSError:
+            pass
+
+
+def child_exit(server, worker):
+    try:
+        _fold_worker_metrics(os.environ["FC_METRICS_DIR"], worker.pid)
+    except Exception:
+        server.log.exception("folding metrics of worker %s failed", worker.pid)
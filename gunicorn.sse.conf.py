@@ -0,0 +1,17 @@
+import os
+
+# Live totals stream (/stats/stream) only; nginx routes it here
+# (deploy/nginx.conf). An open stream costs a greenlet, not one of the
+# web service's gthread threads, so a few hundred tabs don't starve pages.
+bind = os.getenv("SSE_BIND", "0.0.0.0:8001")
+workers = int(os.getenv("SSE_WORKERS", "1"))
+worker_class = "eventlet"
+worker_connections = int(os.getenv("SSE_WORKER_CONNECTIONS", "1000"))
+timeout = 60
+accesslog = "-"
+errorlog = "-"
+
+os.environ.setdefault("FC_WORKER_CLASS", worker_class)
+# Same metric and invalidation directories as the web service (gunicorn.conf.py)
+os.environ.setdefault("FC_METRICS_DIR", "/tmp/fc-metrics")
+os.environ.setdefault("FC_BUS_DIR", "/tmp/fc-bus")
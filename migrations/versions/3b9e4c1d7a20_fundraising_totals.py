@@ -0,0 +1,34 @@
+"""fundraising_totals read model
+
+Revision ID: 3b9e4c1d7a20
+Revises: 05782fbdc21c
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3b9e4c1d7a20'
+down_revision = '05782fbdc21c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows are filled on the first write per team, or by `flask goals reconcile --fix`
+    op.create_table('fundraising_totals',
+    sa.Column('team_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('campaign_goal_id', sa.Integer(), nullable=True),
+    sa.Column('goal_cents', sa.Integer(), nullable=False),
+    sa.Column('raised_cents', sa.Integer(), nullable=False),
+    sa.Column('donor_count', sa.Integer(), nullable=False),
+    sa.Column('sponsor_count', sa.Integer(), nullable=False),
+    sa.Column('largest_gift_cents', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('team_id')
+    )
+
+
+def downgrade():
+    op.drop_table('fundraising_totals')
@@ -0,0 +1,32 @@
+"""leaderboard credits
+
+Revision ID: c41e7a9d2b56
+Revises: 8d2f6a4b1c93
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c41e7a9d2b56'
+down_revision = '8d2f6a4b1c93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('leaderboard_credits',
+    sa.Column('payment_id', sa.String(length=64), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('amount_cents', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('payment_id')
+    )
+    op.create_index(op.f('ix_leaderboard_credits_team_id'), 'leaderboard_credits', ['team_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_leaderboard_credits_team_id'), table_name='leaderboard_credits')
+    op.drop_table('leaderboard_credits')
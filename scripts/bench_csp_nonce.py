@@ -0,0 +1,91 @@
+# scripts/bench_csp_nonce.py
+"""
+Homepage benchmark: compile-time CSP nonces vs the old per-response rewrite.
+
+    python scripts/bench_csp_nonce.py [-n 300]
+
+"compile-time" is the shipped path (CspNonceExtension). "after_request
+regex" disables the extension and re-installs the previous hook, which
+decodes each HTML body, runs two regex passes and re-encodes it.
+"""
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from flask import g  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.config import DevelopmentConfig  # noqa: E402
+
+_SCRIPT_OPEN = re.compile(r"(<script\b(?![^>]*\bnonce=)[^>]*>)", re.IGNORECASE)
+_STYLE_OPEN = re.compile(r"(<style\b(?![^>]*\bnonce=)[^>]*>)", re.IGNORECASE)
+
+
+class _LegacyConfig(DevelopmentConfig):
+    AUTO_NONCE_HTML = False
+
+
+def _install_legacy_rewrite(app):
+    @app.after_request
+    def _legacy_nonce(resp):
+        nonce = getattr(g, "csp_nonce", "")
+        if nonce and resp.mimetype == "text/html" and not resp.direct_passthrough:
+            html = resp.get_data(as_text=True)
+            if "<script" in html or "<style" in html:
+                html = _SCRIPT_OPEN.sub(lambda m: m.group(1)[:-1] + f' nonce="{nonce}">', html)
+                html = _STYLE_OPEN.sub(lambda m: m.group(1)[:-1] + f' nonce="{nonce}">', html)
+                resp.set_data(html)
+        return resp
+
+
+def _run(app, n, path):
+    client = app.test_client()
+    for _ in range(10):  # warm template + snapshot caches
+        client.get(path)
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        resp = client.get(path)
+        resp.get_data()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    samples.sort()
+    return {
+        "status": resp.status_code,
+        "bytes": len(resp.get_data()),
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p95": samples[int(len(samples) * 0.95) - 1],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("-n", type=int, default=300, help="requests per variant")
+    ap.add_argument("--path", default="/")
+    args = ap.parse_args()
+
+    legacy = create_app(_LegacyConfig)
+    _install_legacy_rewrite(legacy)
+    variants = [("compile-time", create_app(DevelopmentConfig)), ("after_request regex", legacy)]
+
+    print(f"GET {args.path} × {args.n}")
+    results = {}
+    for name, app in variants:
+        r = results[name] = _run(app, args.n, args.path)
+        print(
+            f"  {name:<20} status={r['status']} bytes={r['bytes']:,} "
+            f"mean={r['mean']:.2f}ms p50={r['p50']:.2f}ms p95={r['p95']:.2f}ms"
+        )
+    new, old = results["compile-time"], results["after_request regex"]
+    print(f"  saved per request: {old['mean'] - new['mean']:.2f}ms mean, {old['p50'] - new['p50']:.2f}ms p50")
+
+
+if __name__ == "__main__":
+    main()
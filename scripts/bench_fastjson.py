@@ -0,0 +1,88 @@
+# scripts/bench_fastjson.py
+"""
+Per-item serialization cost for 100-item /api/donors lists.
+
+    python scripts/bench_fastjson.py [-n 2000] [--items 100]
+
+"restx marshal + json" is the previous path (marshal_list_with, then the
+stdlib encoder restx uses). "projection + json" isolates the precompiled
+projection; "projection + orjson" is the shipped path when orjson is
+installed (app/services/fastjson.py).
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from flask_restx import marshal  # noqa: E402
+
+from app.routes.api import donor_model  # noqa: E402
+from app.services import fastjson  # noqa: E402
+
+
+def _donors(n):
+    start = datetime(2025, 8, 15, 21, 30)
+    return [
+        {"id": i, "name": f"Donor {i}", "amount": 25.0 + i, "created_at": str(start - timedelta(minutes=i))}
+        for i in range(n)
+    ]
+
+
+def _restx(items):
+    return (json.dumps(marshal(items, donor_model)) + "\n").encode("utf-8")
+
+
+def _projection_stdlib(items, project=fastjson.compile_projection(donor_model)):
+    return json.dumps([project(d) for d in items], separators=(",", ":")).encode("utf-8")
+
+
+def _projection_fast(items, project=fastjson.compile_projection(donor_model)):
+    return fastjson.dumps([project(d) for d in items])
+
+
+def _time(fn, items, n):
+    for _ in range(50):
+        fn(items)
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn(items)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    return statistics.fmean(samples), samples[len(samples) // 2]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("-n", type=int, default=2000, help="serializations per variant")
+    ap.add_argument("--items", type=int, default=100, help="donors per list")
+    args = ap.parse_args()
+
+    items = _donors(args.items)
+    assert json.loads(_restx(items)) == json.loads(_projection_fast(items))
+    variants = [("restx marshal + json", _restx), ("projection + json", _projection_stdlib)]
+    if fastjson.orjson is not None:
+        variants.append(("projection + orjson", _projection_fast))
+    else:
+        print("  (orjson not installed: the fast path uses the stdlib encoder)")
+
+    print(f"{args.items}-item donor list × {args.n}")
+    base = None
+    for name, fn in variants:
+        mean, p50 = _time(fn, items, args.n)
+        base = base or mean
+        print(
+            f"  {name:<22} mean={mean:8.1f}µs p50={p50:8.1f}µs "
+            f"per item={mean / args.items:6.2f}µs  ×{base / mean:4.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ if str(ROOT) not in sys.path:
 
 import os
 import importlib
+import tempfile
 import http.cookies
 import pytest
 
@@ -33,6 +34,7 @@ def app():
         PREFERRED_URL_SCHEME="http",
         PROPAGATE_EXCEPTIONS=True,
         SECRET_KEY=os.environ.get("SECRET_KEY", "test-secret-key"),
+        METRICS_SQLITE_PATH=os.path.join(tempfile.mkdtemp(prefix="fc-metrics-"), "metrics.db"),
     )
 
     ctx = flask_app.app_context()
@@ -49,6 +51,50 @@ def client(app):
     return app.test_client()
 
 
+# =========================
+# In-memory model app
+# =========================
+@pytest.fixture()
+def db_app():
+    """
+    Bare Flask app with the fundraising models on in-memory SQLite
+    (never the session app's dev database). Register blueprints on it as needed.
+    """
+    from flask import Flask
+
+    from app.extensions import db
+    from app.models import campaign_goal, donation, player, sponsor, team, transaction, user  # noqa: F401
+
+    flask_app = Flask(__name__)
+    flask_app.config.update(SQLALCHEMY_DATABASE_URI="sqlite:///:memory:", TESTING=True)
+    db.init_app(flask_app)
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture()
+def web_app(tmp_path):
+    """
+    Factory-built app (routes, templates, context processors) on in-memory
+    SQLite, for page tests that must not write to the session app's dev database.
+    """
+    from app import create_app
+    from app.extensions import db
+    from app.services.schema_registry import refresh_schema
+
+    flask_app = create_app("app.config.TestingConfig")
+    flask_app.config.update(METRICS_SQLITE_PATH=str(tmp_path / "metrics.db"))
+    with flask_app.app_context():
+        db.create_all()
+        refresh_schema()  # the registry inspected the empty database at boot
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
 # =========================
 # CSRF token fixture
 # =========================
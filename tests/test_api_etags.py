@@ -0,0 +1,72 @@
+# tests/test_api_etags.py
+from sqlalchemy import event
+
+from app.extensions import db
+from app.services import data_version
+
+
+def _count_sql(app):
+    statements = []
+
+    def _on_execute(*args, **kwargs):
+        statements.append(args[2])
+
+    event.listen(db.engine, "before_cursor_execute", _on_execute)
+    return statements, lambda: event.remove(db.engine, "before_cursor_execute", _on_execute)
+
+
+def test_matching_etag_is_answered_before_any_sql(client, app):
+    first = client.get("/api/stats?top=5")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag.startswith('"')
+
+    statements, stop = _count_sql(app)
+    try:
+        again = client.get("/api/stats?top=5", headers={"If-None-Match": etag})
+        weak = client.get("/api/stats?top=5", headers={"If-None-Match": f"W/{etag}"})
+    finally:
+        stop()
+    assert again.status_code == weak.status_code == 304
+    assert again.headers["ETag"] == etag and again.headers["Cache-Control"] == "public, max-age=10"
+    assert statements == []
+
+    # Different query → different representation → different tag
+    assert client.get("/api/stats?top=6").headers["ETag"] != etag
+
+
+def test_etag_moves_with_the_tables_read(client):
+    etag = client.get("/api/impact").headers["ETag"]
+    data_version.bump("sponsors")  # not read by /api/impact
+    assert client.get("/api/impact", headers={"If-None-Match": etag}).status_code == 304
+    data_version.bump("example")
+    fresh = client.get("/api/impact", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["ETag"] != etag
+
+
+def test_observe_converges_on_one_version():
+    # Two workers commit to the same table and hear each other's commit:
+    # "etag_a" plays worker A's view of it, "etag_b" worker B's
+    a = data_version.bump("etag_a")
+    b = a + 1000
+    data_version.observe(["etag_b"], b)  # B's own commit
+    data_version.observe(["etag_a"], b)  # A hears B (newer: adopted)
+    data_version.observe(["etag_b"], a)  # B hears A (older: no change)
+    assert data_version.version("etag_a") == data_version.version("etag_b") == b
+
+
+def test_workers_of_one_master_share_the_boot_stamp(monkeypatch):
+    monkeypatch.setenv("FC_BOOT_STAMP", "1700000000000000")
+    assert data_version._boot_stamp() == 1700000000000000
+    monkeypatch.delenv("FC_BOOT_STAMP")
+    assert abs(data_version._boot_stamp() - data_version.time.time_ns() // 1000) < 10_000_000
+
+
+def test_tag_expires_with_the_time_bucket(client, app, monkeypatch):
+    from app.routes import api
+
+    ttl = app.config["SNAPSHOT_CACHE_TTL"]
+    now = api.time.time()
+    etag = client.get("/api/impact").headers["ETag"]
+    monkeypatch.setattr(api.time, "time", lambda: now + ttl)
+    fresh = client.get("/api/impact", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["ETag"] != etag
@@ -0,0 +1,92 @@
+# tests/test_bearer_auth.py
+import json
+import time
+
+import jwt
+import pytest
+from flask import Flask
+from werkzeug.exceptions import Unauthorized
+
+from app.services import bearer_auth
+from app.services.bearer_auth import BearerVerifier
+
+
+@pytest.fixture
+def auth_app():
+    app = Flask(__name__)
+    app.config.update(
+        API_TOKENS="alpha-token, beta-token", JWT_SECRET="s3cret", JWT_ALG="HS256", API_AUDIENCE="", API_ISSUER=""
+    )
+    with app.app_context():
+        yield app
+
+
+def _count_decodes(monkeypatch):
+    calls = []
+    real = jwt.decode
+    monkeypatch.setattr(jwt, "decode", lambda *a, **k: calls.append(1) or real(*a, **k))
+    return calls
+
+
+def test_jwt_verified_once_until_exp(auth_app, monkeypatch):
+    v = BearerVerifier()
+    decodes = _count_decodes(monkeypatch)
+    tok = jwt.encode({"sub": "partner", "scope": "read write", "exp": int(time.time()) + 60}, "s3cret")
+
+    assert v.verify(tok) == ("partner", {"read", "write"})
+    assert v.verify(tok) == ("partner", {"read", "write"})
+    assert len(decodes) == 1 and v.hits == 1
+
+    later = time.time() + 61
+    monkeypatch.setattr(bearer_auth.time, "time", lambda: later)
+    v.verify(tok)  # past exp the cached entry is dropped and the token decoded afresh
+    assert len(decodes) == 2 and v.hits == 1
+
+
+def test_api_tokens_by_digest_and_bad_tokens_are_401(auth_app):
+    v = BearerVerifier()
+    assert v.verify("beta-token") == ("apikey:oken", {"*"})
+    with pytest.raises(Unauthorized):
+        v.verify("not-a-jwt")
+    with pytest.raises(Unauthorized):
+        v.verify(jwt.encode({"sub": "x"}, "wrong-secret"))
+    assert v.stats()["cached"] == 0  # failures never cached
+
+
+def test_rotating_the_secret_drops_cached_verifications(auth_app):
+    v = BearerVerifier()
+    tok = jwt.encode({"sub": "partner"}, "s3cret")
+    assert v.verify(tok)[0] == "partner"
+    auth_app.config["JWT_SECRET"] = "rotated"
+    with pytest.raises(Unauthorized):
+        v.verify(tok)
+    assert v.rebuilds == 2
+
+
+def test_jwks_file_selects_key_by_kid(tmp_path):
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    old, new = (rsa.generate_private_key(public_exponent=65537, key_size=2048) for _ in range(2))
+    path = tmp_path / "jwks.json"
+
+    def _write(*pairs):
+        keys = []
+        for kid, key in pairs:
+            jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key()))
+            keys.append(dict(jwk, kid=kid, alg="RS256"))
+        path.write_text(json.dumps({"keys": keys}))
+
+    app = Flask(__name__)
+    app.config.update(JWT_JWKS_FILE=str(path), JWT_ALG="RS256", API_AUDIENCE="", API_ISSUER="")
+    v = BearerVerifier()
+    with app.app_context():
+        _write(("k1", old))
+        tok_old = jwt.encode({"sub": "a"}, old, algorithm="RS256", headers={"kid": "k1"})
+        tok_new = jwt.encode({"sub": "b"}, new, algorithm="RS256", headers={"kid": "k2"})
+        assert v.verify(tok_old)[0] == "a"
+        with pytest.raises(Unauthorized):
+            v.verify(tok_new)
+
+        time.sleep(0.01)
+        _write(("k1", old), ("k2", new))  # rotation overlap: both keys published
+        assert v.verify(tok_new)[0] == "b" and v.verify(tok_old)[0] == "a"
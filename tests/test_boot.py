@@ -0,0 +1,22 @@
+# tests/test_boot.py
+
+
+def test_boot_bundles_sections_under_one_etag(client):
+    resp = client.get("/api/boot")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert {"stats", "donors", "impact", "payments", "site_stats"} <= set(body)
+    assert "errors" not in body
+    assert body["stats"] == client.get("/api/stats").get_json()
+    assert body["site_stats"] == client.get("/stats").get_json()
+    assert body["donors"]["items"] == client.get("/api/donors").get_json()
+
+    etag = resp.headers["ETag"]
+    again = client.get("/api/boot", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+
+
+def test_boot_subset_and_unknown_section(client):
+    body = client.get("/api/boot?include=payments,impact").get_json()
+    assert set(body) == {"payments", "impact"}
+    assert client.get("/api/boot?include=nope").status_code == 400
@@ -0,0 +1,40 @@
+# tests/test_csp_nonce.py
+from flask import Flask, g, render_template_string
+
+from app.security.jinja_nonce import CspNonceExtension, add_nonce_placeholders
+
+
+def _app():
+    app = Flask(__name__)
+    app.jinja_env.add_extension(CspNonceExtension)
+    return app
+
+
+def test_placeholders_are_added_once_at_compile_time():
+    src = (
+        '<script src="{{ url }}" defer></script>'
+        "<style>.a{}</style>"
+        '<script nonce="{{ NONCE }}">x()</script>'
+        "<script {{ nonce_attr() }} type=module></script>"
+        "{% if a > b %}<script>y()</script>{% endif %}"
+    )
+    out = add_nonce_placeholders(src)
+    assert out.count("_fc_csp_nonce()") == 3
+    assert '<script nonce="{{ NONCE }}">' in out
+    assert add_nonce_placeholders("<p>no tags</p>") == "<p>no tags</p>"
+
+
+def test_jinja_tags_and_raw_blocks_are_untouched():
+    src = "{% set s = '<script>' %}{# <style> #}{% raw %}<script>{% endraw %}{{ s }}"
+    assert add_nonce_placeholders(src) == src
+
+
+def test_rendered_nonce_matches_request_and_macros():
+    app = _app()
+    with app.test_request_context("/"):
+        html = render_template_string(
+            "{% macro m() %}<script>m()</script>{% endmacro %}"
+            "<script>a()</script><style>b{}</style>{{ m() }}"
+        )
+        nonce = g.csp_nonce
+    assert nonce and html.count(f'nonce="{nonce}"') == 3
@@ -0,0 +1,18 @@
+# tests/test_csrf_cookie.py
+
+
+def _csrf_cookies(resp):
+    return [c for c in resp.headers.getlist("Set-Cookie") if c.startswith("csrf_token=")]
+
+
+def test_form_page_mints_once_then_reuses(client):
+    assert len(_csrf_cookies(client.get("/"))) == 1
+    assert _csrf_cookies(client.get("/")) == []  # cookie still valid for this session
+
+
+def test_cacheable_and_api_responses_never_set_cookie(client):
+    for path in ("/api/stats", "/stats", "/static/does-not-exist.css", "/healthz"):
+        resp = client.get(path)
+        assert _csrf_cookies(resp) == [], path
+    stats = client.get("/stats")
+    assert stats.cache_control.public and not stats.headers.getlist("Set-Cookie")
@@ -0,0 +1,97 @@
+# tests/test_donors_feed.py
+import threading
+import time
+
+import pytest
+
+from app.extensions import db
+from app.services import data_version
+from app.services.longpoll import ChangeWaiter
+
+
+@pytest.fixture
+def feed_app(db_app):
+    from app.routes.api import api_bp
+
+    db_app.register_blueprint(api_bp)
+    return db_app
+
+
+def _donate(name, cents):
+    from app.models.donation import Donation
+
+    db.session.add(Donation(name=name, email=f"{name.lower()}@x.io", amount_cents=cents))
+    db.session.commit()
+
+
+def test_cursor_returns_only_new_rows(feed_app):
+    client = feed_app.test_client()
+    _donate("Ann", 1000)
+    full = client.get("/api/donors")
+    assert [d["name"] for d in full.get_json()] == ["Ann"]
+    assert full.get_json()[0]["amount"] == 10.0
+    cursor = full.headers["X-Feed-Cursor"]
+
+    idle = client.get(f"/api/donors?since={cursor}")
+    assert idle.get_json() == [] and idle.headers["X-Feed-Cursor"] == cursor
+
+    _donate("Ben", 500)
+    _donate("Cal", 700)
+    delta = client.get(f"/api/donors?since={cursor}&limit=1")
+    assert [d["name"] for d in delta.get_json()] == ["Ben"] and delta.headers["X-Feed-More"] == "1"
+    rest = client.get(f"/api/donors?since={delta.headers['X-Feed-Cursor']}")
+    assert [d["name"] for d in rest.get_json()] == ["Cal"] and rest.headers["X-Feed-More"] == "0"
+
+    last_id = rest.get_json()[0]["id"]
+    assert client.get(f"/api/donors?after_id={last_id}").get_json() == []
+    assert client.get("/api/donors?after_id=x").status_code == 400
+    assert len(client.get("/api/donors?since=garbage").get_json()) == 3  # full refresh
+
+
+def test_long_poll_wakes_on_commit(feed_app):
+    client = feed_app.test_client()
+    cursor = client.get("/api/donors").headers["X-Feed-Cursor"]
+
+    def _later():
+        time.sleep(0.2)
+        with feed_app.app_context():
+            _donate("Dee", 900)
+
+    threading.Thread(target=_later).start()
+    started = time.monotonic()
+    resp = client.get(f"/api/donors?since={cursor}&wait=5")
+    assert [d["name"] for d in resp.get_json()] == ["Dee"]
+    assert time.monotonic() - started < 4
+    assert resp.headers["Cache-Control"] == "no-store"
+
+
+def test_waiter_times_out_and_caps_slots():
+    waiter = ChangeWaiter(("feed_test_table",))
+    seen = waiter.version()
+    assert waiter.wait(seen, 0.05, slots=1) is False and waiter.timeouts == 1
+    assert waiter.wait(seen, 1.0, slots=0) is False and waiter.rejected == 1
+
+    data_version.subscribe(waiter.notify)
+    threading.Timer(0.05, data_version.bump, args=("feed_test_table",)).start()
+    assert waiter.wait(seen, 2.0, slots=1) is True
+
+
+def test_long_polls_share_the_parked_budget_with_streams(monkeypatch):
+    from app.services.longpoll import budget, parked
+    from app.services.stats_stream import broadcaster
+
+    monkeypatch.setenv("FC_WORKER_CLASS", "gthread")
+    monkeypatch.setenv("FC_WORKER_THREADS", "8")
+    limit = budget({})
+    assert limit == 2 and budget({}, explicit=5) == 5
+
+    waiter = ChangeWaiter(("feed_budget_table",))
+    seen = waiter.version()
+    held = parked.held
+    assert broadcaster.acquire(held + 1) and parked.held == held + 1  # an open /stats/stream
+    try:
+        assert waiter.wait(seen, 1.0, slots=held + 1) is False and waiter.rejected == 1
+    finally:
+        broadcaster.release()
+    assert waiter.wait(seen, 0.05, slots=held + 1) is False and waiter.timeouts == 1
+    assert parked.held == held
@@ -0,0 +1,45 @@
+# tests/test_fastjson.py
+import json
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from flask_restx import marshal
+
+from app.routes.api import bucket_model, donor_model, stats_model
+from app.services.fastjson import compile_projection, dumps
+
+
+def test_projection_matches_restx_marshal():
+    donors = [
+        {"id": 1, "name": "Ann", "amount": 12.5, "created_at": "2025-01-01"},
+        {"id": None, "name": None, "amount": Decimal("3.10"), "created_at": datetime(2025, 1, 2)},
+        SimpleNamespace(id="7", name="Obj", amount=4, created_at=None),
+        {"name": "Sparse"},
+    ]
+    project = compile_projection(donor_model)
+    assert [project(d) for d in donors] == json.loads(json.dumps(marshal(donors, donor_model)))
+
+    stats = {"raised": 5, "goal": Decimal("10"), "percent": 50, "leaderboard": [{"name": "A", "amount": 1}]}
+    assert compile_projection(stats_model)(stats) == dict(marshal(stats, stats_model))
+    assert compile_projection(stats_model)({"raised": 1})["leaderboard"] is None
+
+    bucket = {"id": 1, "slug": "gear", "label": "Gear", "amount": 50}
+    assert compile_projection(bucket_model)(bucket) == dict(marshal(bucket, bucket_model))
+
+
+def test_dumps_handles_non_json_types():
+    out = json.loads(dumps({"d": Decimal("1.5"), "t": datetime(2025, 1, 2, 3, 4, 5), "s": "é"}))
+    assert out == {"d": 1.5, "t": "2025-01-02T03:04:05", "s": "é"}
+
+
+def test_fast_and_restx_paths_agree(client, app):
+    fast = client.get("/api/impact")
+    app.config["API_FAST_JSON"] = False
+    try:
+        slow = client.get("/api/impact")
+    finally:
+        app.config["API_FAST_JSON"] = True
+    assert fast.status_code == slow.status_code == 200
+    assert fast.get_json() == slow.get_json()
+    assert fast.headers["ETag"] == slow.headers["ETag"]
@@ -0,0 +1,152 @@
+# tests/test_goal_accounting.py
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db
+
+
+@pytest.fixture
+def goal(db_app):
+    from app.models.campaign_goal import CampaignGoal
+    from app.models.team import Team
+
+    team = Team(slug="t1", team_name="T1")
+    db.session.add(team)
+    db.session.commit()
+    g = CampaignGoal(team_id=team.id, goal_amount=100_000, total=0, active=True)
+    db.session.add(g)
+    db.session.commit()
+    return g
+
+
+def _total(goal):
+    db.session.expire(goal)
+    return goal.total
+
+
+def test_writes_apply_deltas_without_rescans(goal):
+    from app.models.donation import Donation
+    from app.models.fundraising_totals import reconcile_totals
+    from app.models.sponsor import Sponsor
+
+    reconcile_totals(fix=True)  # materialize rows up front; later writes are deltas
+    sums = []
+
+    def _count(conn, cursor, statement, *a):
+        if "sum(" in statement.lower():
+            sums.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        s = Sponsor(name="Acme", amount=5000, status="pending", team_id=goal.team_id)
+        db.session.add(s)
+        db.session.commit()
+        assert _total(goal) == 0  # pending does not count
+
+        s.status = "paid"
+        db.session.commit()
+        assert _total(goal) == 5000
+
+        s.amount = 7000
+        db.session.commit()
+        assert _total(goal) == 7000
+
+        db.session.add(Donation(name="D", email="d@x.io", amount_cents=1500, team_id=goal.team_id))
+        db.session.commit()
+        assert _total(goal) == 8500
+
+        s.soft_delete()
+        assert _total(goal) == 1500
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+    assert sums == []
+
+
+def test_delete_and_team_move(goal):
+    from app.models.campaign_goal import CampaignGoal
+    from app.models.sponsor import Sponsor
+    from app.models.team import Team
+
+    other = Team(slug="t2", team_name="T2")
+    db.session.add(other)
+    db.session.commit()
+    g2 = CampaignGoal(team_id=other.id, goal_amount=100_000, active=True)
+    db.session.add(g2)
+    s = Sponsor(name="Acme", amount=4000, status="paid", team_id=goal.team_id)
+    db.session.add(s)
+    db.session.commit()
+
+    s.team_id = other.id
+    db.session.commit()
+    assert (_total(goal), _total(g2)) == (0, 4000)
+
+    db.session.delete(s)
+    db.session.commit()
+    assert _total(g2) == 0
+
+
+def test_reconcile_reports_and_fixes_drift(goal):
+    from app.models.campaign_goal import CampaignGoal
+    from app.models.sponsor import Sponsor
+
+    db.session.add(Sponsor(name="Acme", amount=3000, status="paid", team_id=goal.team_id))
+    db.session.commit()
+    assert CampaignGoal.reconcile() == []
+
+    db.session.execute(db.update(CampaignGoal).values(total=999))
+    db.session.commit()
+    drift = CampaignGoal.reconcile(fix=True)
+    assert drift[0]["expected_cents"] == 3000 and drift[0]["drift_cents"] == 999 - 3000
+    assert _total(goal) == 3000
+    assert CampaignGoal.reconcile() == []
+
+
+def test_read_model_tracks_counts_and_largest(goal):
+    from app.models.donation import Donation
+    from app.models.fundraising_totals import ALL_TEAMS, get_totals, reconcile_totals
+    from app.models.sponsor import Sponsor
+
+    big = Sponsor(name="Big", amount=9000, status="paid", team_id=goal.team_id)
+    db.session.add_all(
+        [
+            big,
+            Sponsor(name="Small", amount=1000, status="paid", team_id=goal.team_id),
+            Sponsor(name="Later", amount=50_000, status="pending"),
+            Donation(name="D", email="d@x.io", amount_cents=2500),  # no team
+        ]
+    )
+    db.session.commit()
+
+    team = get_totals(goal.team_id)
+    assert (team["raised_cents"], team["sponsor_count"], team["largest_gift_cents"]) == (10_000, 2, 9000)
+    assert team["goal_cents"] == 100_000 and team["campaign_goal_id"] == goal.id
+    site = get_totals(ALL_TEAMS)
+    assert (site["raised_cents"], site["donor_count"], site["sponsor_count"]) == (12_500, 1, 2)
+
+    big.status = "refunded"
+    db.session.commit()
+    assert get_totals(goal.team_id)["largest_gift_cents"] == 1000
+    assert get_totals(ALL_TEAMS)["largest_gift_cents"] == 2500
+    assert reconcile_totals() == []
+
+
+def test_first_writes_tolerate_a_concurrent_row_creation(goal, monkeypatch):
+    from app.models import fundraising_totals as ft
+    from app.models.sponsor import Sponsor
+
+    real = ft.compute_totals
+
+    def _racing(executor, team_id=ft.ALL_TEAMS):
+        values = real(executor, team_id)
+        # Another worker's first write commits the row between our SELECT and INSERT
+        if not db.session.get(ft.FundraisingTotals, team_id):
+            executor.execute(ft.insert(ft.FundraisingTotals.__table__).values(**values))
+        return values
+
+    monkeypatch.setattr(ft, "compute_totals", _racing)
+    db.session.add(Sponsor(name="Acme", amount=3000, status="paid", team_id=goal.team_id))
+    db.session.commit()
+    monkeypatch.undo()
+
+    assert ft.get_totals(goal.team_id)["raised_cents"] == 3000
+    assert ft.get_totals(ft.ALL_TEAMS)["raised_cents"] == 3000
@@ -0,0 +1,54 @@
+# tests/test_invalidation_bus.py
+import json
+import time
+
+from app.services import data_version
+from app.services.invalidation_bus import InvalidationBus
+
+
+def _wait(pred, timeout=3.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if pred():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_socket_transport_carries_commits_between_workers(tmp_path):
+    a, b = InvalidationBus(), InvalidationBus()
+    seen = []
+    b.on_invalidate(lambda entity, team_id, version: seen.append((entity, team_id, version)))
+    try:
+        for bus in (a, b):
+            bus.start(mode="socket", directory=str(tmp_path))
+        assert _wait(lambda: a.transport is not None and b.transport is not None)
+
+        before = data_version.version("donations")
+        stamp = before + 1  # A's commit, stamped after anything B has seen
+        a._on_local_commit({("donations", 7)}, stamp)
+        assert _wait(lambda: ("donations", 7, stamp) in seen)
+        assert data_version.version("donations") == stamp  # B's snapshots go stale
+        assert a.stats()["published"] == 1 and b.stats()["received"] >= 1
+    finally:
+        a.stop()
+        b.stop()
+
+
+def test_own_messages_are_ignored():
+    bus = InvalidationBus()
+    before = data_version.version("sponsors")
+    bus.deliver(json.dumps({"o": bus.origin, "v": 1, "k": [["sponsors", None]]}))
+    assert data_version.version("sponsors") == before and bus.received == 0
+
+
+def test_auto_picks_redis_from_config_even_if_it_is_down(tmp_path, monkeypatch):
+    from app.services import invalidation_bus
+
+    monkeypatch.setenv("REDIS_URL", "redis://down:6379/0")
+    monkeypatch.setattr(invalidation_bus, "redis_client", lambda: object())  # never answers PING
+    bus = InvalidationBus()
+    assert bus._pick_transport("auto", str(tmp_path)).name == "redis"  # listener retries; no split
+
+    monkeypatch.delenv("REDIS_URL")
+    assert bus._pick_transport("auto", str(tmp_path)).name == "socket"
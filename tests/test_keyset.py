@@ -0,0 +1,89 @@
+# tests/test_keyset.py
+from datetime import datetime
+
+from app.extensions import db
+from app.services.keyset import decode_cursor, encode_cursor, seek
+
+
+def test_cursor_roundtrip_and_garbage():
+    ts = datetime(2025, 1, 2, 3, 4, 5)
+    assert decode_cursor(encode_cursor([ts, 7]), 2) == (ts, 7)
+    assert decode_cursor("not-a-cursor", 2) is None
+    assert decode_cursor(encode_cursor([1]), 2) is None
+
+
+def test_seek_walks_ties_without_gaps_or_repeats(db_app):
+    from app.models.sponsor import Sponsor
+
+    # Duplicate amounts force the id tie-breaker
+    db.session.add_all(
+        [Sponsor(name=f"S{i}", amount=(i % 3) * 100, status="paid") for i in range(10)]
+    )
+    db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        page = seek(Sponsor.query, (Sponsor.amount, Sponsor.id), cursor, 4)
+        seen.extend((s.amount, s.id) for s in page.items)
+        if not page.has_more:
+            break
+        cursor = page.next_cursor
+
+    assert len(seen) == 10 and len(set(seen)) == 10
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_prev_cursor_walks_back_to_the_first_page(db_app):
+    from app.models.sponsor import Sponsor
+
+    db.session.add_all([Sponsor(name=f"S{i}", amount=(i % 3) * 100, status="paid") for i in range(10)])
+    db.session.commit()
+
+    cols = (Sponsor.amount, Sponsor.id)
+    first = seek(Sponsor.query, cols, None, 4)
+    second = seek(Sponsor.query, cols, first.next_cursor, 4)
+    third = seek(Sponsor.query, cols, second.next_cursor, 4)
+    assert not first.has_prev and second.has_prev and not third.has_more
+
+    back = seek(Sponsor.query, cols, None, 4, before=third.prev_cursor)
+    assert [s.id for s in back.items] == [s.id for s in second.items]
+    assert back.next_cursor == second.next_cursor
+    again = seek(Sponsor.query, cols, None, 4, before=back.prev_cursor)
+    assert [s.id for s in again.items] == [s.id for s in first.items] and not again.has_prev
+
+
+def test_sponsors_page_renders_with_cursor_links(web_app, monkeypatch):
+    from app.models.sponsor import Sponsor
+    from app.routes import main
+
+    db.session.add_all([Sponsor(name=f"Keyset {i}", amount=1000 + i, status="paid") for i in range(3)])
+    db.session.add(Sponsor(name="Unpaid", amount=5000, status="pending"))
+    db.session.commit()
+    monkeypatch.setattr(main, "SPONSORS_PER_PAGE", 1)
+    client = web_app.test_client()
+
+    res = client.get("/sponsors")
+    html = res.get_data(as_text=True)
+    assert res.status_code == 200 and "Keyset 2" in html and 'rel="next"' in html
+    assert 'rel="prev"' not in html and "Unpaid" not in html
+
+    nxt = main.seek(main._sponsor_query().order_by(None), (Sponsor.amount, Sponsor.id), None, 1)
+    html = client.get(f"/sponsors?cursor={nxt.next_cursor}").get_data(as_text=True)
+    assert "Keyset 1" in html and 'rel="prev"' in html
+
+
+def test_admin_sponsor_counts_are_cached_only_for_known_statuses(web_app, monkeypatch):
+    from app.admin import routes as admin_routes
+
+    keys = []
+    monkeypatch.setattr(admin_routes, "current_user", None)  # skip the admin guard
+    monkeypatch.setitem(web_app.config, "LOGIN_DISABLED", True)
+    monkeypatch.setattr(admin_routes, "cached_count", lambda key, tables, q: keys.append(key) or 1)
+    db.session.add(admin_routes.Sponsor(name="Listed", amount=100, status="paid"))
+    db.session.commit()
+    client = web_app.test_client()
+
+    for status in ("", "paid", "x" * 40, "paid' OR 1"):
+        assert client.get(f"/admin/sponsors?status={status}").status_code == 200
+    assert "Listed" in client.get("/admin/sponsors").get_data(as_text=True)
+    assert keys == ["admin.sponsors:", "admin.sponsors:paid", "admin.sponsors:"]
@@ -0,0 +1,88 @@
+# tests/test_mail_outbox.py
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from app.extensions import db, mail
+
+
+@pytest.fixture
+def outbox_app():
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI="sqlite:///:memory:",
+        TESTING=True,
+        MAIL_SUPPRESS_SEND=True,
+        MAIL_DEFAULT_SENDER="team@example.org",
+        MAIL_OUTBOX_WORKER=False,
+        MAIL_OUTBOX_BATCH=3,
+        MAIL_OUTBOX_MAX_ATTEMPTS=2,
+    )
+    db.init_app(app)
+    mail.init_app(app)
+    from app.models.email_outbox import EmailOutbox  # noqa: F401
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_batches_share_one_connection(outbox_app, monkeypatch):
+    from app.models.email_outbox import EmailOutbox
+    from app.services import mail_outbox
+
+    opened = []
+    real_connect = mail.connect
+    monkeypatch.setattr(mail, "connect", lambda: opened.append(1) or real_connect())
+
+    for i in range(7):
+        mail_outbox.enqueue(f"Receipt {i}", [f"d{i}@example.org"], body="thanks")
+    db.session.commit()
+
+    with mail.record_messages() as outbox:
+        result = mail_outbox.drain()
+
+    assert len(outbox) == 7
+    assert result == {"sent": 7, "retried": 0, "failed": 0, "batches": 3}
+    assert len(opened) == 3  # batch size 3: one SMTP session per batch, not per email
+    assert {r.status for r in db.session.query(EmailOutbox)} == {"sent"}
+    assert mail_outbox.drain()["batches"] == 0
+
+
+def test_failures_back_off_then_fail(outbox_app, monkeypatch):
+    from flask_mail import Connection
+
+    from app.models.email_outbox import EmailOutbox
+    from app.services import mail_outbox
+
+    def _boom(self, message, envelope_from=None):
+        raise RuntimeError("smtp 451")
+
+    monkeypatch.setattr(Connection, "send", _boom)
+    oid = mail_outbox.enqueue("Receipt", ["d@example.org"], body="thanks")
+    db.session.commit()
+
+    assert mail_outbox.drain()["retried"] == 1
+    row = db.session.get(EmailOutbox, oid)
+    assert row.status == "pending" and row.attempts == 1
+    assert row.next_attempt_at > datetime.utcnow() + timedelta(seconds=20)
+    assert mail_outbox.drain()["batches"] == 0  # not due yet: nothing waits in a thread
+
+    row.next_attempt_at = datetime.utcnow()
+    db.session.commit()
+    assert mail_outbox.drain()["failed"] == 1
+    row = db.session.get(EmailOutbox, oid)
+    assert row.status == "failed" and "smtp 451" in row.last_error
+
+
+def test_enqueue_rides_on_the_callers_transaction(outbox_app):
+    from app.models.email_outbox import EmailOutbox
+    from app.services import mail_outbox
+
+    oid = mail_outbox.enqueue("Receipt", ["d@example.org"], body="thanks")
+    assert oid is not None  # flushed: the id is there before any commit
+    db.session.rollback()  # the caller's transaction failed: the email goes with it
+    assert db.session.query(EmailOutbox).count() == 0
@@ -0,0 +1,121 @@
+# tests/test_metrics.py
+import json
+import os
+import runpy
+from pathlib import Path
+
+from app.services import metrics
+
+HITS = metrics.Counter("t_hits_total", "Test hits.", ("route",))
+LAT = metrics.Histogram("t_latency_seconds", "Test latency.", (), buckets=(0.1, 1.0))
+LIVE = metrics.Gauge("t_clients", "Test clients.")
+
+
+def _lines(text, name):
+    return [ln for ln in text.splitlines() if ln.startswith(name)]
+
+
+def test_histogram_exposition_is_cumulative():
+    for v in (0.05, 0.5, 5.0):
+        LAT.observe(v)
+    text = metrics.render(metrics.collect(directory=""))
+    assert "# TYPE t_latency_seconds histogram" in text
+    assert _lines(text, "t_latency_seconds_bucket") == [
+        't_latency_seconds_bucket{le="0.1"} 1',
+        't_latency_seconds_bucket{le="1"} 2',
+        't_latency_seconds_bucket{le="+Inf"} 3',
+    ]
+    assert _lines(text, "t_latency_seconds_count") == ["t_latency_seconds_count 3"]
+
+
+def test_workers_merge_and_dead_gauges_drop(tmp_path):
+    HITS.inc(route="/")
+    LIVE.inc()
+    metrics.flush(str(tmp_path))  # this worker's own file is skipped (live values used)
+
+    other = {
+        "counters": {metrics._key("t_hits_total", {"route": "/"}): 4.0},
+        "gauges": {metrics._key("t_clients", {}): 7.0},
+        "histograms": {},
+    }
+    live_pid, dead_pid = os.getppid(), 999_999
+    for pid in (live_pid, dead_pid):
+        (tmp_path / f"{pid}-1.json").write_text(json.dumps(other))
+
+    mine = metrics.collect(directory="")
+    text = metrics.render(metrics.collect(str(tmp_path)))
+    own_hits = mine["counters"][metrics._key("t_hits_total", {"route": "/"})]
+    own_live = mine["gauges"][metrics._key("t_clients", {})]
+    assert _lines(text, "t_hits_total{") == [f't_hits_total{{route="/"}} {int(own_hits + 8)}']
+    assert _lines(text, "t_clients ") == [f"t_clients {int(own_live + 7)}"]
+
+
+def test_recycled_pid_keeps_the_old_counters_but_not_its_gauges(tmp_path):
+    snap = {
+        "counters": {metrics._key("t_hits_total", {"route": "/r"}): 2.0},
+        "gauges": {metrics._key("t_clients", {}): 5.0},
+        "histograms": {},
+    }
+    pid = os.getppid()  # alive: the new worker that inherited the pid
+    (tmp_path / f"{pid}-a.json").write_text(json.dumps(snap))  # its dead predecessor
+    (tmp_path / f"{pid}-b.json").write_text(json.dumps(snap))
+
+    merged = metrics.collect(str(tmp_path))
+    mine = metrics.collect(directory="")
+    key = metrics._key("t_clients", {})
+    assert merged["counters"][metrics._key("t_hits_total", {"route": "/r"})] == 4.0
+    assert merged["gauges"][key] == mine["gauges"].get(key, 0.0) + 5.0
+
+
+def test_child_exit_folds_a_dead_workers_file(tmp_path, monkeypatch):
+    for var in ("FC_WORKER_CLASS", "FC_WORKER_THREADS", "FC_BUS_DIR", "FC_BOOT_ID", "FC_BOOT_STAMP"):
+        monkeypatch.setenv(var, os.environ.get(var, "x"))
+    monkeypatch.setenv("FC_METRICS_DIR", str(tmp_path))
+    conf = runpy.run_path(str(Path(__file__).resolve().parents[1] / "gunicorn.conf.py"))
+    key = metrics._key("t_hits_total", {"route": "/gone"})
+    snap = {"counters": {key: 3.0}, "gauges": {metrics._key("t_clients", {}): 9.0}, "histograms": {}}
+    (tmp_path / "999999-1.json").write_text(json.dumps(snap))
+    before = metrics.collect(str(tmp_path))
+
+    class _Worker:
+        pid = 999_999
+
+    conf["child_exit"](None, _Worker())
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["exited.json"]
+    after = metrics.collect(str(tmp_path))
+    assert after["counters"][key] == before["counters"][key] == 3.0  # never goes backwards
+
+    (tmp_path / "999999-1.json").write_text(json.dumps(snap))  # scrape raced the removal
+    assert metrics.collect(str(tmp_path))["counters"][key] == 3.0
+
+
+def test_metrics_endpoint_fails_closed(web_app):
+    client = web_app.test_client()
+    assert client.get("/metrics").status_code == 200  # direct from loopback
+    assert client.get("/metrics", headers={"X-Forwarded-For": "203.0.113.9"}).status_code == 401
+    assert client.get("/metrics", environ_base={"REMOTE_ADDR": "203.0.113.9"}).status_code == 401
+
+    web_app.config["METRICS_TOKEN"] = "s3cret"
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+    web_app.config.update(METRICS_TOKEN=None, METRICS_PUBLIC=True)
+    assert client.get("/metrics", environ_base={"REMOTE_ADDR": "203.0.113.9"}).status_code == 200
+
+
+def test_socketio_clients_are_counted_without_claiming_handlers(web_app):
+    from app.extensions import socketio
+
+    seen = []
+
+    @socketio.on("connect")
+    def _app_connect(auth=None):
+        seen.append("connect")
+
+    gauge = metrics._key("fc_socketio_clients", {})
+    base = metrics.collect(directory="")["gauges"].get(gauge, 0.0)
+    client = socketio.test_client(web_app)
+    assert client.is_connected() and seen == ["connect"]  # the app's own handler still runs
+    assert metrics.collect(directory="")["gauges"][gauge] == base + 1
+    client.disconnect()
+    assert metrics.collect(directory="")["gauges"][gauge] == base
@@ -0,0 +1,98 @@
+# tests/test_metrics_beacon.py
+import json
+
+import pytest
+
+from app.blueprints import fc_metrics
+from app.services import metrics_store, roi_counters
+
+
+class _Pipe:
+    def __init__(self, owner):
+        self.owner, self.ops = owner, []
+
+    def hincrby(self, key, field, amount):
+        self.ops.append(("hincrby", key, field, amount))
+
+    def hincrbyfloat(self, key, field, amount):
+        self.ops.append(("hincrbyfloat", key, field, amount))
+
+    def expire(self, key, seconds):
+        self.ops.append(("expire", key, None, seconds))
+
+    def pfadd(self, key, *values):
+        self.ops.append(("pfadd", key, None, values))
+
+    sadd = pfadd
+
+    def execute(self):
+        self.owner.round_trips += 1
+        self.owner.ops.extend(self.ops)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.round_trips, self.ops = 0, []
+
+    def pipeline(self, transaction=True):
+        return _Pipe(self)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    r = _FakeRedis()
+    monkeypatch.setattr(metrics_store, "backend", lambda: metrics_store.RedisBackend(r))
+    roi_counters.buffer.flush()  # leftovers from earlier tests
+    r.round_trips, r.ops = 0, []
+    return r
+
+
+def _fields(r, week=None):
+    week = week or fc_metrics._week_key()
+    return {(op, field): amount for op, key, field, amount in r.ops if key == f"fc:roi:{week}" and field}
+
+
+def test_batch_is_aggregated_into_one_flush(client, fake_redis):
+    events = [
+        {"type": "impression", "key": "tiers", "route": "/tiers"},
+        {"type": "impression", "key": "tiers", "route": "/tiers", "peer": "jordan-t"},
+        {"type": "click", "key": "sponsor-cta", "campaign": "fall-24"},
+        {"type": "bogus"},
+        "not-an-event",
+    ]
+    # sendBeacon posts a string body as text/plain
+    res = client.post("/metrics/events", data=json.dumps(events), content_type="text/plain;charset=UTF-8")
+    body = res.get_json()
+    roi_counters.buffer.flush()
+    assert res.status_code == 200 and body["accepted"] == 3 and body["dropped"] == 2
+    assert fake_redis.round_trips == 1
+    keys = {key for _, key, _, _ in fake_redis.ops}
+    assert f"fc:roi:{body['week']}" in keys and {k.split(":")[2] for k in keys} == {body["week"], "1m", "1h", "1d"}
+    assert _fields(fake_redis, body["week"]) == {
+        ("hincrby", "impressions"): 2,
+        ("hincrby", "imp:tiers"): 2,
+        ("hincrby", "imp:route:/tiers"): 2,
+        ("hincrby", "imp:peer:jordan-t"): 1,
+        ("hincrby", "clicks"): 1,
+        ("hincrby", "click:sponsor-cta"): 1,
+        ("hincrby", "click:campaign:fall-24"): 1,
+        ("hincrbyfloat", "imp_last_ts"): 2.0,
+    }
+
+
+def test_single_events_keep_their_fields():
+    counts, floats, seen = fc_metrics._aggregate([("impression", {"key": "hub", "route": "/"})])
+    assert len(seen) == 1 and floats == {"imp_last_ts": 1.0}
+    assert counts == {"impressions": 1, "imp:hub": 1, "imp:route:/": 1}
+
+
+def test_rejects_non_lists_and_caps_batch_size(client, app, fake_redis):
+    assert client.post("/metrics/events", json={"type": "click"}).status_code == 400
+    app.config["METRICS_BEACON_MAX_EVENTS"] = 2
+    try:
+        body = client.post("/metrics/events", json={"events": [{"type": "click"}] * 5}).get_json()
+    finally:
+        app.config["METRICS_BEACON_MAX_EVENTS"] = 200
+    roi_counters.buffer.flush()
+    assert body["accepted"] == 2 and body["dropped"] == 3
+    assert _fields(fake_redis)[("hincrby", "clicks")] == 2
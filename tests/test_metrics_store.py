@@ -0,0 +1,108 @@
+# tests/test_metrics_store.py
+import time
+
+import pytest
+from flask import Flask
+
+from app.services import metrics_store, roi_counters, uniques
+from app.services.metrics_store import SqliteBackend
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SqliteBackend(str(tmp_path / "metrics.db"))
+
+
+def test_sqlite_store_speaks_the_redis_read_api(store):
+    store.write(
+        {"fc:roi:2025-W01": {"clicks": 2}, "fc:roi:1m:60": {"clicks": 2}},
+        {"fc:roi:2025-W01": {"donations_total": 12.5}},
+        {("pfadd", "fc:uv:2025-W01:imp"): {"a", "b"}, ("sadd", "fc:uv:2025-W01:index"): {"imp"}},
+    )
+    store.write({"fc:roi:2025-W01": {"clicks": 3}}, members={("pfadd", "fc:uv:2025-W01:imp"): {"b", "c"}})
+
+    assert store.journal_mode() == "wal"
+    assert store.hgetall("fc:roi:2025-W01") == {"clicks": "5", "donations_total": "12.5"}
+    assert store.hmget_many(["fc:roi:1m:60", "fc:roi:1m:120"], ["clicks", "views"]) == [[2.0, None], [None, None]]
+    assert store.smembers("fc:uv:2025-W01:index") == {"imp"}
+    assert store.pfcount_many(["fc:uv:2025-W01:imp", "fc:uv:missing"]) == [3, 0]
+
+    for i in range(5):
+        store.lpush_trim("fc:recent_donations", f'{{"n": {i}}}', keep=3)
+    assert store.lrange("fc:recent_donations", 0, -1) == ['{"n": 4}', '{"n": 3}', '{"n": 2}']
+    assert store.lrange("fc:recent_donations", 1, 1) == ['{"n": 3}']
+
+
+def test_ttls_expire_whole_keys_and_compaction_deletes_them(store, monkeypatch):
+    store.write({"fc:roi:1m:60": {"clicks": 1, "views": 1}, "fc:roi:1d:0": {"clicks": 1}}, ttls={"fc:roi:1m:60": 60})
+    later = time.time() + 61
+    monkeypatch.setattr(metrics_store.time, "time", lambda: later)
+
+    assert store.hgetall("fc:roi:1m:60") == {} and store.hgetall("fc:roi:1d:0") == {"clicks": "1"}
+    store.write({"fc:roi:1m:60": {"clicks": 4}})  # an expired key starts over, as in Redis
+    assert store.hgetall("fc:roi:1m:60") == {"clicks": "4"}
+    assert store.compact()["roi_counters"] == 1  # the stale "views" row
+
+
+def test_sqlite_backend_end_to_end(client, app, tmp_path, monkeypatch):
+    local = SqliteBackend(str(tmp_path / "e2e.db"))
+    monkeypatch.setattr(metrics_store, "backend", lambda: local)
+    roi_counters.buffer.flush()
+
+    page = [{"type": "impression", "key": "tiers", "route": "/tiers"}, {"type": "click", "key": "cta"}]
+    for vid in ("anon-1", "anon-1", "anon-2"):
+        client.post("/metrics/events", json={"vid": vid, "events": page})
+    roi_counters.buffer.flush()
+
+    weekly = client.get("/metrics/roi/weekly").get_json()
+    assert weekly["metrics"]["impressions"] == "3" and weekly["metrics"]["clicks"] == "3"
+    assert weekly["uniques"]["impressions"] == 2 and weekly["notes"]["backend"] == "sqlite"
+    series = client.get("/metrics/range?step=1h&field=impressions").get_json()
+    assert sum(series["series"]["impressions"]) == 3
+
+
+def test_selector_falls_back_to_sqlite_without_redis(tmp_path, monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    flask_app = Flask(__name__)
+    flask_app.config.update(METRICS_BACKEND="auto", METRICS_SQLITE_PATH=str(tmp_path / "auto.db"))
+    selector = metrics_store._Selector()
+    selector.configure(flask_app)
+    assert selector.get().name == "sqlite" and (tmp_path / "auto.db").exists()
+
+    flask_app.config["METRICS_BACKEND"] = "none"
+    selector.configure(flask_app)
+    assert selector.get() is None
+
+
+def test_pfcount_reads_the_stored_count(store, monkeypatch):
+    store.write({}, members={("pfadd", "fc:uv:2025-W01:imp"): {f"v{i}" for i in range(50)}})
+    (blob,) = store._conn().execute("SELECT registers FROM roi_hll").fetchone()
+    assert len(blob) < 200  # sparse, not a 12 KiB dense blob
+
+    monkeypatch.setattr(uniques.HyperLogLog, "count", lambda self: pytest.fail("recounted on read"))
+    assert store.pfcount_many(["fc:uv:2025-W01:imp", "fc:uv:missing"]) == [50, 0]
+
+
+def test_existing_store_gains_the_count_column(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE roi_hll (key TEXT PRIMARY KEY, registers BLOB NOT NULL, expires_at REAL)")
+        conn.execute("INSERT INTO roi_hll (key, registers) VALUES ('fc:uv:w:imp', ?)", (uniques.HyperLogLog().tobytes(),))
+    store = SqliteBackend(path)
+    store.write({}, members={("pfadd", "fc:uv:w:click"): {"a", "b"}})
+    assert store.pfcount_many(["fc:uv:w:imp", "fc:uv:w:click"]) == [0, 2]
+
+
+def test_auto_selector_does_not_depend_on_redis_answering(tmp_path, monkeypatch):
+    down = object()  # a client whose server is unreachable right now
+    monkeypatch.setattr(metrics_store, "redis_client", lambda: down)
+    flask_app = Flask(__name__)
+    flask_app.config.update(METRICS_BACKEND="auto", REDIS_URL="redis://cache:6379/0",
+                            METRICS_SQLITE_PATH=str(tmp_path / "auto.db"))
+    selector = metrics_store._Selector()
+    selector.configure(flask_app)
+    chosen = selector.get()
+    assert chosen.name == "redis" and chosen.client is down  # the buffer retries; no split into SQLite
+    assert not (tmp_path / "auto.db").exists()
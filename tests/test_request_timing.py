@@ -0,0 +1,54 @@
+# tests/test_request_timing.py
+import logging
+import time
+
+from flask import Flask, g, render_template_string
+from sqlalchemy import text
+
+from app.extensions import db
+from app.services import request_timing
+
+
+def _app(**config):
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI="sqlite:///:memory:", **config)
+    db.init_app(app)
+    request_timing.init_request_timing(app)
+
+    @app.before_request
+    def _start():
+        g._start_ts = time.perf_counter()
+        g.request_id = "rid-123"
+
+    @app.get("/page")
+    def page():
+        for _ in range(3):
+            db.session.execute(text("SELECT 1"))
+        return render_template_string("<p>{{ n }}</p>", n=3)
+
+    @app.after_request
+    def _header(resp):
+        with request_timing.segment("csp"):
+            pass
+        resp.headers["Server-Timing"] = request_timing.server_timing(g._start_ts)
+        request_timing.check_budget(app, resp.status_code, g._start_ts)
+        return resp
+
+    return app
+
+
+def test_segments_and_query_count():
+    app = _app()
+    header = app.test_client().get("/page").headers["Server-Timing"]
+    names = [part.split(";")[0] for part in header.split(", ")]
+    assert names == ["app", "db", "render", "csp"]
+    assert 'desc="3 queries"' in header
+
+
+def test_over_budget_is_logged_with_request_id(caplog):
+    app = _app(REQUEST_QUERY_BUDGET=2, REQUEST_LATENCY_BUDGET_MS=0)
+    with caplog.at_level(logging.WARNING):
+        app.test_client().get("/page")
+    msgs = [r.getMessage() for r in caplog.records if "Over budget" in r.getMessage()]
+    assert len(msgs) == 1
+    assert "queries 3>2" in msgs[0] and "rid=rid-123" in msgs[0] and "/page" in msgs[0]
@@ -0,0 +1,74 @@
+# tests/test_roi_counters.py
+from app.services import metrics_store
+from app.services.roi_counters import WriteBehindBuffer
+
+
+class _FlakyRedis:
+    def __init__(self, fail=0):
+        self.fail, self.hashes = fail, {}
+
+    def pipeline(self, transaction=True):
+        assert transaction is True
+        ops, owner = [], self
+
+        class _Pipe:
+            def hincrby(self, key, field, amount):
+                ops.append((key, field, amount))
+
+            hincrbyfloat = hincrby
+
+            def execute(self):
+                if owner.fail:
+                    owner.fail -= 1
+                    raise ConnectionError("redis blip")
+                for key, field, amount in ops:
+                    h = owner.hashes.setdefault(key, {})
+                    h[field] = h.get(field, 0) + amount
+
+        return _Pipe()
+
+
+def test_failed_flush_is_retried_without_losing_counts(monkeypatch):
+    r = _FlakyRedis(fail=1)
+    monkeypatch.setattr(metrics_store, "backend", lambda: metrics_store.RedisBackend(r))
+    buf = WriteBehindBuffer()
+    buf._stop.set()  # drive flushes by hand
+
+    buf.add("fc:roi:2025-W01", {"impressions": 2, "imp:hub": 2}, {"imp_last_ts": 2.0})
+    assert buf.flush() is False and buf.stats()["pending_fields"] == 3
+    buf.add("fc:roi:2025-W01", {"impressions": 1, "imp:hub": 1}, {"imp_last_ts": 1.0})
+    assert buf.flush() is True
+    assert r.hashes == {"fc:roi:2025-W01": {"impressions": 3, "imp:hub": 3, "imp_last_ts": 3.0}}
+    assert buf.stats()["failures"] == 1 and buf.stats()["pending_fields"] == 0
+
+
+def test_new_fields_past_the_cap_are_dropped_and_counted(monkeypatch):
+    r = _FlakyRedis()
+    monkeypatch.setattr(metrics_store, "backend", lambda: metrics_store.RedisBackend(r))
+    buf = WriteBehindBuffer(max_fields=2)
+    buf._stop.set()
+
+    buf.add("k", {"a": 1, "b": 1, "c": 1})
+    buf.add("k", {"a": 4})  # existing field still accumulates
+    assert buf.dropped == 1
+    buf.close()  # drains
+    assert r.hashes == {"k": {"a": 5, "b": 1}}
+
+
+def test_thread_flushes_once_enough_events_are_pending(monkeypatch, app):
+    r = _FlakyRedis()
+    monkeypatch.setattr(metrics_store, "backend", lambda: metrics_store.RedisBackend(r))
+    buf = WriteBehindBuffer(flush_ms=60_000, flush_events=3)
+    app.config.update(ROI_FLUSH_MS=60_000, ROI_FLUSH_EVENTS=3)
+    try:
+        buf.add("k", {"clicks": 1}, events=2)
+        assert buf.alive and r.hashes == {}
+        buf.add("k", {"clicks": 1})
+        for _ in range(200):
+            if r.hashes:
+                break
+            buf._thread.join(0.01)
+        assert r.hashes == {"k": {"clicks": 2}}
+    finally:
+        app.config.update(ROI_FLUSH_MS=1000, ROI_FLUSH_EVENTS=500)
+        buf.close()
@@ -0,0 +1,102 @@
+# tests/test_rollups.py
+import pytest
+
+from app.services import metrics_store, rollups, roi_counters
+
+
+class _MemRedis:
+    """Just enough Redis for the ROI write/read paths."""
+
+    def __init__(self):
+        self.hashes, self.ttls = {}, {}
+
+    def hincrby(self, key, field, amount):
+        h = self.hashes.setdefault(key, {})
+        h[field] = h.get(field, 0) + amount
+
+    hincrbyfloat = hincrby
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    def pfadd(self, key, *values):
+        pass
+
+    sadd = pfadd
+
+    def hmget(self, key, fields):
+        h = self.hashes.get(key, {})
+        return [None if h.get(f) is None else str(h[f]).encode() for f in fields]
+
+    def pipeline(self, transaction=True):
+        owner, results = self, []
+
+        class _Pipe:
+            def __getattr__(self, name):
+                return lambda *a: results.append(getattr(owner, name)(*a))
+
+            def execute(self):
+                return list(results)
+
+        return _Pipe()
+
+
+@pytest.fixture
+def mem_redis(monkeypatch):
+    r = _MemRedis()
+    roi_counters.buffer.flush()
+    monkeypatch.setattr(metrics_store, "backend", lambda: metrics_store.RedisBackend(r))
+    return r
+
+
+def test_step_and_time_parsing():
+    assert [rollups.parse_step(s) for s in ("90", "5m", "1h", "2d")] == [90, 300, 3600, 172800]
+    assert [rollups.resolution_for(s) for s in (300, 7200, 86400 * 7)] == ["1m", "1h", "1d"]
+    with pytest.raises(ValueError):
+        rollups.resolution_for(90)
+    with pytest.raises(ValueError):
+        rollups.parse_step("soon")
+    assert rollups.parse_time("2025-08-15T00:00:00Z") == rollups.parse_time("2025-08-15T00:00:00") == 1755216000
+    assert rollups.parse_time("1755216000") == 1755216000 and rollups.parse_time("") is None
+
+
+def test_deltas_land_in_every_bucket_with_retention(mem_redis):
+    ts = 1755216000 + 3600 * 5 + 60 * 7 + 30  # 2025-08-15 05:07:30 UTC
+    rollups.record("2025-W33", {"clicks": 2}, {"donations_total": 12.5}, ts=ts)
+    roi_counters.buffer.flush()
+    for key in ("fc:roi:2025-W33", "fc:roi:1m:1755234420", "fc:roi:1h:1755234000", "fc:roi:1d:1755216000"):
+        assert mem_redis.hashes[key] == {"clicks": 2, "donations_total": 12.5}
+    assert mem_redis.ttls["fc:roi:1m:1755234420"] == 48 * 3600
+    assert mem_redis.ttls["fc:roi:1d:1755216000"] == 400 * 86400
+    assert mem_redis.ttls["fc:roi:2025-W33"] == 400 * 86400
+
+
+def test_series_sums_aligned_steps(mem_redis, monkeypatch):
+    base = 1755216000
+    for minute, n in ((0, 1), (3, 2), (5, 4), (14, 8)):
+        rollups.record("2025-W33", {"impressions": n}, ts=base + minute * 60)
+    roi_counters.buffer.flush()
+
+    out = rollups.series(["impressions", "clicks"], base + 30, base + 15 * 60, 300)
+    assert out["resolution"] == "1m" and out["from"] == base and out["to"] == base + 900
+    assert out["t"] == [base, base + 300, base + 600]
+    assert out["series"] == {"impressions": [3, 4, 8], "clicks": [0, 0, 0]}
+
+    hourly = rollups.series(["impressions"], base, base + 2 * 3600, 3600)
+    assert hourly["resolution"] == "1h" and hourly["series"]["impressions"] == [15, 0]
+
+    monkeypatch.setattr(rollups, "np", None)  # pure-Python fold agrees
+    assert rollups.series(["impressions", "clicks"], base + 30, base + 15 * 60, 300) == out
+
+    with pytest.raises(ValueError):
+        rollups.series(["impressions"], base, base + 86400 * 30, 60, max_buckets=1000)
+
+
+def test_range_endpoint(client, mem_redis):
+    client.post("/metrics/events", json=[{"type": "click", "key": "cta"}] * 3)
+    roi_counters.buffer.flush()
+    body = client.get("/metrics/range?step=1m&field=clicks,click:cta").get_json()
+    assert body["ok"] and body["resolution"] == "1m" and len(body["t"]) in (1440, 1441)  # last 24h, current minute included
+    assert sum(body["series"]["clicks"]) == 3 and sum(body["series"]["click:cta"]) == 3
+    assert client.get("/metrics/range?step=90s").status_code == 400
+    assert client.get("/metrics/range?from=tomorrow").status_code == 400
@@ -0,0 +1,72 @@
+# tests/test_schema_registry.py
+from flask import Flask
+from sqlalchemy import text
+
+from app.extensions import db
+from app.services import data_version, schema_registry
+from app.services.schema_registry import SCHEMA_KEY, get_registry, init_schema_registry, table_exists
+
+
+def _app():
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI="sqlite:///:memory:")
+    db.init_app(app)
+    return app
+
+
+def test_lookups_are_served_from_memory():
+    app = _app()
+    with app.app_context():
+        db.session.execute(text("CREATE TABLE sponsors (id INTEGER PRIMARY KEY)"))
+        db.session.commit()
+        reg = init_schema_registry(app)
+        assert reg.inspections == 1
+
+        class Sponsor:
+            __tablename__ = "sponsors"
+
+        for _ in range(5):
+            assert table_exists(Sponsor)
+            assert not table_exists("donations")
+        assert reg.inspections == 1
+        assert reg.stats()["inspections_saved"] == 9  # 10 questions, 1 inspection
+
+
+def test_refresh_picks_up_new_tables():
+    app = _app()
+    with app.app_context():
+        reg = init_schema_registry(app)
+        assert not table_exists("donations")
+        db.session.execute(text("CREATE TABLE donations (id INTEGER PRIMARY KEY)"))
+        db.session.commit()
+        assert not table_exists("donations")  # stale until refreshed
+        reg.refresh()
+        assert table_exists("donations")
+        assert get_registry(app) is reg
+
+
+def _create_donations():
+    db.session.execute(text("CREATE TABLE donations (id INTEGER PRIMARY KEY)"))
+    db.session.commit()
+
+
+def test_another_workers_refresh_reaches_this_one():
+    app = _app()
+    with app.app_context():
+        reg = init_schema_registry(app)
+        assert not table_exists("donations")
+        _create_donations()
+        data_version.observe([SCHEMA_KEY], data_version.version(SCHEMA_KEY) + 1)  # as delivered by the bus
+        assert table_exists("donations") and reg.inspections == 2
+        assert table_exists("donations") and reg.inspections == 2
+
+
+def test_a_miss_reinspects_once_the_ttl_has_passed(monkeypatch):
+    app = _app()
+    with app.app_context():
+        reg = init_schema_registry(app)
+        _create_donations()
+        assert not table_exists("donations")
+        later = reg.refreshed_at + reg.miss_ttl
+        monkeypatch.setattr(schema_registry.time, "time", lambda: later)
+        assert table_exists("donations") and reg.inspections == 2
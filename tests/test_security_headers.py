@@ -0,0 +1,22 @@
+# tests/test_security_headers.py
+import re
+
+from app.security.csp import NONCE_SLOT, CspTemplate
+
+
+def test_template_fills_every_nonce_slot():
+    tpl = CspTemplate(f"script-src 'self' 'nonce-{NONCE_SLOT}'; style-src 'self' 'nonce-{NONCE_SLOT}'")
+    assert tpl.render("abc") == "script-src 'self' 'nonce-abc'; style-src 'self' 'nonce-abc'"
+    assert tpl.render("") == "script-src 'self'; style-src 'self'"
+
+
+def test_html_gets_nonce_policy_json_does_not(client):
+    html = client.get("/")
+    csp = html.headers["Content-Security-Policy"]
+    nonce = re.search(r"'nonce-([^']+)'", csp).group(1)
+    assert f'nonce="{nonce}"' in html.get_data(as_text=True)
+    assert html.headers["X-Content-Type-Options"] == "nosniff"
+
+    api = client.get("/api/stats")
+    assert "Content-Security-Policy" not in api.headers
+    assert api.headers["X-Frame-Options"] == "DENY"
@@ -0,0 +1,60 @@
+# tests/test_snapshot_cache.py
+from app.extensions import db
+from app.services import data_version
+from app.services.snapshot_cache import SnapshotCache
+
+
+def test_cache_hit_until_version_bump():
+    cache = SnapshotCache(ttl=0)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {"raised": len(calls)}
+
+    a = cache.get("t", ("sponsors",), build)
+    b = cache.get("t", ("sponsors",), build)
+    assert a is b and len(calls) == 1
+
+    data_version.bump("sponsors")
+    c = cache.get("t", ("sponsors",), build)
+    assert len(calls) == 2
+    assert c.etag != a.etag
+
+
+def test_unrelated_table_keeps_snapshot():
+    cache = SnapshotCache(ttl=0)
+    first = cache.get("t", ("sponsors",), lambda: {"x": 1})
+    data_version.bump("newsletter_signups")
+    assert cache.peek("t", ("sponsors",)) is first
+
+
+def test_commit_bumps_version_rollback_does_not(db_app):
+    from app.models.sponsor import Sponsor
+
+    before = data_version.version("sponsors")
+    db.session.add(Sponsor(name="Acme", amount=5000, status="paid"))
+    db.session.flush()
+    assert data_version.version("sponsors") == before  # not yet committed
+    db.session.commit()
+    after = data_version.version("sponsors")
+    assert after > before
+
+    db.session.add(Sponsor(name="Nope", amount=100, status="paid"))
+    db.session.flush()
+    db.session.rollback()
+    assert data_version.version("sponsors") == after
+
+
+def test_sponsor_view_has_the_keys_the_partials_read():
+    from jinja2 import Environment
+
+    from app.models.sponsor import Sponsor
+    from app.routes.main import _sponsor_view
+
+    views = [_sponsor_view(Sponsor(id=i, name=n, amount=a)) for i, (n, a) in enumerate([("A", 500), ("B", 900)])]
+    assert set(views[0]) >= {"amount", "tier", "logo", "url"} and views[0]["logo"] is None
+    tpl = Environment().from_string(
+        "{{ (s | sort(attribute='amount', reverse=True))[0].name }} {{ s | sum(attribute='amount') }}"
+    )
+    assert tpl.render(s=views) == "B 1400"
@@ -0,0 +1,35 @@
+# tests/test_startup_profile.py
+from app.services import clients
+from app.services.startup_profile import parse_importtime, top_imports
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     redis.exceptions
+2026-01-01 00:00:00 [INFO] app: some log line
+import time:      4000 |      84113 |   redis
+import time:      1500 |     100000 | app.routes.api
+"""
+
+
+def test_parse_importtime_skips_noise_and_keeps_depth():
+    rows = parse_importtime(SAMPLE)
+    assert [r["module"] for r in rows] == ["redis.exceptions", "redis", "app.routes.api"]
+    assert rows[0]["depth"] == 2 and rows[2]["depth"] == 0
+    assert rows[1]["cumulative_ms"] == 84.113
+    assert [r["module"] for r in top_imports(rows, prefix="app")] == ["app.routes.api"]
+
+
+def test_create_app_records_init_steps(app):
+    steps = dict(app.extensions["fc_startup"].steps)
+    assert "sqlalchemy" in steps and "blueprint:app.routes.api" in steps
+
+
+def test_clients_are_cached_including_unavailable(monkeypatch):
+    monkeypatch.setenv("REDIS_URL", "memory://")
+    clients.reset("redis")
+    try:
+        assert clients.redis_client() is None
+        monkeypatch.setenv("REDIS_URL", "redis://localhost:6379/0")
+        assert clients.redis_client() is None  # cached until reset()
+    finally:
+        clients.reset("redis")
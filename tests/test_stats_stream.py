@@ -0,0 +1,117 @@
+# tests/test_stats_stream.py
+import json
+
+from app.services.stats_stream import HEARTBEAT, StatsBroadcaster
+
+
+def _event_data(chunk: bytes) -> dict:
+    line = [ln for ln in chunk.decode().splitlines() if ln.startswith("data: ")][0]
+    return json.loads(line[len("data: "):])
+
+
+def test_publish_dedupes_and_encodes_once():
+    b = StatsBroadcaster()
+    assert b.publish({"raised": 10, "goal": 100, "percent": 10.0})
+    first = b.event
+    assert not b.publish({"raised": 10, "goal": 100, "percent": 10.0})
+    assert b.event is first and b.seq == 1
+
+    s1 = b.stream(None, heartbeat=0.01, max_seconds=0)
+    s2 = b.stream(None, heartbeat=0.01, max_seconds=0)
+    assert next(s1).startswith(b"retry:") and next(s2).startswith(b"retry:")
+    # Both connections write the very same bytes object
+    assert next(s1) is next(s2) is first
+    assert _event_data(first)["seq"] == 1
+    assert next(s1) == HEARTBEAT
+    s1.close(), s2.close()
+    assert b.clients == 0
+
+
+def test_resume_with_last_event_id_skips_duplicate():
+    b = StatsBroadcaster()
+    b.publish({"raised": 5})
+    resumed = b.stream(b.event_id, heartbeat=0.01, max_seconds=0)
+    next(resumed)  # retry
+    assert next(resumed) == HEARTBEAT  # nothing new since the client's last id
+
+    b.publish({"raised": 6})
+    chunk = next(resumed)
+    assert _event_data(chunk)["raised"] == 6
+    resumed.close()
+
+
+def test_stream_ends_after_max_seconds():
+    b = StatsBroadcaster()
+    b.publish({"raised": 1})
+    chunks = list(b.stream(None, heartbeat=0.01, max_seconds=0.03))
+    assert chunks[0].startswith(b"retry:") and chunks[1] == b.event
+    assert b.clients == 0
+
+
+def test_capacity_stays_well_below_the_worker_threads(monkeypatch):
+    from app.services.stats_stream import capacity
+
+    monkeypatch.setenv("FC_WORKER_CLASS", "gthread")
+    monkeypatch.setenv("FC_WORKER_THREADS", "8")
+    assert capacity({"SSE_MAX_CLIENTS": 0}) == 2
+    assert capacity({"SSE_MAX_CLIENTS": 5}) == 5
+    monkeypatch.setenv("FC_WORKER_CLASS", "eventlet")
+    assert capacity({"SSE_MAX_CLIENTS": 0, "SSE_ASYNC_MAX_CLIENTS": 500}) == 500
+
+
+def test_stream_route_rejects_past_capacity_and_frees_slots(client, app, monkeypatch):
+    from app.services.stats_stream import broadcaster
+
+    monkeypatch.setitem(app.config, "SSE_MAX_CLIENTS", 1)
+    before = broadcaster.clients
+    assert broadcaster.acquire(before + 1)  # somebody else's stream fills the process
+    try:
+        res = client.get("/stats/stream")
+        assert res.status_code == 503 and res.headers["Retry-After"] == "30"
+    finally:
+        broadcaster.release()
+
+    monkeypatch.setitem(app.config, "SSE_MAX_CLIENTS", before + 1)
+    res = client.get("/stats/stream", buffered=False)
+    assert res.status_code == 200 and broadcaster.clients == before + 1
+    res.close()  # client went away before reading a byte
+    assert broadcaster.clients == before
+
+
+def test_stream_script_only_on_pages_with_live_totals(client):
+    assert b"fc-stats-stream.js" in client.get("/").data
+    assert b"fc-stats-stream.js" not in client.get("/about").data
+
+
+def test_pump_stops_with_the_last_subscriber_and_restarts():
+    import time
+
+    from flask import Flask
+
+    b = StatsBroadcaster()
+    app = Flask(__name__)
+    assert b.acquire(10)
+    b.start(app, lambda: {"raised": b.builds}, poll=0.01)
+    assert _wait_for(lambda: b.event is not None)
+    b.release()
+    assert _wait_for(lambda: not b.stats()["pump_alive"]) and b.event is None
+    idle = b.builds
+    time.sleep(0.05)
+    assert b.builds == idle  # no rebuilds while nobody listens
+
+    assert b.acquire(10)
+    b.start(app, lambda: {"raised": b.builds}, poll=0.01)
+    assert _wait_for(lambda: b.builds > idle and b.event is not None)
+    b.release()
+    assert _wait_for(lambda: not b.stats()["pump_alive"])
+
+
+def _wait_for(pred, timeout=2.0):
+    import time
+
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if pred():
+            return True
+        time.sleep(0.01)
+    return False
@@ -0,0 +1,102 @@
+# tests/test_uniques.py
+import pytest
+
+from app.services import metrics_store, roi_counters, uniques
+from app.services.uniques import HyperLogLog
+
+
+def test_hll_is_bounded_and_accurate():
+    hll = HyperLogLog()
+    for i in range(20_000):
+        hll.add(f"visitor-{i}")
+    for i in range(5_000):  # repeats don't count
+        hll.add(f"visitor-{i}")
+    assert not hll.sparse and hll.nbytes == HyperLogLog.DENSE_BYTES <= 12 * 1024 + 1
+    assert abs(hll.count() - 20_000) / 20_000 < 0.03
+    assert HyperLogLog.frombytes(hll.tobytes()).count() == hll.count()
+
+
+def test_small_hll_stays_sparse_and_round_trips():
+    hll = HyperLogLog()
+    for i in range(100):
+        hll.add(f"visitor-{i}")
+    blob = hll.tobytes()
+    assert hll.sparse and len(blob) <= 300
+    again = HyperLogLog.frombytes(blob)
+    assert again.sparse and again.count() == hll.count() and abs(hll.count() - 100) <= 3
+
+    for i in range(100, 5_000):  # crosses SPARSE_MAX set registers → dense, same estimate either way
+        hll.add(f"visitor-{i}")
+    assert not hll.sparse and abs(hll.count() - 5_000) / 5_000 < 0.03
+
+
+def test_visitor_hash_is_keyed_and_week_scoped():
+    a = uniques.visitor_hash("203.0.113.7|Mozilla", "2025-W01", secret="s")
+    assert a == uniques.visitor_hash("203.0.113.7|Mozilla", "2025-W01", secret="s")
+    assert a != uniques.visitor_hash("203.0.113.7|Mozilla", "2025-W02", secret="s")
+    assert a != uniques.visitor_hash("203.0.113.7|Mozilla", "2025-W01", secret="t")
+    assert "203.0.113.7" not in a and len(a) == 16
+
+
+@pytest.fixture
+def local_only(monkeypatch):
+    monkeypatch.setattr(metrics_store, "backend", lambda: None)  # METRICS_BACKEND=none
+    uniques.reset_local()
+    yield
+    uniques.reset_local()
+
+
+def test_weekly_report_counts_visitors_not_refreshes(client, local_only):
+    page = [{"type": "impression", "key": "tiers", "route": "/tiers"}]
+    for vid in ("anon-1", "anon-1", "anon-1", "anon-2"):
+        client.post("/metrics/events", json={"vid": vid, "events": page})
+    client.post("/metrics/events", json={"vid": "anon-2", "events": [{"type": "click", "key": "cta"}]})
+
+    body = client.get("/metrics/roi/weekly").get_json()
+    assert body["uniques"]["impressions"] == 2 and body["uniques"]["clicks"] == 1
+    assert body["uniques"]["by"]["imp:route:/tiers"] == 2
+    assert body["uniques"]["by"]["imp:source:web"] == 2
+    assert body["uniques"]["by"]["click:key:cta"] == 1
+
+
+def test_redis_path_buffers_pfadd_and_index(monkeypatch):
+    calls = []
+
+    class _Pipe:
+        def __getattr__(self, name):
+            return lambda *args: calls.append((name,) + args)
+
+        def execute(self):
+            pass
+
+    class _Redis:
+        def pipeline(self, transaction=True):
+            return _Pipe()
+
+    monkeypatch.setattr(metrics_store, "backend", lambda: metrics_store.RedisBackend(_Redis()))
+    roi_counters.buffer.flush()
+    calls.clear()
+
+    ctx = {"key": "hub", "route": "", "peer": "jordan-t", "campaign": "", "source": "web"}
+    uniques.observe("2025-W01", [("impression", ctx)], "abc123")
+    roi_counters.buffer.flush()
+    pfadds = {c[1] for c in calls if c[0] == "pfadd"}
+    assert pfadds == {
+        "fc:uv:2025-W01:imp",
+        "fc:uv:2025-W01:imp:key:hub",
+        "fc:uv:2025-W01:imp:peer:jordan-t",
+        "fc:uv:2025-W01:imp:source:web",
+    }
+    assert all(c[2:] == ("abc123",) for c in calls if c[0] == "pfadd")
+    assert ("sadd", "fc:uv:2025-W01:index", "imp", "imp:key:hub", "imp:peer:jordan-t", "imp:source:web") in calls
+
+
+def test_dimension_values_past_the_cap_fold_into_other(client, app, local_only, monkeypatch):
+    monkeypatch.setitem(app.config, "ROI_MAX_DIMENSION_VALUES", 2)
+    for i, route in enumerate(("/a", "/b", "/c", "/d", "/a")):
+        client.post("/metrics/events", json={"vid": f"anon-{i}", "events": [{"type": "impression", "route": route}]})
+
+    by = client.get("/metrics/roi/weekly").get_json()["uniques"]["by"]
+    routes = {k for k in by if k.startswith("imp:route:")}
+    assert routes == {"imp:route:/a", "imp:route:/b", "imp:route:other"}
+    assert by["imp:route:other"] == 2 and by["imp:route:/a"] == 2